@@ -8,12 +8,31 @@ class Settings(BaseSettings):
 
     # Database
     MONGODB_URI: str = "mongodb://mongo:27017/vedicjivan"
+    MONGODB_MIN_POOL_SIZE: int = 2
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    # Read routing per query class: read_preference, read_concern,
+    # max_staleness_seconds (>= 90) and tags. Unlisted classes use the primary.
+    MONGODB_READ_PROFILES: dict[str, dict] = {
+        "analytics": {
+            "read_preference": "secondaryPreferred",
+            "read_concern": "local",
+            "max_staleness_seconds": 120,
+        },
+    }
 
     # Auth
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # SSE stream tokens go in the URL (EventSource cannot send headers), so
+    # they are only valid long enough to open the stream
+    STREAM_TOKEN_EXPIRE_SECONDS: int = 60
+    # Revoked token/session ids: per-worker Bloom filter sized for CAPACITY
+    # ids at ERROR_RATE false positives, delta-synced every SYNC_SECONDS
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_SYNC_SECONDS: float = 5.0
 
     # Stripe
     STRIPE_SECRET_KEY: str = ""
@@ -24,8 +43,125 @@ class Settings(BaseSettings):
     EMAIL_FROM: str = "VedicJivan <noreply@nandishdave.world>"
     ADMIN_EMAIL: str = "vedic.jivan33@gmail.com"
 
+    # Stripe and Resend calls: per-call deadline and max concurrent calls
+    # per worker. A dependency's breaker opens for BREAKER_OPEN_SECONDS when
+    # BREAKER_ERROR_RATE of its last BREAKER_WINDOW calls failed (after at
+    # least BREAKER_MIN_CALLS), then lets one probe call through.
+    STRIPE_TIMEOUT_SECONDS: float = 10.0
+    STRIPE_MAX_CONCURRENCY: int = 8
+    RESEND_TIMEOUT_SECONDS: float = 5.0
+    RESEND_MAX_CONCURRENCY: int = 4
+    BREAKER_WINDOW: int = 20
+    BREAKER_MIN_CALLS: int = 5
+    BREAKER_ERROR_RATE: float = 0.5
+    BREAKER_OPEN_SECONDS: float = 30.0
+
+    # Serve /slots and booking conflict checks from db.day_schedule.
+    # Enable once the read model has been rebuilt for existing dates.
+    DAY_SCHEDULE_READS: bool = False
+
+    # Check booking conflicts with one indexed find_one on start_min/end_min.
+    # Enable once POST /api/admin/migrations/interval-fields has run.
+    INTERVAL_CONFLICT_CHECKS: bool = False
+
+    # Cross-worker cache invalidation: "auto" (change streams, else polling
+    # the capped collection), "change_stream", "poll" or "off"
+    INVALIDATION_BUS: str = "auto"
+
+    # Background jobs run on whichever worker holds the Mongo lease
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LEASE_SECONDS: int = 30
+
+    # Move past confirmed sessions to completed in the background
+    AUTO_COMPLETE_ENABLED: bool = True
+    AUTO_COMPLETE_INTERVAL_SECONDS: int = 900
+
+    # Rate limiting ("memory" per worker, "mongo" shared across workers)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMITS: dict[str, str] = {
+        "login:ip": "20/minute",
+        "login:email": "5/minute",
+        "register:ip": "5/minute",
+        "bookings:ip": "30/minute",
+    }
+    # Proxies that append to X-Forwarded-For (API Gateway); 0 ignores the header
+    TRUSTED_PROXY_HOPS: int = 1
+
+    # Idempotency-Key on booking creation and checkout: stored responses
+    # expire after the TTL; duplicates wait up to WAIT_SECONDS for the first
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+
+    # Public availability reads: browser max-age, CDN s-maxage and
+    # stale-while-revalidate. Writes purge the CDN, so its TTL can be long.
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 60
+    HTTP_CACHE_CDN_MAX_AGE_SECONDS: int = 86400
+    HTTP_CACHE_STALE_SECONDS: int = 86400
+    # CloudFront distribution serving /api/availability reads ("" = no purges)
+    CDN_DISTRIBUTION_ID: str = ""
+
+    # Kundli charts: birth times are local to KUNDLI_TIMEZONE; computed
+    # charts are kept in db.kundli_charts and a per-worker LRU of this size
+    KUNDLI_TIMEZONE: str = "Asia/Kolkata"
+    KUNDLI_CACHE_SIZE: int = 1024
+
+    # Logging: JSON lines on stdout, written by a listener thread from a
+    # queue of LOG_QUEUE_SIZE records (overflow is dropped and counted).
+    # DEBUG records are kept for LOG_DEBUG_SAMPLE_RATE of requests.
+    LOG_LEVEL: str = "INFO"
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01
+    LOG_QUEUE_SIZE: int = 10_000
+
+    # Tracing: "off", "console", "file" (JSON lines in TRACING_FILE) or
+    # "module:factory". New traces are sampled at TRACING_SAMPLE_RATIO;
+    # an incoming traceparent keeps the caller's decision.
+    TRACING_EXPORTER: str = "off"
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 0.1
+
+    # Profiling (admin-only, opt-in per request)
+    PROFILING_ENABLED: bool = True
+    PROFILING_OUTPUT_DIR: str = ""
+
     class Config:
         env_file = ".env"
 
 
-settings = Settings()
+_settings: Settings | None = None
+
+
+def get_settings() -> Settings:
+    """Return the active settings, loading them from the environment once."""
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+def configure(new_settings: Settings) -> Settings:
+    """Install an explicitly built Settings instance (see create_app)."""
+    global _settings
+    _settings = new_settings
+    return new_settings
+
+
+class _SettingsProxy:
+    """Module-level ``settings`` that resolves lazily on first attribute access.
+
+    Importing ``app.config`` no longer reads the environment, so modules can
+    be imported (and tests collected) before configuration is available.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+    def __delattr__(self, name):
+        delattr(get_settings(), name)
+
+
+settings = _SettingsProxy()
@@ -1,22 +1,84 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
 
+from app import tracing
 from app.config import settings
+from app.memorydb import MemoryClient, is_memory_uri
+
+# Query classes with their own read routing (see MONGODB_READ_PROFILES)
+ANALYTICS = "analytics"
+
+_READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
 
 client: AsyncIOMotorClient = None
 db: AsyncIOMotorDatabase = None
+_profile_dbs: dict[str, AsyncIOMotorDatabase] = {}
 
 
 async def connect_db():
     global client, db
-    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    if is_memory_uri(settings.MONGODB_URI):
+        client = MemoryClient(settings.MONGODB_URI)
+        db = client.get_default_database()
+        _profile_dbs.clear()
+        return
+    client = AsyncIOMotorClient(
+        settings.MONGODB_URI,
+        minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+        serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        event_listeners=[tracing.MongoCommandListener()],
+    )
     db = client.get_default_database()
+    _profile_dbs.clear()
 
 
 async def close_db():
     global client
     if client:
         client.close()
+    _profile_dbs.clear()
+
+
+def read_options(profile: dict) -> dict:
+    """Translate a read profile into ``Database.with_options`` kwargs."""
+    options = {}
+    mode = profile.get("read_preference", "primary")
+    if mode not in _READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference: {mode}")
+    if mode == "primary":
+        options["read_preference"] = Primary()
+    else:
+        options["read_preference"] = _READ_PREFERENCES[mode](
+            tag_sets=profile.get("tags"),
+            max_staleness=profile.get("max_staleness_seconds", -1),
+        )
+    if profile.get("read_concern"):
+        options["read_concern"] = ReadConcern(profile["read_concern"])
+    return options
+
 
+def get_db(query_class: str | None = None) -> AsyncIOMotorDatabase:
+    """The database handle, optionally routed for a query class.
 
-def get_db() -> AsyncIOMotorDatabase:
-    return db
+    Classes without a profile in ``MONGODB_READ_PROFILES`` (and the default)
+    read from the primary, so booking-critical reads are never stale.
+    """
+    profile = settings.MONGODB_READ_PROFILES.get(query_class) if query_class else None
+    if not profile or db is None:
+        return db
+    if query_class not in _profile_dbs:
+        _profile_dbs[query_class] = db.with_options(**read_options(profile))
+    return _profile_dbs[query_class]
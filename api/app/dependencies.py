@@ -1,8 +1,11 @@
-from fastapi import Depends, Header
+from fastapi import Depends, Header, Query, Request
 
+from app.config import settings
 from app.database import get_db
 from app.models.user import UserRole
-from app.utils.exceptions import ForbiddenError, UnauthorizedError
+from app.services import rate_limit as limiter
+from app.services import revocation
+from app.utils.exceptions import ForbiddenError, TooManyRequestsError, UnauthorizedError
 from app.utils.security import decode_token
 
 
@@ -15,6 +18,14 @@ async def get_current_user(authorization: str = Header(...)):
 
     if not payload or payload.get("type") != "access":
         raise UnauthorizedError("Invalid or expired token")
+    return await _token_user(payload)
+
+
+async def _token_user(payload: dict) -> dict:
+    # Served from the per-worker Bloom filter; only probable hits query Mongo
+    sid = payload.get("sid")
+    if sid and await revocation.is_revoked(sid):
+        raise UnauthorizedError("Session has been revoked")
 
     db = get_db()
     from bson import ObjectId
@@ -35,3 +46,62 @@ async def require_admin(current_user: dict = Depends(get_current_user)):
     if current_user["role"] != UserRole.ADMIN:
         raise ForbiddenError("Admin access required")
     return current_user
+
+
+async def require_admin_stream(token: str | None = Query(None)):
+    """Admin for a Server-Sent Events route, from a ``?token=`` stream token.
+
+    A browser ``EventSource`` cannot send an Authorization header, so the
+    client first exchanges its access token for a stream token
+    (``POST /api/admin/stream-token``) and puts that in the URL. Stream
+    tokens are only accepted here and expire after
+    ``STREAM_TOKEN_EXPIRE_SECONDS``; the token is checked when the stream
+    opens, so an open stream outlives it.
+    """
+    payload = decode_token(token) if token else None
+    if not payload or payload.get("type") != "stream":
+        raise UnauthorizedError("Invalid or expired stream token")
+    user = await _token_user(payload)
+    if user["role"] != UserRole.ADMIN:
+        raise ForbiddenError("Admin access required")
+    return user
+
+
+def client_ip(request: Request) -> str:
+    """Caller IP as seen by the outermost trusted proxy.
+
+    Clients can send any X-Forwarded-For they like, and each proxy appends
+    the address it received the request from. With ``TRUSTED_PROXY_HOPS``
+    proxies in front of the API the caller is that many entries from the
+    right; anything further left is client-supplied and ignored.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    forwarded = request.headers.get("x-forwarded-for")
+    if hops > 0 and forwarded:
+        chain = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        if len(chain) >= hops:
+            return chain[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(name: str, by_email: bool = False):
+    """Dependency enforcing the ``<name>:ip`` (and ``<name>:email``) buckets.
+
+    With ``by_email`` the ``email`` field of the JSON body is used as a second
+    key, so one account cannot be hammered from many IPs.
+    """
+
+    async def _check(request: Request):
+        decision = await limiter.check(f"{name}:ip", client_ip(request))
+        if decision.allowed and by_email:
+            try:
+                body = await request.json()
+            except ValueError:
+                body = None
+            email = body.get("email") if isinstance(body, dict) else None
+            if isinstance(email, str) and email:
+                decision = await limiter.check(f"{name}:email", email.strip().lower())
+        if not decision.allowed:
+            raise TooManyRequestsError(decision.retry_after)
+
+    return Depends(_check)
@@ -0,0 +1,182 @@
+"""Structured JSON logging that never blocks the event loop.
+
+Modules log with ``logging.getLogger(__name__)`` and pass structured
+fields via ``extra``. ``setup()`` installs a single ``QueueHandler`` on
+the root logger:
+
+* the logging call only stamps the record and puts it on a bounded queue
+  (``LOG_QUEUE_SIZE``) without waiting;
+* a listener thread formats each record as one JSON line on stdout.
+
+When stdout cannot keep up and the queue is full, records are dropped and
+counted rather than blocking the caller. A warning with the number
+dropped is logged once the queue has room again.
+
+Every record carries the ``request_id`` of the request that logged it
+(see ``RequestIdMiddleware``). DEBUG records are sampled per request at
+``LOG_DEBUG_SAMPLE_RATE``, so a sampled request keeps all its debug lines.
+"""
+
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+from app.config import settings
+
+# Loggers that install their own handlers; routed through ours instead
+_ADOPTED_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+# (request id, debug sampled) for the current request
+_context: contextvars.ContextVar[tuple[str, bool] | None] = contextvars.ContextVar(
+    "log_context", default=None
+)
+
+_stats = {"dropped": 0, "sampled_out": 0}
+_handler: "QueueHandler | None" = None
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _sample() -> bool:
+    return random.random() < settings.LOG_DEBUG_SAMPLE_RATE
+
+
+def bind_request(request_id: str) -> contextvars.Token:
+    """Attach ``request_id`` (and a debug sampling decision) to this context."""
+    return _context.set((request_id, _sample()))
+
+
+def unbind_request(token: contextvars.Token):
+    _context.reset(token)
+
+
+def current_request_id() -> str | None:
+    context = _context.get()
+    return context[0] if context else None
+
+
+class ContextFilter(logging.Filter):
+    """Stamp the request id on records and drop unsampled DEBUG records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _context.get()
+        record.request_id = context[0] if context else None
+        if record.levelno <= logging.DEBUG and not (context[1] if context else _sample()):
+            _stats["sampled_out"] += 1
+            return False
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue without blocking; count what does not fit."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self._reported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments here (they may change after the call);
+        # JSON formatting and tracebacks are rendered by the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        unreported = _stats["dropped"] - self._reported
+        if unreported and self.queue.qsize() < self.queue.maxsize // 2:
+            self._reported += unreported
+            self._put(logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": "log records dropped: queue full",
+                "dropped": unreported,
+            }))
+        self._put(record)
+
+    def _put(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _stats["dropped"] += 1
+
+
+def setup():
+    """Route all logging through the queue to JSON on stdout (idempotent)."""
+    global _handler, _listener
+    if _listener is not None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    _handler = QueueHandler(log_queue)
+    _handler.addFilter(ContextFilter())
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name in _ADOPTED_LOGGERS:
+        adopted = logging.getLogger(name)
+        adopted.handlers.clear()
+        adopted.propagate = True
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+
+def shutdown():
+    """Flush queued records and stop the listener thread."""
+    global _handler, _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+
+
+def metrics() -> dict:
+    log_queue = _handler.queue if _handler else None
+    return {
+        "level": logging.getLevelName(logging.getLogger().level),
+        "queued": log_queue.qsize() if log_queue else 0,
+        "capacity": log_queue.maxsize if log_queue else 0,
+        "dropped": _stats["dropped"],
+        "debug_sampled_out": _stats["sampled_out"],
+        "debug_sample_rate": settings.LOG_DEBUG_SAMPLE_RATE,
+    }
+
+
+def reset():
+    shutdown()
+    _stats.update(dropped=0, sampled_out=0)
@@ -1,50 +1,136 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 
-from app.config import settings
-from app.database import close_db, connect_db
-from app.routers import admin, auth, availability, bookings, payments
+from app.config import Settings, configure, get_settings
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    from app import log, tracing
+    from app.config import settings
+    from app.database import close_db, connect_db
+    from app.services.booking_lifecycle import complete_past_bookings
+    from app.services import http_cache, revocation
+    from app.services.health import warm_up
+    from app.services.invalidation import InvalidationBus, set_bus
+    from app.services.scheduler import Scheduler
+
+    log.setup()
+    tracing.setup()
     await connect_db()
+    # Readiness flips once warm-up completes; liveness is up immediately
+    warmup = asyncio.create_task(warm_up())
+
+    # Every worker runs a scheduler; only the lease holder executes jobs
+    scheduler = Scheduler(lease_seconds=settings.SCHEDULER_LEASE_SECONDS)
+    if settings.AUTO_COMPLETE_ENABLED:
+        scheduler.add(
+            "auto_complete_bookings",
+            complete_past_bookings,
+            every=settings.AUTO_COMPLETE_INTERVAL_SECONDS,
+        )
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    app.state.scheduler = scheduler
+
+    # Purge public availability reads from CloudFront when they change
+    if settings.CDN_DISTRIBUTION_ID:
+        http_cache.add_purge_hook(http_cache.cloudfront_purge)
+
+    # Apply cache invalidations published by other workers
+    bus = None
+    if settings.INVALIDATION_BUS != "off":
+        bus = InvalidationBus(settings.INVALIDATION_BUS)
+        bus.start()
+        set_bus(bus)
+
+    # Keep this worker's revoked-session filter in sync
+    revocations = revocation.get_list()
+    revocations.start()
+
     yield
+    await revocations.stop()
+    if bus:
+        await bus.stop()
+        set_bus(None)
+    await scheduler.stop()
+    warmup.cancel()
     await close_db()
+    tracing.shutdown()
+    log.shutdown()
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """Build the API application.
+
+    Routers and middleware are imported here rather than at module level so
+    importing ``app.main`` stays cheap. Pass ``settings`` to configure the app
+    explicitly instead of reading the environment.
+    """
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from app.middleware.profiling import ProfilingMiddleware
+    from app.middleware.request_id import RequestIdMiddleware
+    from app.middleware.tracing import TracingMiddleware
+    from app.routers import admin, auth, availability, bookings, health, payments, services
+
+    settings = configure(settings) if settings is not None else get_settings()
+
+    app = FastAPI(
+        title="VedicJivan API",
+        description="Backend API for VedicJivan booking, payments, and admin",
+        version="1.3.0",
+        lifespan=lifespan,
+    )
+
+    # Profiling (admin-only, per request)
+    app.add_middleware(ProfilingMiddleware)
+
+    # CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            settings.FRONTEND_URL,
+            "http://localhost:3000",
+            "http://localhost:3001",
+            "https://vedicjivan.nandishdave.world",
+            "https://vedicjivan-test.nandishdave.world",
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Request-ID", "traceparent"],
+    )
+
+    # Request spans (inside the request id, so span logs carry it)
+    app.add_middleware(TracingMiddleware)
+
+    # Correlation ids (outermost, so every log line of the request has one)
+    app.add_middleware(RequestIdMiddleware)
+
+    # Routers
+    app.include_router(auth.router)
+    app.include_router(availability.router)
+    app.include_router(bookings.router)
+    app.include_router(payments.router)
+    app.include_router(services.router)
+    app.include_router(admin.router)
+    app.include_router(health.router)
+
+    return app
+
+
+_app: FastAPI | None = None
 
 
-app = FastAPI(
-    title="VedicJivan API",
-    description="Backend API for VedicJivan booking, payments, and admin",
-    version="1.3.0",
-    lifespan=lifespan,
-)
-
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        settings.FRONTEND_URL,
-        "http://localhost:3000",
-        "http://localhost:3001",
-        "https://vedicjivan.nandishdave.world",
-        "https://vedicjivan-test.nandishdave.world",
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Routers
-app.include_router(auth.router)
-app.include_router(availability.router)
-app.include_router(bookings.router)
-app.include_router(payments.router)
-app.include_router(admin.router)
-
-
-@app.get("/api/health")
-async def health():
-    return {"status": "ok", "service": "VedicJivan API"}
+def __getattr__(name: str):
+    # ``app.main:app`` keeps working for uvicorn and tests; the app is built
+    # on first access instead of at import time.
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
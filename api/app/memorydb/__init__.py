@@ -0,0 +1,19 @@
+"""An in-memory, Motor-compatible MongoDB for tests and benchmarks.
+
+Selected with ``MONGODB_URI=memory://`` (see ``app.database.connect_db``).
+Filters, updates and aggregation pipelines are evaluated with the server's
+semantics for the operators this API uses: BSON comparison order, array
+traversal, ``$text`` scores, positional updates, pipeline updates, unique
+and TTL indexes and capped collections. Data lives in the process, so it
+is not shared between workers and is lost on restart.
+"""
+
+from app.memorydb.client import MemoryClient, MemoryDatabase
+from app.memorydb.collection import MemoryCollection, MemoryCursor
+
+SCHEME = "memory://"
+
+
+def is_memory_uri(uri: str) -> bool:
+    return uri.startswith(SCHEME)
+
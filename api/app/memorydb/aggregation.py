@@ -0,0 +1,342 @@
+"""Aggregation pipeline stages and projections."""
+
+import copy
+import datetime as dt
+from functools import cmp_to_key
+
+from pymongo.errors import OperationFailure
+
+from app.memorydb.expressions import evaluate
+from app.memorydb.query import QueryContext, match
+from app.memorydb.values import (
+    MISSING,
+    compare,
+    get_path,
+    hash_key,
+    iter_values,
+    normalize,
+    set_path,
+    unset_path,
+)
+
+UPDATE_STAGES = {"$addFields", "$set", "$project", "$unset", "$replaceRoot", "$replaceWith"}
+
+
+class Pipeline:
+    """One pipeline run: shared ``$$NOW``, text scores and ``$lookup`` access."""
+
+    def __init__(self, ctx: QueryContext | None = None, database=None):
+        self.ctx = ctx or QueryContext()
+        self.database = database
+        self.now = normalize(dt.datetime.now(dt.timezone.utc))
+
+    def variables(self, doc: dict) -> dict:
+        variables = {**self.ctx.variables, "ROOT": doc, "NOW": self.now}
+        score = self.ctx.scores.get(id(doc))
+        if score is not None:
+            variables["__text_score__"] = score
+        return variables
+
+    def evaluate(self, expr, doc: dict):
+        return evaluate(expr, doc, self.variables(doc))
+
+    def carry(self, old: dict, new: dict) -> dict:
+        """Keep ``old``'s text score on the document that replaces it."""
+        score = self.ctx.scores.get(id(old))
+        if score is not None:
+            self.ctx.scores[id(new)] = score
+        return new
+
+
+# ── Projection ──
+
+
+def _is_flag(value) -> bool:
+    return isinstance(value, (bool, int)) and not isinstance(value, float) and value in (0, 1)
+
+
+def project(doc: dict, spec: dict | None, pipeline: Pipeline | None = None) -> dict:
+    """``find()`` projections and ``$project``."""
+    if not spec:
+        return doc
+    pipeline = pipeline or Pipeline()
+    fields = {k: v for k, v in spec.items() if k != "_id"}
+    # {"_id": 0} alone excludes _id and keeps everything else
+    exclusion = any(_is_flag(v) and not v for v in fields.values()) or (
+        not fields and _is_flag(spec["_id"]) and not spec["_id"]
+    )
+    if exclusion:
+        if any(not (_is_flag(v) and not v) for v in fields.values()):
+            raise OperationFailure("Cannot do inclusion on field in exclusion projection", code=31253)
+        result = copy.deepcopy(doc)
+        for path in fields:
+            unset_path(result, path)
+        if "_id" in spec and not spec["_id"]:
+            result.pop("_id", None)
+        return pipeline.carry(doc, result)
+
+    result: dict = {}
+    id_spec = spec.get("_id", 1)
+    if _is_flag(id_spec):
+        if id_spec and "_id" in doc:
+            result["_id"] = copy.deepcopy(doc["_id"])
+    else:
+        result["_id"] = pipeline.evaluate(id_spec, doc)
+    for path, value in fields.items():
+        if _is_flag(value):
+            found = get_path(doc, path)
+            if found is not MISSING:
+                set_path(result, path, copy.deepcopy(found))
+        else:
+            computed = pipeline.evaluate(value, doc)
+            if computed is not MISSING:
+                set_path(result, path, computed)
+    return pipeline.carry(doc, result)
+
+
+# ── Sorting ──
+
+
+def _sort_value(doc: dict, path: str, descending: bool):
+    values = []
+    for value in iter_values(doc, path.split(".")):
+        if isinstance(value, list):
+            values.extend(value)
+        else:
+            values.append(None if value is MISSING else value)
+    if not values:
+        return None
+    best = values[0]
+    for value in values[1:]:
+        c = compare(value, best)
+        if (c > 0) if descending else (c < 0):
+            best = value
+    return best
+
+
+def sort_documents(docs: list[dict], spec, pipeline: Pipeline | None = None) -> list[dict]:
+    if isinstance(spec, dict):
+        keys = list(spec.items())
+    else:
+        keys = list(spec)
+    pipeline = pipeline or Pipeline()
+
+    def key_value(doc, path, direction):
+        if isinstance(direction, dict) and direction.get("$meta") == "textScore":
+            return pipeline.ctx.scores.get(id(doc), 0)
+        return _sort_value(doc, path, direction < 0)
+
+    def cmp(a, b):
+        for path, direction in keys:
+            c = compare(key_value(a, path, direction), key_value(b, path, direction))
+            if c:
+                descending = isinstance(direction, dict) or direction < 0
+                return -c if descending else c
+        return 0
+
+    return sorted(docs, key=cmp_to_key(cmp))
+
+
+# ── $group ──
+
+
+def _accumulate(op: str, values: list):
+    present = [v for v in values if v is not MISSING]
+    if op == "$sum":
+        return sum(v for v in present if isinstance(v, (int, float)) and not isinstance(v, bool))
+    if op == "$avg":
+        numbers = [v for v in present if isinstance(v, (int, float)) and not isinstance(v, bool)]
+        return sum(numbers) / len(numbers) if numbers else None
+    if op in ("$min", "$max"):
+        present = [v for v in present if v is not None]
+        if not present:
+            return None
+        best = present[0]
+        for v in present[1:]:
+            c = compare(v, best)
+            if (c < 0) if op == "$min" else (c > 0):
+                best = v
+        return best
+    if op == "$first":
+        return None if not values or values[0] is MISSING else values[0]
+    if op == "$last":
+        return None if not values or values[-1] is MISSING else values[-1]
+    if op == "$push":
+        return present
+    if op == "$addToSet":
+        seen, unique = set(), []
+        for v in present:
+            key = hash_key(v)
+            if key not in seen:
+                seen.add(key)
+                unique.append(v)
+        return unique
+    if op == "$count":
+        return len(values)
+    raise OperationFailure(f"unknown group operator '{op}'", code=15952)
+
+
+def _group(docs: list[dict], spec: dict, pipeline: Pipeline) -> list[dict]:
+    if "_id" not in spec:
+        raise OperationFailure("a group specification must include an _id", code=15955)
+    groups: dict = {}
+    for doc in docs:
+        key = pipeline.evaluate(spec["_id"], doc)
+        key = None if key is MISSING else key
+        group = groups.setdefault(hash_key(key), {"_id": key, "values": {}})
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (op, expr), = accumulator.items()
+            value = 1 if op == "$count" else pipeline.evaluate(expr, doc)
+            group["values"].setdefault(field, []).append(value)
+    results = []
+    for group in groups.values():
+        result = {"_id": group["_id"]}
+        for field, accumulator in spec.items():
+            if field != "_id":
+                (op, _), = accumulator.items()
+                result[field] = _accumulate(op, group["values"].get(field, []))
+        results.append(result)
+    return results
+
+
+# ── Other stages ──
+
+
+def _add_fields(docs, spec, pipeline):
+    results = []
+    for doc in docs:
+        new = copy.deepcopy(doc)
+        for path, expr in spec.items():
+            value = pipeline.evaluate(expr, doc)
+            if value is MISSING:
+                unset_path(new, path)
+            else:
+                set_path(new, path, value)
+        results.append(pipeline.carry(doc, new))
+    return results
+
+
+def _unwind(docs, spec, pipeline):
+    if isinstance(spec, str):
+        spec = {"path": spec}
+    path = spec["path"].lstrip("$")
+    keep_empty = spec.get("preserveNullAndEmptyArrays", False)
+    index_field = spec.get("includeArrayIndex")
+    results = []
+    for doc in docs:
+        value = get_path(doc, path)
+        if isinstance(value, list) and value:
+            for index, element in enumerate(value):
+                new = copy.deepcopy(doc)
+                set_path(new, path, copy.deepcopy(element))
+                if index_field:
+                    new[index_field] = index
+                results.append(pipeline.carry(doc, new))
+        elif isinstance(value, list) or value is None or value is MISSING:
+            if keep_empty:
+                new = copy.deepcopy(doc)
+                if isinstance(value, list):
+                    unset_path(new, path)
+                if index_field:
+                    new[index_field] = None
+                results.append(pipeline.carry(doc, new))
+        else:
+            new = copy.deepcopy(doc)
+            if index_field:
+                new[index_field] = None
+            results.append(pipeline.carry(doc, new))
+    return results
+
+
+def _lookup(docs, spec, pipeline):
+    if pipeline.database is None:
+        raise OperationFailure("$lookup is not available here", code=51047)
+    foreign = pipeline.database.get_collection(spec["from"])
+    results = []
+    for doc in docs:
+        candidates = foreign._live_documents()
+        if "localField" in spec:
+            local = [v for v in iter_values(doc, spec["localField"].split("."))]
+            targets = []
+            for value in local:
+                targets.extend(value if isinstance(value, list) else [None if value is MISSING else value])
+            candidates = [
+                c for c in candidates if match(c, {spec["foreignField"]: {"$in": targets}})
+            ]
+        if "pipeline" in spec:
+            let = {name: pipeline.evaluate(expr, doc) for name, expr in spec.get("let", {}).items()}
+            inner = Pipeline(QueryContext(variables=let), pipeline.database)
+            inner.now = pipeline.now
+            candidates = run_stages(candidates, spec["pipeline"], pipeline=inner)
+        new = copy.deepcopy(doc)
+        set_path(new, spec["as"], [copy.deepcopy(c) for c in candidates])
+        results.append(pipeline.carry(doc, new))
+    return results
+
+
+def _replace_root(docs, expr, pipeline):
+    results = []
+    for doc in docs:
+        new = pipeline.evaluate(expr, doc)
+        if not isinstance(new, dict):
+            raise OperationFailure("'newRoot' expression must evaluate to an object", code=40228)
+        results.append(pipeline.carry(doc, copy.deepcopy(new)))
+    return results
+
+
+def _stage(docs: list[dict], name: str, spec, pipeline: Pipeline) -> list[dict]:
+    if name == "$match":
+        return [d for d in docs if match(d, spec, pipeline.ctx)]
+    if name in ("$addFields", "$set"):
+        return _add_fields(docs, spec, pipeline)
+    if name == "$project":
+        return [project(d, spec, pipeline) for d in docs]
+    if name == "$unset":
+        fields = [spec] if isinstance(spec, str) else spec
+        return [project(d, {f: 0 for f in fields}, pipeline) for d in docs]
+    if name == "$group":
+        return _group(docs, spec, pipeline)
+    if name == "$sort":
+        return sort_documents(docs, spec, pipeline)
+    if name == "$limit":
+        return docs[:spec]
+    if name == "$skip":
+        return docs[spec:]
+    if name == "$count":
+        return [{spec: len(docs)}] if docs else []
+    if name == "$unwind":
+        return _unwind(docs, spec, pipeline)
+    if name == "$facet":
+        return [{
+            field: [copy.deepcopy(d) for d in run_stages(docs, stages, pipeline=pipeline)]
+            for field, stages in spec.items()
+        }]
+    if name == "$lookup":
+        return _lookup(docs, spec, pipeline)
+    if name == "$replaceRoot":
+        return _replace_root(docs, spec["newRoot"], pipeline)
+    if name == "$replaceWith":
+        return _replace_root(docs, spec, pipeline)
+    if name == "$sortByCount":
+        grouped = _group(docs, {"_id": spec, "count": {"$sum": 1}}, pipeline)
+        return sort_documents(grouped, {"count": -1}, pipeline)
+    raise OperationFailure(f"Unrecognized pipeline stage name: '{name}'", code=40324)
+
+
+def run_stages(
+    docs: list[dict],
+    stages: list[dict],
+    pipeline: Pipeline | None = None,
+    update_pipeline: bool = False,
+) -> list[dict]:
+    pipeline = pipeline or Pipeline()
+    for stage in stages:
+        if len(stage) != 1:
+            raise OperationFailure("A pipeline stage specification object must contain exactly one field.", code=40323)
+        (name, spec), = stage.items()
+        if update_pipeline and name not in UPDATE_STAGES:
+            raise OperationFailure(f"{name} is not allowed to be used within an update", code=72)
+        docs = _stage(docs, name, normalize(spec), pipeline)
+    return docs
@@ -0,0 +1,96 @@
+"""``MemoryClient`` / ``MemoryDatabase``: the Motor client and database surface."""
+
+from urllib.parse import parse_qs, urlsplit
+
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+from app.memorydb.collection import MemoryCollection
+
+DEFAULT_DATABASE = "test"
+
+
+def _flag(options: dict, name: str) -> bool:
+    return options.get(name, ["false"])[-1].lower() in ("1", "true", "yes")
+
+
+class MemoryDatabase:
+    def __init__(self, client: "MemoryClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: dict[str, MemoryCollection] = {}
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        return self.get_collection(name)
+
+    def get_collection(self, name: str, **_options) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def with_options(self, **_options) -> "MemoryDatabase":
+        # One copy of the data, so every read preference sees the same documents
+        return self
+
+    async def create_collection(self, name: str, capped: bool = False, size=None, max=None, **_kwargs):
+        if name in self._collections:
+            raise CollectionInvalid(f"collection {name} already exists")
+        self._collections[name] = MemoryCollection(self, name, capped=capped, size=size, max=max)
+        return self._collections[name]
+
+    async def drop_collection(self, name):
+        self._collections.pop(getattr(name, "name", name), None)
+
+    async def list_collection_names(self, **_kwargs) -> list[str]:
+        return list(self._collections)
+
+    async def command(self, command, **_kwargs) -> dict:
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        raise OperationFailure(f"no such command: '{name}'", code=59)
+
+
+class MemoryClient:
+    """An in-process stand-in for ``AsyncIOMotorClient``.
+
+    ``memory:///<db>?simulate_indexes=true&notablescan=true``: with
+    ``simulate_indexes`` queries on an indexed first key only examine the
+    matching documents (see ``explain()``); ``notablescan`` additionally
+    fails queries that would need a collection scan, like the server option.
+    """
+
+    def __init__(self, uri: str = "memory://", **_kwargs):
+        parts = urlsplit(uri)
+        options = parse_qs(parts.query)
+        self.simulate_indexes = _flag(options, "simulate_indexes") or _flag(options, "notablescan")
+        self.notablescan = _flag(options, "notablescan")
+        self.default_database = (parts.netloc or parts.path.strip("/")) or DEFAULT_DATABASE
+        self._databases: dict[str, MemoryDatabase] = {}
+
+    def __getattr__(self, name: str) -> MemoryDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_database(name)
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        return self.get_database(name)
+
+    def get_database(self, name: str | None = None, **_options) -> MemoryDatabase:
+        name = name or self.default_database
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(self, name)
+        return self._databases[name]
+
+    def get_default_database(self, default: str | None = None, **_options) -> MemoryDatabase:
+        return self.get_database(self.default_database or default)
+
+    async def drop_database(self, name):
+        self._databases.pop(getattr(name, "name", name), None)
+
+    def close(self):
+        pass
@@ -0,0 +1,657 @@
+"""In-memory collections and cursors with Motor's async API."""
+
+import copy
+import datetime as dt
+import re
+
+from bson import ObjectId, encode
+from pymongo import ReturnDocument
+from pymongo.errors import (
+    BulkWriteError,
+    DuplicateKeyError,
+    OperationFailure,
+    WriteError,
+)
+from pymongo.results import (
+    BulkWriteResult,
+    DeleteResult,
+    InsertManyResult,
+    InsertOneResult,
+    UpdateResult,
+)
+
+from app.memorydb.aggregation import Pipeline, project, run_stages, sort_documents
+from app.memorydb.expressions import field_values
+from app.memorydb.query import QueryContext, is_operator_dict, match, match_values
+from app.memorydb.update import apply_update, replace, seed_from_query
+from app.memorydb.values import MISSING, get_path, hash_key, normalize
+
+_WORD = re.compile(r"\w+")
+_PHRASE = re.compile(r'"([^"]*)"')
+_RANGE_OPS = {"$gt", "$gte", "$lt", "$lte"}
+
+
+def _now() -> dt.datetime:
+    return normalize(dt.datetime.now(dt.timezone.utc))
+
+
+def _key_list(keys, direction=None) -> list[tuple[str, object]]:
+    if isinstance(keys, str):
+        return [(keys, 1 if direction is None else direction)]
+    if isinstance(keys, dict):
+        return list(keys.items())
+    return [(k, d) for k, d in keys]
+
+
+class Index:
+    def __init__(self, name: str, keys: list, unique=False, sparse=False, expire_after=None, weights=None):
+        self.name = name
+        self.keys = keys
+        self.unique = unique
+        self.sparse = sparse
+        self.expire_after = expire_after
+        self.text_fields = {k: 1 for k, d in keys if d == "text"}
+        self.text_fields.update(weights or {})
+        # first key value -> (value, ids of documents with it); index simulation only
+        self.entries: dict = {}
+        # full key -> id (unique indexes only)
+        self.unique_keys: dict = {}
+
+    @property
+    def is_text(self) -> bool:
+        return bool(self.text_fields)
+
+    @property
+    def field(self) -> str:
+        return self.keys[0][0]
+
+    def unique_key(self, doc: dict):
+        values = [get_path(doc, field) for field, _ in self.keys]
+        if self.sparse and all(v is MISSING for v in values):
+            return None
+        return tuple(hash_key(None if v is MISSING else v) for v in values)
+
+    def info(self) -> dict:
+        info = {"v": 2, "key": dict(self.keys), "name": self.name}
+        if self.unique:
+            info["unique"] = True
+        if self.sparse:
+            info["sparse"] = True
+        if self.expire_after is not None:
+            info["expireAfterSeconds"] = self.expire_after
+        return info
+
+
+class MemoryCursor:
+    """A lazily executed ``find()``; chain ``sort``/``skip``/``limit`` then iterate."""
+
+    def __init__(self, collection: "MemoryCollection", filter=None, projection=None, sort=None, skip=0, limit=0):
+        self._collection = collection
+        self._filter = filter or {}
+        self._projection = projection
+        self._sort = _key_list(sort) if sort else None
+        self._skip = skip
+        self._limit = limit
+        self._results: list[dict] | None = None
+        self._position = 0
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _key_list(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int):
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int):
+        self._limit = limit
+        return self
+
+    def batch_size(self, _size: int):
+        return self
+
+    def _execute(self) -> list[dict]:
+        if self._results is None:
+            self._results = self._collection._find(
+                self._filter, self._projection, self._sort, self._skip, self._limit
+            )
+        return self._results
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        results = self._execute()
+        if self._position >= len(results):
+            raise StopAsyncIteration
+        self._position += 1
+        return results[self._position - 1]
+
+    async def next(self):
+        return await self.__anext__()
+
+    @property
+    def alive(self) -> bool:
+        # Tailable cursors are not emulated: a cursor dies once exhausted
+        return self._results is None or self._position < len(self._results)
+
+    async def to_list(self, length: int | None = None):
+        results = self._execute()[self._position:]
+        if length:
+            results = results[:length]
+        self._position += len(results)
+        return results
+
+    async def explain(self) -> dict:
+        return self._collection._explain(self._filter, self._sort, self._skip, self._limit)
+
+    def close(self):
+        self._position = len(self._execute())
+
+
+class MemoryCommandCursor(MemoryCursor):
+    """Aggregation results."""
+
+    def __init__(self, results: list[dict]):
+        self._results = results
+        self._position = 0
+
+
+class MemoryCollection:
+    def __init__(self, database, name: str, capped: bool = False, size: int | None = None, max: int | None = None):
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        self.capped = capped
+        self.max_size = size
+        self.max_docs = max
+        self._docs: dict = {}
+        self._indexes: dict[str, Index] = {"_id_": Index("_id_", [("_id", 1)], unique=True)}
+        self._rebuild_entries(self._indexes["_id_"])
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.database.get_collection(f"{self.name}.{name}")
+
+    def __getitem__(self, name: str):
+        return self.database.get_collection(f"{self.name}.{name}")
+
+    def with_options(self, **_options):
+        return self
+
+    # ── Storage and indexes ──
+
+    @property
+    def _simulate(self) -> bool:
+        return self.database.client.simulate_indexes
+
+    def _live_documents(self) -> list[dict]:
+        self._expire()
+        return list(self._docs.values())
+
+    def _expire(self):
+        ttl = [i for i in self._indexes.values() if i.expire_after is not None]
+        if not ttl:
+            return
+        now = _now()
+        for key, doc in list(self._docs.items()):
+            for index in ttl:
+                values = [v for v in field_values(doc, index.field) if isinstance(v, dt.datetime)]
+                if values and min(values) + dt.timedelta(seconds=index.expire_after) <= now:
+                    self._remove(key)
+                    break
+
+    def _rebuild_entries(self, index: Index):
+        index.entries.clear()
+        index.unique_keys.clear()
+        for key, doc in self._docs.items():
+            self._index_add(index, key, doc)
+
+    def _index_add(self, index: Index, key, doc: dict):
+        if index.unique:
+            unique_key = index.unique_key(doc)
+            if unique_key is not None:
+                index.unique_keys[unique_key] = key
+        if self._simulate and not index.is_text:
+            for value in field_values(doc, index.field):
+                index.entries.setdefault(hash_key(value), (value, set()))[1].add(key)
+
+    def _index_remove(self, index: Index, key, doc: dict):
+        if index.unique:
+            index.unique_keys.pop(index.unique_key(doc), None)
+        if self._simulate and not index.is_text:
+            for value in field_values(doc, index.field):
+                entry = index.entries.get(hash_key(value))
+                if entry:
+                    entry[1].discard(key)
+                    if not entry[1]:
+                        del index.entries[hash_key(value)]
+
+    def _check_unique(self, doc: dict, own_key=None):
+        for index in self._indexes.values():
+            if not index.unique:
+                continue
+            unique_key = index.unique_key(doc)
+            if unique_key is None:
+                continue
+            holder = index.unique_keys.get(unique_key, MISSING)
+            if holder is not MISSING and holder != own_key:
+                dup = {field: get_path(doc, field) for field, _ in index.keys}
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.full_name} index: {index.name} dup key: {dup}",
+                    code=11000,
+                    details={"index": 0, "code": 11000, "keyPattern": dict(index.keys), "keyValue": dup},
+                )
+
+    def _store(self, doc: dict):
+        key = hash_key(doc["_id"])
+        self._docs[key] = doc
+        for index in self._indexes.values():
+            self._index_add(index, key, doc)
+        if self.capped:
+            self._trim()
+
+    def _remove(self, key):
+        doc = self._docs.pop(key)
+        for index in self._indexes.values():
+            self._index_remove(index, key, doc)
+        return doc
+
+    def _swap(self, key, new: dict):
+        self._check_unique(new, own_key=key)
+        old = self._docs[key]
+        for index in self._indexes.values():
+            self._index_remove(index, key, old)
+        self._docs[key] = new
+        for index in self._indexes.values():
+            self._index_add(index, key, new)
+
+    def _trim(self):
+        while self._docs and (
+            (self.max_docs and len(self._docs) > self.max_docs)
+            or (self.max_size and sum(len(encode(d)) for d in self._docs.values()) > self.max_size)
+        ):
+            self._remove(next(iter(self._docs)))
+
+    def _insert(self, document: dict) -> dict:
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        doc = normalize(document)
+        self._check_unique(doc)
+        self._store(doc)
+        return doc
+
+    # ── Query planning ──
+
+    def _text_score(self, doc: dict, spec: dict) -> float:
+        index = next((i for i in self._indexes.values() if i.is_text), None)
+        if index is None:
+            raise OperationFailure("text index required for $text query", code=27)
+        search = spec["$search"].lower()
+        phrases = _PHRASE.findall(search)
+        words = _WORD.findall(_PHRASE.sub(" ", search))
+        negated = {w for w in re.findall(r"-(\w+)", search)}
+        terms = [w for w in words if w not in negated] + [w for p in phrases for w in _WORD.findall(p)]
+        score = 0.0
+        for field, weight in index.text_fields.items():
+            text = " ".join(str(v) for v in field_values(doc, field) if isinstance(v, str)).lower()
+            if negated & set(_WORD.findall(text)):
+                return 0.0
+            tokens = _WORD.findall(text)
+            for term in set(terms):
+                count = tokens.count(term)
+                if count:
+                    score += weight * (0.5 * count / len(tokens) + 0.5)
+        for phrase in phrases:
+            if not any(
+                phrase in str(v).lower() for f in index.text_fields for v in field_values(doc, f)
+            ):
+                return 0.0
+        return score
+
+    def _plan(self, filter: dict) -> tuple[str, Index | None, set | None]:
+        """``(stage, index, candidate keys)`` for a filter; ``None`` keys = scan."""
+        if not self._simulate:
+            return "COLLSCAN", None, None
+        conditions = dict(filter)
+        for sub in filter.get("$and", []):
+            conditions.update({k: v for k, v in sub.items() if not k.startswith("$")})
+        for index in self._indexes.values():
+            if index.is_text or index.field not in conditions:
+                continue
+            cond = conditions[index.field]
+            if not is_operator_dict(cond):
+                cond = {"$eq": cond}
+            if "$eq" in cond or "$in" in cond:
+                values = [cond["$eq"]] if "$eq" in cond else cond["$in"]
+                keys: set = set()
+                for value in values:
+                    if isinstance(value, re.Pattern):
+                        return "IXSCAN", index, self._range_keys(index, {"$regex": value})
+                    keys |= index.entries.get(hash_key(value), (None, set()))[1]
+                return "IXSCAN", index, keys
+            bounded = {k: v for k, v in cond.items() if k in _RANGE_OPS}
+            if bounded:
+                return "IXSCAN", index, self._range_keys(index, bounded)
+            regex = cond.get("$regex")
+            if isinstance(regex, str) and regex.startswith("^"):
+                return "IXSCAN", index, self._range_keys(index, {"$regex": regex})
+        return "COLLSCAN", None, None
+
+    def _range_keys(self, index: Index, cond: dict) -> set:
+        keys: set = set()
+        for value, ids in index.entries.values():
+            if match_values([value], cond):
+                keys |= ids
+        return keys
+
+    def _candidates(self, filter: dict) -> tuple[list, dict]:
+        self._expire()
+        stage, index, keys = self._plan(filter)
+        if stage == "COLLSCAN" and filter and self.database.client.notablescan:
+            raise OperationFailure(
+                f"No query solutions (notablescan): {self.full_name} {filter}", code=291
+            )
+        if keys is None:
+            docs = list(self._docs.values())
+        else:
+            docs = [doc for key, doc in self._docs.items() if key in keys]
+        stats = {"stage": stage, "index": index.name if index else None, "docsExamined": len(docs)}
+        return docs, stats
+
+    def _matching(self, filter, ctx: QueryContext | None = None) -> list[dict]:
+        filter = normalize(filter or {})
+        if "$text" in filter and not any(i.is_text for i in self._indexes.values()):
+            raise OperationFailure("text index required for $text query", code=27)
+        ctx = ctx or QueryContext(text=self._text_score)
+        docs, _ = self._candidates(filter)
+        return [doc for doc in docs if match(doc, filter, ctx)]
+
+    def _find(self, filter, projection=None, sort=None, skip=0, limit=0) -> list[dict]:
+        ctx = QueryContext(text=self._text_score)
+        docs = self._matching(filter, ctx)
+        pipeline = Pipeline(ctx, self.database)
+        if sort and sort[0][0] == "$natural":
+            # Natural order is insertion order, which _docs preserves
+            if sort[0][1] < 0:
+                docs.reverse()
+        elif sort:
+            docs = sort_documents(docs, sort, pipeline)
+        docs = docs[skip:]
+        if limit:
+            docs = docs[:abs(limit)]
+        if isinstance(projection, list):
+            projection = {field: 1 for field in projection}
+        return [copy.deepcopy(project(doc, projection, pipeline)) for doc in docs]
+
+    def _explain(self, filter, sort=None, skip=0, limit=0) -> dict:
+        filter = normalize(filter or {})
+        docs, stats = self._candidates(filter)
+        returned = len(self._find(filter, None, sort, skip, limit))
+        stage = {"stage": stats["stage"]}
+        if stats["index"]:
+            stage = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": stats["index"]}}
+        return {
+            "queryPlanner": {"namespace": self.full_name, "winningPlan": stage},
+            "executionStats": {
+                "nReturned": returned,
+                "totalDocsExamined": stats["docsExamined"],
+            },
+        }
+
+    def _first(self, filter, sort=None) -> dict | None:
+        docs = self._matching(filter)
+        if sort:
+            docs = sort_documents(docs, _key_list(sort))
+        return docs[0] if docs else None
+
+    # ── Reads ──
+
+    def find(self, filter=None, projection=None, *, sort=None, skip=0, limit=0, **_kwargs) -> MemoryCursor:
+        return MemoryCursor(self, filter, projection, sort, skip, limit)
+
+    async def find_one(self, filter=None, *args, **kwargs):
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        results = self._find(
+            filter, args[0] if args else kwargs.get("projection"), _key_list(kwargs["sort"]) if kwargs.get("sort") else None, 0, 1
+        )
+        return results[0] if results else None
+
+    async def count_documents(self, filter: dict, skip: int = 0, limit: int = 0, **_kwargs) -> int:
+        count = max(0, len(self._matching(filter)) - skip)
+        return min(count, limit) if limit else count
+
+    async def estimated_document_count(self, **_kwargs) -> int:
+        return len(self._live_documents())
+
+    async def distinct(self, key: str, filter: dict | None = None, **_kwargs) -> list:
+        seen, values = set(), []
+        for doc in self._matching(filter):
+            for value in field_values(doc, key):
+                if value is None and get_path(doc, key) is MISSING:
+                    continue
+                marker = hash_key(value)
+                if marker not in seen:
+                    seen.add(marker)
+                    values.append(copy.deepcopy(value))
+        return values
+
+    def aggregate(self, pipeline: list[dict], **_kwargs) -> MemoryCommandCursor:
+        ctx = QueryContext(text=self._text_score)
+        stages = list(pipeline)
+        # A leading $match can use indexes, like the server's pipeline optimizer
+        if stages and "$match" in stages[0]:
+            docs = self._matching(stages.pop(0)["$match"], ctx)
+        else:
+            docs = self._live_documents()
+        results = run_stages(docs, stages, Pipeline(ctx, self.database))
+        return MemoryCommandCursor([copy.deepcopy(doc) for doc in results])
+
+    def watch(self, *_args, **_kwargs):
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+    # ── Writes ──
+
+    async def insert_one(self, document: dict, **_kwargs) -> InsertOneResult:
+        self._expire()
+        doc = self._insert(document)
+        return InsertOneResult(doc["_id"], True)
+
+    async def insert_many(self, documents, ordered: bool = True, **_kwargs) -> InsertManyResult:
+        documents = list(documents)
+        await self.bulk_write([_Insert(d) for d in documents], ordered=ordered)
+        return InsertManyResult([d["_id"] for d in documents], True)
+
+    def _update(self, filter, update, upsert=False, multi=False, array_filters=None, sort=None) -> dict:
+        """Apply an update; returns raw counts plus the before/after documents."""
+        filter = normalize(filter or {})
+        update = normalize(update)
+        docs = self._matching(filter)
+        if sort:
+            docs = sort_documents(docs, _key_list(sort))
+        if not multi:
+            docs = docs[:1]
+        raw = {"n": 0, "nModified": 0, "ok": 1.0, "before": None, "after": None}
+        for doc in docs:
+            new = apply_update(doc, update, filter, array_filters)
+            raw["n"] += 1
+            raw["before"] = raw["before"] or doc
+            if encode(new) != encode(doc):
+                self._swap(hash_key(doc["_id"]), new)
+                raw["nModified"] += 1
+            raw["after"] = raw["after"] or new
+        if not docs and upsert:
+            seed = seed_from_query(filter)
+            new = apply_update(seed, update, filter, array_filters, inserting=True)
+            doc = self._insert(new)
+            raw.update(n=1, upserted=doc["_id"], after=doc)
+        return raw
+
+    async def update_one(self, filter, update, upsert=False, array_filters=None, **kwargs) -> UpdateResult:
+        raw = self._update(filter, update, upsert, False, array_filters, kwargs.get("sort"))
+        return _update_result(raw)
+
+    async def update_many(self, filter, update, upsert=False, array_filters=None, **_kwargs) -> UpdateResult:
+        raw = self._update(filter, update, upsert, True, array_filters)
+        return _update_result(raw)
+
+    def _replace(self, filter, replacement, upsert=False, sort=None) -> dict:
+        filter = normalize(filter or {})
+        replacement = normalize(replacement)
+        doc = self._first(filter, sort)
+        raw = {"n": 0, "nModified": 0, "ok": 1.0, "before": doc, "after": None}
+        if doc is not None:
+            new = replace(doc, replacement)
+            raw["n"] = 1
+            if encode(new) != encode(doc):
+                self._swap(hash_key(doc["_id"]), new)
+                raw["nModified"] = 1
+            raw["after"] = new
+        elif upsert:
+            seed = seed_from_query(filter)
+            new = {**({"_id": seed["_id"]} if "_id" in seed else {}), **replacement}
+            stored = self._insert(new)
+            raw.update(n=1, upserted=stored["_id"], after=stored)
+        return raw
+
+    async def replace_one(self, filter, replacement, upsert=False, **_kwargs) -> UpdateResult:
+        return _update_result(self._replace(filter, replacement, upsert))
+
+    async def delete_one(self, filter, **_kwargs) -> DeleteResult:
+        doc = self._first(filter)
+        if doc is not None:
+            self._remove(hash_key(doc["_id"]))
+        return DeleteResult({"n": int(doc is not None), "ok": 1.0}, True)
+
+    async def delete_many(self, filter, **_kwargs) -> DeleteResult:
+        docs = self._matching(filter)
+        for doc in docs:
+            self._remove(hash_key(doc["_id"]))
+        return DeleteResult({"n": len(docs), "ok": 1.0}, True)
+
+    async def find_one_and_update(
+        self, filter, update, projection=None, sort=None, upsert=False,
+        return_document=ReturnDocument.BEFORE, array_filters=None, **_kwargs,
+    ):
+        raw = self._update(filter, update, upsert, False, array_filters, sort)
+        doc = raw["after"] if return_document == ReturnDocument.AFTER else raw["before"]
+        return copy.deepcopy(project(doc, projection)) if doc is not None else None
+
+    async def find_one_and_replace(
+        self, filter, replacement, projection=None, sort=None, upsert=False,
+        return_document=ReturnDocument.BEFORE, **_kwargs,
+    ):
+        raw = self._replace(filter, replacement, upsert, sort)
+        doc = raw["after"] if return_document == ReturnDocument.AFTER else raw["before"]
+        return copy.deepcopy(project(doc, projection)) if doc is not None else None
+
+    async def find_one_and_delete(self, filter, projection=None, sort=None, **_kwargs):
+        doc = self._first(filter, sort)
+        if doc is None:
+            return None
+        self._remove(hash_key(doc["_id"]))
+        return copy.deepcopy(project(doc, projection))
+
+    async def bulk_write(self, requests: list, ordered: bool = True, **_kwargs) -> BulkWriteResult:
+        result = {
+            "writeErrors": [], "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0,
+            "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": [],
+        }
+        for index, request in enumerate(requests):
+            kind = type(request).__name__
+            try:
+                if kind in ("InsertOne", "_Insert"):
+                    self._insert(request._doc)
+                    result["nInserted"] += 1
+                elif kind in ("UpdateOne", "UpdateMany"):
+                    raw = self._update(
+                        request._filter, request._doc, bool(request._upsert),
+                        kind == "UpdateMany", request._array_filters,
+                    )
+                    self._count_update(result, raw, index)
+                elif kind == "ReplaceOne":
+                    raw = self._replace(request._filter, request._doc, bool(request._upsert))
+                    self._count_update(result, raw, index)
+                elif kind in ("DeleteOne", "DeleteMany"):
+                    docs = self._matching(request._filter)
+                    if kind == "DeleteOne":
+                        docs = docs[:1]
+                    for doc in docs:
+                        self._remove(hash_key(doc["_id"]))
+                    result["nRemoved"] += len(docs)
+                else:
+                    raise TypeError(f"{request!r} is not a valid request")
+            except (DuplicateKeyError, WriteError) as e:
+                result["writeErrors"].append({"index": index, "code": e.code, "errmsg": str(e), "op": request})
+                if ordered:
+                    break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    @staticmethod
+    def _count_update(result: dict, raw: dict, index: int):
+        if "upserted" in raw:
+            result["nUpserted"] += 1
+            result["upserted"].append({"index": index, "_id": raw["upserted"]})
+        else:
+            result["nMatched"] += raw["n"]
+            result["nModified"] += raw["nModified"]
+
+    # ── Indexes ──
+
+    async def create_index(self, keys, **kwargs) -> str:
+        keys = _key_list(keys)
+        name = kwargs.get("name") or "_".join(f"{k}_{d}" for k, d in keys)
+        existing = self._indexes.get(name)
+        if existing is not None:
+            if existing.keys != keys:
+                raise OperationFailure(f"Index with name: {name} already exists with different options", code=86)
+            return name
+        if any(d == "text" for _, d in keys) and any(i.is_text for i in self._indexes.values()):
+            raise OperationFailure("An equivalent index already exists with a different name and options", code=85)
+        index = Index(
+            name, keys,
+            unique=kwargs.get("unique", False),
+            sparse=kwargs.get("sparse", False),
+            expire_after=kwargs.get("expireAfterSeconds"),
+            weights=kwargs.get("weights"),
+        )
+        self._rebuild_entries(index)
+        if index.unique and len(index.unique_keys) < sum(index.unique_key(d) is not None for d in self._docs.values()):
+            raise OperationFailure(f"E11000 duplicate key error collection: {self.full_name} index: {name}", code=11000)
+        self._indexes[name] = index
+        return name
+
+    async def create_indexes(self, indexes: list, **_kwargs) -> list[str]:
+        return [await self.create_index(i.document["key"], **{
+            k: v for k, v in i.document.items() if k != "key"
+        }) for i in indexes]
+
+    async def drop_index(self, name: str, **_kwargs):
+        if name == "_id_" or name not in self._indexes:
+            raise OperationFailure(f"index not found with name [{name}]", code=27)
+        del self._indexes[name]
+
+    async def index_information(self) -> dict:
+        return {name: index.info() for name, index in self._indexes.items()}
+
+    def list_indexes(self) -> MemoryCommandCursor:
+        return MemoryCommandCursor([index.info() for index in self._indexes.values()])
+
+    async def drop(self):
+        await self.database.drop_collection(self.name)
+
+
+class _Insert:
+    """``insert_many`` entries routed through ``bulk_write``."""
+
+    def __init__(self, document: dict):
+        self._doc = document
+
+
+def _update_result(raw: dict) -> UpdateResult:
+    raw = {k: v for k, v in raw.items() if k not in ("before", "after")}
+    return UpdateResult(raw, True)
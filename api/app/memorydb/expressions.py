@@ -0,0 +1,529 @@
+"""Aggregation expression evaluation (``$project``, ``$group``, ``$expr``...)."""
+
+import datetime as dt
+import math
+import re
+from zoneinfo import ZoneInfo
+
+from pymongo.errors import OperationFailure
+
+from app.memorydb.values import (
+    MISSING,
+    compare,
+    equal,
+    from_millis,
+    iter_values,
+    to_millis,
+    truthy,
+    type_name,
+)
+
+
+def _field(value, path: str):
+    """``$a.b`` semantics: traverse arrays, collecting into a list."""
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, MISSING)
+        elif isinstance(value, list):
+            value = [
+                v for v in (_field(e, part) for e in value if isinstance(e, (dict, list)))
+                if v is not MISSING
+            ]
+        else:
+            return MISSING
+        if value is MISSING:
+            return MISSING
+    return value
+
+
+def evaluate(expr, doc: dict, variables: dict | None = None):
+    variables = variables if variables is not None else {}
+    if isinstance(expr, str) and expr.startswith("$$"):
+        name, _, rest = expr[2:].partition(".")
+        if name == "ROOT":
+            base = variables.get("ROOT", doc)
+        elif name == "CURRENT":
+            base = doc
+        elif name == "NOW":
+            base = variables.get("NOW") or dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+        elif name == "REMOVE":
+            return MISSING
+        elif name in variables:
+            base = variables[name]
+        else:
+            raise OperationFailure(f"Use of undefined variable: {name}", code=17276)
+        return _field(base, rest) if rest else base
+    if isinstance(expr, str) and expr.startswith("$"):
+        return _field(doc, expr[1:])
+    if isinstance(expr, dict):
+        if len(expr) == 1:
+            (op, arg), = expr.items()
+            if op.startswith("$"):
+                handler = OPERATORS.get(op)
+                if handler is None:
+                    raise OperationFailure(f"Unrecognized expression '{op}'", code=168)
+                return handler(arg, doc, variables)
+        result = {}
+        for key, value in expr.items():
+            evaluated = evaluate(value, doc, variables)
+            if evaluated is not MISSING:
+                result[key] = evaluated
+        return result
+    if isinstance(expr, list):
+        return [evaluate(e, doc, variables) for e in expr]
+    return expr
+
+
+def _args(arg, doc, variables) -> list:
+    if isinstance(arg, list):
+        return [evaluate(a, doc, variables) for a in arg]
+    return [evaluate(arg, doc, variables)]
+
+
+def _nullish(value) -> bool:
+    return value is None or value is MISSING
+
+
+def _null_if_any(fn):
+    def handler(arg, doc, variables):
+        values = _args(arg, doc, variables)
+        if any(_nullish(v) for v in values):
+            return None
+        return fn(*values)
+
+    return handler
+
+
+# ── Arithmetic ──
+
+
+def _add(arg, doc, variables):
+    values = _args(arg, doc, variables)
+    if any(_nullish(v) for v in values):
+        return None
+    dates = [v for v in values if isinstance(v, dt.datetime)]
+    total = sum(v for v in values if not isinstance(v, dt.datetime))
+    if dates:
+        if len(dates) > 1:
+            raise OperationFailure("only one date allowed in an $add expression", code=16612)
+        return from_millis(to_millis(dates[0]) + total)
+    return total
+
+
+def _subtract(a, b):
+    if isinstance(a, dt.datetime) and isinstance(b, dt.datetime):
+        return to_millis(a) - to_millis(b)
+    if isinstance(a, dt.datetime):
+        return from_millis(to_millis(a) - b)
+    return a - b
+
+
+def _multiply(arg, doc, variables):
+    values = _args(arg, doc, variables)
+    if any(_nullish(v) for v in values):
+        return None
+    return math.prod(values)
+
+
+def _divide(a, b):
+    if b == 0:
+        raise OperationFailure("can't $divide by zero", code=16608)
+    return a / b
+
+
+def _round(arg, doc, variables):
+    values = _args(arg, doc, variables)
+    if _nullish(values[0]):
+        return None
+    places = values[1] if len(values) > 1 else 0
+    rounded = round(values[0], places)
+    return int(rounded) if places == 0 and isinstance(values[0], int) else rounded
+
+
+# ── Comparison / logic ──
+
+
+def _cmp(test):
+    def handler(arg, doc, variables):
+        a, b = _args(arg, doc, variables)
+        return test(compare(None if a is MISSING else a, None if b is MISSING else b))
+
+    return handler
+
+
+def _and(arg, doc, variables):
+    return all(truthy(v) for v in _args(arg, doc, variables))
+
+
+def _or(arg, doc, variables):
+    return any(truthy(v) for v in _args(arg, doc, variables))
+
+
+def _not(arg, doc, variables):
+    return not truthy(_args(arg, doc, variables)[0])
+
+
+def _cond(arg, doc, variables):
+    if isinstance(arg, dict):
+        test, then, otherwise = arg["if"], arg["then"], arg["else"]
+    else:
+        test, then, otherwise = arg
+    branch = then if truthy(evaluate(test, doc, variables)) else otherwise
+    return evaluate(branch, doc, variables)
+
+
+def _if_null(arg, doc, variables):
+    for expr in arg[:-1]:
+        value = evaluate(expr, doc, variables)
+        if not _nullish(value):
+            return value
+    return evaluate(arg[-1], doc, variables)
+
+
+def _switch(arg, doc, variables):
+    for branch in arg["branches"]:
+        if truthy(evaluate(branch["case"], doc, variables)):
+            return evaluate(branch["then"], doc, variables)
+    if "default" not in arg:
+        raise OperationFailure("$switch could not find a matching branch", code=40066)
+    return evaluate(arg["default"], doc, variables)
+
+
+def _in(arg, doc, variables):
+    value, array = _args(arg, doc, variables)
+    if not isinstance(array, list):
+        raise OperationFailure("$in requires an array as a second argument", code=40081)
+    return any(equal(value, v) for v in array)
+
+
+# ── Strings ──
+
+
+def _concat(arg, doc, variables):
+    values = _args(arg, doc, variables)
+    if any(_nullish(v) for v in values):
+        return None
+    return "".join(values)
+
+
+def _substr_cp(arg, doc, variables):
+    value, start, length = _args(arg, doc, variables)
+    if _nullish(value):
+        return ""
+    return str(value)[start:start + length]
+
+
+def _trim(strip):
+    def handler(arg, doc, variables):
+        value = evaluate(arg["input"], doc, variables)
+        if _nullish(value):
+            return None
+        chars = evaluate(arg["chars"], doc, variables) if "chars" in arg else None
+        return getattr(value, strip)(chars)
+
+    return handler
+
+
+def _case(fn):
+    def handler(arg, doc, variables):
+        value = _args(arg, doc, variables)[0]
+        return "" if _nullish(value) else fn(str(value))
+
+    return handler
+
+
+def _regex_find_all(arg, doc, variables):
+    value = evaluate(arg["input"], doc, variables)
+    if _nullish(value):
+        return []
+    pattern = evaluate(arg["regex"], doc, variables)
+    options = evaluate(arg.get("options", ""), doc, variables) or ""
+    flags = 0
+    for option in options:
+        flags |= {"i": re.I, "m": re.M, "s": re.S, "x": re.X}.get(option, 0)
+    compiled = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+    return [
+        {"match": m.group(0), "idx": m.start(), "captures": list(m.groups())}
+        for m in compiled.finditer(value)
+    ]
+
+
+def _split(value, separator):
+    return value.split(separator)
+
+
+# ── Conversion ──
+
+
+def _to_int(arg, doc, variables):
+    value = _args(arg, doc, variables)[0]
+    if _nullish(value):
+        return None
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            raise OperationFailure(f"Failed to parse number '{value}' in $convert", code=241)
+    if isinstance(value, dt.datetime):
+        return to_millis(value)
+    return int(value)
+
+
+def _to_double(arg, doc, variables):
+    value = _args(arg, doc, variables)[0]
+    if _nullish(value):
+        return None
+    if isinstance(value, dt.datetime):
+        return float(to_millis(value))
+    return float(value)
+
+
+def _to_string(arg, doc, variables):
+    value = _args(arg, doc, variables)[0]
+    if _nullish(value):
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, dt.datetime):
+        return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+    return str(value)
+
+
+def _to_bool(arg, doc, variables):
+    value = _args(arg, doc, variables)[0]
+    if _nullish(value):
+        return None
+    return truthy(value)
+
+
+# ── Dates ──
+
+
+def _local(value: dt.datetime, timezone) -> dt.datetime:
+    if not timezone:
+        return value
+    return value.replace(tzinfo=dt.timezone.utc).astimezone(ZoneInfo(timezone)).replace(tzinfo=None)
+
+
+_DATE_FORMAT = re.compile(r"%[YmdHMSLjwu%]")
+
+
+def _date_to_string(arg, doc, variables):
+    value = evaluate(arg["date"], doc, variables)
+    if _nullish(value):
+        return evaluate(arg["onNull"], doc, variables) if "onNull" in arg else None
+    value = _local(value, evaluate(arg.get("timezone"), doc, variables))
+    fmt = arg.get("format", "%Y-%m-%dT%H:%M:%S.%LZ")
+    directives = {
+        "%Y": f"{value.year:04d}", "%m": f"{value.month:02d}", "%d": f"{value.day:02d}",
+        "%H": f"{value.hour:02d}", "%M": f"{value.minute:02d}", "%S": f"{value.second:02d}",
+        "%L": f"{value.microsecond // 1000:03d}", "%j": f"{value.timetuple().tm_yday:03d}",
+        "%w": str(value.isoweekday() % 7 + 1), "%u": str(value.isoweekday()), "%%": "%",
+    }
+    return _DATE_FORMAT.sub(lambda m: directives[m.group(0)], fmt)
+
+
+def _date_part(part):
+    def handler(arg, doc, variables):
+        if isinstance(arg, dict) and "date" in arg:
+            value = evaluate(arg["date"], doc, variables)
+            timezone = evaluate(arg.get("timezone"), doc, variables)
+        else:
+            value, timezone = _args(arg, doc, variables)[0], None
+        if _nullish(value):
+            return None
+        return part(_local(value, timezone))
+
+    return handler
+
+
+# ── Arrays ──
+
+
+def _size(arg, doc, variables):
+    value = _args(arg, doc, variables)[0]
+    if not isinstance(value, list):
+        raise OperationFailure(f"The argument to $size must be an array. Type: {type_name(value)}", code=17124)
+    return len(value)
+
+
+def _array_elem_at(arg, doc, variables):
+    array, index = _args(arg, doc, variables)
+    if _nullish(array):
+        return None
+    try:
+        return array[index]
+    except IndexError:
+        return MISSING
+
+
+def _concat_arrays(arg, doc, variables):
+    values = _args(arg, doc, variables)
+    if any(_nullish(v) for v in values):
+        return None
+    return [item for value in values for item in value]
+
+
+def _map(arg, doc, variables):
+    array = evaluate(arg["input"], doc, variables)
+    if _nullish(array):
+        return None
+    name = arg.get("as", "this")
+    return [evaluate(arg["in"], doc, {**variables, name: item}) for item in array]
+
+
+def _filter(arg, doc, variables):
+    array = evaluate(arg["input"], doc, variables)
+    if _nullish(array):
+        return None
+    name = arg.get("as", "this")
+    result = [item for item in array if truthy(evaluate(arg["cond"], doc, {**variables, name: item}))]
+    limit = evaluate(arg["limit"], doc, variables) if "limit" in arg else None
+    return result[:limit] if limit else result
+
+
+def _reduce(arg, doc, variables):
+    array = evaluate(arg["input"], doc, variables)
+    if _nullish(array):
+        return None
+    value = evaluate(arg["initialValue"], doc, variables)
+    for item in array:
+        value = evaluate(arg["in"], doc, {**variables, "value": value, "this": item})
+    return value
+
+
+def _let(arg, doc, variables):
+    bound = {name: evaluate(expr, doc, variables) for name, expr in arg["vars"].items()}
+    return evaluate(arg["in"], doc, {**variables, **bound})
+
+
+def _merge_objects(arg, doc, variables):
+    result = {}
+    for value in _args(arg, doc, variables):
+        if isinstance(value, list):
+            for item in value:
+                result.update(item or {})
+        elif isinstance(value, dict):
+            result.update(value)
+    return result
+
+
+# ── Accumulator-style expressions ──
+
+
+def _numbers(arg, doc, variables) -> list:
+    values = _args(arg, doc, variables)
+    if len(values) == 1 and isinstance(values[0], list):
+        values = values[0]
+    return [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+
+
+def _sum(arg, doc, variables):
+    return sum(_numbers(arg, doc, variables))
+
+
+def _avg(arg, doc, variables):
+    values = _numbers(arg, doc, variables)
+    return sum(values) / len(values) if values else None
+
+
+def _extreme(pick):
+    def handler(arg, doc, variables):
+        values = _args(arg, doc, variables)
+        if len(values) == 1 and isinstance(values[0], list):
+            values = values[0]
+        values = [v for v in values if not _nullish(v)]
+        if not values:
+            return None
+        best = values[0]
+        for v in values[1:]:
+            if pick(compare(v, best)):
+                best = v
+        return best
+
+    return handler
+
+
+def _meta(arg, doc, variables):
+    if arg == "textScore":
+        return variables.get("__text_score__", MISSING)
+    raise OperationFailure(f"Unsupported $meta: {arg}", code=17308)
+
+
+OPERATORS = {
+    "$literal": lambda arg, doc, variables: arg,
+    "$add": _add,
+    "$subtract": _null_if_any(_subtract),
+    "$multiply": _multiply,
+    "$divide": _null_if_any(_divide),
+    "$mod": _null_if_any(lambda a, b: math.fmod(a, b) if isinstance(a, float) or isinstance(b, float) else a % b),
+    "$abs": _null_if_any(abs),
+    "$ceil": _null_if_any(math.ceil),
+    "$floor": _null_if_any(math.floor),
+    "$round": _round,
+    "$pow": _null_if_any(pow),
+    "$eq": _cmp(lambda c: c == 0),
+    "$ne": _cmp(lambda c: c != 0),
+    "$gt": _cmp(lambda c: c > 0),
+    "$gte": _cmp(lambda c: c >= 0),
+    "$lt": _cmp(lambda c: c < 0),
+    "$lte": _cmp(lambda c: c <= 0),
+    "$cmp": _cmp(lambda c: c),
+    "$and": _and,
+    "$or": _or,
+    "$not": _not,
+    "$cond": _cond,
+    "$ifNull": _if_null,
+    "$switch": _switch,
+    "$in": _in,
+    "$concat": _concat,
+    "$substrCP": _substr_cp,
+    "$substr": _substr_cp,
+    "$toLower": _case(str.lower),
+    "$toUpper": _case(str.upper),
+    "$trim": _trim("strip"),
+    "$ltrim": _trim("lstrip"),
+    "$rtrim": _trim("rstrip"),
+    "$split": _null_if_any(_split),
+    "$strLenCP": _null_if_any(len),
+    "$regexFindAll": _regex_find_all,
+    "$toInt": _to_int,
+    "$toLong": _to_int,
+    "$toDouble": _to_double,
+    "$toString": _to_string,
+    "$toBool": _to_bool,
+    "$type": lambda arg, doc, variables: type_name(_args(arg, doc, variables)[0]),
+    "$isArray": lambda arg, doc, variables: isinstance(_args(arg, doc, variables)[0], list),
+    "$dateToString": _date_to_string,
+    "$year": _date_part(lambda d: d.year),
+    "$month": _date_part(lambda d: d.month),
+    "$dayOfMonth": _date_part(lambda d: d.day),
+    "$dayOfWeek": _date_part(lambda d: d.isoweekday() % 7 + 1),
+    "$hour": _date_part(lambda d: d.hour),
+    "$minute": _date_part(lambda d: d.minute),
+    "$second": _date_part(lambda d: d.second),
+    "$size": _size,
+    "$arrayElemAt": _array_elem_at,
+    "$concatArrays": _concat_arrays,
+    "$map": _map,
+    "$filter": _filter,
+    "$reduce": _reduce,
+    "$let": _let,
+    "$mergeObjects": _merge_objects,
+    "$sum": _sum,
+    "$avg": _avg,
+    "$min": _extreme(lambda c: c < 0),
+    "$max": _extreme(lambda c: c > 0),
+    "$meta": _meta,
+}
+
+
+def field_values(doc, path: str) -> list:
+    """Values of a dotted path for index keys (array elements expanded)."""
+    values = []
+    for value in iter_values(doc, path.split(".")):
+        if isinstance(value, list):
+            values.extend(value or [None])
+        else:
+            values.append(None if value is MISSING else value)
+    return values
@@ -0,0 +1,198 @@
+"""Query filter matching (``find``, ``$match``, update filters)."""
+
+import re
+from typing import Callable
+
+from bson.regex import Regex
+from pymongo.errors import OperationFailure
+
+from app.memorydb.values import (
+    MISSING,
+    compare,
+    equal,
+    get_path,
+    iter_values,
+    matches_type,
+    truthy,
+    type_rank,
+)
+
+_LOGICAL = {"$and", "$or", "$nor"}
+
+
+class QueryContext:
+    """Collection hooks a filter may need: ``$text`` scoring and ``$expr`` variables."""
+
+    def __init__(self, text: Callable[[dict, dict], float] | None = None, variables: dict | None = None):
+        self.text = text
+        self.variables = variables or {}
+        self.scores: dict[int, float] = {}
+
+
+def is_operator_dict(cond) -> bool:
+    return isinstance(cond, dict) and bool(cond) and all(k.startswith("$") for k in cond)
+
+
+def _candidates(values):
+    for value in values:
+        yield value
+        if isinstance(value, list):
+            yield from value
+
+
+def _compile(pattern, options: str = "") -> re.Pattern:
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    if isinstance(pattern, Regex):
+        return pattern.try_compile()
+    flags = 0
+    for option in options:
+        flags |= {"i": re.I, "m": re.M, "s": re.S, "x": re.X}.get(option, 0)
+    return re.compile(pattern, flags)
+
+
+def _regex_any(values, pattern) -> bool:
+    return any(isinstance(v, str) and pattern.search(v) for v in _candidates(values))
+
+
+def _eq_any(values, target) -> bool:
+    if isinstance(target, (re.Pattern, Regex)):
+        return _regex_any(values, _compile(target))
+    return any(equal(v, target) for v in _candidates(values))
+
+
+def _range(values, arg, test) -> bool:
+    rank = type_rank(arg)
+    return any(type_rank(v) == rank and test(compare(v, arg)) for v in _candidates(values))
+
+
+def _elem_match(element, cond) -> bool:
+    if is_operator_dict(cond) and not (set(cond) & (_LOGICAL | {"$expr"})):
+        return match_values([element], cond)
+    return isinstance(element, dict) and match(element, cond)
+
+
+def match_values(values: list, cond) -> bool:
+    """Does a field whose values (after array traversal) are ``values`` satisfy ``cond``?"""
+    if not is_operator_dict(cond):
+        return _eq_any(values, cond)
+
+    for op, arg in cond.items():
+        if op == "$eq":
+            ok = _eq_any(values, arg)
+        elif op == "$ne":
+            ok = not _eq_any(values, arg)
+        elif op == "$gt":
+            ok = _range(values, arg, lambda c: c > 0)
+        elif op == "$gte":
+            ok = _range(values, arg, lambda c: c >= 0)
+        elif op == "$lt":
+            ok = _range(values, arg, lambda c: c < 0)
+        elif op == "$lte":
+            ok = _range(values, arg, lambda c: c <= 0)
+        elif op == "$in":
+            ok = any(_eq_any(values, t) for t in arg)
+        elif op == "$nin":
+            ok = not any(_eq_any(values, t) for t in arg)
+        elif op == "$exists":
+            ok = any(v is not MISSING for v in values) == bool(arg)
+        elif op == "$type":
+            wanted = arg if isinstance(arg, list) else [arg]
+            ok = any(matches_type(v, t) for v in _candidates(values) for t in wanted)
+        elif op == "$regex":
+            ok = _regex_any(values, _compile(arg, cond.get("$options", "")))
+        elif op == "$options":
+            continue
+        elif op == "$not":
+            ok = not match_values(values, arg)
+        elif op == "$elemMatch":
+            ok = any(
+                isinstance(v, list) and any(_elem_match(e, arg) for e in v) for v in values
+            )
+        elif op == "$size":
+            ok = any(isinstance(v, list) and len(v) == arg for v in values)
+        elif op == "$all":
+            ok = bool(arg) and all(
+                match_values(values, t) if is_operator_dict(t) else _eq_any(values, t) for t in arg
+            )
+        elif op == "$mod":
+            divisor, remainder = arg
+            ok = any(
+                isinstance(v, (int, float)) and not isinstance(v, bool) and int(v) % divisor == remainder
+                for v in _candidates(values)
+            )
+        else:
+            raise OperationFailure(f"unknown operator: {op}", code=2)
+        if not ok:
+            return False
+    return True
+
+
+def match_field(doc, path: str, cond) -> bool:
+    return match_values(list(iter_values(doc, path.split("."))), cond)
+
+
+def match(doc: dict, query: dict | None, ctx: QueryContext | None = None) -> bool:
+    if not query:
+        return True
+    for key, cond in query.items():
+        if key == "$and":
+            ok = all(match(doc, q, ctx) for q in cond)
+        elif key == "$or":
+            ok = any(match(doc, q, ctx) for q in cond)
+        elif key == "$nor":
+            ok = not any(match(doc, q, ctx) for q in cond)
+        elif key == "$expr":
+            from app.memorydb.expressions import evaluate
+
+            ok = truthy(evaluate(cond, doc, {**(ctx.variables if ctx else {}), "ROOT": doc}))
+        elif key == "$text":
+            if ctx is None or ctx.text is None:
+                raise OperationFailure("text index required for $text query", code=27)
+            score = ctx.text(doc, cond)
+            ctx.scores[id(doc)] = score
+            ok = score > 0
+        elif key == "$comment":
+            continue
+        elif key.startswith("$"):
+            raise OperationFailure(f"unknown top level operator: {key}", code=2)
+        else:
+            ok = match_field(doc, key, cond)
+        if not ok:
+            return False
+    return True
+
+
+def _conditions_on(query: dict, array_path: str):
+    """``(subpath, cond)`` pairs of ``query`` that constrain elements of ``array_path``."""
+    for key, cond in query.items():
+        if key == "$and":
+            for sub in cond:
+                yield from _conditions_on(sub, array_path)
+        elif key == array_path:
+            yield None, cond
+        elif key.startswith(array_path + "."):
+            yield key[len(array_path) + 1:], cond
+
+
+def positional_index(doc: dict, query: dict, array_path: str) -> int | None:
+    """Index of the first ``array_path`` element the query matched (the ``$`` operator)."""
+    array = get_path(doc, array_path)
+    conditions = list(_conditions_on(query, array_path))
+    if not isinstance(array, list) or not conditions:
+        return None
+    for index, element in enumerate(array):
+        ok = True
+        for subpath, cond in conditions:
+            if subpath is None:
+                if isinstance(cond, dict) and "$elemMatch" in cond:
+                    ok = _elem_match(element, cond["$elemMatch"])
+                else:
+                    ok = match_values([element], cond)
+            else:
+                ok = match_field(element, subpath, cond) if isinstance(element, dict) else False
+            if not ok:
+                break
+        if ok:
+            return index
+    return None
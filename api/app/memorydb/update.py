@@ -0,0 +1,271 @@
+"""Update documents (operator updates, pipeline updates, upsert seeding)."""
+
+import copy
+import datetime as dt
+from functools import cmp_to_key
+
+from pymongo.errors import WriteError
+
+from app.memorydb.query import is_operator_dict, match, match_values, positional_index
+from app.memorydb.values import (
+    MISSING,
+    compare,
+    equal,
+    get_path,
+    normalize,
+    set_path,
+    unset_path,
+)
+
+
+def _now() -> dt.datetime:
+    return normalize(dt.datetime.now(dt.timezone.utc))
+
+
+def _fail(message: str, code: int = 2):
+    raise WriteError(message, code=code)
+
+
+# ── Path expansion ($, $[], $[id]) ──
+
+
+def _expand(doc: dict, path: str, query: dict, array_filters: dict) -> list[str]:
+    """Concrete paths for a path that may contain positional operators."""
+    parts = path.split(".")
+    results = [[]]
+    for i, part in enumerate(parts):
+        if part == "$":
+            prefix = ".".join(parts[:i])
+            index = positional_index(doc, query, prefix)
+            if index is None:
+                _fail("The positional operator did not find the match needed from the query.")
+            results = [r + [str(index)] for r in results]
+        elif part.startswith("$[") and part.endswith("]"):
+            ident = part[2:-1]
+            expanded = []
+            for prefix in results:
+                array = get_path(doc, ".".join(prefix))
+                if not isinstance(array, list):
+                    _fail(f"The path '{'.'.join(prefix)}' must exist in the document in order to apply array updates.")
+                for index, element in enumerate(array):
+                    if ident and not _element_matches(element, ident, array_filters):
+                        continue
+                    expanded.append(prefix + [str(index)])
+            results = expanded
+        else:
+            results = [r + [part] for r in results]
+    return [".".join(r) for r in results]
+
+
+def _element_matches(element, ident: str, array_filters: dict) -> bool:
+    if ident not in array_filters:
+        _fail(f"No array filter found for identifier '{ident}' in path", code=2)
+    cond = {}
+    for key, value in array_filters[ident].items():
+        _, _, rest = key.partition(".")
+        cond[rest or "__element__"] = value
+    wrapped = {"__element__": element} if "__element__" in cond else element
+    if not isinstance(wrapped, dict):
+        return False
+    return match(wrapped, cond)
+
+
+def _parse_array_filters(array_filters: list | None) -> dict:
+    result: dict[str, dict] = {}
+    for spec in array_filters or []:
+        for key, value in spec.items():
+            ident = key.split(".", 1)[0]
+            result.setdefault(ident, {})[key] = value
+    return result
+
+
+# ── Operators ──
+
+
+def _number(value, op: str, path: str):
+    if value is MISSING:
+        return 0
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        _fail(f"Cannot apply {op} to a value of non-numeric type. {{{path}: {value!r}}}", code=14)
+    return value
+
+
+def _array(value, op: str, path: str) -> list:
+    if value is MISSING:
+        return []
+    if not isinstance(value, list):
+        _fail(f"The field '{path}' must be an array for {op}", code=2)
+    return value
+
+
+def _apply(doc: dict, op: str, path: str, arg, inserting: bool):
+    current = get_path(doc, path)
+    if op == "$set":
+        set_path(doc, path, copy.deepcopy(arg))
+    elif op == "$setOnInsert":
+        if inserting:
+            set_path(doc, path, copy.deepcopy(arg))
+    elif op == "$unset":
+        if current is not MISSING:
+            unset_path(doc, path)
+    elif op == "$inc":
+        set_path(doc, path, _number(current, op, path) + arg)
+    elif op == "$mul":
+        set_path(doc, path, _number(current, op, path) * arg)
+    elif op in ("$min", "$max"):
+        better = (lambda c: c < 0) if op == "$min" else (lambda c: c > 0)
+        if current is MISSING or better(compare(arg, current)):
+            set_path(doc, path, copy.deepcopy(arg))
+    elif op == "$rename":
+        if current is not MISSING:
+            unset_path(doc, path)
+            set_path(doc, arg, current)
+    elif op == "$currentDate":
+        set_path(doc, path, _now())
+    elif op == "$push":
+        array = list(_array(current, op, path))
+        if isinstance(arg, dict) and "$each" in arg:
+            items = copy.deepcopy(arg["$each"])
+            position = arg.get("$position")
+            if position is None:
+                array.extend(items)
+            else:
+                array[position:position] = items
+            if "$sort" in arg:
+                spec = arg["$sort"]
+                if isinstance(spec, dict):
+                    for key, direction in reversed(list(spec.items())):
+                        array.sort(key=_sort_key(key), reverse=direction < 0)
+                else:
+                    array.sort(key=_sort_key(None), reverse=spec < 0)
+            if "$slice" in arg:
+                n = arg["$slice"]
+                array = array[n:] if n < 0 else array[:n]
+        else:
+            array.append(copy.deepcopy(arg))
+        set_path(doc, path, array)
+    elif op == "$addToSet":
+        array = list(_array(current, op, path))
+        items = arg["$each"] if isinstance(arg, dict) and "$each" in arg else [arg]
+        for item in items:
+            if not any(equal(item, existing) for existing in array):
+                array.append(copy.deepcopy(item))
+        set_path(doc, path, array)
+    elif op == "$pull":
+        if current is MISSING:
+            return
+        array = _array(current, op, path)
+        set_path(doc, path, [e for e in array if not _pull_matches(e, arg)])
+    elif op == "$pullAll":
+        if current is MISSING:
+            return
+        array = _array(current, op, path)
+        set_path(doc, path, [e for e in array if not any(equal(e, v) for v in arg)])
+    elif op == "$pop":
+        if current is MISSING:
+            return
+        array = list(_array(current, op, path))
+        if array:
+            array.pop(0 if arg == -1 else -1)
+        set_path(doc, path, array)
+    elif op == "$bit":
+        value = _number(current, op, path)
+        for kind, operand in arg.items():
+            value = {"and": value & operand, "or": value | operand, "xor": value ^ operand}[kind]
+        set_path(doc, path, value)
+    else:
+        _fail(f"Unknown modifier: {op}. Expected a valid update modifier or pipeline-style update specified as an array", code=9)
+
+
+def _sort_key(field):
+    def key(element):
+        return get_path(element, field) if field and isinstance(element, dict) else element
+
+    return cmp_to_key(lambda a, b: compare(key(a), key(b)))
+
+
+def _pull_matches(element, cond) -> bool:
+    if isinstance(cond, dict):
+        if is_operator_dict(cond):
+            return match_values([element], cond)
+        return isinstance(element, dict) and match(element, cond)
+    return equal(element, cond)
+
+
+def _check_conflicts(update: dict):
+    seen: list[str] = []
+    for op, fields in update.items():
+        for path in fields:
+            for other in seen:
+                if path == other or path.startswith(other + ".") or other.startswith(path + "."):
+                    _fail(f"Updating the path '{path}' would create a conflict at '{other}'", code=40)
+            seen.append(path)
+
+
+def apply_update(
+    doc: dict,
+    update,
+    query: dict | None = None,
+    array_filters: list | None = None,
+    inserting: bool = False,
+) -> dict:
+    """Apply ``update`` (operators or a pipeline) and return the new document."""
+    if isinstance(update, list):
+        from app.memorydb.aggregation import run_stages
+
+        result = run_stages([doc], update, update_pipeline=True)[0]
+        if result.get("_id", MISSING) != doc.get("_id", MISSING):
+            _fail("Performing an update on the path '_id' would modify the immutable field '_id'", code=66)
+        return result
+
+    if not update or not all(k.startswith("$") for k in update):
+        _fail("update document requires atomic operators", code=9)
+    _check_conflicts(update)
+    filters = _parse_array_filters(array_filters)
+    new = copy.deepcopy(doc)
+    for op, fields in update.items():
+        for path, arg in fields.items():
+            if (path == "_id" or path.startswith("_id.")) and not (
+                inserting or op == "$setOnInsert" or (op == "$set" and equal(arg, doc.get("_id")))
+            ):
+                _fail("Performing an update on the path '_id' would modify the immutable field '_id'", code=66)
+            try:
+                for concrete in _expand(new, path, query or {}, filters):
+                    _apply(new, op, concrete, arg, inserting)
+            except ValueError as e:
+                _fail(str(e), code=28)
+    return new
+
+
+def replace(doc: dict, replacement: dict) -> dict:
+    if any(k.startswith("$") for k in replacement):
+        raise ValueError("replacement can not include $ operators")
+    new = copy.deepcopy(replacement)
+    if "_id" in doc:
+        if "_id" in new and not equal(new["_id"], doc["_id"]):
+            _fail("After applying the update, the (immutable) field '_id' was found to have been altered", code=66)
+        new = {"_id": doc["_id"], **{k: v for k, v in new.items() if k != "_id"}}
+    return new
+
+
+def seed_from_query(query: dict | None) -> dict:
+    """The document an upsert starts from: the filter's equality conditions."""
+    doc: dict = {}
+
+    def visit(q: dict):
+        for key, cond in q.items():
+            if key == "$and":
+                for sub in cond:
+                    visit(sub)
+            elif key.startswith("$"):
+                continue
+            elif isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+                if "$eq" in cond:
+                    set_path(doc, key, copy.deepcopy(cond["$eq"]))
+                elif "$in" in cond and len(cond["$in"]) == 1:
+                    set_path(doc, key, copy.deepcopy(cond["$in"][0]))
+            else:
+                set_path(doc, key, copy.deepcopy(cond))
+
+    visit(query or {})
+    return doc
@@ -0,0 +1,281 @@
+"""BSON value semantics: normalization, ordering and dotted paths."""
+
+import datetime as dt
+import re
+from decimal import Decimal
+
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from bson.errors import InvalidDocument
+from bson.regex import Regex
+
+
+class _Missing:
+    """A field that does not exist (distinct from ``None``)."""
+
+    def __repr__(self):
+        return "MISSING"
+
+    def __bool__(self):
+        return False
+
+
+MISSING = _Missing()
+
+_EPOCH = dt.datetime(1970, 1, 1)
+
+
+def normalize(value):
+    """Convert a value to what a BSON round trip through Motor returns.
+
+    Aware datetimes become naive UTC, datetimes lose sub-millisecond
+    precision, tuples become lists and ``str``/``int`` subclasses (enums)
+    become plain values.
+    """
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, dt.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(dt.timezone.utc).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, str) and type(value) is not str:
+        return str.__str__(value)
+    if isinstance(value, int) and type(value) is not int:
+        return int(value)
+    if isinstance(value, Decimal):
+        return Decimal128(value)
+    if isinstance(value, dt.date):
+        raise InvalidDocument(f"cannot encode object: {value!r}, of type: {type(value)}")
+    return value
+
+
+# ── Ordering ──
+
+
+def type_rank(value) -> int:
+    """BSON comparison order of a value's type."""
+    if value is MISSING or value is None:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float, Decimal128)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, bytes):
+        return 6
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, dt.datetime):
+        return 9
+    if isinstance(value, (re.Pattern, Regex)):
+        return 11
+    return 12
+
+
+def _number(value):
+    return value.to_decimal() if isinstance(value, Decimal128) else value
+
+
+def compare(a, b) -> int:
+    ra, rb = type_rank(a), type_rank(b)
+    if ra != rb:
+        return -1 if ra < rb else 1
+    if ra == 1:
+        return 0
+    if ra == 4:
+        for (ka, va), (kb, vb) in zip(a.items(), b.items()):
+            c = compare(ka, kb) or compare(va, vb)
+            if c:
+                return c
+        return (len(a) > len(b)) - (len(a) < len(b))
+    if ra == 5:
+        for va, vb in zip(a, b):
+            c = compare(va, vb)
+            if c:
+                return c
+        return (len(a) > len(b)) - (len(a) < len(b))
+    if ra == 11:
+        a, b = (a.pattern, a.flags), (b.pattern, b.flags)
+    elif ra == 2:
+        a, b = _number(a), _number(b)
+    elif ra == 7:
+        a, b = a.binary, b.binary
+    return (a > b) - (a < b)
+
+
+def equal(a, b) -> bool:
+    return compare(a, b) == 0
+
+
+def truthy(value) -> bool:
+    """Aggregation truthiness: only false, null, missing and zero are false."""
+    if value is MISSING or value is None or value is False:
+        return False
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value != 0
+    return True
+
+
+def hash_key(value):
+    """A hashable key that groups BSON-equal values together."""
+    if isinstance(value, dict):
+        return ("d", tuple((k, hash_key(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return ("l", tuple(hash_key(v) for v in value))
+    if value is MISSING:
+        return ("n", None)
+    if isinstance(value, Decimal128):
+        return ("#", value.to_decimal())
+    if isinstance(value, bool):
+        return ("b", value)
+    if isinstance(value, (int, float)):
+        return ("#", value)
+    return (type_rank(value), value)
+
+
+# ── Types ──
+
+TYPE_ALIASES = {
+    1: "double", 2: "string", 3: "object", 4: "array", 5: "binData", 7: "objectId",
+    8: "bool", 9: "date", 10: "null", 11: "regex", 16: "int", 18: "long", 19: "decimal",
+}
+
+
+def type_name(value) -> str:
+    if value is MISSING:
+        return "missing"
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int" if -(2**31) <= value < 2**31 else "long"
+    if isinstance(value, float):
+        return "double"
+    if isinstance(value, Decimal128):
+        return "decimal"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, bytes):
+        return "binData"
+    if isinstance(value, ObjectId):
+        return "objectId"
+    if isinstance(value, dt.datetime):
+        return "date"
+    if isinstance(value, (re.Pattern, Regex)):
+        return "regex"
+    return type(value).__name__
+
+
+def matches_type(value, wanted) -> bool:
+    name = type_name(value)
+    wanted = TYPE_ALIASES.get(wanted, wanted)
+    if wanted == "number":
+        return name in ("int", "long", "double", "decimal")
+    return name == wanted
+
+
+# ── Dotted paths ──
+
+
+def get_path(doc, path: str):
+    """Value at ``path`` without array traversal (numeric parts index lists)."""
+    current = doc
+    for part in path.split("."):
+        if isinstance(current, dict):
+            current = current.get(part, MISSING)
+        elif isinstance(current, list) and part.isdigit():
+            index = int(part)
+            current = current[index] if index < len(current) else MISSING
+        else:
+            return MISSING
+        if current is MISSING:
+            return MISSING
+    return current
+
+
+def iter_values(doc, parts: list[str]):
+    """Every value reachable at ``parts``, descending into arrays of documents."""
+    if not parts:
+        yield doc
+        return
+    key, rest = parts[0], parts[1:]
+    if isinstance(doc, dict):
+        if key in doc:
+            yield from iter_values(doc[key], rest)
+        else:
+            yield MISSING
+    elif isinstance(doc, list):
+        found = False
+        if key.isdigit() and int(key) < len(doc):
+            found = True
+            yield from iter_values(doc[int(key)], rest)
+        for element in doc:
+            if isinstance(element, dict):
+                found = True
+                yield from iter_values(element, parts)
+        if not found:
+            yield MISSING
+    else:
+        yield MISSING
+
+
+def set_path(doc: dict, path: str, value):
+    parts = path.split(".")
+    current = doc
+    for i, part in enumerate(parts[:-1]):
+        nxt = parts[i + 1]
+        if isinstance(current, list):
+            index = int(part)
+            while len(current) <= index:
+                current.append(None)
+            if not isinstance(current[index], (dict, list)):
+                current[index] = {}
+            current = current[index]
+            continue
+        child = current.get(part, MISSING)
+        if not isinstance(child, (dict, list)):
+            if child is not MISSING and child is not None:
+                raise ValueError(f"Cannot create field '{nxt}' in element {{{part}: {child!r}}}")
+            child = {}
+            current[part] = child
+        current = child
+    last = parts[-1]
+    if isinstance(current, list):
+        index = int(last)
+        while len(current) <= index:
+            current.append(None)
+        current[index] = value
+    else:
+        current[last] = value
+
+
+def unset_path(doc: dict, path: str):
+    parts = path.split(".")
+    parent = get_path(doc, ".".join(parts[:-1])) if len(parts) > 1 else doc
+    last = parts[-1]
+    if isinstance(parent, dict):
+        parent.pop(last, None)
+    elif isinstance(parent, list) and last.isdigit() and int(last) < len(parent):
+        parent[int(last)] = None
+
+
+def to_millis(value: dt.datetime) -> int:
+    return int((value - _EPOCH).total_seconds() * 1000)
+
+
+def from_millis(ms: float) -> dt.datetime:
+    return _EPOCH + dt.timedelta(milliseconds=ms)
@@ -0,0 +1,134 @@
+"""Opt-in per-request profiling for admins.
+
+An authenticated admin adds ``X-Profile: 1`` (or ``?profile=1``) to any
+request. That single request runs under ``cProfile`` and the response body
+is replaced with the pstats report; the original status code is returned
+in ``X-Profile-Status``. Requests without the flag only pay for a header
+scan.
+"""
+
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import time
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.dependencies import get_current_user
+from app.models.user import UserRole
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_STATS_LIMIT = 60
+
+_TRUTHY = {"1", "true", "yes", "on"}
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _profile_requested(scope) -> bool:
+    flag = _header(scope, PROFILE_HEADER)
+    if flag is not None:
+        return flag.strip().lower() in _TRUTHY
+
+    query = scope.get("query_string", b"")
+    if PROFILE_QUERY_PARAM.encode() not in query:
+        return False
+    values = parse_qs(query.decode("latin-1")).get(PROFILE_QUERY_PARAM, [])
+    return any(v.strip().lower() in _TRUTHY for v in values)
+
+
+async def _is_admin(scope) -> bool:
+    authorization = _header(scope, b"authorization")
+    if not authorization:
+        return False
+    try:
+        user = await get_current_user(authorization)
+    except HTTPException:
+        return False
+    return user["role"] == UserRole.ADMIN
+
+
+def _render_report(profiler: cProfile.Profile, method: str, path: str, elapsed_ms: float) -> str:
+    out = io.StringIO()
+    out.write(f"{method} {path} — {elapsed_ms:.1f} ms wall\n\n")
+    stats = pstats.Stats(profiler, stream=out)
+    stats.strip_dirs().sort_stats("cumulative")
+    stats.print_stats(PROFILE_STATS_LIMIT)
+    stats.print_callees(PROFILE_STATS_LIMIT)
+    return out.getvalue()
+
+
+def _dump_stats(profiler: cProfile.Profile, method: str, path: str) -> str:
+    slug = path.strip("/").replace("/", "_") or "root"
+    filename = f"{int(time.time() * 1000)}-{method.lower()}-{slug}.prof"
+    target = os.path.join(settings.PROFILING_OUTPUT_DIR, filename)
+    os.makedirs(settings.PROFILING_OUTPUT_DIR, exist_ok=True)
+    profiler.dump_stats(target)
+    return filename
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles flagged requests from admins.
+
+    Only one request is profiled at a time: the interpreter allows a single
+    active profiler, so concurrent flagged requests queue on a lock. Other
+    coroutines scheduled on the loop while a profiled request awaits I/O
+    show up in its report too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.PROFILING_ENABLED
+            or not _profile_requested(scope)
+            or not await _is_admin(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def capture(message):
+            # The handler's own body is discarded; only its status is reported
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        async with self._lock:
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, capture)
+            finally:
+                profiler.disable()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+        method, path = scope["method"], scope["path"]
+        report = _render_report(profiler, method, path, elapsed_ms).encode()
+
+        headers = [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", str(len(report)).encode()),
+            (b"x-profile-status", str(status).encode()),
+            (b"x-profile-elapsed-ms", f"{elapsed_ms:.1f}".encode()),
+        ]
+        if settings.PROFILING_OUTPUT_DIR:
+            headers.append((b"x-profile-file", _dump_stats(profiler, method, path).encode()))
+
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": report})
@@ -0,0 +1,65 @@
+"""Per-request correlation ids.
+
+Each request gets an id: the caller's ``X-Request-ID`` when it is a sane
+token (so ids propagate from the CDN or another service), otherwise a new
+one. Every log record written while handling the request carries it, and
+it is echoed in the ``X-Request-ID`` response header.
+"""
+
+import logging
+import re
+import time
+import uuid
+
+from app import log
+
+HEADER = b"x-request-id"
+_VALID_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+logger = logging.getLogger(__name__)
+
+
+def _request_id(scope) -> str:
+    for key, value in scope.get("headers", []):
+        if key == HEADER:
+            candidate = value.decode("latin-1")
+            if _VALID_ID.match(candidate):
+                return candidate
+            break
+    return uuid.uuid4().hex
+
+
+class RequestIdMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id(scope)
+        token = log.bind_request(request_id)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (HEADER, request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            logger.debug(
+                "request",
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                },
+            )
+            log.unbind_request(token)
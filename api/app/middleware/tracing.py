@@ -0,0 +1,55 @@
+"""A server span per request.
+
+Continues the caller's trace from a ``traceparent`` header and returns the
+request span's ``traceparent`` in the response, so a slow request can be
+looked up in the exported spans. Spans are named after the route template
+(``POST /api/payments/create-checkout``), not the raw path.
+"""
+
+from app import log, tracing
+
+HEADER = b"traceparent"
+
+
+def _traceparent(scope) -> str | None:
+    for key, value in scope.get("headers", []):
+        if key == HEADER:
+            return value.decode("latin-1")
+    return None
+
+
+class TracingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracing.enabled():
+            await self.app(scope, receive, send)
+            return
+
+        with tracing.span(
+            f"{scope['method']} {scope['path']}",
+            tracing.SERVER,
+            {
+                "http.method": scope["method"],
+                "http.target": scope["path"],
+                "request_id": log.current_request_id(),
+            },
+            traceparent=_traceparent(scope),
+        ) as span:
+
+            async def send_with_traceparent(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "error"
+                    message["headers"] = [*message.get("headers", []), (HEADER, span.traceparent.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_traceparent)
+            finally:
+                route = scope.get("route")
+                if getattr(route, "path", None):
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
@@ -1,3 +1,5 @@
+from enum import Enum
+
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -18,11 +20,61 @@ class UnavailabilityResponse(BaseModel):
     reason: str = ""
 
 
+class UnavailabilityBulkCreate(BaseModel):
+    items: list[UnavailabilityCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class UnavailabilityBulkResponse(BaseModel):
+    inserted: int
+    skipped_holidays: list[str] = []
+
+
+class UnavailabilityRuleCreate(BaseModel):
+    """Weekly recurring block or holiday, expanded at query time."""
+
+    weekday: int = Field(..., ge=0, le=6, description="0=Mon, 1=Tue, ..., 6=Sun")
+    interval_weeks: int = Field(1, ge=1, le=52)
+    start_date: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
+    until: str | None = Field(None, pattern=r"^\d{4}-\d{2}-\d{2}$")
+    start_time: str | None = Field(None, pattern=r"^\d{2}:\d{2}$")
+    end_time: str | None = Field(None, pattern=r"^\d{2}:\d{2}$")
+    is_holiday: bool = False
+    reason: str = ""
+
+
+class UnavailabilityRuleResponse(BaseModel):
+    id: str
+    weekday: int
+    interval_weeks: int
+    start_date: str
+    until: str | None = None
+    start_time: str | None = None
+    end_time: str | None = None
+    is_holiday: bool
+    reason: str = ""
+
+
 class AvailableSlot(BaseModel):
     start: str
     end: str
 
 
+class DayStatus(str, Enum):
+    OPEN = "open"
+    CLOSED = "closed"
+    HOLIDAY = "holiday"
+    FULL = "full"
+
+
+class DayAvailabilitySummary(BaseModel):
+    """Per-day slot summary for the calendar month view."""
+
+    date: str
+    status: DayStatus
+    total_slots: int
+    free_slots: int
+
+
 # ── Business Hours Settings ──
 
 
@@ -82,6 +82,35 @@ class BookingStatusUpdate(BaseModel):
     status: BookingStatus
 
 
+class BookingBulkStatusUpdate(BaseModel):
+    """Apply ``status`` to every booking matching the filters (ANDed)."""
+
+    status: BookingStatus
+    booking_ids: list[str] | None = Field(None, min_length=1, max_length=1000)
+    current_status: BookingStatus | None = None
+    date_from: str | None = Field(None, pattern=r"^\d{4}-\d{2}-\d{2}$")
+    date_to: str | None = Field(None, pattern=r"^\d{4}-\d{2}-\d{2}$")
+
+    @model_validator(mode="after")
+    def validate_filters(self) -> "BookingBulkStatusUpdate":
+        if not (self.booking_ids or self.current_status or self.date_from or self.date_to):
+            raise ValueError("At least one filter is required")
+        if self.date_from and self.date_to and self.date_from > self.date_to:
+            raise ValueError("date_from must not be after date_to")
+        return self
+
+
+class BookingBulkStatusResponse(BaseModel):
+    matched: int
+    modified: int
+
+
+class BookingSearchResponse(BaseModel):
+    mode: str
+    items: list[BookingResponse]
+    next_cursor: str | None = None
+
+
 class BookingInDB(BaseModel):
     user_id: str | None = None
     user_name: str
@@ -98,6 +127,14 @@ class BookingInDB(BaseModel):
     notes: str = ""
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+    # Minutes since midnight (see app.services.intervals)
+    start_min: int | None = None
+    end_min: int | None = None
+
+    # Normalized search keys (see app.services.booking_search)
+    email_lc: str = ""
+    phone_digits: str = ""
+
     # Birth details
     date_of_birth: str = ""
     time_of_birth: str | None = None
@@ -0,0 +1,23 @@
+from enum import Enum
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class MatchRole(str, Enum):
+    GROOM = "groom"
+    BRIDE = "bride"
+
+
+class MatchScoreRequest(BaseModel):
+    """Score one booking's birth details against candidate bookings."""
+
+    booking_id: str
+    role: MatchRole  # of the profile booking; candidates take the other role
+    candidate_booking_ids: list[str] = Field(..., min_length=1, max_length=5000)
+    min_score: float = Field(0, ge=0, le=36)
+
+    @model_validator(mode="after")
+    def validate_candidates(self) -> "MatchScoreRequest":
+        if self.booking_id in self.candidate_booking_ids:
+            raise ValueError("The profile booking cannot be its own candidate")
+        return self
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field, field_validator
+
+
+class ServiceUpsert(BaseModel):
+    title: str = Field(..., min_length=1, max_length=200)
+    # Duration in minutes (as a string key) -> price in INR; "0" for reports
+    prices: dict[str, int] = Field(..., min_length=1)
+    active: bool = True
+    sort_order: int = 0
+
+    @field_validator("prices")
+    @classmethod
+    def validate_prices(cls, v: dict[str, int]) -> dict[str, int]:
+        for duration, price in v.items():
+            if not duration.isdigit() or int(duration) > 120:
+                raise ValueError("price keys must be durations in minutes (0-120)")
+            if price <= 0:
+                raise ValueError("prices must be positive")
+        return v
+
+
+class ServiceResponse(BaseModel):
+    slug: str
+    title: str
+    prices: dict[str, int]
+    durations: list[int]
+    is_report: bool
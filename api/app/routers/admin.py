@@ -1,17 +1,38 @@
-from datetime import datetime, timedelta, timezone
+import asyncio
+from datetime import date, datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends
+from bson import ObjectId
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
 
-from app.database import get_db
-from app.dependencies import require_admin
+from app import log, tracing
+from app.database import ANALYTICS, get_db
+from app.config import settings
+from app.dependencies import require_admin, require_admin_stream
 from app.models.booking import BookingStatus
+from app.models.matchmaking import MatchScoreRequest
+from app.services import (
+    activity,
+    booking_search,
+    day_schedule,
+    intervals,
+    invalidation,
+    resilience,
+    revocation,
+    scheduler,
+)
+from app.utils import sse
+from app.utils.exceptions import BadRequestError, NotFoundError, UnprocessableEntityError
+from app.utils.security import create_stream_token, decode_token
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
+ACTIVITY_HEARTBEAT_SECONDS = 15
+
 
 @router.get("/dashboard")
 async def dashboard(_admin: dict = Depends(require_admin)):
-    db = get_db()
+    db = get_db(ANALYTICS)
 
     today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
@@ -66,7 +87,7 @@ async def dashboard(_admin: dict = Depends(require_admin)):
 
 @router.get("/stats")
 async def stats(_admin: dict = Depends(require_admin)):
-    db = get_db()
+    db = get_db(ANALYTICS)
 
     total_users = await db.users.count_documents({})
     total_bookings = await db.bookings.count_documents({})
@@ -151,3 +172,195 @@ async def stats(_admin: dict = Depends(require_admin)):
         "daily_bookings": daily_series,
         "daily_revenue": revenue_series,
     }
+
+
+@router.post("/day-schedule/check")
+async def check_day_schedule(
+    start: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    repair: bool = False,
+    _admin: dict = Depends(require_admin),
+):
+    """Compare the day_schedule read model against source collections."""
+    start_date, end_date = date.fromisoformat(start), date.fromisoformat(end)
+    num_days = (end_date - start_date).days + 1
+    if num_days < 1 or num_days > 366:
+        raise BadRequestError("Range must cover 1 to 366 days")
+
+    dates = [(start_date + timedelta(days=i)).isoformat() for i in range(num_days)]
+    mismatched = await day_schedule.check_consistency(dates, repair=repair)
+    return {
+        "checked": len(dates),
+        "mismatched": mismatched,
+        "repaired": repair,
+    }
+
+
+@router.post("/bookings/search-backfill")
+async def backfill_booking_search(_admin: dict = Depends(require_admin)):
+    """Create the search indexes and normalize email/phone on old bookings."""
+    updated = await booking_search.backfill_normalized_fields()
+    return {"updated": updated}
+
+
+@router.post("/migrations/interval-fields")
+async def backfill_interval_fields(_admin: dict = Depends(require_admin)):
+    """Add start_min/end_min to existing bookings and time blocks."""
+    return await intervals.backfill()
+
+
+@router.post("/kundli/precompute")
+async def precompute_kundli_charts(_admin: dict = Depends(require_admin)):
+    """Compute charts for all upcoming premium-kundli bookings in one batch."""
+    # NumPy is only needed here; keep it out of the startup import path
+    from app.services import kundli
+
+    return await kundli.precompute_upcoming()
+
+
+@router.get("/bookings/{booking_id}/kundli")
+async def booking_kundli(booking_id: str, _admin: dict = Depends(require_admin)):
+    """Birth chart for a booking's birth details (memoized)."""
+    from app.services import kundli
+
+    if not ObjectId.is_valid(booking_id):
+        raise NotFoundError("Booking not found")
+    doc = await get_db().bookings.find_one({"_id": ObjectId(booking_id)})
+    if not doc:
+        raise NotFoundError("Booking not found")
+    try:
+        birth = kundli.birth_input(doc)
+    except ValueError as exc:
+        raise UnprocessableEntityError(str(exc))
+    (chart,) = await kundli.charts_for([birth])
+    return chart
+
+
+@router.post("/matchmaking/score")
+async def matchmaking_score(data: MatchScoreRequest, _admin: dict = Depends(require_admin)):
+    """Ashtakoota scores of one booking against candidate bookings, best first."""
+    # NumPy is only needed here; keep it out of the startup import path
+    from app.services import ashtakoota
+
+    try:
+        result = await ashtakoota.score_bookings(
+            data.booking_id, data.role, data.candidate_booking_ids, data.min_score
+        )
+    except ValueError as exc:
+        raise UnprocessableEntityError(str(exc))
+    if result is None:
+        raise NotFoundError("Booking not found")
+    return result
+
+
+@router.get("/scheduler")
+async def scheduler_status(_admin: dict = Depends(require_admin)):
+    """Lease holder and per-job run duration, lag and failure counts."""
+    return await scheduler.job_metrics()
+
+
+@router.get("/invalidation")
+async def invalidation_status(
+    probe: bool = False,
+    _admin: dict = Depends(require_admin),
+):
+    """This worker's invalidation bus mode and lag; ``probe`` adds a round trip."""
+    bus = invalidation.get_bus()
+    result = bus.metrics() if bus else {"worker": invalidation.WORKER_ID, "mode": None}
+    if probe:
+        result["probe_ms"] = await invalidation.measure_lag()
+    return result
+
+
+@router.get("/revocation")
+async def revocation_status(_admin: dict = Depends(require_admin)):
+    """This worker's revocation filter: size, sync watermark and hit rates."""
+    return revocation.get_list().metrics()
+
+
+@router.get("/logging")
+async def logging_status(_admin: dict = Depends(require_admin)):
+    """This worker's log queue depth, dropped records and debug sampling."""
+    return log.metrics()
+
+
+@router.get("/tracing")
+async def tracing_status(_admin: dict = Depends(require_admin)):
+    """This worker's span exporter, sampling ratio and export counters."""
+    return tracing.metrics()
+
+
+@router.get("/dependencies")
+async def dependency_status(_admin: dict = Depends(require_admin)):
+    """Breaker state, bulkhead usage and call counters for Stripe and Resend."""
+    return resilience.metrics()
+
+
+@router.post("/stream-token")
+async def stream_token(
+    authorization: str = Header(...),
+    admin: dict = Depends(require_admin),
+):
+    """Short-lived token for opening an admin SSE stream with ``?token=``."""
+    sid = decode_token(authorization.split(" ")[1]).get("sid")
+    claims = {"sub": admin["id"], **({"sid": sid} if sid else {})}
+    return {
+        "token": create_stream_token(claims),
+        "expires_in": settings.STREAM_TOKEN_EXPIRE_SECONDS,
+    }
+
+
+@router.get("/activity/stream")
+async def activity_stream(
+    request: Request,
+    last_event_id: str | None = Query(None),
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+    _admin: dict = Depends(require_admin_stream),
+):
+    """Server-Sent Events feed of booking and payment activity.
+
+    Authenticated with ``?token=`` from ``POST /stream-token``, since
+    ``EventSource`` cannot send headers. Its automatic reconnect reuses the
+    URL, so once the token has expired the client must fetch a new one and
+    reconnect with ``last_event_id``.
+
+    Reconnecting clients (``Last-Event-ID`` header or ``last_event_id``
+    query) first get the events they missed. A ``reset`` event means the gap
+    was too large and the dashboard should be reloaded.
+    """
+    hub = activity.get_hub()
+    # Subscribe first so nothing lands between the backlog and the live feed
+    queue = await hub.subscribe()
+    resume_from = last_event_id_header or last_event_id
+    try:
+        backlog = await activity.catch_up(resume_from) if resume_from else []
+    except BaseException:
+        hub.unsubscribe(queue)
+        raise
+
+    async def events():
+        replayed = {message["id"] for message in backlog or []}
+        try:
+            if backlog is None:
+                yield sse.format_event("reset", {})
+            for message in backlog or []:
+                yield sse.format_event(message["type"], message, event_id=message["id"])
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), ACTIVITY_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield sse.KEEP_ALIVE
+                    continue
+                if message is activity.RESET:
+                    yield sse.format_event("reset", {})
+                    continue
+                # The backlog and live queue can overlap right after connecting
+                if message["id"] in replayed:
+                    continue
+                yield sse.format_event(message["type"], message, event_id=message["id"])
+        finally:
+            hub.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=sse.HEADERS)
@@ -1,8 +1,12 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
 from bson import ObjectId
 from fastapi import APIRouter, Depends
 
+from app.config import settings
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, rate_limit
 from app.models.user import (
     TokenRefresh,
     TokenResponse,
@@ -11,6 +15,7 @@ from app.models.user import (
     UserLogin,
     UserResponse,
 )
+from app.services import revocation
 from app.utils.exceptions import BadRequestError, UnauthorizedError
 from app.utils.security import (
     create_access_token,
@@ -23,7 +28,25 @@ from app.utils.security import (
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
 
 
-@router.post("/register", response_model=TokenResponse)
+def _issue_tokens(user_id: str, sid: str | None = None) -> TokenResponse:
+    """Token pair for a new session, or the next one in session ``sid``."""
+    sid = sid or uuid.uuid4().hex
+    return TokenResponse(
+        access_token=create_access_token({"sub": user_id, "sid": sid}),
+        refresh_token=create_refresh_token({"sub": user_id, "sid": sid}),
+    )
+
+
+def _session_expiry() -> datetime:
+    # A session lives as long as its newest refresh token
+    return datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+@router.post(
+    "/register",
+    response_model=TokenResponse,
+    dependencies=[rate_limit("register")],
+)
 async def register(data: UserCreate):
     db = get_db()
 
@@ -39,15 +62,14 @@ async def register(data: UserCreate):
     )
 
     result = await db.users.insert_one(user.model_dump())
-    user_id = str(result.inserted_id)
-
-    return TokenResponse(
-        access_token=create_access_token({"sub": user_id}),
-        refresh_token=create_refresh_token({"sub": user_id}),
-    )
+    return _issue_tokens(str(result.inserted_id))
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[rate_limit("login", by_email=True)],
+)
 async def login(data: UserLogin):
     db = get_db()
 
@@ -55,31 +77,52 @@ async def login(data: UserLogin):
     if not user or not verify_password(data.password, user["password_hash"]):
         raise UnauthorizedError("Invalid email or password")
 
-    user_id = str(user["_id"])
-
-    return TokenResponse(
-        access_token=create_access_token({"sub": user_id}),
-        refresh_token=create_refresh_token({"sub": user_id}),
-    )
+    return _issue_tokens(str(user["_id"]))
 
 
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(data: TokenRefresh):
+    """Exchange a refresh token for a new pair; each refresh token works once.
+
+    Presenting an already-rotated token means it was copied, so the whole
+    session is revoked.
+    """
     payload = decode_token(data.refresh_token)
     if not payload or payload.get("type") != "refresh":
         raise UnauthorizedError("Invalid refresh token")
 
+    sid = payload.get("sid")
+    if sid and await revocation.is_revoked(sid):
+        raise UnauthorizedError("Session has been revoked")
+
     db = get_db()
     user = await db.users.find_one({"_id": ObjectId(payload["sub"])})
     if not user:
         raise UnauthorizedError("User not found")
 
-    user_id = str(user["_id"])
+    # Tokens issued before rotation existed have no jti; they start a new session
+    jti = payload.get("jti")
+    if jti:
+        expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+        if not await revocation.revoke(jti, revocation.ROTATED, expires_at):
+            if sid:
+                await revocation.revoke(sid, revocation.SESSION, _session_expiry())
+            raise UnauthorizedError("Refresh token already used")
 
-    return TokenResponse(
-        access_token=create_access_token({"sub": user_id}),
-        refresh_token=create_refresh_token({"sub": user_id}),
-    )
+    return _issue_tokens(str(user["_id"]), sid)
+
+
+@router.post("/logout")
+async def logout(data: TokenRefresh):
+    """Revoke the session: its refresh token and every access token issued in it."""
+    payload = decode_token(data.refresh_token)
+    if not payload or payload.get("type") != "refresh":
+        raise UnauthorizedError("Invalid refresh token")
+
+    sid = payload.get("sid")
+    if sid:
+        await revocation.revoke(sid, revocation.SESSION, _session_expiry())
+    return {"message": "Logged out"}
 
 
 @router.get("/me", response_model=UserResponse)
@@ -1,24 +1,46 @@
+import asyncio
+import calendar
 from datetime import date, datetime, timedelta, timezone
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pymongo import InsertOne
 
+from app.config import settings
 from app.database import get_db
 from app.dependencies import require_admin
 from app.models.availability import (
     AvailableSlot,
     BusinessHoursResponse,
     BusinessHoursSettings,
+    DayAvailabilitySummary,
+    DayStatus,
+    UnavailabilityBulkCreate,
+    UnavailabilityBulkResponse,
     UnavailabilityCreate,
     UnavailabilityResponse,
+    UnavailabilityRuleCreate,
+    UnavailabilityRuleResponse,
 )
 from app.models.booking import PENDING_EXPIRY_MINUTES
-from app.services.settings import get_business_hours
+from app.services import (
+    day_schedule,
+    http_cache,
+    intervals,
+    invalidation,
+    recurring,
+    slot_stream,
+)
+from app.services.settings import BUSINESS_HOURS_TOPIC, get_business_hours
+from app.utils import sse
 from app.utils.exceptions import BadRequestError, NotFoundError
 
 router = APIRouter(prefix="/api/availability", tags=["Availability"])
 
 SLOT_DURATION_MINUTES = 30
+STREAM_MAX_DAYS = 14
+STREAM_HEARTBEAT_SECONDS = 15
 
 
 def _generate_all_slots(
@@ -46,16 +68,15 @@ def _generate_all_slots(
     return slots
 
 
-def _time_to_minutes(t: str) -> int:
-    """Convert HH:MM to minutes since midnight."""
-    h, m = t.split(":")
-    return int(h) * 60 + int(m)
+def _minutes_to_time(m: int) -> str:
+    hours, mins = divmod(m, 60)
+    return f"{hours:02d}:{mins:02d}"
 
 
 def _overlaps(start1: str, end1: str, start2: str, end2: str) -> bool:
     """Check if two time ranges overlap."""
-    s1, e1 = _time_to_minutes(start1), _time_to_minutes(end1)
-    s2, e2 = _time_to_minutes(start2), _time_to_minutes(end2)
+    s1, e1 = intervals.to_minutes(start1), intervals.to_minutes(end1)
+    s2, e2 = intervals.to_minutes(start2), intervals.to_minutes(end2)
     return s1 < e2 and s2 < e1
 
 
@@ -70,6 +91,47 @@ def _doc_to_response(doc: dict) -> UnavailabilityResponse:
     )
 
 
+def _unavailability_doc(data: UnavailabilityCreate) -> dict:
+    if data.is_holiday:
+        return {
+            "date": data.date,
+            "is_holiday": True,
+            "reason": data.reason,
+        }
+
+    _validate_time_block(data.start_time, data.end_time)
+    return {
+        "date": data.date,
+        "start_time": data.start_time,
+        "end_time": data.end_time,
+        **intervals.block_fields(data.start_time, data.end_time),
+        "is_holiday": False,
+        "reason": data.reason,
+    }
+
+
+def _validate_time_block(start_time: str | None, end_time: str | None):
+    if not start_time or not end_time:
+        raise BadRequestError("start_time and end_time are required for time blocks")
+
+    if intervals.to_minutes(start_time) >= intervals.to_minutes(end_time):
+        raise BadRequestError("start_time must be before end_time")
+
+
+def _rule_to_response(doc: dict) -> UnavailabilityRuleResponse:
+    return UnavailabilityRuleResponse(
+        id=str(doc["_id"]),
+        weekday=doc["weekday"],
+        interval_weeks=doc.get("interval_weeks", 1),
+        start_date=doc["start_date"],
+        until=doc.get("until"),
+        start_time=doc.get("start_time"),
+        end_time=doc.get("end_time"),
+        is_holiday=doc.get("is_holiday", False),
+        reason=doc.get("reason", ""),
+    )
+
+
 @router.get("/slots", response_model=list[AvailableSlot])
 async def get_available_slots(
     date_str: str = Query(..., alias="date", pattern=r"^\d{4}-\d{2}-\d{2}$"),
@@ -86,6 +148,14 @@ async def get_available_slots(
     if not day_config or not day_config.is_open:
         return []
 
+    # Recurring rules are expanded here rather than stored per date
+    rule_holiday, rule_blocks = await recurring.rules_for_date(requested_date)
+    if rule_holiday:
+        return []
+
+    if settings.DAY_SCHEDULE_READS:
+        return await _slots_from_day_schedule(date_str, requested_date, day_config, rule_blocks)
+
     # Check if entire day is a holiday
     holiday = await db.unavailability.find_one({"date": date_str, "is_holiday": True})
     if holiday:
@@ -93,7 +163,7 @@ async def get_available_slots(
 
     # Get unavailable periods for the date
     cursor = db.unavailability.find({"date": date_str, "is_holiday": False})
-    unavailable = []
+    unavailable = [(_minutes_to_time(s), _minutes_to_time(e)) for s, e in rule_blocks]
     async for doc in cursor:
         if doc.get("start_time") and doc.get("end_time"):
             unavailable.append((doc["start_time"], doc["end_time"]))
@@ -109,7 +179,7 @@ async def get_available_slots(
     })
     booked = []
     async for b in booking_cursor:
-        start_min = _time_to_minutes(b["time_slot"])
+        start_min = intervals.to_minutes(b["time_slot"])
         end_min = start_min + b.get("duration_minutes", 30)
         hours, mins = divmod(end_min, 60)
         booked.append((b["time_slot"], f"{hours:02d}:{mins:02d}"))
@@ -126,7 +196,7 @@ async def get_available_slots(
 
     for slot in all_slots:
         # Skip slots that have already started if date is today
-        if is_today and _time_to_minutes(slot["start"]) <= now_minutes:
+        if is_today and intervals.to_minutes(slot["start"]) <= now_minutes:
             continue
 
         blocked = False
@@ -148,11 +218,187 @@ async def get_available_slots(
     return available
 
 
+@router.get("/slots/stream")
+async def stream_slots(
+    request: Request,
+    date_str: str | None = Query(None, alias="date", pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    start: str | None = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end: str | None = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+):
+    """Server-Sent Events for one date or a ``start``..``end`` range.
+
+    Sends a ``snapshot`` event (date -> slots) first, then ``delta`` events
+    with the slots ``added``/``removed`` on one date. A new ``snapshot`` is
+    sent if the client falls behind.
+    """
+    if date_str:
+        dates = [date_str]
+    elif start and end:
+        start_date, end_date = date.fromisoformat(start), date.fromisoformat(end)
+        num_days = (end_date - start_date).days + 1
+        if num_days < 1 or num_days > STREAM_MAX_DAYS:
+            raise BadRequestError(f"Range must cover 1 to {STREAM_MAX_DAYS} days")
+        dates = [(start_date + timedelta(days=i)).isoformat() for i in range(num_days)]
+    else:
+        raise BadRequestError("Provide date, or start and end")
+
+    hub = slot_stream.get_hub(get_available_slots)
+    queue, snapshot = await hub.subscribe(dates)
+
+    async def events():
+        try:
+            yield sse.format_event("snapshot", snapshot)
+            while True:
+                try:
+                    delta = await asyncio.wait_for(queue.get(), STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield sse.KEEP_ALIVE
+                    continue
+                if delta is slot_stream.RESYNC:
+                    yield sse.format_event("snapshot", hub.snapshot(dates))
+                else:
+                    yield sse.format_event("delta", delta)
+        finally:
+            hub.unsubscribe(queue, dates)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=sse.HEADERS,
+    )
+
+
+async def _slots_from_day_schedule(
+    date_str, requested_date, day_config, rule_blocks
+) -> list[AvailableSlot]:
+    """Same result as the source-collection path, from one point read."""
+    schedule = await day_schedule.load_day_schedule(date_str)
+    if schedule.holiday:
+        return []
+
+    busy = schedule.busy
+    for start, end in rule_blocks:
+        busy |= day_schedule.interval_mask(start, end)
+    now = datetime.now()
+    is_today = requested_date == now.date()
+    now_minutes = now.hour * 60 + now.minute if is_today else 0
+
+    available = []
+    for slot in _generate_all_slots(day_config.open_time, day_config.close_time):
+        start = intervals.to_minutes(slot["start"])
+        if is_today and start <= now_minutes:
+            continue
+        if busy & day_schedule.interval_mask(start, start + SLOT_DURATION_MINUTES):
+            continue
+        available.append(AvailableSlot(start=slot["start"], end=slot["end"]))
+    return available
+
+
+@router.get("/month", response_model=list[DayAvailabilitySummary])
+async def get_month_summary(
+    month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
+):
+    """Per-day open/holiday/full status and free-slot counts for a month."""
+    # NumPy is only needed here; keep it out of the startup import path
+    from app.services.availability_grid import busy_matrix, free_slot_counts
+
+    db = get_db()
+
+    year, month_num = map(int, month.split("-"))
+    if not 1 <= month_num <= 12:
+        raise BadRequestError("month must be in YYYY-MM format")
+    num_days = calendar.monthrange(year, month_num)[1]
+    days = [date(year, month_num, d) for d in range(1, num_days + 1)]
+    first, last = days[0].isoformat(), days[-1].isoformat()
+    index = {d.isoformat(): i for i, d in enumerate(days)}
+
+    bh_settings = await get_business_hours()
+    hours_by_day = {d.day: d for d in bh_settings.weekly_hours}
+
+    # Bulk-load the month's blocks, holidays and live bookings
+    holidays = set()
+    busy = []
+    cursor = db.unavailability.find({"date": {"$gte": first, "$lte": last}})
+    async for doc in cursor:
+        if doc.get("is_holiday"):
+            holidays.add(doc["date"])
+        elif doc.get("start_time") and doc.get("end_time"):
+            busy.append((
+                index[doc["date"]],
+                intervals.to_minutes(doc["start_time"]),
+                intervals.to_minutes(doc["end_time"]),
+            ))
+
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=PENDING_EXPIRY_MINUTES)
+    booking_cursor = db.bookings.find({
+        "date": {"$gte": first, "$lte": last},
+        "$or": [
+            {"status": "confirmed"},
+            {"status": "pending", "created_at": {"$gte": cutoff}},
+        ],
+    })
+    async for b in booking_cursor:
+        start_min = intervals.to_minutes(b["time_slot"])
+        busy.append((index[b["date"]], start_min, start_min + b.get("duration_minutes", 30)))
+
+    rules = await recurring.load_rules()
+    for i, d in enumerate(days):
+        rule_holiday, rule_blocks = recurring.expand(rules, d)
+        if rule_holiday:
+            holidays.add(d.isoformat())
+        busy.extend((i, s, e) for s, e in rule_blocks)
+
+    # Closed days and holidays get an empty window so they yield no slots
+    open_min = [0] * num_days
+    close_min = [0] * num_days
+    for i, d in enumerate(days):
+        day_config = hours_by_day.get(d.weekday())
+        if day_config and day_config.is_open and d.isoformat() not in holidays:
+            open_min[i] = intervals.to_minutes(day_config.open_time)
+            close_min[i] = intervals.to_minutes(day_config.close_time)
+
+    # Match /slots: on today, slots that have already started are not free
+    now = datetime.now()
+    not_before = [-1] * num_days
+    if now.date().isoformat() in index:
+        not_before[index[now.date().isoformat()]] = now.hour * 60 + now.minute
+
+    total, free = free_slot_counts(
+        busy_matrix(num_days, busy), open_min, close_min, SLOT_DURATION_MINUTES, not_before
+    )
+
+    summaries = []
+    for i, d in enumerate(days):
+        day_config = hours_by_day.get(d.weekday())
+        if d.isoformat() in holidays:
+            status = DayStatus.HOLIDAY
+        elif not day_config or not day_config.is_open:
+            status = DayStatus.CLOSED
+        elif free[i] == 0:
+            status = DayStatus.FULL
+        else:
+            status = DayStatus.OPEN
+        summaries.append(DayAvailabilitySummary(
+            date=d.isoformat(),
+            status=status,
+            total_slots=int(total[i]),
+            free_slots=int(free[i]),
+        ))
+    return summaries
+
+
 @router.get("/unavailable", response_model=list[UnavailabilityResponse])
 async def get_unavailability(
+    request: Request,
+    response: Response,
     date: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
 ):
     """Get unavailable periods for a specific date."""
+    not_modified = await http_cache.conditional(http_cache.UNAVAILABILITY, request, response)
+    if not_modified:
+        return not_modified
     db = get_db()
     cursor = db.unavailability.find({"date": date}).sort("start_time", 1)
     results = []
@@ -163,10 +409,15 @@ async def get_unavailability(
 
 @router.get("/unavailable/range", response_model=list[UnavailabilityResponse])
 async def get_unavailability_range(
+    request: Request,
+    response: Response,
     start: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
     end: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
 ):
     """Get unavailable periods for a date range."""
+    not_modified = await http_cache.conditional(http_cache.UNAVAILABILITY, request, response)
+    if not_modified:
+        return not_modified
     db = get_db()
     cursor = db.unavailability.find(
         {"date": {"$gte": start, "$lte": end}}
@@ -179,10 +430,15 @@ async def get_unavailability_range(
 
 @router.get("/holidays", response_model=list[str])
 async def get_holidays(
+    request: Request,
+    response: Response,
     start: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
     end: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
 ):
     """Get holiday dates in a range (for calendar view)."""
+    not_modified = await http_cache.conditional(http_cache.UNAVAILABILITY, request, response)
+    if not_modified:
+        return not_modified
     db = get_db()
     cursor = db.unavailability.find(
         {"date": {"$gte": start, "$lte": end}, "is_holiday": True}
@@ -190,6 +446,16 @@ async def get_holidays(
     holidays = []
     async for doc in cursor:
         holidays.append(doc["date"])
+
+    # Occurrences of recurring holiday rules in the range
+    rules = [r for r in await recurring.load_rules() if r.get("is_holiday")]
+    if rules:
+        day = date.fromisoformat(start)
+        last = date.fromisoformat(end)
+        while day <= last:
+            if recurring.expand(rules, day)[0] and day.isoformat() not in holidays:
+                holidays.append(day.isoformat())
+            day += timedelta(days=1)
     return holidays
 
 
@@ -209,31 +475,62 @@ async def add_unavailability(
         if existing:
             raise BadRequestError(f"{data.date} is already marked as a holiday")
 
-        doc = {
-            "date": data.date,
-            "is_holiday": True,
-            "reason": data.reason,
-        }
-    else:
-        if not data.start_time or not data.end_time:
-            raise BadRequestError("start_time and end_time are required for time blocks")
-
-        if _time_to_minutes(data.start_time) >= _time_to_minutes(data.end_time):
-            raise BadRequestError("start_time must be before end_time")
-
-        doc = {
-            "date": data.date,
-            "start_time": data.start_time,
-            "end_time": data.end_time,
-            "is_holiday": False,
-            "reason": data.reason,
-        }
-
+    doc = _unavailability_doc(data)
     result = await db.unavailability.insert_one(doc)
     doc["_id"] = result.inserted_id
+    await day_schedule.block_added(doc)
+    await slot_stream.publish_change(doc["date"])
+    await http_cache.bump(http_cache.UNAVAILABILITY, http_cache.unavailability_paths(data.is_holiday))
     return _doc_to_response(doc)
 
 
+@router.post("/unavailable/bulk", response_model=UnavailabilityBulkResponse)
+async def add_unavailability_bulk(
+    data: UnavailabilityBulkCreate,
+    _admin: dict = Depends(require_admin),
+):
+    """Add many blocks/holidays with one ordered bulk_write.
+
+    Holidays already present (in the DB or earlier in the payload) are
+    skipped and reported rather than failing the whole batch.
+    """
+    db = get_db()
+
+    docs = []
+    for i, item in enumerate(data.items):
+        try:
+            docs.append(_unavailability_doc(item))
+        except BadRequestError as e:
+            raise BadRequestError(f"items[{i}]: {e.detail}")
+
+    holiday_dates = [d["date"] for d in docs if d["is_holiday"]]
+    taken = set()
+    if holiday_dates:
+        cursor = db.unavailability.find({"date": {"$in": holiday_dates}, "is_holiday": True})
+        taken = {doc["date"] async for doc in cursor}
+
+    to_insert = []
+    skipped = []
+    for doc in docs:
+        if doc["is_holiday"]:
+            if doc["date"] in taken:
+                skipped.append(doc["date"])
+                continue
+            taken.add(doc["date"])
+        to_insert.append(doc)
+
+    if to_insert:
+        await db.unavailability.bulk_write([InsertOne(doc) for doc in to_insert], ordered=True)
+        await day_schedule.blocks_added(to_insert)
+        await slot_stream.publish_change()
+        await http_cache.bump(
+            http_cache.UNAVAILABILITY,
+            http_cache.unavailability_paths(any(d["is_holiday"] for d in to_insert)),
+        )
+
+    return UnavailabilityBulkResponse(inserted=len(to_insert), skipped_holidays=skipped)
+
+
 @router.delete("/unavailable/{block_id}")
 async def remove_unavailability(
     block_id: str,
@@ -241,9 +538,64 @@ async def remove_unavailability(
 ):
     """Remove an unavailable period (make it available again)."""
     db = get_db()
-    result = await db.unavailability.delete_one({"_id": ObjectId(block_id)})
-    if result.deleted_count == 0:
+    doc = await db.unavailability.find_one_and_delete({"_id": ObjectId(block_id)})
+    if not doc:
         raise NotFoundError("Unavailability block not found")
+    await day_schedule.block_removed(doc)
+    await slot_stream.publish_change(doc["date"])
+    await http_cache.bump(http_cache.UNAVAILABILITY, http_cache.unavailability_paths(doc.get("is_holiday", False)))
+    return {"message": "Removed"}
+
+
+# ── Recurring rules ──
+
+
+@router.get("/unavailable/rules", response_model=list[UnavailabilityRuleResponse])
+async def list_unavailability_rules():
+    """List recurring blocks/holidays."""
+    return [_rule_to_response(doc) for doc in await recurring.load_rules()]
+
+
+@router.post("/unavailable/rules", response_model=UnavailabilityRuleResponse)
+async def add_unavailability_rule(
+    data: UnavailabilityRuleCreate,
+    _admin: dict = Depends(require_admin),
+):
+    """Store a weekly recurring block or holiday as a single rule."""
+    db = get_db()
+
+    if not data.is_holiday:
+        _validate_time_block(data.start_time, data.end_time)
+    if data.until and data.until < data.start_date:
+        raise BadRequestError("until must not be before start_date")
+
+    doc = data.model_dump()
+    if data.is_holiday:
+        doc["start_time"] = doc["end_time"] = None
+
+    result = await db.unavailability_rules.insert_one(doc)
+    doc["_id"] = result.inserted_id
+    await invalidation.publish(recurring.RULES_TOPIC)
+    await slot_stream.publish_change()
+    # Recurring holidays show up in /holidays; blocks only affect slots
+    if data.is_holiday:
+        await http_cache.bump(http_cache.UNAVAILABILITY, http_cache.unavailability_paths())
+    return _rule_to_response(doc)
+
+
+@router.delete("/unavailable/rules/{rule_id}")
+async def remove_unavailability_rule(
+    rule_id: str,
+    _admin: dict = Depends(require_admin),
+):
+    """Remove a recurring rule (all future occurrences)."""
+    db = get_db()
+    result = await db.unavailability_rules.delete_one({"_id": ObjectId(rule_id)})
+    if result.deleted_count == 0:
+        raise NotFoundError("Unavailability rule not found")
+    await invalidation.publish(recurring.RULES_TOPIC)
+    await slot_stream.publish_change()
+    await http_cache.bump(http_cache.UNAVAILABILITY, http_cache.unavailability_paths())
     return {"message": "Removed"}
 
 
@@ -251,8 +603,11 @@ async def remove_unavailability(
 
 
 @router.get("/settings", response_model=BusinessHoursResponse)
-async def get_business_hours_settings():
+async def get_business_hours_settings(request: Request, response: Response):
     """Get business hours configuration (public)."""
+    not_modified = await http_cache.conditional(http_cache.BUSINESS_HOURS, request, response)
+    if not_modified:
+        return not_modified
     settings = await get_business_hours()
     return BusinessHoursResponse(
         timezone=settings.timezone,
@@ -273,6 +628,9 @@ async def update_business_hours_settings(
         "weekly_hours": [dh.model_dump() for dh in data.weekly_hours],
     }
     await db.settings.replace_one({"_id": "business_hours"}, doc, upsert=True)
+    await invalidation.publish(BUSINESS_HOURS_TOPIC)
+    await slot_stream.publish_change()
+    await http_cache.bump(http_cache.BUSINESS_HOURS, http_cache.business_hours_paths())
     return BusinessHoursResponse(
         timezone=data.timezone,
         weekly_hours=data.weekly_hours,
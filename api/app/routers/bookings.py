@@ -1,122 +1,118 @@
 from datetime import date, datetime, timedelta, timezone
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Response
 
+from app.config import settings
 from app.database import get_db
-from app.dependencies import get_current_user, require_admin
+from app.dependencies import get_current_user, rate_limit, require_admin
 from app.models.booking import (
     PENDING_EXPIRY_MINUTES,
+    BookingBulkStatusResponse,
+    BookingBulkStatusUpdate,
     BookingCreate,
     BookingInDB,
     BookingResponse,
+    BookingSearchResponse,
     BookingStatus,
     BookingStatusUpdate,
 )
+from app.services import (
+    activity,
+    booking_search,
+    day_schedule,
+    idempotency,
+    intervals,
+    recurring,
+    slot_stream,
+)
+from app.services.catalog import get_catalog
 from app.services.settings import get_business_hours
 from app.utils.exceptions import BadRequestError, ForbiddenError, NotFoundError
 
 router = APIRouter(prefix="/api/bookings", tags=["Bookings"])
 
-# Service pricing (INR in paise-friendly integers)
-SERVICE_PRICES = {
-    "call-consultation": {"30": 1999, "45": 2499, "60": 2999},
-    "video-consultation": {"30": 2499, "45": 2999, "60": 3999},
-    "premium-kundli": {"0": 4999},
-    "numerology-report": {"0": 1499},
-    "vastu-consultation": {"30": 2499, "45": 2999, "60": 3499},
-    "matchmaking": {"0": 2499},
-    "astrological-consulting": {"30": 2499, "45": 2999, "60": 3499},
-    "personal-growth-coaching": {"30": 3499, "45": 3999, "60": 4999},
-    "therapeutic-healing": {"45": 4499, "60": 4999, "75": 5999},
-    "test-payment": {"30": 100},
-}
-
-
-def get_price(service_slug: str, duration_minutes: int) -> int:
-    prices = SERVICE_PRICES.get(service_slug)
-    if not prices:
-        raise BadRequestError(f"Unknown service: {service_slug}")
-
-    price = prices.get(str(duration_minutes))
-    if price is None:
-        available = ", ".join(f"{k} min" for k in prices.keys() if k != "0")
-        if "0" in prices:
-            return prices["0"]
-        raise BadRequestError(
-            f"Duration {duration_minutes} min not available for this service. Options: {available}"
-        )
-    return price
-
-
-def _time_to_minutes(t: str) -> int:
-    h, m = t.split(":")
-    return int(h) * 60 + int(m)
-
 
 def _overlaps(s1: int, e1: int, s2: int, e2: int) -> bool:
     return s1 < e2 and s2 < e1
 
 
-@router.post("", response_model=BookingResponse)
-async def create_booking(data: BookingCreate):
+@router.post("", response_model=BookingResponse, dependencies=[rate_limit("bookings")])
+async def create_booking(
+    data: BookingCreate,
+    response: Response,
+    idempotency_key: str | None = Header(None, alias=idempotency.HEADER),
+):
+    """Create a pending booking.
+
+    Retries that send the same ``Idempotency-Key`` get the original booking
+    back instead of creating another one.
+    """
+    return await idempotency.run(
+        "bookings", idempotency_key, data.model_dump(), lambda: _create_booking(data), response
+    )
+
+
+async def _create_booking(data: BookingCreate) -> BookingResponse:
     db = get_db()
 
     # Validate price
-    price = get_price(data.service_slug, data.duration_minutes)
+    price = get_catalog().price(data.service_slug, data.duration_minutes)
 
     is_report = data.duration_minutes == 0
 
     # Scheduling checks only apply to consultation/session bookings, not reports
     if not is_report:
+        schedule = None
+        if settings.DAY_SCHEDULE_READS:
+            schedule = await day_schedule.load_day_schedule(data.date)
+            holiday = schedule.holiday
+        else:
+            holiday = await db.unavailability.find_one({"date": data.date, "is_holiday": True})
+        requested_date = date.fromisoformat(data.date)
+        rule_holiday, rule_blocks = await recurring.rules_for_date(requested_date)
         # Check if date is a holiday
-        holiday = await db.unavailability.find_one({"date": data.date, "is_holiday": True})
-        if holiday:
+        if holiday or rule_holiday:
             raise BadRequestError("This date is a holiday")
 
         # Calculate booking time range
-        booking_start = _time_to_minutes(data.time_slot)
+        booking_start = intervals.to_minutes(data.time_slot)
         booking_end = booking_start + max(data.duration_minutes, 30)
 
         # Check business hours for the day
         bh_settings = await get_business_hours()
-        requested_date = date.fromisoformat(data.date)
         day_of_week = requested_date.weekday()
 
         day_config = next((d for d in bh_settings.weekly_hours if d.day == day_of_week), None)
         if not day_config or not day_config.is_open:
             raise BadRequestError("Bookings are not available on this day")
 
-        bh_open = _time_to_minutes(day_config.open_time)
-        bh_close = _time_to_minutes(day_config.close_time)
+        bh_open = intervals.to_minutes(day_config.open_time)
+        bh_close = intervals.to_minutes(day_config.close_time)
         if booking_start < bh_open or booking_end > bh_close:
             raise BadRequestError(
                 f"Booking must be within business hours ({day_config.open_time} - {day_config.close_time})"
             )
 
-        # Check against unavailable periods
-        cursor = db.unavailability.find({"date": data.date, "is_holiday": False})
-        async for block in cursor:
-            if block.get("start_time") and block.get("end_time"):
-                block_start = _time_to_minutes(block["start_time"])
-                block_end = _time_to_minutes(block["end_time"])
-                if _overlaps(booking_start, booking_end, block_start, block_end):
-                    raise BadRequestError("This time slot is unavailable")
-
-        # Check against existing bookings (ignore expired pending bookings)
-        cutoff = datetime.now(timezone.utc) - timedelta(minutes=PENDING_EXPIRY_MINUTES)
-        existing_cursor = db.bookings.find({
-            "date": data.date,
-            "$or": [
-                {"status": "confirmed"},
-                {"status": "pending", "created_at": {"$gte": cutoff}},
-            ],
-        })
-        async for existing in existing_cursor:
-            ex_start = _time_to_minutes(existing["time_slot"])
-            ex_end = ex_start + existing.get("duration_minutes", 30)
-            if _overlaps(booking_start, booking_end, ex_start, ex_end):
+        # Check against recurring blocks
+        for block_start, block_end in rule_blocks:
+            if _overlaps(booking_start, booking_end, block_start, block_end):
+                raise BadRequestError("This time slot is unavailable")
+
+        if schedule is not None:
+            mask = day_schedule.interval_mask(booking_start, booking_end)
+            if schedule.blocked & mask:
+                raise BadRequestError("This time slot is unavailable")
+            if schedule.booked & mask:
                 raise BadRequestError("This time slot is already booked")
+        elif settings.INTERVAL_CONFLICT_CHECKS:
+            conflict = await intervals.find_conflict(data.date, booking_start, booking_end)
+            if conflict == "unavailable":
+                raise BadRequestError("This time slot is unavailable")
+            if conflict == "booked":
+                raise BadRequestError("This time slot is already booked")
+        else:
+            await _check_conflicts(db, data.date, booking_start, booking_end)
 
     booking = BookingInDB(
         user_name=data.user_name,
@@ -127,8 +123,11 @@ async def create_booking(data: BookingCreate):
         date=data.date,
         time_slot=data.time_slot,
         duration_minutes=data.duration_minutes,
+        **intervals.booking_fields(data.time_slot, data.duration_minutes),
         price_inr=price,
         notes=data.notes,
+        email_lc=booking_search.normalize_email(data.user_email),
+        phone_digits=booking_search.normalize_phone(data.user_phone),
         date_of_birth=data.date_of_birth,
         time_of_birth=data.time_of_birth,
         birth_time_unknown=data.birth_time_unknown,
@@ -140,9 +139,40 @@ async def create_booking(data: BookingCreate):
     result = await db.bookings.insert_one(booking.model_dump())
 
     doc = await db.bookings.find_one({"_id": result.inserted_id})
+    await day_schedule.booking_created(doc)
+    if not is_report:
+        await slot_stream.publish_change(doc["date"])
+    await activity.record(activity.BOOKING_CREATED, activity.booking_summary(doc))
     return _to_response(doc)
 
 
+async def _check_conflicts(db, date_str: str, booking_start: int, booking_end: int):
+    """Scan the date's blocks and live bookings for an overlap."""
+    # Check against unavailable periods
+    cursor = db.unavailability.find({"date": date_str, "is_holiday": False})
+    async for block in cursor:
+        if block.get("start_time") and block.get("end_time"):
+            block_start = intervals.to_minutes(block["start_time"])
+            block_end = intervals.to_minutes(block["end_time"])
+            if _overlaps(booking_start, booking_end, block_start, block_end):
+                raise BadRequestError("This time slot is unavailable")
+
+    # Check against existing bookings (ignore expired pending bookings)
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=PENDING_EXPIRY_MINUTES)
+    existing_cursor = db.bookings.find({
+        "date": date_str,
+        "$or": [
+            {"status": "confirmed"},
+            {"status": "pending", "created_at": {"$gte": cutoff}},
+        ],
+    })
+    async for existing in existing_cursor:
+        ex_start = intervals.to_minutes(existing["time_slot"])
+        ex_end = ex_start + existing.get("duration_minutes", 30)
+        if _overlaps(booking_start, booking_end, ex_start, ex_end):
+            raise BadRequestError("This time slot is already booked")
+
+
 @router.get("", response_model=list[BookingResponse])
 async def list_bookings(
     status: BookingStatus | None = None,
@@ -166,6 +196,28 @@ async def list_bookings(
     return results
 
 
+@router.get("/search", response_model=BookingSearchResponse)
+async def search_bookings(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    _admin: dict = Depends(require_admin),
+):
+    """Search by booking id, email or phone prefix, or name/service text.
+
+    Pass ``next_cursor`` back as ``cursor`` for the next page.
+    """
+    try:
+        mode, docs, next_cursor = await booking_search.search(q, limit, cursor)
+    except ValueError as e:
+        raise BadRequestError(str(e))
+    return BookingSearchResponse(
+        mode=mode,
+        items=[_to_response(doc) for doc in docs],
+        next_cursor=next_cursor,
+    )
+
+
 @router.get("/{booking_id}/resume", response_model=BookingResponse)
 async def resume_booking(booking_id: str):
     """Check if a pending booking is still valid for resumption (public)."""
@@ -220,6 +272,14 @@ async def cancel_booking(booking_id: str, current_user: dict = Depends(get_curre
         {"_id": ObjectId(booking_id)},
         {"$set": {"status": BookingStatus.CANCELLED}},
     )
+    await day_schedule.booking_status_changed(doc, doc["status"], BookingStatus.CANCELLED)
+    await slot_stream.publish_change(doc["date"])
+    await activity.record(activity.BOOKING_STATUS_CHANGED, {
+        **activity.booking_summary(doc),
+        "old_status": doc["status"],
+        "status": BookingStatus.CANCELLED.value,
+        "changed_by": current_user["email"],
+    })
 
     doc["status"] = BookingStatus.CANCELLED
     return _to_response(doc)
@@ -240,11 +300,65 @@ async def update_booking_status(
         {"_id": ObjectId(booking_id)},
         {"$set": {"status": data.status.value}},
     )
+    await day_schedule.booking_status_changed(doc, doc["status"], data.status.value)
+    await slot_stream.publish_change(doc["date"])
+    await activity.record(activity.BOOKING_STATUS_CHANGED, {
+        **activity.booking_summary(doc),
+        "old_status": doc["status"],
+        "status": data.status.value,
+        "changed_by": _admin["email"],
+    })
 
     doc["status"] = data.status.value
     return _to_response(doc)
 
 
+@router.patch("/status", response_model=BookingBulkStatusResponse)
+async def bulk_update_booking_status(
+    data: BookingBulkStatusUpdate,
+    _admin: dict = Depends(require_admin),
+):
+    """Set the status of every booking matching the filters in one update."""
+    db = get_db()
+
+    query: dict = {}
+    if data.booking_ids:
+        try:
+            query["_id"] = {"$in": [ObjectId(i) for i in data.booking_ids]}
+        except Exception:
+            raise BadRequestError("Invalid booking id")
+    if data.current_status:
+        query["status"] = data.current_status.value
+    if data.date_from or data.date_to:
+        query["date"] = {}
+        if data.date_from:
+            query["date"]["$gte"] = data.date_from
+        if data.date_to:
+            query["date"]["$lte"] = data.date_to
+
+    # Dates whose day_schedule must be rebuilt; past dates are never read
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    affected_dates = [d for d in await db.bookings.distinct("date", query) if d >= today]
+
+    result = await db.bookings.update_many(query, {"$set": {"status": data.status.value}})
+
+    for date_str in affected_dates:
+        await day_schedule.rebuild_day(date_str)
+        await slot_stream.publish_change(date_str)
+
+    await activity.record(activity.BOOKINGS_BULK_STATUS, {
+        "status": data.status.value,
+        "matched": result.matched_count,
+        "modified": result.modified_count,
+        "changed_by": _admin["email"],
+    })
+
+    return BookingBulkStatusResponse(
+        matched=result.matched_count,
+        modified=result.modified_count,
+    )
+
+
 def _to_response(doc: dict) -> BookingResponse:
     return BookingResponse(
         id=str(doc["_id"]),
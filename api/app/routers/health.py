@@ -0,0 +1,41 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services import health as health_state
+
+router = APIRouter(prefix="/api/health", tags=["Health"])
+
+
+@router.get("")
+async def health():
+    return {"status": "ok", "service": "VedicJivan API"}
+
+
+@router.get("/live")
+async def live():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/started")
+async def started():
+    """Startup: warm-up has finished once. Unlike /ready, no Mongo ping."""
+    if not health_state.is_ready():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming", "error": health_state.warmup_error()},
+        )
+    return {"status": "started"}
+
+
+@router.get("/ready")
+async def ready():
+    """Readiness: warm-up finished and Mongo answers a (cached) ping."""
+    if not health_state.is_ready():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming", "error": health_state.warmup_error()},
+        )
+    if not await health_state.ping_mongo():
+        return JSONResponse(status_code=503, content={"status": "unavailable"})
+    return {"status": "ready"}
@@ -1,7 +1,9 @@
-import stripe
+import logging
+
 from bson import ObjectId
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Header, Request, Response
 
+from app import tracing
 from app.config import settings
 from app.database import get_db
 from app.dependencies import require_admin
@@ -12,19 +14,35 @@ from app.models.payment import (
     PaymentResponse,
     PaymentStatus,
 )
+from app.services import activity, day_schedule, idempotency, resilience
 from app.services.email_service import (
     send_admin_booking_notification,
     send_booking_confirmation,
 )
+from app.services.stripe_client import get_stripe
 from app.utils.exceptions import BadRequestError, NotFoundError
 
-router = APIRouter(prefix="/api/payments", tags=["Payments"])
+logger = logging.getLogger(__name__)
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
+router = APIRouter(prefix="/api/payments", tags=["Payments"])
 
 
 @router.post("/create-checkout-session", response_model=dict)
-async def create_checkout_session(data: PaymentCreateCheckout):
+async def create_checkout_session(
+    data: PaymentCreateCheckout,
+    response: Response,
+    idempotency_key: str | None = Header(None, alias=idempotency.HEADER),
+):
+    return await idempotency.run(
+        "checkout",
+        idempotency_key,
+        data.model_dump(),
+        lambda: _create_checkout_session(data, idempotency_key),
+        response,
+    )
+
+
+async def _create_checkout_session(data: PaymentCreateCheckout, idempotency_key: str | None) -> dict:
     db = get_db()
 
     booking = await db.bookings.find_one({"_id": ObjectId(data.booking_id)})
@@ -42,34 +60,41 @@ async def create_checkout_session(data: PaymentCreateCheckout):
         else "Report booking"
     )
 
-    session = stripe.checkout.Session.create(
-        payment_method_types=["card"],
-        line_items=[
-            {
-                "price_data": {
-                    "currency": "inr",
-                    "product_data": {
-                        "name": booking["service_title"],
-                        "description": description,
+    stripe = get_stripe()
+    with tracing.span(
+        "stripe.checkout.sessions.create", tracing.CLIENT, {"peer.service": "stripe", "booking_id": data.booking_id}
+    ):
+        session = await resilience.get("stripe").call(
+            stripe.checkout.Session.create,
+            payment_method_types=["card"],
+            line_items=[
+                {
+                    "price_data": {
+                        "currency": "inr",
+                        "product_data": {
+                            "name": booking["service_title"],
+                            "description": description,
+                        },
+                        "unit_amount": amount_paise,
                     },
-                    "unit_amount": amount_paise,
-                },
-                "quantity": 1,
-            }
-        ],
-        mode="payment",
-        success_url=(
-            f"{settings.FRONTEND_URL}/booking-success/"
-            f"?session_id={{CHECKOUT_SESSION_ID}}&booking_id={data.booking_id}"
-        ),
-        cancel_url=(
-            f"{settings.FRONTEND_URL}/booking-cancelled/"
-            f"?booking_id={data.booking_id}"
-        ),
-        customer_email=booking["user_email"],
-        metadata={"booking_id": data.booking_id},
-        payment_intent_data={"metadata": {"booking_id": data.booking_id}},
-    )
+                    "quantity": 1,
+                }
+            ],
+            mode="payment",
+            success_url=(
+                f"{settings.FRONTEND_URL}/booking-success/"
+                f"?session_id={{CHECKOUT_SESSION_ID}}&booking_id={data.booking_id}"
+            ),
+            cancel_url=(
+                f"{settings.FRONTEND_URL}/booking-cancelled/"
+                f"?booking_id={data.booking_id}"
+            ),
+            customer_email=booking["user_email"],
+            metadata={"booking_id": data.booking_id},
+            payment_intent_data={"metadata": {"booking_id": data.booking_id}},
+            # Stripe de-duplicates too, in case our record was released mid-call
+            idempotency_key=f"checkout:{idempotency_key}" if idempotency_key else None,
+        )
 
     payment = PaymentInDB(
         booking_id=data.booking_id,
@@ -85,6 +110,7 @@ async def create_checkout_session(data: PaymentCreateCheckout):
 async def stripe_webhook(request: Request):
     body = await request.body()
     signature = request.headers.get("stripe-signature", "")
+    stripe = get_stripe()
 
     try:
         event = stripe.Webhook.construct_event(
@@ -116,10 +142,17 @@ async def stripe_webhook(request: Request):
 
         booking = await db.bookings.find_one({"_id": ObjectId(booking_id)})
         if booking:
+            await day_schedule.booking_status_changed(
+                booking, BookingStatus.PENDING, BookingStatus.CONFIRMED
+            )
             await db.availability.update_one(
                 {"date": booking["date"], "slots.start": booking["time_slot"]},
                 {"$set": {"slots.$.booked": True}},
             )
+            await activity.record(activity.PAYMENT_CAPTURED, {
+                **activity.booking_summary(booking),
+                "payment_intent_id": session.get("payment_intent"),
+            })
 
             try:
                 await send_booking_confirmation(
@@ -132,8 +165,8 @@ async def stripe_webhook(request: Request):
                     price_inr=booking["price_inr"],
                     booking_id=booking_id,
                 )
-            except Exception as e:
-                print(f"[EMAIL ERROR] Customer confirmation: {e}")
+            except Exception:
+                logger.exception("customer confirmation email failed", extra={"booking_id": booking_id})
 
             try:
                 await send_admin_booking_notification(
@@ -147,8 +180,8 @@ async def stripe_webhook(request: Request):
                     price_inr=booking["price_inr"],
                     booking_id=booking_id,
                 )
-            except Exception as e:
-                print(f"[EMAIL ERROR] Admin notification: {e}")
+            except Exception:
+                logger.exception("admin notification email failed", extra={"booking_id": booking_id})
 
     elif event["type"] == "checkout.session.expired":
         session = event["data"]["object"]
@@ -164,6 +197,10 @@ async def stripe_webhook(request: Request):
             {"stripe_payment_intent_id": payment_intent_id},
             {"$set": {"status": PaymentStatus.REFUNDED}},
         )
+        await activity.record(activity.PAYMENT_REFUNDED, {
+            "payment_intent_id": payment_intent_id,
+            "amount_refunded": charge.get("amount_refunded"),
+        })
 
     return {"status": "ok"}
 
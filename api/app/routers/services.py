@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, Request, Response
+
+from app.database import get_db
+from app.dependencies import require_admin
+from app.models.service import ServiceResponse, ServiceUpsert
+from app.services import http_cache, invalidation
+from app.services.catalog import CATALOG_TOPIC, get_catalog
+from app.utils.exceptions import NotFoundError
+
+router = APIRouter(prefix="/api/services", tags=["Services"])
+
+# Prices change rarely; let browsers/CDN reuse the list and refresh it in the background
+CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=86400"
+
+
+@router.get("", response_model=list[ServiceResponse])
+async def list_services(request: Request, response: Response):
+    """Active services with their prices (public)."""
+    catalog = get_catalog()
+    etag = f'"{catalog.etag}"'
+    if http_cache.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return [
+        ServiceResponse(
+            slug=s.slug,
+            title=s.title,
+            prices={str(d): p for d, p in s.prices.items()},
+            durations=list(s.durations),
+            is_report=s.is_report,
+        )
+        for s in catalog
+    ]
+
+
+@router.put("/{slug}")
+async def upsert_service(
+    slug: str,
+    data: ServiceUpsert,
+    _admin: dict = Depends(require_admin),
+):
+    """Create or update a service; every worker reloads its catalog."""
+    db = get_db()
+    await db.services.update_one({"_id": slug}, {"$set": data.model_dump()}, upsert=True)
+    await invalidation.publish(CATALOG_TOPIC)
+    return {"slug": slug, **data.model_dump()}
+
+
+@router.delete("/{slug}")
+async def deactivate_service(slug: str, _admin: dict = Depends(require_admin)):
+    """Hide a service from the catalog (past bookings keep their slug)."""
+    db = get_db()
+    result = await db.services.update_one({"_id": slug}, {"$set": {"active": False}})
+    if result.matched_count == 0:
+        raise NotFoundError("Service not found")
+    await invalidation.publish(CATALOG_TOPIC)
+    return {"message": "Deactivated"}
@@ -0,0 +1,230 @@
+"""Admin activity feed.
+
+Booking and payment writes call ``record()``. This appends an event to the
+capped ``db.activity_events`` collection and publishes ``ACTIVITY_TOPIC``
+on the invalidation bus::
+
+    {"_id": ObjectId, "type": "booking_created", "data": {...}, "created_at": ...}
+
+Each worker keeps one ``ActivityHub``. On a bus notification it fetches the
+events newer than the last one it has seen (one query per worker) and puts
+them on every connected admin's queue. A reconnecting client sends its last
+event id as ``Last-Event-ID`` and ``catch_up()`` replays what it missed. The
+replay is limited to ``CATCHUP_SECONDS`` and ``CATCHUP_LIMIT`` events. If
+the gap is larger, the client is told to reload instead.
+
+"Newer" means inserted later. ObjectIds minted by different workers in the
+same second do not sort in insertion order, so both paths read the capped
+collection backwards in natural order and stop at the last seen event.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import CollectionInvalid
+
+from app.database import get_db
+from app.services import invalidation
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_TOPIC = "activity"
+CAPPED_SIZE_BYTES = 4 * 1024 * 1024
+CATCHUP_SECONDS = 3600
+CATCHUP_LIMIT = 500
+QUEUE_SIZE = 200
+
+BOOKING_CREATED = "booking_created"
+BOOKING_STATUS_CHANGED = "booking_status_changed"
+BOOKINGS_BULK_STATUS = "bookings_bulk_status"
+PAYMENT_CAPTURED = "payment_captured"
+PAYMENT_REFUNDED = "payment_refunded"
+
+# Queued instead of an event when a subscriber fell too far behind
+RESET = None
+
+_collection_ready = False
+
+
+async def _ensure_collection(db):
+    global _collection_ready
+    if not _collection_ready:
+        try:
+            await db.create_collection("activity_events", capped=True, size=CAPPED_SIZE_BYTES)
+        except CollectionInvalid:
+            pass
+        _collection_ready = True
+
+
+async def record(event_type: str, data: dict):
+    """Append an activity event and notify every worker.
+
+    Failures are logged, not raised: the feed must never fail the write.
+    """
+    db = get_db()
+    try:
+        await _ensure_collection(db)
+        await db.activity_events.insert_one({
+            "type": event_type,
+            "data": data,
+            "created_at": datetime.now(timezone.utc),
+        })
+        await invalidation.publish(ACTIVITY_TOPIC)
+    except Exception:
+        logger.exception("activity record failed", extra={"event_type": event_type})
+
+
+def booking_summary(doc: dict) -> dict:
+    return {
+        "booking_id": str(doc["_id"]),
+        "user_name": doc.get("user_name"),
+        "service_title": doc.get("service_title"),
+        "date": doc.get("date"),
+        "time_slot": doc.get("time_slot"),
+        "price_inr": doc.get("price_inr"),
+        "status": doc.get("status"),
+    }
+
+
+def to_message(doc: dict) -> dict:
+    return {
+        "id": str(doc["_id"]),
+        "type": doc["type"],
+        "data": doc.get("data", {}),
+        "created_at": doc["created_at"].isoformat(),
+    }
+
+
+async def _newest_id(db) -> ObjectId | None:
+    doc = await db.activity_events.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+    return doc["_id"] if doc else None
+
+
+async def _inserted_after(db, last_id: ObjectId | None) -> list[dict] | None:
+    """Events inserted after ``last_id``, oldest first.
+
+    ``None`` if ``last_id`` is not among the newest ``CATCHUP_LIMIT + 1``
+    events. With ``last_id=None`` every event is newer.
+    """
+    newer, found = [], last_id is None
+    cursor = db.activity_events.find({}).sort("$natural", -1).limit(CATCHUP_LIMIT + 1)
+    async for doc in cursor:
+        if doc["_id"] == last_id:
+            found = True
+            break
+        newer.append(doc)
+    if not found or len(newer) > CATCHUP_LIMIT:
+        return None
+    newer.reverse()
+    return newer
+
+
+async def catch_up(last_event_id: str, now: datetime | None = None) -> list[dict] | None:
+    """Events after ``last_event_id``, or ``None`` if the gap is too large."""
+    try:
+        last_id = ObjectId(last_event_id)
+    except (InvalidId, TypeError):
+        return None
+    now = now or datetime.now(timezone.utc)
+    if last_id.generation_time < now - timedelta(seconds=CATCHUP_SECONDS):
+        return None
+
+    docs = await _inserted_after(get_db(), last_id)
+    if docs is None:
+        return None
+    return [to_message(doc) for doc in docs]
+
+
+class ActivityHub:
+    def __init__(self):
+        self._subscribers: set[asyncio.Queue] = set()
+        self._last_id: ObjectId | None = None
+        self._pending = False
+        self._fetcher: asyncio.Task | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        if not self._subscribers:
+            # Events before the first subscriber are only served by catch_up()
+            newest = await _newest_id(get_db())
+            if not self._subscribers:
+                self._last_id = newest
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def notify(self, _key: str | None = None):
+        if not self._subscribers:
+            return
+        self._pending = True
+        if self._fetcher is None or self._fetcher.done():
+            self._fetcher = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self):
+        while self._pending:
+            self._pending = False
+            await self.fetch()
+
+    async def fetch(self):
+        """Load events newer than the last seen one and fan them out.
+
+        If the last seen event is no longer among the newest
+        ``CATCHUP_LIMIT + 1``, subscribers get ``RESET`` and the hub moves
+        on from the newest event.
+        """
+        db = get_db()
+        try:
+            docs = await _inserted_after(db, self._last_id)
+            newest = await _newest_id(db) if docs is None else None
+        except Exception:
+            logger.exception("activity fetch failed")
+            return
+        if docs is None:
+            self._last_id = newest
+            self._fan_out(RESET)
+            return
+        for doc in docs:
+            self._last_id = doc["_id"]
+            self._fan_out(to_message(doc))
+
+    def _fan_out(self, message: dict | None):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESET)
+
+
+_hub: ActivityHub | None = None
+
+
+def get_hub() -> ActivityHub:
+    global _hub
+    if _hub is None:
+        _hub = ActivityHub()
+    return _hub
+
+
+def _on_activity(key: str | None):
+    if _hub is not None:
+        _hub.notify(key)
+
+
+invalidation.subscribe(ACTIVITY_TOPIC, _on_activity)
+
+
+def reset():
+    global _hub, _collection_ready
+    _hub = None
+    _collection_ready = False
@@ -0,0 +1,211 @@
+"""Ashtakoota (guna milan) compatibility scoring.
+
+The eight kootas depend only on the Moon's nakshatra and rashi of the
+groom and the bride. Both follow from the Moon's pada (108 padas of
+3°20'; a nakshatra has 4 and a rashi 9), so every possible pairing is
+scored once at import into ``KOOTA_TABLE[koota, groom_pada, bride_pada]``
+by broadcasting the per-koota lookup tables over a 108 x 108 grid.
+Scoring a profile against any number of candidates is then a single
+fancy-indexing operation.
+
+Totals are the classical 36-point guna count. Dosha cancellations
+(e.g. Nadi dosha exceptions for the same rashi lord) are left to the
+astrologer; ``nadi_dosha`` and ``bhakoot_dosha`` are flagged instead.
+"""
+
+import numpy as np
+from bson import ObjectId
+
+from app.database import get_db
+from app.models.matchmaking import MatchRole
+from app.services import kundli
+
+KOOTAS = ("varna", "vashya", "tara", "yoni", "graha_maitri", "gana", "bhakoot", "nadi")
+MAX_POINTS = np.array([1, 2, 3, 4, 5, 6, 7, 8], dtype=np.float32)
+PADAS = 108
+
+# ── Per-rashi attributes (Mesha .. Meena) ──
+
+# Brahmin 3, Kshatriya 2, Vaishya 1, Shudra 0
+VARNA = np.array([2, 1, 0, 3, 2, 1, 0, 3, 2, 1, 0, 3])
+# Chatushpada 0, Manava 1, Jalachara 2, Vanachara 3, Keeta 4 (by whole sign)
+VASHYA = np.array([0, 0, 1, 2, 3, 1, 1, 4, 1, 2, 1, 2])
+VASHYA_POINTS = np.array([
+    [2, 1, 1, 0.5, 1],
+    [1, 2, 0.5, 0, 1],
+    [1, 0.5, 2, 1, 1],
+    [0.5, 0, 1, 2, 0],
+    [1, 1, 1, 0, 2],
+])
+# Rashi lords: Sun 0, Moon 1, Mars 2, Mercury 3, Jupiter 4, Venus 5, Saturn 6
+LORD = np.array([2, 5, 3, 1, 0, 3, 5, 2, 4, 6, 6, 4])
+# Natural relationship of row planet towards column planet: friend 2, neutral 1, enemy 0
+RELATION = np.array([
+    [2, 2, 2, 1, 2, 0, 0],
+    [2, 2, 1, 2, 1, 1, 1],
+    [2, 2, 2, 0, 2, 1, 1],
+    [2, 0, 1, 2, 1, 2, 1],
+    [2, 2, 2, 0, 2, 0, 1],
+    [0, 0, 1, 2, 1, 2, 2],
+    [0, 0, 0, 2, 1, 2, 2],
+])
+# Points by the pair of relationships (either order): both enemy .. both friend
+MAITRI_POINTS = np.array([
+    [0, 0.5, 1],
+    [0.5, 3, 4],
+    [1, 4, 5],
+])
+
+# ── Per-nakshatra attributes (Ashwini .. Revati) ──
+
+# Horse, Elephant, Sheep, Serpent, Dog, Cat, Rat, Cow, Buffalo, Tiger, Deer, Monkey, Mongoose, Lion
+YONI = np.array([0, 1, 2, 3, 3, 4, 5, 2, 5, 6, 6, 7, 8, 9, 8, 9, 10, 10, 4, 11, 12, 11, 13, 0, 13, 7, 1])
+YONI_POINTS = np.array([
+    [4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1],
+    [2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0],
+    [2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1],
+    [3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2],
+    [2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1],
+    [2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1],
+    [2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2],
+    [1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1],
+    [0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1],
+    [1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1],
+    [3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1],
+    [3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2],
+    [2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2],
+    [1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4],
+])
+# Deva 0, Manushya 1, Rakshasa 2
+GANA = np.array([0, 1, 2, 1, 0, 1, 0, 0, 2, 2, 1, 1, 0, 2, 0, 2, 0, 2, 2, 1, 1, 0, 2, 2, 1, 1, 0])
+# Groom's gana (rows) against the bride's (columns)
+GANA_POINTS = np.array([
+    [6, 6, 1],
+    [5, 6, 0],
+    [1, 0, 6],
+])
+# Adi 0, Madhya 1, Antya 2: repeats every six nakshatras
+NADI = np.array([0, 1, 2, 2, 1, 0])[np.arange(27) % 6]
+# Tara counts whose remainder (mod 9) is inauspicious: Vipat, Pratyak, Vadha
+BAD_TARA = np.array([3, 5, 7])
+# Rashi distances (1-based, one way) of the 2/12, 5/9 and 6/8 axes
+BAD_BHAKOOT = np.array([2, 12, 5, 9, 6, 8])
+
+
+def _build_table() -> np.ndarray:
+    pada = np.arange(PADAS)
+    nak, rashi = pada // 4, pada // 9
+    g_nak, b_nak = nak[:, None], nak[None, :]
+    g_rashi, b_rashi = rashi[:, None], rashi[None, :]
+
+    varna = (VARNA[g_rashi] >= VARNA[b_rashi]).astype(float)
+    vashya = VASHYA_POINTS[VASHYA[g_rashi], VASHYA[b_rashi]]
+
+    # Count from the bride's nakshatra to the groom's, and back
+    to_groom = ((g_nak - b_nak) % 27 + 1) % 9
+    to_bride = ((b_nak - g_nak) % 27 + 1) % 9
+    tara = 1.5 * (~np.isin(to_groom, BAD_TARA)) + 1.5 * (~np.isin(to_bride, BAD_TARA))
+
+    yoni = YONI_POINTS[YONI[g_nak], YONI[b_nak]]
+    g_lord, b_lord = LORD[g_rashi], LORD[b_rashi]
+    maitri = np.where(
+        g_lord == b_lord,
+        5.0,
+        MAITRI_POINTS[RELATION[g_lord, b_lord], RELATION[b_lord, g_lord]],
+    )
+    gana = GANA_POINTS[GANA[g_nak], GANA[b_nak]]
+    distance = (g_rashi - b_rashi) % 12 + 1
+    bhakoot = 7.0 * ~np.isin(distance, BAD_BHAKOOT)
+    nadi = 8.0 * (NADI[g_nak] != NADI[b_nak])
+
+    grids = [varna, vashya, tara, yoni, maitri, gana, bhakoot, nadi]
+    return np.stack([np.broadcast_to(g, (PADAS, PADAS)) for g in grids]).astype(np.float32)
+
+
+KOOTA_TABLE = _build_table()
+TOTAL_TABLE = KOOTA_TABLE.sum(axis=0)
+
+
+def moon_pada(sidereal_longitude) -> np.ndarray:
+    return (np.asarray(sidereal_longitude) // kundli.PADA_SPAN).astype(int) % PADAS
+
+
+def score(profile_pada: int, candidate_padas, role: MatchRole) -> np.ndarray:
+    """Koota points, shape ``(len(candidate_padas), 8)``, for one profile vs many."""
+    candidates = np.asarray(candidate_padas, dtype=int)
+    if role == MatchRole.GROOM:
+        return KOOTA_TABLE[:, profile_pada, candidates].T
+    return KOOTA_TABLE[:, candidates, profile_pada].T
+
+
+def _moon(chart: dict) -> dict:
+    moon = chart["planets"]["moon"]
+    return {"moon_rashi": moon["sign"], "moon_nakshatra": moon["nakshatra"], "moon_pada": moon["pada"]}
+
+
+async def score_bookings(booking_id: str, role: MatchRole, candidate_ids: list[str], min_score: float = 0) -> dict:
+    """Score a booking's birth details against candidate bookings, best first.
+
+    Returns ``None`` when the profile booking does not exist. Candidates
+    that do not exist or lack usable birth details are listed separately.
+    """
+    ids = list(dict.fromkeys([booking_id, *candidate_ids]))
+    object_ids = [ObjectId(i) for i in ids if ObjectId.is_valid(i)]
+    projection = {
+        "user_name": 1, "date_of_birth": 1, "time_of_birth": 1, "birth_time_unknown": 1,
+        "birth_latitude": 1, "birth_longitude": 1,
+    }
+    bookings = {
+        str(doc["_id"]): doc
+        async for doc in get_db().bookings.find({"_id": {"$in": object_ids}}, projection)
+    }
+    if booking_id not in bookings:
+        return None
+
+    inputs, usable, invalid = [], [], []
+    for i in ids:
+        if i not in bookings:
+            continue
+        try:
+            inputs.append(kundli.birth_input(bookings[i]))
+            usable.append(i)
+        except (ValueError, TypeError):
+            invalid.append(i)
+    if booking_id not in usable:
+        raise ValueError("The profile booking has no usable birth details")
+
+    charts = dict(zip(usable, await kundli.charts_for(inputs)))
+    candidates = usable[1:]
+    padas = moon_pada([charts[i]["planets"]["moon"]["longitude"] for i in usable])
+    points = score(int(padas[0]), padas[1:], role)
+    totals = points.sum(axis=1)
+    order = np.argsort(-totals, kind="stable")
+
+    matches = []
+    for row in order:
+        if totals[row] < min_score:
+            break
+        kootas = dict(zip(KOOTAS, points[row].tolist()))
+        candidate = candidates[row]
+        matches.append({
+            "booking_id": candidate,
+            "user_name": bookings[candidate].get("user_name", ""),
+            **_moon(charts[candidate]),
+            "score": float(totals[row]),
+            "kootas": kootas,
+            "nadi_dosha": kootas["nadi"] == 0,
+            "bhakoot_dosha": kootas["bhakoot"] == 0,
+            "birth_time_unknown": charts[candidate]["birth"]["birth_time_unknown"],
+        })
+    return {
+        "profile": {
+            "booking_id": booking_id,
+            "role": role.value,
+            "user_name": bookings[booking_id].get("user_name", ""),
+            **_moon(charts[booking_id]),
+        },
+        "max_score": float(MAX_POINTS.sum()),
+        "matches": matches,
+        "invalid": invalid,
+        "missing": [i for i in candidate_ids if i not in bookings],
+    }
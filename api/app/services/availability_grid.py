@@ -0,0 +1,67 @@
+"""Vectorized minute-grid availability for multi-day ranges.
+
+A range of days is represented as a ``days x 1440`` boolean matrix where a
+cell is True when that minute is busy (blocked or booked). Free-slot counts
+for every day are then derived in a single NumPy pass instead of
+re-running the per-day slot loop once per date.
+"""
+
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def busy_matrix(num_days: int, intervals: list[tuple[int, int, int]]) -> np.ndarray:
+    """Build the busy grid from ``(day_index, start_min, end_min)`` intervals.
+
+    Intervals are half-open and clipped to the day; empty ones are ignored.
+    """
+    diff = np.zeros((num_days, MINUTES_PER_DAY + 1), dtype=np.int32)
+    if intervals:
+        arr = np.asarray(intervals, dtype=np.int64).reshape(-1, 3)
+        days = arr[:, 0]
+        starts = np.clip(arr[:, 1], 0, MINUTES_PER_DAY)
+        ends = np.clip(arr[:, 2], 0, MINUTES_PER_DAY)
+        keep = starts < ends
+        np.add.at(diff, (days[keep], starts[keep]), 1)
+        np.add.at(diff, (days[keep], ends[keep]), -1)
+    return np.cumsum(diff, axis=1)[:, :MINUTES_PER_DAY] > 0
+
+
+def free_slot_counts(
+    busy: np.ndarray,
+    open_min,
+    close_min,
+    slot_minutes: int,
+    not_before=None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Count total and free slots per day.
+
+    Slots start at ``open_min`` and step by ``slot_minutes`` while they end by
+    ``close_min``. A slot is free when none of its minutes are busy and its
+    start is strictly after ``not_before`` (use -1 to keep every slot).
+    Days with ``close_min <= open_min`` have no slots. The per-day inputs
+    may be lists or arrays.
+
+    Returns ``(total, free)`` integer arrays, one entry per day.
+    """
+    num_days = busy.shape[0]
+    open_min = np.asarray(open_min)
+    close_min = np.asarray(close_min)
+    not_before = np.full(num_days, -1) if not_before is None else np.asarray(not_before)
+
+    # busy_in_window[d, m] is True when [m, m + slot_minutes) touches a busy minute
+    prefix = np.zeros((num_days, MINUTES_PER_DAY + 1), dtype=np.int32)
+    np.cumsum(busy, axis=1, out=prefix[:, 1:])
+    busy_in_window = (prefix[:, slot_minutes:] - prefix[:, :-slot_minutes]) > 0
+
+    starts = np.arange(MINUTES_PER_DAY - slot_minutes + 1)[None, :]
+    open_col = open_min[:, None]
+    is_slot = (
+        (starts >= open_col)
+        & (starts + slot_minutes <= close_min[:, None])
+        & ((starts - open_col) % slot_minutes == 0)
+    )
+    is_free = is_slot & ~busy_in_window & (starts > not_before[:, None])
+
+    return is_slot.sum(axis=1), is_free.sum(axis=1)
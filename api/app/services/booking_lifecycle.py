@@ -0,0 +1,78 @@
+"""Automatic booking status transitions.
+
+Confirmed sessions whose end time has passed are moved to ``completed`` by
+one ``update_many`` per scheduler run, backed by the ``(status, date)``
+index. This keeps the confirmed set that availability queries scan limited
+to sessions that can still take place. Report bookings (``duration_minutes == 0``) are
+delivered offline and are left for an admin to complete. Completed sessions
+leave the ``day_schedule`` booked bitmap, so today's entry is rebuilt when
+one of today's sessions was completed; past dates are never read.
+"""
+
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from app.database import get_db
+from app.models.booking import BookingStatus
+from app.services import day_schedule
+from app.services.settings import get_business_hours
+
+STATUS_DATE_INDEX = [("status", 1), ("date", 1)]
+
+# Session end in minutes since midnight: HH * 60 + MM + duration
+_END_MINUTES = {
+    "$add": [
+        {"$multiply": [{"$toInt": {"$substrCP": ["$time_slot", 0, 2]}}, 60]},
+        {"$toInt": {"$substrCP": ["$time_slot", 3, 2]}},
+        {"$ifNull": ["$duration_minutes", 30]},
+    ]
+}
+
+_indexed = False
+
+
+async def _ensure_indexes(db):
+    global _indexed
+    if not _indexed:
+        await db.bookings.create_index(STATUS_DATE_INDEX)
+        _indexed = True
+
+
+def past_sessions_query(now_local: datetime) -> dict:
+    """Confirmed sessions that ended before ``now_local`` (business timezone)."""
+    today = now_local.strftime("%Y-%m-%d")
+    now_min = now_local.hour * 60 + now_local.minute
+    return {
+        "status": BookingStatus.CONFIRMED.value,
+        "duration_minutes": {"$gt": 0},
+        "$or": [
+            {"date": {"$lt": today}},
+            {"date": today, "$expr": {"$lte": [_END_MINUTES, now_min]}},
+        ],
+    }
+
+
+async def complete_past_bookings(now: datetime | None = None) -> int:
+    """Mark past confirmed sessions completed; returns the number updated."""
+    db = get_db()
+    await _ensure_indexes(db)
+
+    now = now or datetime.now(timezone.utc)
+    bh_settings = await get_business_hours()
+    now_local = now.astimezone(ZoneInfo(bh_settings.timezone))
+
+    query = past_sessions_query(now_local)
+    today = now_local.strftime("%Y-%m-%d")
+    ends_today = await db.bookings.find_one({**query, "date": today}, {"_id": 1})
+    result = await db.bookings.update_many(
+        query,
+        {"$set": {"status": BookingStatus.COMPLETED.value, "completed_at": now}},
+    )
+    if ends_today:
+        await day_schedule.rebuild_day(today)
+    return result.modified_count
+
+
+def reset():
+    global _indexed
+    _indexed = False
@@ -0,0 +1,208 @@
+"""Index-backed admin search over bookings.
+
+A query is routed to exactly one index:
+
+* a 24-hex booking id  -> ``_id`` point lookup
+* contains ``@``       -> prefix match on ``email_lc`` (lower-cased email)
+* 4+ digits, no letters -> prefix match on ``phone_digits`` (national number)
+* anything else        -> ``$text`` over user name and service, ordered
+                          by relevance
+
+Phones are stored and searched as the national number: "+91 98765 43210",
+"0091 9876543210", "09876543210" and "9876543210" all index as
+"9876543210", and the query "+91 98765" searches "98765".
+
+Anchored, case-sensitive prefix regexes on the normalized fields are
+index range scans. Results are paged with keyset cursors rather than
+``skip``, so deep pages cost the same as the first one. Prefix results are
+keyed by ``(created_at, _id)`` descending, and text results by
+``(score, _id)``.
+"""
+
+import base64
+import json
+import re
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT
+
+from app.database import get_db
+
+MIN_PHONE_DIGITS = 4
+COUNTRY_CODE = "91"
+
+# Applied to the digits of a phone number (or query). Written for both
+# ``re`` and the server's PCRE so the backfill pipeline matches Python.
+# International ("+" or "00"): drop the 00 prefix and our country code.
+_INTERNATIONAL = rf"^0*(?:{COUNTRY_CODE})?(\d*)$"
+# National: drop a trunk 0, or keep the last 10 digits of a longer number
+_NATIONAL = r"^(?:0|\d*?)(\d{0,10})$"
+
+INDEXES = [
+    ([("email_lc", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+    ([("phone_digits", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+    (
+        [("user_name", TEXT), ("service_title", TEXT), ("service_slug", TEXT)],
+        {"weights": {"user_name": 5, "service_title": 2, "service_slug": 1}, "name": "booking_text"},
+    ),
+]
+
+_indexed = False
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def normalize_phone(phone: str) -> str:
+    phone = phone.strip()
+    digits = re.sub(r"\D", "", phone)
+    international = phone.startswith("+") or digits.startswith("00")
+    return re.search(_INTERNATIONAL if international else _NATIONAL, digits).group(1)
+
+
+async def ensure_indexes(db):
+    global _indexed
+    if not _indexed:
+        for keys, options in INDEXES:
+            await db.bookings.create_index(keys, **options)
+        _indexed = True
+
+
+async def backfill_normalized_fields() -> int:
+    """Populate ``email_lc``/``phone_digits`` on bookings missing them.
+
+    Also rewrites ``phone_digits`` stored before country codes and trunk
+    zeros were stripped (a leading 0 or 11+ digits).
+    """
+    db = get_db()
+    await ensure_indexes(db)
+    phone = {"$trim": {"input": {"$ifNull": ["$user_phone", ""]}}}
+    digits = {
+        "$reduce": {
+            "input": {"$regexFindAll": {"input": phone, "regex": "[0-9]"}},
+            "initialValue": "",
+            "in": {"$concat": ["$$value", "$$this.match"]},
+        }
+    }
+    international = {"$or": [
+        {"$eq": [{"$substrCP": ["$$phone", 0, 1]}, "+"]},
+        {"$eq": [{"$substrCP": ["$$digits", 0, 2]}, "00"]},
+    ]}
+    national = {"$let": {
+        "vars": {"phone": phone, "digits": digits},
+        "in": {"$let": {
+            "vars": {"found": {"$arrayElemAt": [
+                {"$regexFindAll": {
+                    "input": "$$digits",
+                    "regex": {"$cond": [international, _INTERNATIONAL, _NATIONAL]},
+                }},
+                0,
+            ]}},
+            "in": {"$arrayElemAt": ["$$found.captures", 0]},
+        }},
+    }}
+    result = await db.bookings.update_many(
+        {"$or": [
+            {"email_lc": {"$exists": False}},
+            {"phone_digits": {"$exists": False}},
+            {"phone_digits": {"$regex": r"^(0|\d{11})"}},
+        ]},
+        [{"$set": {
+            "email_lc": {"$toLower": {"$trim": {"input": {"$ifNull": ["$user_email", ""]}}}},
+            "phone_digits": national,
+        }}],
+    )
+    return result.modified_count
+
+
+# ── Cursors ──
+
+
+def encode_cursor(values: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        values["id"] = ObjectId(values["id"])
+        return values
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def classify(q: str) -> str:
+    if ObjectId.is_valid(q):
+        return "id"
+    if "@" in q:
+        return "email"
+    if len(re.sub(r"\D", "", q)) >= MIN_PHONE_DIGITS and not re.search(r"[A-Za-z]", q):
+        return "phone"
+    return "text"
+
+
+def _created_keyset(values: dict) -> dict:
+    created_at = datetime.fromisoformat(values["t"])
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": values["id"]}},
+    ]}
+
+
+async def search(q: str, limit: int, cursor: str | None = None) -> tuple[str, list[dict], str | None]:
+    """Return ``(mode, docs, next_cursor)`` for one page of results."""
+    db = get_db()
+    await ensure_indexes(db)
+    q = q.strip()
+    mode = classify(q)
+    after = decode_cursor(cursor) if cursor else None
+
+    if mode == "id":
+        doc = await db.bookings.find_one({"_id": ObjectId(q)})
+        return mode, [doc] if doc and not after else [], None
+
+    if mode == "text":
+        pipeline: list[dict] = [
+            {"$match": {"$text": {"$search": q}}},
+            {"$addFields": {"_score": {"$meta": "textScore"}}},
+        ]
+        if after:
+            pipeline.append({"$match": {"$or": [
+                {"_score": {"$lt": after["s"]}},
+                {"_score": after["s"], "_id": {"$lt": after["id"]}},
+            ]}})
+        pipeline += [{"$sort": {"_score": -1, "_id": -1}}, {"$limit": limit + 1}]
+        docs = [doc async for doc in db.bookings.aggregate(pipeline)]
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            last = docs[-1]
+            next_cursor = encode_cursor({"s": last["_score"], "id": str(last["_id"])})
+        return mode, docs, next_cursor
+
+    if mode == "email":
+        query: dict = {"email_lc": {"$regex": "^" + re.escape(normalize_email(q))}}
+    else:
+        national = normalize_phone(q)
+        if not national:
+            # Only prefixes ("0000", "+91"): "^" would match every booking
+            return mode, [], None
+        query = {"phone_digits": {"$regex": "^" + national}}
+    if after:
+        query = {"$and": [query, _created_keyset(after)]}
+
+    results = db.bookings.find(query).sort([("created_at", -1), ("_id", -1)]).limit(limit + 1)
+    docs = [doc async for doc in results]
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor({"t": last["created_at"].isoformat(), "id": str(last["_id"])})
+    return mode, docs, next_cursor
+
+
+def reset():
+    global _indexed
+    _indexed = False
@@ -0,0 +1,170 @@
+"""Service catalog (``db.services``) with an immutable in-memory snapshot.
+
+Each document holds a service's title and its price per duration::
+
+    {"_id": "call-consultation", "title": "Call Consultation",
+     "prices": {"30": 1999, "45": 2499, "60": 2999}, "active": True, "sort_order": 0}
+
+``get_catalog()`` returns the current ``Catalog``, a read-only snapshot
+with precomputed lookups and error messages, so pricing a booking is a
+dict lookup. ``reload()`` builds a new snapshot and swaps it in. It runs
+during warm-up, whenever ``CATALOG_TOPIC`` arrives on the invalidation bus,
+and after any admin write. Readers never see a half-built catalog.
+
+An empty collection is seeded with ``DEFAULT_SERVICES``.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+from pymongo import UpdateOne
+
+from app.database import get_db
+from app.services import invalidation
+from app.utils.exceptions import BadRequestError
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TOPIC = "services"
+
+# Seed data (INR) for a fresh database; "0" marks a report with one price
+DEFAULT_SERVICES = [
+    ("call-consultation", "Call Consultation", {"30": 1999, "45": 2499, "60": 2999}),
+    ("video-consultation", "Video Consultation", {"30": 2499, "45": 2999, "60": 3999}),
+    ("premium-kundli", "Premium Kundli Report", {"0": 4999}),
+    ("numerology-report", "Numerology Report", {"0": 1499}),
+    ("vastu-consultation", "Vastu Consultation", {"30": 2499, "45": 2999, "60": 3499}),
+    ("matchmaking", "Kundli Matching", {"0": 2499}),
+    ("astrological-consulting", "Astrological Consulting", {"30": 2499, "45": 2999, "60": 3499}),
+    ("personal-growth-coaching", "Personal Growth Coaching", {"30": 3499, "45": 3999, "60": 4999}),
+    ("therapeutic-healing", "Therapeutic Healing", {"45": 4499, "60": 4999, "75": 5999}),
+    ("test-payment", "Test Payment", {"30": 100}),
+]
+
+
+class Service(NamedTuple):
+    slug: str
+    title: str
+    prices: Mapping[int, int]
+    durations: tuple[int, ...]
+    report_price: int | None
+    duration_error: str
+
+    @property
+    def is_report(self) -> bool:
+        return self.report_price is not None
+
+
+def _build_service(slug: str, title: str, prices: dict[str, int]) -> Service:
+    by_duration = {int(k): v for k, v in prices.items()}
+    durations = tuple(sorted(d for d in by_duration if d))
+    options = ", ".join(f"{d} min" for d in durations)
+    return Service(
+        slug=slug,
+        title=title,
+        prices=MappingProxyType(by_duration),
+        durations=durations,
+        report_price=by_duration.get(0),
+        duration_error=f"not available for this service. Options: {options}",
+    )
+
+
+class Catalog:
+    """Immutable snapshot of the active services, in display order."""
+
+    __slots__ = ("_services", "etag")
+
+    def __init__(self, services: list[Service]):
+        self._services = MappingProxyType({s.slug: s for s in services})
+        payload = json.dumps(
+            [(s.slug, s.title, sorted(s.prices.items())) for s in services]
+        ).encode()
+        self.etag = hashlib.sha1(payload).hexdigest()[:16]
+
+    def __iter__(self):
+        return iter(self._services.values())
+
+    def __len__(self):
+        return len(self._services)
+
+    def get(self, slug: str) -> Service | None:
+        return self._services.get(slug)
+
+    def price(self, slug: str, duration_minutes: int) -> int:
+        service = self._services.get(slug)
+        if service is None:
+            raise BadRequestError(f"Unknown service: {slug}")
+        price = service.prices.get(duration_minutes)
+        if price is not None:
+            return price
+        if service.report_price is not None:
+            return service.report_price
+        raise BadRequestError(f"Duration {duration_minutes} min {service.duration_error}")
+
+    def durations(self, slug: str) -> tuple[int, ...]:
+        service = self._services.get(slug)
+        return service.durations if service else ()
+
+
+def _default_catalog() -> Catalog:
+    return Catalog([_build_service(*entry) for entry in DEFAULT_SERVICES])
+
+
+_catalog: Catalog = _default_catalog()
+_reload_lock = asyncio.Lock()
+
+
+def get_catalog() -> Catalog:
+    return _catalog
+
+
+async def _seed_defaults(db):
+    # Upserts with $setOnInsert, so workers racing to seed cannot conflict
+    await db.services.bulk_write(
+        [
+            UpdateOne(
+                {"_id": slug},
+                {"$setOnInsert": {"title": title, "prices": prices, "active": True, "sort_order": i}},
+                upsert=True,
+            )
+            for i, (slug, title, prices) in enumerate(DEFAULT_SERVICES)
+        ],
+        ordered=False,
+    )
+
+
+async def reload() -> Catalog:
+    """Load active services from the database and swap in a new snapshot."""
+    global _catalog
+    async with _reload_lock:
+        db = get_db()
+        if not await db.services.count_documents({}, limit=1):
+            await _seed_defaults(db)
+        cursor = db.services.find({"active": True}).sort([("sort_order", 1), ("_id", 1)])
+        services = [_build_service(doc["_id"], doc["title"], doc["prices"]) async for doc in cursor]
+        _catalog = Catalog(services)
+        return _catalog
+
+
+def _log_reload_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logger.error("catalog reload failed", exc_info=task.exception())
+
+
+def _on_catalog_changed(_key: str | None):
+    task = asyncio.get_running_loop().create_task(reload())
+    task.add_done_callback(_log_reload_failure)
+
+
+invalidation.subscribe(CATALOG_TOPIC, _on_catalog_changed)
+
+
+def reset():
+    """Back to the built-in defaults (tests)."""
+    global _catalog, _reload_lock
+    _catalog = _default_catalog()
+    _reload_lock = asyncio.Lock()
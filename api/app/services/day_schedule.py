@@ -0,0 +1,322 @@
+"""Write-time materialized free/busy read model (``db.day_schedule``).
+
+One document per date, keyed by the ``YYYY-MM-DD`` string::
+
+    {
+        "_id": "2026-03-16",
+        "holiday": False,
+        "blocked": {"w00": 0, ..., "w29": 0},   # admin time blocks
+        "booked": {"w00": 0, ..., "w29": 0},    # confirmed bookings
+        "pending": [{"booking_id", "start_min", "end_min", "created_at"}],
+    }
+
+Bitmaps hold one bit per minute of the day, split into 30 words of 48 bits
+so every word stays a positive int64. A confirmed booking ORs its bits
+into ``booked``; releasing one clears only the bits no other confirmed
+booking on that date still covers. Pending bookings expire on a timer
+rather than an event, so they are kept as a short list, filtered by
+``created_at`` at read time and pruned on every write to the date. Time
+blocks may overlap each other, so removing one rebuilds that date from
+``db.unavailability``.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from pymongo import UpdateOne
+
+from app.database import get_db
+from app.models.booking import PENDING_EXPIRY_MINUTES, BookingStatus
+from app.services.intervals import to_minutes
+
+MINUTES_PER_DAY = 24 * 60
+WORD_BITS = 48
+NUM_WORDS = MINUTES_PER_DAY // WORD_BITS
+WORD_MASK = (1 << WORD_BITS) - 1
+
+
+class DaySchedule(NamedTuple):
+    holiday: bool
+    blocked: int
+    booked: int
+
+    @property
+    def busy(self) -> int:
+        return self.blocked | self.booked
+
+
+def interval_mask(start_min: int, end_min: int) -> int:
+    """Bitmask with one bit set per minute in ``[start_min, end_min)``."""
+    start_min = max(start_min, 0)
+    end_min = min(end_min, MINUTES_PER_DAY)
+    if end_min <= start_min:
+        return 0
+    return ((1 << (end_min - start_min)) - 1) << start_min
+
+
+def _word_key(i: int) -> str:
+    return f"w{i:02d}"
+
+
+def _split_words(mask: int) -> dict[str, int]:
+    return {
+        _word_key(i): (mask >> (i * WORD_BITS)) & WORD_MASK
+        for i in range(NUM_WORDS)
+    }
+
+
+def _join_words(words: dict | None) -> int:
+    mask = 0
+    for key, word in (words or {}).items():
+        mask |= int(word) << (int(key[1:]) * WORD_BITS)
+    return mask
+
+
+def _bit_update(field: str, mask: int, op: str) -> dict:
+    """``$bit`` clause that ORs in or clears ``mask`` on a bitmap field."""
+    update = {}
+    for key, word in _split_words(mask).items():
+        if not word:
+            continue
+        if op == "or":
+            update[f"{field}.{key}"] = {"or": word}
+        else:
+            update[f"{field}.{key}"] = {"and": WORD_MASK & ~word}
+    return update
+
+
+def _booking_interval(doc: dict) -> tuple[int, int] | None:
+    duration = doc.get("duration_minutes", 30)
+    if duration == 0:
+        return None
+    start = to_minutes(doc["time_slot"])
+    return start, start + duration
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _pending_cutoff() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(minutes=PENDING_EXPIRY_MINUTES)
+
+
+def _pending_entry(doc: dict, interval: tuple[int, int]) -> dict:
+    return {
+        "booking_id": str(doc["_id"]),
+        "start_min": interval[0],
+        "end_min": interval[1],
+        "created_at": doc["created_at"],
+    }
+
+
+async def _update_day(date_str: str, update: dict):
+    """Apply ``update`` to a date and drop its expired pendings.
+
+    A ``$pull`` in ``update`` is widened to also match expired entries. A
+    ``$push`` cannot share the path with a ``$pull``, so the prune goes
+    first in the same ordered ``bulk_write``.
+    """
+    db = get_db()
+    expired = {"created_at": {"$lt": _pending_cutoff()}}
+    if "$push" not in update:
+        pull = update.get("$pull", {}).get("pending")
+        update = {**update, "$pull": {"pending": {"$or": [pull, expired]} if pull else expired}}
+        await db.day_schedule.update_one({"_id": date_str}, update, upsert=True)
+        return
+    await db.day_schedule.bulk_write(
+        [
+            UpdateOne({"_id": date_str}, {"$pull": {"pending": expired}}),
+            UpdateOne({"_id": date_str}, update, upsert=True),
+        ],
+        ordered=True,
+    )
+
+
+async def _confirmed_mask(date_str: str, exclude_id) -> int:
+    """Minutes still covered by the date's other confirmed bookings."""
+    db = get_db()
+    mask = 0
+    cursor = db.bookings.find(
+        {"date": date_str, "status": BookingStatus.CONFIRMED, "_id": {"$ne": exclude_id}},
+        {"time_slot": 1, "duration_minutes": 1},
+    )
+    async for b in cursor:
+        interval = _booking_interval(b)
+        if interval:
+            mask |= interval_mask(*interval)
+    return mask
+
+
+# ── Reads ──
+
+
+async def load_day_schedule(date_str: str) -> DaySchedule:
+    """Single point read; folds live pending bookings into ``booked``."""
+    db = get_db()
+    doc = await db.day_schedule.find_one({"_id": date_str})
+    if not doc:
+        return DaySchedule(holiday=False, blocked=0, booked=0)
+
+    cutoff = _pending_cutoff()
+    booked = _join_words(doc.get("booked"))
+    for p in doc.get("pending", []):
+        if _as_utc(p["created_at"]) >= cutoff:
+            booked |= interval_mask(p["start_min"], p["end_min"])
+
+    return DaySchedule(
+        holiday=doc.get("holiday", False),
+        blocked=_join_words(doc.get("blocked")),
+        booked=booked,
+    )
+
+
+# ── Write hooks ──
+
+
+async def booking_created(doc: dict):
+    """Record a new pending booking."""
+    interval = _booking_interval(doc)
+    if not interval:
+        return
+    await _update_day(doc["date"], {"$push": {"pending": _pending_entry(doc, interval)}})
+
+
+async def booking_status_changed(doc: dict, old_status: str, new_status: str):
+    """Move a booking between the pending list and the booked bitmap.
+
+    Combines ``$pull``/``$push`` on the pending list with a ``$bit`` on the
+    booked bitmap. Confirmed bookings can overlap (admin status changes
+    skip the conflict check), so releasing one only clears the minutes
+    that no other confirmed booking on the date covers.
+    """
+    interval = _booking_interval(doc)
+    if not interval or old_status == new_status:
+        return
+
+    booking_id = str(doc["_id"])
+    mask = interval_mask(*interval)
+    update: dict = {}
+
+    if old_status == BookingStatus.PENDING:
+        update["$pull"] = {"pending": {"booking_id": booking_id}}
+    elif new_status == BookingStatus.PENDING:
+        update["$push"] = {"pending": _pending_entry(doc, interval)}
+
+    if new_status == BookingStatus.CONFIRMED:
+        update["$bit"] = _bit_update("booked", mask, "or")
+    elif old_status == BookingStatus.CONFIRMED:
+        released = mask & ~await _confirmed_mask(doc["date"], doc["_id"])
+        if released:
+            update["$bit"] = _bit_update("booked", released, "and")
+
+    if update:
+        await _update_day(doc["date"], update)
+
+
+def _block_update(doc: dict) -> dict:
+    if doc.get("is_holiday"):
+        return {"$set": {"holiday": True}}
+    mask = interval_mask(
+        to_minutes(doc["start_time"]), to_minutes(doc["end_time"])
+    )
+    return {"$bit": _bit_update("blocked", mask, "or")}
+
+
+async def block_added(doc: dict):
+    """Record a new holiday or time block."""
+    await _update_day(doc["date"], _block_update(doc))
+
+
+async def blocks_added(docs: list[dict]):
+    """Record many holidays/blocks with one ordered bulk_write."""
+    db = get_db()
+    expired = {"pending": {"created_at": {"$lt": _pending_cutoff()}}}
+    await db.day_schedule.bulk_write(
+        [
+            UpdateOne({"_id": d["date"]}, {**_block_update(d), "$pull": expired}, upsert=True)
+            for d in docs
+        ],
+        ordered=True,
+    )
+
+
+async def block_removed(doc: dict):
+    """Blocks can overlap, so recompute the date's blocks from source."""
+    await rebuild_day(doc["date"])
+
+
+# ── Rebuild / consistency ──
+
+
+async def _compute_day(date_str: str) -> dict:
+    db = get_db()
+    holiday = False
+    blocked = 0
+    async for u in db.unavailability.find({"date": date_str}):
+        if u.get("is_holiday"):
+            holiday = True
+        elif u.get("start_time") and u.get("end_time"):
+            blocked |= interval_mask(
+                to_minutes(u["start_time"]), to_minutes(u["end_time"])
+            )
+
+    booked = 0
+    pending = []
+    cutoff = _pending_cutoff()
+    cursor = db.bookings.find({
+        "date": date_str,
+        "$or": [
+            {"status": "confirmed"},
+            {"status": "pending", "created_at": {"$gte": cutoff}},
+        ],
+    })
+    async for b in cursor:
+        interval = _booking_interval(b)
+        if not interval:
+            continue
+        if b["status"] == BookingStatus.CONFIRMED:
+            booked |= interval_mask(*interval)
+        else:
+            pending.append(_pending_entry(b, interval))
+
+    return {
+        "_id": date_str,
+        "holiday": holiday,
+        "blocked": _split_words(blocked),
+        "booked": _split_words(booked),
+        "pending": pending,
+    }
+
+
+async def rebuild_day(date_str: str) -> dict:
+    """Recompute one date from bookings + unavailability and store it."""
+    db = get_db()
+    doc = await _compute_day(date_str)
+    await db.day_schedule.replace_one({"_id": date_str}, doc, upsert=True)
+    return doc
+
+
+async def check_consistency(dates: list[str], repair: bool = False) -> list[str]:
+    """Return dates whose stored bitmaps disagree with the source collections.
+
+    Expired pendings are ignored on both sides. With ``repair=True`` each
+    mismatching date is rewritten (which also prunes expired pendings).
+    """
+    db = get_db()
+    mismatched = []
+    for date_str in dates:
+        expected = await _compute_day(date_str)
+        stored = await load_day_schedule(date_str)
+        actual_booked = _join_words(expected["booked"])
+        for p in expected["pending"]:
+            actual_booked |= interval_mask(p["start_min"], p["end_min"])
+        if (
+            stored.holiday != expected["holiday"]
+            or stored.blocked != _join_words(expected["blocked"])
+            or stored.booked != actual_booked
+        ):
+            mismatched.append(date_str)
+            if repair:
+                await db.day_schedule.replace_one({"_id": date_str}, expected, upsert=True)
+    return mismatched
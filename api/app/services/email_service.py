@@ -1,4 +1,10 @@
+import logging
+
+from app import tracing
 from app.config import settings
+from app.services import resilience
+
+logger = logging.getLogger(__name__)
 
 # Direct S3 URL — no CloudFront/GitHub restrictive headers, works in all email clients
 LOGO_URL = "https://vedicjivan-website.s3.ap-south-1.amazonaws.com/images/logo/logo-email.jpg"
@@ -26,17 +32,23 @@ def _email_footer() -> str:
 
 
 def _send_email(to: str, subject: str, html: str):
-    """Send an email via Resend. Returns silently if no API key configured."""
+    """Send an email via Resend. Returns silently if no API key configured.
+
+    Blocking; callers run it through ``resilience.get("resend")``.
+    """
     if not settings.RESEND_API_KEY:
-        print(f"[EMAIL SKIP] No RESEND_API_KEY. Would send to {to}: {subject}")
+        logger.info("email skipped: no RESEND_API_KEY", extra={"to": to, "subject": subject})
         return
 
     import resend
+    from resend.http_client_requests import RequestsClient
 
     resend.api_key = settings.RESEND_API_KEY
-    resend.Emails.send(
-        {"from": settings.EMAIL_FROM, "to": to, "subject": subject, "html": html}
-    )
+    resend.default_http_client = RequestsClient(timeout=settings.RESEND_TIMEOUT_SECONDS)
+    with tracing.span("resend.emails.send", tracing.CLIENT, {"peer.service": "resend", "email.subject": subject}):
+        resend.Emails.send(
+            {"from": settings.EMAIL_FROM, "to": to, "subject": subject, "html": html}
+        )
 
 
 async def send_booking_confirmation(
@@ -74,7 +86,7 @@ async def send_booking_confirmation(
         {_email_footer()}
     </div>
     """
-    _send_email(to_email, subject, html)
+    await resilience.get("resend").call(_send_email, to_email, subject, html)
 
 
 async def send_admin_booking_notification(
@@ -91,7 +103,7 @@ async def send_admin_booking_notification(
     """Notify admin about a new confirmed booking."""
     admin_email = settings.ADMIN_EMAIL
     if not admin_email:
-        print("[EMAIL SKIP] No ADMIN_EMAIL configured.")
+        logger.info("admin email skipped: no ADMIN_EMAIL")
         return
 
     subject = f"New Booking: {service_title} on {date} at {time_slot}"
@@ -121,7 +133,7 @@ async def send_admin_booking_notification(
         {_email_footer()}
     </div>
     """
-    _send_email(admin_email, subject, html)
+    await resilience.get("resend").call(_send_email, admin_email, subject, html)
 
 
 async def send_booking_cancellation(
@@ -146,4 +158,4 @@ async def send_booking_cancellation(
         {_email_footer()}
     </div>
     """
-    _send_email(to_email, subject, html)
+    await resilience.get("resend").call(_send_email, to_email, subject, html)
@@ -0,0 +1,127 @@
+"""Vectorized low-precision ephemeris (offline).
+
+Positions come from the mean orbital elements and periodic terms bundled
+in ``app/assets/ephemeris.json``; nothing is downloaded. Every function
+takes an array of Julian days (UT) and evaluates all of them at once, so a
+batch of charts costs a handful of NumPy passes instead of a Python loop
+per chart and body.
+
+Longitudes are ecliptic, in degrees. ``tropical_longitudes`` is referred
+to the equinox of date; subtract ``ayanamsa`` for sidereal (Lahiri)
+positions. Accuracy is about a couple of arcminutes for the Sun and
+planets and a few for the Moon between 1800 and 2100, well inside the
+13°20' of a nakshatra.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+EPHEMERIS_PATH = Path(__file__).resolve().parent.parent / "assets" / "ephemeris.json"
+
+# Order of the columns returned by tropical_longitudes
+BODIES = ("sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn", "rahu", "ketu")
+
+_ORBITS = ("sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn")
+_SUN, _MOON, _JUPITER, _SATURN = 0, 1, 5, 6
+_PLANETS = slice(2, 7)
+_J2000 = 2451545.0
+_KEPLER_ITERATIONS = 6
+
+
+def _load():
+    with open(EPHEMERIS_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    elements = np.array([data["elements"][name] for name in _ORBITS], dtype=np.float64)
+    terms = {
+        name: np.array(series["terms"], dtype=np.float64)
+        for name, series in data["perturbations"].items()
+        if isinstance(series, dict)
+    }
+    return data["epoch_jd"], elements[:, 0::2], elements[:, 1::2], terms, data["ayanamsa"]
+
+
+_EPOCH, _BASE, _RATE, _TERMS, _AYANAMSA = _load()
+
+
+def _series(terms: np.ndarray, arguments: np.ndarray) -> np.ndarray:
+    """Sum ``amplitude * sin(coefficients . arguments + phase)`` per row (degrees)."""
+    angle = arguments @ terms[:, 1:-1].T + terms[:, -1]
+    return np.sin(np.radians(angle)) @ terms[:, 0]
+
+
+def _eccentric_anomaly(mean_anomaly: np.ndarray, e: np.ndarray) -> np.ndarray:
+    """Solve Kepler's equation (radians) by Newton iteration, elementwise."""
+    E = mean_anomaly + e * np.sin(mean_anomaly) * (1.0 + e * np.cos(mean_anomaly))
+    for _ in range(_KEPLER_ITERATIONS):
+        E = E - (E - e * np.sin(E) - mean_anomaly) / (1.0 - e * np.cos(E))
+    return E
+
+
+def tropical_longitudes(jd: np.ndarray) -> np.ndarray:
+    """Geocentric longitudes, shape ``(len(jd), len(BODIES))``, in [0, 360)."""
+    d = np.asarray(jd, dtype=np.float64)[:, None, None] - _EPOCH
+    # Each element as a (charts, orbits) array
+    N, i, w, a, e, M = np.moveaxis(_BASE + _RATE * d, -1, 0)
+    N, i, w, M = (np.radians(x) for x in (N, i, w, M))
+
+    E = _eccentric_anomaly(M, e)
+    xv = a * (np.cos(E) - e)
+    yv = a * np.sqrt(1.0 - e * e) * np.sin(E)
+    r = np.hypot(xv, yv)
+    u = np.arctan2(yv, xv) + w  # argument of latitude
+
+    # Ecliptic coordinates (heliocentric for planets, geocentric for the Moon)
+    x = r * (np.cos(N) * np.cos(u) - np.sin(N) * np.sin(u) * np.cos(i))
+    y = r * (np.sin(N) * np.cos(u) + np.cos(N) * np.sin(u) * np.cos(i))
+    z = r * np.sin(u) * np.sin(i)
+    lon = np.degrees(np.arctan2(y, x))
+    lat = np.arctan2(z, np.hypot(x, y))
+
+    mean_anomaly = np.degrees(M)
+    sun_lon = lon[:, _SUN]
+    moon_mean = np.degrees(N[:, _MOON] + w[:, _MOON]) + mean_anomaly[:, _MOON]
+    sun_mean = np.degrees(w[:, _SUN]) + mean_anomaly[:, _SUN]
+    elongation = moon_mean - sun_mean
+    moon_arguments = np.stack(
+        [mean_anomaly[:, _MOON], mean_anomaly[:, _SUN], elongation, moon_mean - np.degrees(N[:, _MOON])],
+        axis=1,
+    )
+    lon[:, _MOON] += _series(_TERMS["moon"], moon_arguments)
+    giants = mean_anomaly[:, [_JUPITER, _SATURN]]
+    lon[:, _JUPITER] += _series(_TERMS["jupiter"], giants)
+    lon[:, _SATURN] += _series(_TERMS["saturn"], giants)
+
+    # Planets: heliocentric -> geocentric by adding the Sun's geocentric vector
+    planet_lon = np.radians(lon[:, _PLANETS])
+    planet_r = r[:, _PLANETS] * np.cos(lat[:, _PLANETS])
+    sun = np.radians(sun_lon)[:, None]
+    gx = planet_r * np.cos(planet_lon) + r[:, _SUN, None] * np.cos(sun)
+    gy = planet_r * np.sin(planet_lon) + r[:, _SUN, None] * np.sin(sun)
+    lon[:, _PLANETS] = np.degrees(np.arctan2(gy, gx))
+
+    rahu = np.degrees(N[:, _MOON])  # mean lunar node
+    out = np.concatenate([lon, rahu[:, None], rahu[:, None] + 180.0], axis=1)
+    return np.mod(out, 360.0)
+
+
+def ayanamsa(jd: np.ndarray) -> np.ndarray:
+    """Lahiri ayanamsa in degrees."""
+    centuries = (np.asarray(jd, dtype=np.float64) - _J2000) / 36525.0
+    return _AYANAMSA["j2000"] + _AYANAMSA["per_century"] * centuries
+
+
+def obliquity(jd: np.ndarray) -> np.ndarray:
+    return 23.4393 - 3.563e-7 * (np.asarray(jd, dtype=np.float64) - _EPOCH)
+
+
+def ascendant(jd: np.ndarray, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """Tropical ascendant in degrees for observers at ``latitude``/``longitude`` (east +)."""
+    jd = np.asarray(jd, dtype=np.float64)
+    gmst = 280.46061837 + 360.98564736629 * (jd - _J2000)
+    ramc = np.radians(np.mod(gmst + np.asarray(longitude, dtype=np.float64), 360.0))
+    eps = np.radians(obliquity(jd))
+    phi = np.radians(np.asarray(latitude, dtype=np.float64))
+    asc = np.arctan2(np.cos(ramc), -(np.sin(ramc) * np.cos(eps) + np.tan(phi) * np.sin(eps)))
+    return np.mod(np.degrees(asc), 360.0)
@@ -0,0 +1,93 @@
+"""Startup warm-up and readiness state.
+
+``warm_up()`` runs in the background from the lifespan: it forces server
+selection, opens the minimum pool connections and prefetches cacheable
+reference data (business hours, the service catalog). Until it finishes
+the readiness and startup probes report 503, so traffic is never routed to
+a cold task. The startup probe (the ECS container health check) stays
+healthy afterwards; only readiness follows Mongo.
+
+Readiness also requires Mongo to answer a ping. Ping results are cached
+for ``PING_CACHE_SECONDS`` and concurrent probes share one in-flight ping,
+so probe traffic cannot turn into database load.
+"""
+
+import asyncio
+import time
+
+from app.config import settings
+from app.database import get_db
+from app.services import catalog
+from app.services.settings import get_business_hours
+
+PING_CACHE_SECONDS = 5
+PING_TIMEOUT_SECONDS = 2
+WARMUP_RETRY_SECONDS = (1, 2, 5, 10)
+
+_ready = False
+_warmup_error: str | None = None
+_last_ping: tuple[float, bool] | None = None
+_ping_lock = asyncio.Lock()
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+def warmup_error() -> str | None:
+    return _warmup_error
+
+
+async def ping_mongo() -> bool:
+    """Cached, single-flight Mongo ping."""
+    global _last_ping
+    async with _ping_lock:
+        now = time.monotonic()
+        if _last_ping and now - _last_ping[0] < PING_CACHE_SECONDS:
+            return _last_ping[1]
+        try:
+            await asyncio.wait_for(get_db().command("ping"), PING_TIMEOUT_SECONDS)
+            ok = True
+        except Exception:
+            ok = False
+        _last_ping = (time.monotonic(), ok)
+        return ok
+
+
+async def _warm_once():
+    db = get_db()
+    # Server selection + one connection
+    await db.command("ping")
+    # Concurrent pings check out separate connections, filling the pool
+    await asyncio.gather(
+        *(db.command("ping") for _ in range(settings.MONGODB_MIN_POOL_SIZE))
+    )
+    await get_business_hours()
+    await catalog.reload()
+
+
+async def warm_up():
+    """Warm the task, retrying with backoff until it succeeds."""
+    global _ready, _warmup_error
+    attempt = 0
+    while True:
+        try:
+            await _warm_once()
+        except Exception as e:
+            _warmup_error = str(e)
+            delay = WARMUP_RETRY_SECONDS[min(attempt, len(WARMUP_RETRY_SECONDS) - 1)]
+            attempt += 1
+            await asyncio.sleep(delay)
+            continue
+        _warmup_error = None
+        _ready = True
+        return
+
+
+def reset():
+    """Back to the cold state (tests, or before a new warm-up)."""
+    global _ready, _warmup_error, _last_ping, _ping_lock
+    _ready = False
+    _warmup_error = None
+    _last_ping = None
+    _ping_lock = asyncio.Lock()
@@ -0,0 +1,186 @@
+"""Conditional requests and CDN caching for public reads.
+
+Public availability reads (business hours, holidays, blocked periods) are
+fetched on every page view but change only when an admin edits them. Each
+such resource has a version counter in ``db.data_versions``::
+
+    {"_id": "unavailability", "version": 42}
+
+Writers call ``bump()``. This increments the counter, drops every worker's
+cached copy over the invalidation bus, and runs the purge hooks for the
+affected CDN paths. Readers build a strong ETag from the version and the
+query string, so an ``If-None-Match`` revalidation is answered with 304
+from the worker's cached version without touching the data.
+
+The version is read before the data. A response can therefore carry an
+older version than its body, never a newer one, and a client can never
+hold stale data under a current ETag.
+
+Purge hooks receive CloudFront-style paths (a trailing ``*`` matches any
+suffix, query strings included). ``cloudfront_purge`` is installed at
+startup when ``CDN_DISTRIBUTION_ID`` is set.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+from pymongo import ReturnDocument
+
+from app.config import settings
+from app.database import get_db
+from app.services import invalidation
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_TOPIC = "data_versions"
+
+BUSINESS_HOURS = "business_hours"
+UNAVAILABILITY = "unavailability"
+
+# Bounds staleness on workers that miss a bus event (or run without a bus)
+VERSION_TTL_SECONDS = 30
+
+_versions: dict[str, tuple[int, float]] = {}
+_purge_hooks: list[Callable[[list[str]], Awaitable[None]]] = []
+
+
+def cache_control() -> str:
+    return (
+        f"public, max-age={settings.HTTP_CACHE_MAX_AGE_SECONDS}, "
+        f"s-maxage={settings.HTTP_CACHE_CDN_MAX_AGE_SECONDS}, "
+        f"stale-while-revalidate={settings.HTTP_CACHE_STALE_SECONDS}"
+    )
+
+
+async def get_version(resource: str) -> int:
+    cached = _versions.get(resource)
+    if cached and time.monotonic() - cached[1] < VERSION_TTL_SECONDS:
+        return cached[0]
+    db = get_db()
+    doc = await db.data_versions.find_one({"_id": resource})
+    version = doc["version"] if doc else 0
+    _versions[resource] = (version, time.monotonic())
+    return version
+
+
+def make_etag(resource: str, version: int, request: Request) -> str:
+    variant = hashlib.sha1(str(request.query_params).encode()).hexdigest()[:12]
+    return f'"{resource}-v{version}-{variant}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 specifies for ``If-None-Match``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control()}
+
+
+async def conditional(resource: str, request: Request, response: Response) -> Response | None:
+    """Return a 304 if the client's copy is current, else set cache headers.
+
+    Call before loading the data; the route returns the 304 when given one.
+    """
+    etag = make_etag(resource, await get_version(resource), request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    response.headers.update(cache_headers(etag))
+    return None
+
+
+# ── Writes ──
+
+
+def add_purge_hook(hook: Callable[[list[str]], Awaitable[None]]):
+    _purge_hooks.append(hook)
+
+
+async def purge(paths: list[str]):
+    """Run every purge hook; failures are logged, the CDN TTL still applies."""
+    for hook in _purge_hooks:
+        try:
+            await hook(paths)
+        except Exception:
+            logger.exception("cdn purge failed", extra={"paths": paths})
+
+
+async def bump(resource: str, paths: list[str]):
+    """Record a change to ``resource`` and purge ``paths`` from the CDN."""
+    db = get_db()
+    version = None
+    try:
+        doc = await db.data_versions.find_one_and_update(
+            {"_id": resource},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        version = doc["version"]
+    except Exception:
+        logger.exception("version bump failed", extra={"resource": resource})
+    await invalidation.publish(VERSIONS_TOPIC, resource)
+    if version is not None:
+        # Publishing dropped the local copy; the writer already knows the new one
+        _versions[resource] = (version, time.monotonic())
+    await purge(paths)
+
+
+def _on_version_changed(resource: str | None):
+    if resource is None:
+        _versions.clear()
+    else:
+        _versions.pop(resource, None)
+
+
+invalidation.subscribe(VERSIONS_TOPIC, _on_version_changed)
+
+
+# ── Targeted CDN paths ──
+
+
+def business_hours_paths() -> list[str]:
+    return ["/api/availability/settings"]
+
+
+def unavailability_paths(holidays: bool = True) -> list[str]:
+    """Paths to purge after blocks change; holiday lists only if affected.
+
+    CloudFront cannot invalidate a single query string variant, so every
+    date of ``/unavailable`` (and ``/unavailable/range``) goes at once.
+    """
+    paths = ["/api/availability/unavailable*"]
+    if holidays:
+        paths.append("/api/availability/holidays*")
+    return paths
+
+
+async def cloudfront_purge(paths: list[str]):
+    """Create a CloudFront invalidation for ``paths`` on the API distribution."""
+    import boto3
+
+    def _invalidate():
+        boto3.client("cloudfront").create_invalidation(
+            DistributionId=settings.CDN_DISTRIBUTION_ID,
+            InvalidationBatch={
+                "Paths": {"Quantity": len(paths), "Items": paths},
+                "CallerReference": uuid.uuid4().hex,
+            },
+        )
+
+    await asyncio.to_thread(_invalidate)
+
+
+def reset():
+    _versions.clear()
+    _purge_hooks.clear()
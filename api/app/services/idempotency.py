@@ -0,0 +1,218 @@
+"""``Idempotency-Key`` support for retried POSTs.
+
+Mobile clients on flaky connections retry ``POST /api/bookings`` and
+``/create-checkout-session``. Without a key every retry creates another
+pending booking (or Stripe session) that holds the slot until it expires.
+
+The first request with a key claims ``db.idempotency_keys`` with an
+``insert_one`` on ``_id = "<scope>:<key>"``::
+
+    {"_id": "bookings:3f2a...", "fingerprint": "<sha256 of the body>",
+     "status": "in_progress", "locked_until": ..., "expires_at": ...}
+
+When it finishes, the status code and response body are stored on the
+same document. A duplicate that loses the insert race waits for the record
+to complete and replays the stored result without doing the work again.
+Duplicates on the same worker wait on an in-process future; duplicates on
+other workers poll with backoff. Reusing a key with a different body is
+rejected with 422. Documents are removed by a TTL index after
+``IDEMPOTENCY_TTL_HOURS``.
+
+Client errors (4xx) are stored and replayed like successes. On a server
+error the claim is released so the client can retry with the same key. A
+claim whose worker died is taken over once ``locked_until`` has passed.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.database import get_db
+from app.utils.exceptions import (
+    BadRequestError,
+    ConflictError,
+    UnprocessableEntityError,
+)
+
+logger = logging.getLogger(__name__)
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+KEY_MAX_LENGTH = 255
+LOCK_SECONDS = 30
+POLL_INITIAL_SECONDS = 0.05
+POLL_MAX_SECONDS = 0.5
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+_indexed = False
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def fingerprint(body: dict) -> str:
+    canonical = json.dumps(jsonable_encoder(body), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+async def ensure_indexes(db):
+    global _indexed
+    if not _indexed:
+        await db.idempotency_keys.create_index("expires_at", expireAfterSeconds=0)
+        _indexed = True
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _replay(doc: dict, response: Response | None):
+    headers = {REPLAYED_HEADER: "true"}
+    if doc["status_code"] >= 400:
+        raise HTTPException(status_code=doc["status_code"], detail=doc["body"].get("detail"), headers=headers)
+    if response is not None:
+        response.headers.update(headers)
+    return doc["body"]
+
+
+async def _wait(db, doc_id: str, fp: str) -> dict | None:
+    """Wait until the record completes or its lock lapses.
+
+    Returns ``None`` if the record disappeared (released after a server
+    error, or expired) so the caller can try to claim it again.
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = POLL_INITIAL_SECONDS
+    while True:
+        doc = await db.idempotency_keys.find_one({"_id": doc_id})
+        if doc is None:
+            return None
+        if doc["fingerprint"] != fp:
+            raise UnprocessableEntityError(f"{HEADER} was already used for a different request")
+        if doc["status"] == COMPLETED:
+            return doc
+        if _as_utc(doc["locked_until"]) <= datetime.now(timezone.utc):
+            return doc
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ConflictError(f"A request with this {HEADER} is still in progress")
+        local = _inflight.get(doc_id)
+        if local is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(local), remaining)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, POLL_MAX_SECONDS)
+
+
+async def _claim(db, doc_id: str, fp: str) -> dict | None:
+    """Claim ``doc_id`` for this request, or return the completed record."""
+    while True:
+        now = datetime.now(timezone.utc)
+        locked_until = now + timedelta(seconds=LOCK_SECONDS)
+        try:
+            await db.idempotency_keys.insert_one({
+                "_id": doc_id,
+                "fingerprint": fp,
+                "status": IN_PROGRESS,
+                "locked_until": locked_until,
+                "created_at": now,
+                "expires_at": now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+            })
+            return None
+        except DuplicateKeyError:
+            pass
+
+        doc = await _wait(db, doc_id, fp)
+        if doc is None:
+            continue
+        if doc["status"] == COMPLETED:
+            return doc
+        # The owner's lock lapsed: take over unless another waiter beat us to it
+        taken = await db.idempotency_keys.update_one(
+            {"_id": doc_id, "status": IN_PROGRESS, "locked_until": doc["locked_until"]},
+            {"$set": {"locked_until": locked_until}},
+        )
+        if taken.modified_count:
+            return None
+
+
+async def _complete(db, doc_id: str, status_code: int, body: Any):
+    try:
+        await db.idempotency_keys.update_one(
+            {"_id": doc_id},
+            {"$set": {"status": COMPLETED, "status_code": status_code, "body": body}},
+        )
+    except Exception:
+        logger.exception("idempotent response store failed", extra={"key_id": doc_id})
+
+
+async def _release(db, doc_id: str):
+    try:
+        await db.idempotency_keys.delete_one({"_id": doc_id, "status": IN_PROGRESS})
+    except Exception:
+        logger.exception("idempotency claim release failed", extra={"key_id": doc_id})
+
+
+async def run(
+    scope: str,
+    key: str | None,
+    body: dict,
+    work: Callable[[], Awaitable[Any]],
+    response: Response | None = None,
+):
+    """Run ``work()`` at most once per ``(scope, key)`` and replay its result.
+
+    Without a key (or with ``IDEMPOTENCY_ENABLED`` off) ``work()`` just runs.
+    """
+    if key is None or not settings.IDEMPOTENCY_ENABLED:
+        return await work()
+    if not key.strip() or len(key) > KEY_MAX_LENGTH:
+        raise BadRequestError(f"{HEADER} must be 1-{KEY_MAX_LENGTH} characters")
+
+    db = get_db()
+    await ensure_indexes(db)
+    doc_id = f"{scope}:{key}"
+    fp = fingerprint(body)
+
+    done = await _claim(db, doc_id, fp)
+    if done is not None:
+        return _replay(done, response)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[doc_id] = future
+    try:
+        result = await work()
+    except HTTPException as e:
+        if e.status_code < 500:
+            await _complete(db, doc_id, e.status_code, {"detail": e.detail})
+        else:
+            await _release(db, doc_id)
+        raise
+    except BaseException:
+        await _release(db, doc_id)
+        raise
+    else:
+        await _complete(db, doc_id, 200, jsonable_encoder(result))
+        return result
+    finally:
+        _inflight.pop(doc_id, None)
+        future.set_result(None)
+
+
+def reset():
+    global _indexed
+    _indexed = False
+    _inflight.clear()
@@ -0,0 +1,112 @@
+"""Numeric ``start_min``/``end_min`` fields for bookings and time blocks.
+
+Both collections store times as ``HH:MM`` strings. Overlap tests on those
+strings need the end time computed in Python, so every document for the
+date had to be loaded. With minutes-since-midnight stored alongside, a
+conflict is one indexed ``find_one`` per collection::
+
+    {"date": d, "start_min": {"$lt": end}, "end_min": {"$gt": start}}
+
+This stops at the first hit on the ``(date, start_min, end_min)`` index.
+``backfill()`` fills the fields on existing documents. Enable
+``INTERVAL_CONFLICT_CHECKS`` once it has run.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.database import get_db
+from app.models.booking import PENDING_EXPIRY_MINUTES
+
+INTERVAL_INDEX = [("date", 1), ("start_min", 1), ("end_min", 1)]
+
+_indexed = False
+
+
+def to_minutes(t: str) -> int:
+    h, m = t.split(":")
+    return int(h) * 60 + int(m)
+
+
+def booking_fields(time_slot: str, duration_minutes: int) -> dict:
+    start = to_minutes(time_slot)
+    return {"start_min": start, "end_min": start + duration_minutes}
+
+
+def block_fields(start_time: str, end_time: str) -> dict:
+    return {"start_min": to_minutes(start_time), "end_min": to_minutes(end_time)}
+
+
+async def ensure_indexes(db):
+    global _indexed
+    if not _indexed:
+        await db.bookings.create_index(INTERVAL_INDEX)
+        await db.unavailability.create_index(INTERVAL_INDEX)
+        _indexed = True
+
+
+def _minutes_expr(field: str) -> dict:
+    return {
+        "$add": [
+            {"$multiply": [{"$toInt": {"$substrCP": [field, 0, 2]}}, 60]},
+            {"$toInt": {"$substrCP": [field, 3, 2]}},
+        ]
+    }
+
+
+async def backfill() -> dict:
+    """Add interval fields to bookings and time blocks that lack them."""
+    db = get_db()
+    await ensure_indexes(db)
+
+    bookings = await db.bookings.update_many(
+        {"start_min": {"$exists": False}, "time_slot": {"$type": "string"}},
+        [
+            {"$set": {"start_min": _minutes_expr("$time_slot")}},
+            {"$set": {"end_min": {"$add": ["$start_min", {"$ifNull": ["$duration_minutes", 30]}]}}},
+        ],
+    )
+    blocks = await db.unavailability.update_many(
+        {
+            "start_min": {"$exists": False},
+            "is_holiday": False,
+            "start_time": {"$type": "string"},
+            "end_time": {"$type": "string"},
+        },
+        [{"$set": {
+            "start_min": _minutes_expr("$start_time"),
+            "end_min": _minutes_expr("$end_time"),
+        }}],
+    )
+    return {"bookings": bookings.modified_count, "blocks": blocks.modified_count}
+
+
+async def find_conflict(date_str: str, start: int, end: int) -> str | None:
+    """``"unavailable"``, ``"booked"`` or ``None`` for ``[start, end)`` on a date."""
+    db = get_db()
+    overlap = {"date": date_str, "start_min": {"$lt": end}, "end_min": {"$gt": start}}
+
+    block = await db.unavailability.find_one(
+        {**overlap, "is_holiday": False}, projection={"_id": 1}
+    )
+    if block:
+        return "unavailable"
+
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=PENDING_EXPIRY_MINUTES)
+    booking = await db.bookings.find_one(
+        {
+            **overlap,
+            "$or": [
+                {"status": "confirmed"},
+                {"status": "pending", "created_at": {"$gte": cutoff}},
+            ],
+        },
+        projection={"_id": 1},
+    )
+    if booking:
+        return "booked"
+    return None
+
+
+def reset():
+    global _indexed
+    _indexed = False
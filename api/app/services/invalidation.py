@@ -0,0 +1,241 @@
+"""Cross-worker cache invalidation bus.
+
+In-process caches (business hours, recurring rules, ...) are per uvicorn
+worker and per ECS task. Writers call ``publish(topic)``. This runs the
+local handlers at once and appends an event to the capped
+``db.cache_events`` collection::
+
+    {"topic": "business_hours", "key": None, "origin": "<worker>", "published_at": ...}
+
+Every worker runs an ``InvalidationBus`` listener that applies events from
+other workers. It follows the collection with a change stream when the
+deployment is a replica set (Atlas, or the local single-node ``rs0`` in
+docker-compose). On a standalone server it falls back to one long-lived
+tailable cursor that reads the capped collection in natural (insertion)
+order. ObjectIds minted by different processes in the same second are not
+in insertion order, so events are never paged by ``_id``.
+
+Invalidation lag (``received - published_at``) is recorded per worker.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable
+
+from bson import ObjectId
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+from app.database import get_db
+
+logger = logging.getLogger(__name__)
+
+CAPPED_SIZE_BYTES = 1024 * 1024
+POLL_SECONDS = 1.0
+RETRY_SECONDS = 5.0
+
+# Server error codes meaning "change streams unavailable on this deployment"
+_NO_CHANGE_STREAM_CODES = {40573, 40324}
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_handlers: dict[str, list[Callable[[str | None], None]]] = {}
+
+
+def subscribe(topic: str, handler: Callable[[str | None], None]):
+    """Register ``handler(key)`` to run whenever ``topic`` is invalidated."""
+    _handlers.setdefault(topic, []).append(handler)
+
+
+def _dispatch(topic: str, key: str | None):
+    for handler in _handlers.get(topic, []):
+        handler(key)
+
+
+async def publish(topic: str, key: str | None = None):
+    """Invalidate ``topic`` locally, then broadcast it to the other workers.
+
+    A failed broadcast is logged rather than raised: the write that caused
+    it has already succeeded, and remote caches still expire on their TTL.
+    """
+    _dispatch(topic, key)
+    db = get_db()
+    try:
+        await db.cache_events.insert_one({
+            "topic": topic,
+            "key": key,
+            "origin": WORKER_ID,
+            "published_at": datetime.now(timezone.utc),
+        })
+    except Exception:
+        logger.exception("invalidation publish failed", extra={"topic": topic})
+
+
+class LagStats:
+    def __init__(self):
+        self.received = 0
+        self.applied = 0
+        self.last_ms: float | None = None
+        self.max_ms = 0.0
+        self.total_ms = 0.0
+
+    def record(self, lag_ms: float):
+        self.received += 1
+        self.last_ms = lag_ms
+        self.max_ms = max(self.max_ms, lag_ms)
+        self.total_ms += lag_ms
+
+    def as_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "applied": self.applied,
+            "last_lag_ms": round(self.last_ms, 3) if self.last_ms is not None else None,
+            "max_lag_ms": round(self.max_ms, 3),
+            "mean_lag_ms": round(self.total_ms / self.received, 3) if self.received else None,
+        }
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class InvalidationBus:
+    def __init__(self, mode: str = "auto"):
+        if mode not in ("auto", "change_stream", "poll"):
+            raise ValueError(f"Unknown invalidation bus mode: {mode}")
+        self.requested_mode = mode
+        self.mode: str | None = None
+        self.stats = LagStats()
+        self._task: asyncio.Task | None = None
+        self._resume_token = None
+        self._last_id: ObjectId | None = None
+        self._positioned = False
+
+    def handle(self, event: dict, now: datetime | None = None):
+        """Record lag for an event and apply it unless this worker sent it."""
+        now = now or datetime.now(timezone.utc)
+        published = event.get("published_at")
+        if published:
+            self.stats.record((now - _as_utc(published)).total_seconds() * 1000)
+        if event.get("_id"):
+            self._last_id = event["_id"]
+        if event.get("origin") != WORKER_ID:
+            _dispatch(event["topic"], event.get("key"))
+            self.stats.applied += 1
+
+    async def ensure_collection(self):
+        db = get_db()
+        try:
+            await db.create_collection("cache_events", capped=True, size=CAPPED_SIZE_BYTES)
+        except CollectionInvalid:
+            pass
+
+    async def _watch(self):
+        db = get_db()
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        async with db.cache_events.watch(pipeline, resume_after=self._resume_token) as stream:
+            self.mode = "change_stream"
+            async for change in stream:
+                self._resume_token = stream.resume_token
+                self.handle(change["fullDocument"])
+
+    async def _tail(self):
+        """Follow the capped collection with one tailable cursor.
+
+        The cursor stays open while the server keeps it alive. A replacement
+        (the server closes it at once on an empty collection) reads from the
+        start in natural order and skips everything up to the last event
+        handled. If that event has rolled out of the collection, the whole
+        first pass is applied; invalidations are idempotent.
+        """
+        db = get_db()
+        self.mode = "poll"
+        if not self._positioned:
+            newest = await db.cache_events.find_one({}, sort=[("$natural", -1)])
+            self._last_id = newest["_id"] if newest else None
+            self._positioned = True
+        while True:
+            cursor = db.cache_events.find({}, cursor_type=CursorType.TAILABLE_AWAIT)
+            skipped: list[dict] | None = None if self._last_id is None else []
+            while cursor.alive:
+                async for event in cursor:
+                    if skipped is None:
+                        self.handle(event)
+                    elif event["_id"] == self._last_id:
+                        skipped = None
+                    else:
+                        skipped.append(event)
+                if skipped is not None:
+                    for event in skipped:
+                        self.handle(event)
+                    skipped = None
+            await asyncio.sleep(POLL_SECONDS)
+
+    async def run(self):
+        await self.ensure_collection()
+        use_change_stream = self.requested_mode != "poll"
+        while True:
+            try:
+                if use_change_stream:
+                    await self._watch()
+                else:
+                    await self._tail()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if use_change_stream and self.requested_mode == "auto" and e.code in _NO_CHANGE_STREAM_CODES:
+                    logger.warning("change streams unavailable, polling capped collection")
+                    use_change_stream = False
+                    continue
+                logger.exception("invalidation listener failed")
+            except Exception:
+                logger.exception("invalidation listener failed")
+            await asyncio.sleep(RETRY_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def metrics(self) -> dict:
+        return {"worker": WORKER_ID, "mode": self.mode, **self.stats.as_dict()}
+
+
+_bus: InvalidationBus | None = None
+
+
+def get_bus() -> InvalidationBus | None:
+    return _bus
+
+
+def set_bus(bus: InvalidationBus | None):
+    global _bus
+    _bus = bus
+
+
+async def measure_lag(timeout: float = 5.0) -> float | None:
+    """Publish a probe and wait for this worker's listener to see it.
+
+    Returns the round trip through the bus in milliseconds, or ``None`` if
+    no listener is running or the probe did not arrive within ``timeout``.
+    """
+    bus = get_bus()
+    if bus is None or bus._task is None:
+        return None
+    seen = bus.stats.received
+    t0 = time.perf_counter()
+    await publish("_probe")
+    while time.perf_counter() - t0 < timeout:
+        if bus.stats.received > seen:
+            return round((time.perf_counter() - t0) * 1000, 3)
+        await asyncio.sleep(0.01)
+    return None
@@ -0,0 +1,261 @@
+"""Birth charts (kundli) for premium-kundli bookings.
+
+A chart holds the sidereal (Lahiri) longitude, rashi, nakshatra and pada
+of the nine grahas, the ascendant (lagna) and whole-sign houses counted
+from it. Charts are computed in batches with ``app.services.ephemeris``:
+all birth times go through the ephemeris as one array, and nothing in the
+math loops per chart.
+
+Birth times are local to ``KUNDLI_TIMEZONE`` (bookings do not record a
+timezone). When the birth time is unknown the chart is cast for local
+noon and has no ascendant or houses.
+
+Charts are memoized by their normalized birth inputs (see ``BirthInput``)
+in a per-worker LRU of ``KUNDLI_CACHE_SIZE`` entries and persisted in
+``db.kundli_charts`` keyed the same way, so a chart is computed once
+across workers and restarts. The key includes ``ENGINE_VERSION``; bump it
+when the math changes and old charts are simply not found again.
+"""
+
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+from app.database import get_db
+from app.models.booking import BookingStatus
+from app.services import ephemeris
+
+logger = logging.getLogger(__name__)
+
+ENGINE_VERSION = 1
+SERVICE_SLUG = "premium-kundli"
+
+RASHIS = (
+    "Mesha", "Vrishabha", "Mithuna", "Karka", "Simha", "Kanya",
+    "Tula", "Vrishchika", "Dhanu", "Makara", "Kumbha", "Meena",
+)
+NAKSHATRAS = (
+    "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra",
+    "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni", "Uttara Phalguni",
+    "Hasta", "Chitra", "Swati", "Vishakha", "Anuradha", "Jyeshtha",
+    "Mula", "Purva Ashadha", "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha",
+    "Purva Bhadrapada", "Uttara Bhadrapada", "Revati",
+)
+NAKSHATRA_SPAN = 360 / 27
+PADA_SPAN = NAKSHATRA_SPAN / 4
+
+UNKNOWN_TIME_MINUTES = 12 * 60
+_UNIX_EPOCH_JD = 2440587.5
+
+# Upcoming = not yet delivered
+UPCOMING_STATUSES = [BookingStatus.PENDING, BookingStatus.CONFIRMED]
+
+_memo: OrderedDict[str, dict] = OrderedDict()
+_stats = {"hits": 0, "db_hits": 0, "computed": 0}
+
+
+class BirthInput(NamedTuple):
+    date_of_birth: str
+    minutes: int | None  # local clock time, None when unknown
+    latitude: float
+    longitude: float
+    timezone: str
+
+    @property
+    def key(self) -> str:
+        clock = "unknown" if self.minutes is None else f"{self.minutes // 60:02d}:{self.minutes % 60:02d}"
+        return (
+            f"v{ENGINE_VERSION}|{self.date_of_birth}|{clock}|"
+            f"{self.latitude:.4f}|{self.longitude:.4f}|{self.timezone}"
+        )
+
+    def utc(self) -> datetime:
+        minutes = UNKNOWN_TIME_MINUTES if self.minutes is None else self.minutes
+        local = datetime.fromisoformat(self.date_of_birth) + timedelta(minutes=minutes)
+        return local.replace(tzinfo=ZoneInfo(self.timezone)).astimezone(timezone.utc)
+
+
+def _clock_minutes(value: str) -> int:
+    """Minutes after midnight for ``"HH:MM AM/PM"``."""
+    clock, meridiem = value.split()
+    hours, minutes = (int(part) for part in clock.split(":"))
+    if not (1 <= hours <= 12 and 0 <= minutes < 60 and meridiem in ("AM", "PM")):
+        raise ValueError(f"Invalid time of birth: {value}")
+    return (hours % 12 + (12 if meridiem == "PM" else 0)) * 60 + minutes
+
+
+def birth_input(booking: dict) -> BirthInput:
+    """Normalized birth inputs of a booking; ``ValueError`` if incomplete."""
+    date_of_birth = booking.get("date_of_birth") or ""
+    datetime.strptime(date_of_birth, "%Y-%m-%d")
+    time_of_birth = booking.get("time_of_birth")
+    if booking.get("birth_time_unknown") or not time_of_birth:
+        minutes = None
+    else:
+        minutes = _clock_minutes(time_of_birth)
+    latitude = round(float(booking.get("birth_latitude", 0.0)), 4)
+    longitude = round(float(booking.get("birth_longitude", 0.0)), 4)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Birth coordinates out of range")
+    return BirthInput(date_of_birth, minutes, latitude, longitude, settings.KUNDLI_TIMEZONE)
+
+
+def _position(longitude, sign, nakshatra, pada) -> dict:
+    # Plain Python numbers: charts are stored in Mongo and returned as JSON
+    longitude, sign, nakshatra, pada = float(longitude), int(sign), int(nakshatra), int(pada)
+    return {
+        "longitude": round(longitude, 4),
+        "sign": RASHIS[sign],
+        "sign_index": sign,
+        "degree_in_sign": round(longitude - 30 * sign, 4),
+        "nakshatra": NAKSHATRAS[nakshatra],
+        "nakshatra_index": nakshatra,
+        "pada": pada,
+    }
+
+
+def compute_charts(inputs: list[BirthInput]) -> list[dict]:
+    """Charts for ``inputs``, computed in one vectorized pass."""
+    if not inputs:
+        return []
+    moments = [birth.utc() for birth in inputs]
+    jd = np.array([m.timestamp() / 86400 + _UNIX_EPOCH_JD for m in moments])
+    latitude = np.array([birth.latitude for birth in inputs])
+    longitude = np.array([birth.longitude for birth in inputs])
+    known_time = np.array([birth.minutes is not None for birth in inputs])
+
+    # Positions now and a day later in one call; the difference gives the motion
+    count = len(inputs)
+    tropical = ephemeris.tropical_longitudes(np.concatenate([jd, jd + 1]))
+    ayanamsa = ephemeris.ayanamsa(jd)
+    sidereal = np.mod(tropical[:count] - ayanamsa[:, None], 360.0)
+    motion = np.mod(tropical[count:] - tropical[:count] + 180.0, 360.0) - 180.0
+    retrograde = motion < 0
+
+    lagna = np.mod(ephemeris.ascendant(jd, latitude, longitude) - ayanamsa, 360.0)
+
+    # Rashi, nakshatra and pada for bodies and lagna together
+    points = np.concatenate([sidereal, lagna[:, None]], axis=1)
+    signs = (points // 30).astype(int) % 12
+    nakshatras = (points // NAKSHATRA_SPAN).astype(int) % 27
+    padas = ((points % NAKSHATRA_SPAN) // PADA_SPAN).astype(int) + 1
+    houses = np.mod(signs[:, :-1] - signs[:, -1:], 12) + 1
+
+    charts = []
+    for row, birth in enumerate(inputs):
+        planets = {}
+        for col, body in enumerate(ephemeris.BODIES):
+            planet = _position(points[row, col], signs[row, col], nakshatras[row, col], padas[row, col])
+            planet["retrograde"] = bool(retrograde[row, col])
+            planet["house"] = int(houses[row, col]) if known_time[row] else None
+            planets[body] = planet
+        lagna_sign = int(signs[row, -1])
+        charts.append({
+            "_id": birth.key,
+            "engine_version": ENGINE_VERSION,
+            "birth": {
+                **birth._asdict(),
+                "birth_time_unknown": birth.minutes is None,
+                "utc": moments[row].isoformat(),
+            },
+            "ayanamsa": round(float(ayanamsa[row]), 4),
+            "ascendant": (
+                _position(points[row, -1], lagna_sign, nakshatras[row, -1], padas[row, -1])
+                if known_time[row] else None
+            ),
+            "houses": (
+                [{"house": h + 1, "sign": RASHIS[(lagna_sign + h) % 12]} for h in range(12)]
+                if known_time[row] else None
+            ),
+            "planets": planets,
+            "computed_at": datetime.now(timezone.utc),
+        })
+    return charts
+
+
+def _remember(chart: dict):
+    _memo[chart["_id"]] = chart
+    _memo.move_to_end(chart["_id"])
+    while len(_memo) > settings.KUNDLI_CACHE_SIZE:
+        _memo.popitem(last=False)
+
+
+async def charts_for(inputs: list[BirthInput]) -> list[dict]:
+    """Charts for ``inputs`` in order: memo, then ``db.kundli_charts``, then one batch."""
+    keys = [birth.key for birth in inputs]
+    found: dict[str, dict] = {}
+    for key in keys:
+        if key in _memo:
+            _memo.move_to_end(key)
+            found[key] = _memo[key]
+    _stats["hits"] += len(found)
+
+    missing = [key for key in dict.fromkeys(keys) if key not in found]
+    if missing:
+        db = get_db()
+        async for chart in db.kundli_charts.find({"_id": {"$in": missing}}):
+            found[chart["_id"]] = chart
+            _remember(chart)
+            _stats["db_hits"] += 1
+
+    pending = {birth.key: birth for birth in inputs if birth.key not in found}
+    if pending:
+        computed = compute_charts(list(pending.values()))
+        _stats["computed"] += len(computed)
+        for chart in computed:
+            found[chart["_id"]] = chart
+            _remember(chart)
+        try:
+            await get_db().kundli_charts.insert_many([dict(c) for c in computed], ordered=False)
+        except BulkWriteError:
+            pass  # another worker stored the same chart first
+    return [found[key] for key in keys]
+
+
+async def upcoming_bookings() -> list[dict]:
+    db = get_db()
+    cursor = db.bookings.find(
+        {"service_slug": SERVICE_SLUG, "status": {"$in": UPCOMING_STATUSES}},
+        {
+            "date_of_birth": 1, "time_of_birth": 1, "birth_time_unknown": 1,
+            "birth_latitude": 1, "birth_longitude": 1,
+        },
+    )
+    return [doc async for doc in cursor]
+
+
+async def precompute_upcoming() -> dict:
+    """Compute (or load) the charts of every upcoming premium-kundli booking."""
+    bookings = await upcoming_bookings()
+    inputs, invalid = [], []
+    for booking in bookings:
+        try:
+            inputs.append(birth_input(booking))
+        except (ValueError, TypeError):
+            invalid.append(str(booking["_id"]))
+    before = _stats["computed"]
+    await charts_for(inputs)
+    computed = _stats["computed"] - before
+    if invalid:
+        logger.warning("kundli precompute skipped bookings", extra={"booking_ids": invalid})
+    return {
+        "bookings": len(bookings),
+        "charts": len({birth.key for birth in inputs}),
+        "computed": computed,
+        "invalid": invalid,
+    }
+
+
+def metrics() -> dict:
+    return {"memoized": len(_memo), **_stats}
+
+
+def reset():
+    _memo.clear()
+    _stats.update(hits=0, db_hits=0, computed=0)
@@ -0,0 +1,180 @@
+"""Token-bucket rate limiting with in-memory and Mongo-backed stores.
+
+Limits are written as ``"<capacity>/<period>"`` (e.g. ``"5/minute"``): a
+bucket holds up to ``capacity`` tokens and refills at
+``capacity / period`` tokens per second. Each request spends one token.
+
+The memory store is per worker. The Mongo store keeps buckets in
+``db.rate_limits`` and updates them atomically with a pipeline update, so
+every uvicorn worker and ECS task shares the same counters.
+"""
+
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.database import get_db
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Refilled memory buckets are swept once the table grows past this size,
+# at most once per MEMORY_SWEEP_SECONDS
+MEMORY_SWEEP_THRESHOLD = 10_000
+MEMORY_SWEEP_SECONDS = 60
+
+
+class Limit(NamedTuple):
+    capacity: int
+    period: int
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    retry_after: int
+
+
+def parse_limit(spec: str) -> Limit:
+    """Parse ``"10/minute"`` or ``"10/60"`` into a :class:`Limit`."""
+    count, _, period = spec.partition("/")
+    period = period.strip().lower()
+    seconds = PERIODS.get(period.rstrip("s")) or int(period)
+    capacity = int(count)
+    if capacity < 1 or seconds < 1:
+        raise ValueError(f"Invalid rate limit: {spec}")
+    return Limit(capacity=capacity, period=seconds)
+
+
+def _retry_after(tokens: float, limit: Limit) -> int:
+    return max(1, math.ceil((1 - tokens) / limit.rate))
+
+
+class MemoryStore:
+    """Per-process buckets; fine for a single worker or local dev."""
+
+    def __init__(self):
+        # key -> (tokens, updated, refilled_by)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._swept_at = float("-inf")
+
+    async def hit(self, key: str, limit: Limit) -> Decision:
+        now = time.monotonic()
+        tokens, updated, _ = self._buckets.get(key, (float(limit.capacity), now, now))
+        tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+
+        if tokens >= 1:
+            tokens -= 1
+            decision = Decision(allowed=True, retry_after=0)
+        else:
+            decision = Decision(allowed=False, retry_after=_retry_after(tokens, limit))
+        self._buckets[key] = (tokens, now, now + limit.period)
+
+        if len(self._buckets) > MEMORY_SWEEP_THRESHOLD and now - self._swept_at >= MEMORY_SWEEP_SECONDS:
+            self._sweep(now)
+        return decision
+
+    def _sweep(self, now: float):
+        # A bucket idle for its limit's period is full again, the same as a
+        # missing one, so dropping it changes no decision
+        self._buckets = {k: v for k, v in self._buckets.items() if v[2] > now}
+        self._swept_at = now
+
+    def reset(self):
+        self._buckets.clear()
+        self._swept_at = float("-inf")
+
+
+class MongoStore:
+    """Buckets shared by all workers via ``db.rate_limits``.
+
+    Each hit is one ``find_one_and_update`` with a pipeline that refills,
+    spends and records the decision server-side. Documents carry a TTL so
+    idle buckets are cleaned up by Mongo.
+    """
+
+    def __init__(self):
+        self._indexed = False
+
+    async def _ensure_indexes(self, db):
+        if not self._indexed:
+            await db.rate_limits.create_index("expires_at", expireAfterSeconds=0)
+            self._indexed = True
+
+    async def hit(self, key: str, limit: Limit) -> Decision:
+        db = get_db()
+        await self._ensure_indexes(db)
+
+        now = datetime.now(timezone.utc)
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {
+            "$min": [
+                limit.capacity,
+                {"$add": [{"$ifNull": ["$tokens", limit.capacity]}, {"$multiply": [elapsed, limit.rate]}]},
+            ]
+        }
+        pipeline = [
+            {"$set": {"tokens": refilled, "updated_at": now}},
+            {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+            {
+                "$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "expires_at": now + timedelta(seconds=limit.period),
+                }
+            },
+        ]
+        try:
+            doc = await self._update(db, key, pipeline)
+        except DuplicateKeyError:
+            # Two first hits raced to insert the bucket; the loser's retry
+            # finds the winner's document and updates it
+            doc = await self._update(db, key, pipeline)
+        if doc["allowed"]:
+            return Decision(allowed=True, retry_after=0)
+        return Decision(allowed=False, retry_after=_retry_after(doc["tokens"], limit))
+
+    @staticmethod
+    async def _update(db, key: str, pipeline: list) -> dict:
+        return await db.rate_limits.find_one_and_update(
+            {"_id": key},
+            pipeline,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def reset(self):
+        self._indexed = False
+
+
+_store: MemoryStore | MongoStore | None = None
+
+
+def get_store() -> MemoryStore | MongoStore:
+    global _store
+    if _store is None:
+        _store = MongoStore() if settings.RATE_LIMIT_BACKEND == "mongo" else MemoryStore()
+    return _store
+
+
+def reset_store():
+    """Drop the active store (tests, or after changing the backend)."""
+    global _store
+    _store = None
+
+
+async def check(name: str, identity: str) -> Decision:
+    """Spend a token from the ``name`` bucket for ``identity``.
+
+    Names without a configured limit are always allowed.
+    """
+    spec = settings.RATE_LIMITS.get(name)
+    if not settings.RATE_LIMIT_ENABLED or not spec:
+        return Decision(allowed=True, retry_after=0)
+    return await get_store().hit(f"{name}:{identity}", parse_limit(spec))
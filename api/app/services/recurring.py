@@ -0,0 +1,78 @@
+"""Recurring unavailability rules (``db.unavailability_rules``).
+
+A rule such as "every other Tuesday 13:00-14:00 until 2026-09-30" is stored
+as one document and expanded for a given date at query time, instead of
+being materialized as one unavailability row per occurrence::
+
+    {
+        "weekday": 1,              # 0=Mon ... 6=Sun
+        "interval_weeks": 2,
+        "start_date": "2026-03-03",
+        "until": "2026-09-30",     # or None for open-ended
+        "start_time": "13:00",
+        "end_time": "14:00",
+        "is_holiday": False,
+        "reason": "",
+    }
+"""
+
+import time
+from datetime import date
+
+from app.database import get_db
+from app.services import invalidation
+from app.services.intervals import to_minutes
+
+RULES_CACHE_SECONDS = 30
+RULES_TOPIC = "unavailability_rules"
+
+_cache: tuple[float, list[dict]] | None = None
+
+
+async def load_rules() -> list[dict]:
+    """All rules, cached in-process for ``RULES_CACHE_SECONDS``."""
+    global _cache
+    now = time.monotonic()
+    if _cache and now - _cache[0] < RULES_CACHE_SECONDS:
+        return _cache[1]
+
+    db = get_db()
+    rules = [doc async for doc in db.unavailability_rules.find({})]
+    _cache = (now, rules)
+    return rules
+
+
+def invalidate_rules(_key: str | None = None):
+    global _cache
+    _cache = None
+
+
+invalidation.subscribe(RULES_TOPIC, invalidate_rules)
+
+
+def rule_applies(rule: dict, day: date) -> bool:
+    if day.weekday() != rule["weekday"]:
+        return False
+    iso = day.isoformat()
+    if iso < rule["start_date"] or (rule.get("until") and iso > rule["until"]):
+        return False
+    weeks = (day - date.fromisoformat(rule["start_date"])).days // 7
+    return weeks % rule.get("interval_weeks", 1) == 0
+
+
+def expand(rules: list[dict], day: date) -> tuple[bool, list[tuple[int, int]]]:
+    """Return ``(is_holiday, [(start_min, end_min), ...])`` for ``day``."""
+    holiday = False
+    intervals = []
+    for rule in rules:
+        if not rule_applies(rule, day):
+            continue
+        if rule.get("is_holiday"):
+            holiday = True
+        else:
+            intervals.append((to_minutes(rule["start_time"]), to_minutes(rule["end_time"])))
+    return holiday, intervals
+
+
+async def rules_for_date(day: date) -> tuple[bool, list[tuple[int, int]]]:
+    return expand(await load_rules(), day)
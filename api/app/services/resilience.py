@@ -0,0 +1,257 @@
+"""Failure isolation for calls to external services (Stripe, Resend).
+
+The SDKs are synchronous, so each call runs in a worker thread behind
+three guards, per dependency and per worker:
+
+* **Deadline** — the caller gets ``GatewayTimeoutError`` (504) after
+  ``<NAME>_TIMEOUT_SECONDS``. The SDK's own HTTP timeout is set to the same
+  value so the abandoned thread finishes soon after.
+* **Bulkhead** — at most ``<NAME>_MAX_CONCURRENCY`` calls in flight (an
+  abandoned call keeps its slot until its thread returns). Further calls
+  are rejected at once with 503 instead of queueing behind a slow upstream.
+* **Circuit breaker** — when at least ``BREAKER_ERROR_RATE`` of the last
+  ``BREAKER_WINDOW`` calls failed (once ``BREAKER_MIN_CALLS`` were made),
+  calls fail fast with 503 for ``BREAKER_OPEN_SECONDS``. Then a single
+  probe call is let through (half-open): success closes the breaker,
+  failure opens it again. Each call hands back the ``Permit`` it got from
+  ``allow()``, so only the probe settles the half-open state and calls
+  that started before the breaker last opened are ignored.
+
+Only outages count as failures (timeouts, connection errors, 5xx and rate
+limits); an upstream 4xx means the request was bad, not the service.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Callable, NamedTuple
+
+from app.config import settings
+from app.utils.exceptions import GatewayTimeoutError, ServiceUnavailableError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class Permit(NamedTuple):
+    epoch: int  # times_opened when the call was allowed
+    probe: bool
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        window: int,
+        min_calls: int,
+        error_rate: float,
+        open_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            return HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - self._clock())
+
+    def allow(self) -> Permit | None:
+        """A permit for the call, or ``None``; in half-open, one probe at a time."""
+        state = self.state
+        if state == CLOSED:
+            return Permit(self.times_opened, probe=False)
+        if state == OPEN or self._probing:
+            return None
+        self._state = HALF_OPEN
+        self._probing = True
+        return Permit(self.times_opened, probe=True)
+
+    def record(self, permit: Permit, success: bool):
+        if permit.probe:
+            self._probing = False
+            if success:
+                self._state = CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+        if permit.epoch != self.times_opened:
+            return  # started before the breaker last opened
+        self._outcomes.append(success)
+        calls = len(self._outcomes)
+        if calls >= self.min_calls and self._outcomes.count(False) / calls >= self.error_rate:
+            self._open()
+
+    def abandon(self, permit: Permit):
+        """The call ended without an outcome (cancelled); free the probe."""
+        if permit.probe:
+            self._probing = False
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.times_opened += 1
+
+    def metrics(self) -> dict:
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "window_failures": self._outcomes.count(False),
+            "times_opened": self.times_opened,
+            "retry_after_seconds": round(self.retry_after(), 1) if self.state == OPEN else 0,
+        }
+
+
+def _always(exc: BaseException) -> bool:
+    return True
+
+
+class Dependency:
+    """Deadline, bulkhead and circuit breaker around one external service."""
+
+    def __init__(
+        self,
+        label: str,
+        timeout: float,
+        max_concurrency: int,
+        breaker: CircuitBreaker,
+        is_failure: Callable[[BaseException], bool] = _always,
+    ):
+        self.label = label
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker
+        self.is_failure = is_failure
+        self.in_flight = 0
+        self.stats = {"calls": 0, "failures": 0, "timeouts": 0, "rejected_open": 0, "rejected_full": 0}
+
+    async def call(self, fn: Callable, *args, **kwargs):
+        """Run the blocking ``fn(*args, **kwargs)`` in a thread under the guards."""
+        if self.in_flight >= self.max_concurrency:
+            self.stats["rejected_full"] += 1
+            raise ServiceUnavailableError(1, f"{self.label} is busy, try again shortly")
+        permit = self.breaker.allow()
+        if permit is None:
+            self.stats["rejected_open"] += 1
+            raise ServiceUnavailableError(
+                max(1, math.ceil(self.breaker.retry_after())),
+                f"{self.label} is unavailable, try again shortly",
+            )
+
+        self.stats["calls"] += 1
+        self.in_flight += 1
+        future = asyncio.ensure_future(asyncio.to_thread(fn, *args, **kwargs))
+        future.add_done_callback(self._release)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            self._failed(permit)
+            raise GatewayTimeoutError(f"{self.label} did not respond in time")
+        except asyncio.CancelledError:
+            self.breaker.abandon(permit)
+            raise
+        except Exception as exc:
+            if self.is_failure(exc):
+                self._failed(permit)
+            else:
+                self.breaker.record(permit, True)
+            raise
+        self.breaker.record(permit, True)
+        return result
+
+    def _failed(self, permit: Permit):
+        self.stats["failures"] += 1
+        self.breaker.record(permit, False)
+
+    def _release(self, future: asyncio.Future):
+        self.in_flight -= 1
+        if not future.cancelled():
+            future.exception()  # retrieved: the caller may have timed out
+
+    def metrics(self) -> dict:
+        return {
+            **self.breaker.metrics(),
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout,
+            **self.stats,
+        }
+
+
+def _stripe_outage(exc: BaseException) -> bool:
+    import stripe
+
+    if isinstance(exc, (stripe.APIConnectionError, stripe.RateLimitError)):
+        return True
+    if isinstance(exc, stripe.StripeError):
+        return (exc.http_status or 500) >= 500
+    return True
+
+
+def _resend_outage(exc: BaseException) -> bool:
+    from resend.exceptions import ResendError
+
+    if isinstance(exc, ResendError):
+        try:
+            code = int(exc.code)
+        except (TypeError, ValueError):
+            return True
+        return code >= 500 or code == 429
+    return True
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        window=settings.BREAKER_WINDOW,
+        min_calls=settings.BREAKER_MIN_CALLS,
+        error_rate=settings.BREAKER_ERROR_RATE,
+        open_seconds=settings.BREAKER_OPEN_SECONDS,
+    )
+
+
+_FACTORIES: dict[str, Callable[[], Dependency]] = {
+    "stripe": lambda: Dependency(
+        "Stripe",
+        settings.STRIPE_TIMEOUT_SECONDS,
+        settings.STRIPE_MAX_CONCURRENCY,
+        _breaker(),
+        _stripe_outage,
+    ),
+    "resend": lambda: Dependency(
+        "Resend",
+        settings.RESEND_TIMEOUT_SECONDS,
+        settings.RESEND_MAX_CONCURRENCY,
+        _breaker(),
+        _resend_outage,
+    ),
+}
+_dependencies: dict[str, Dependency] = {}
+
+
+def get(name: str) -> Dependency:
+    if name not in _dependencies:
+        _dependencies[name] = _FACTORIES[name]()
+    return _dependencies[name]
+
+
+def metrics() -> dict:
+    return {name: get(name).metrics() for name in _FACTORIES}
+
+
+def reset():
+    _dependencies.clear()
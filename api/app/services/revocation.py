@@ -0,0 +1,247 @@
+"""Refresh-token and session revocation.
+
+Refresh tokens carry a ``jti`` (token id) and a ``sid`` (session id) that
+stays the same across rotations. Access tokens carry the ``sid`` only.
+Revoked ids go to ``db.revoked_tokens``::
+
+    {"_id": "<jti or sid>", "kind": "rotated" | "session",
+     "revoked_at": ..., "expires_at": <token expiry>}
+
+Documents are removed by a TTL index once the token they revoke would have
+expired anyway.
+
+A rotated ``jti`` is only ever checked by inserting it again on refresh
+(the duplicate key is the signal), so it never needs to be in memory.
+Session ids are checked on every authenticated request. Looking each one up
+would cost a Mongo read per request, so each worker keeps a Bloom filter of
+revoked session ids:
+
+* ``revoke()`` of a session adds the id locally and publishes it on the
+  invalidation bus, so other workers add it within the bus lag.
+* ``RevocationList.sync()`` pulls session revocations newer than the last
+  pull (``revoked_at`` is indexed) every ``REVOCATION_SYNC_SECONDS``. This
+  is the backstop for missed bus events. The filter is rebuilt from the
+  collection every ``REBUILD_SECONDS`` so expired ids age out.
+
+``is_revoked()`` answers "no" from memory for ids not in the filter. Only
+probable hits (real revocations plus ~``REVOCATION_BLOOM_ERROR_RATE``
+false positives) fall through to an ``_id`` lookup. Until the first sync
+has completed, every check goes to the database.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.database import get_db
+from app.services import invalidation
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_TOPIC = "revocations"
+REBUILD_SECONDS = 3600
+# Pull a little before the watermark: revoked_at comes from each worker's clock
+CLOCK_SKEW_SECONDS = 5
+
+ROTATED = "rotated"
+SESSION = "session"
+
+_indexed = False
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> bool:
+        """Set ``item``'s bits; ``False`` (and not counted) if all were set.
+
+        Re-adding an id, as the bus and overlapping delta pulls do, leaves
+        ``count`` alone, so it tracks distinct items (less the rare id that
+        is already a false positive).
+        """
+        added = False
+        for pos in self._positions(item):
+            byte, bit = pos >> 3, 1 << (pos & 7)
+            if not self._bits[byte] & bit:
+                self._bits[byte] |= bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+async def ensure_indexes(db):
+    global _indexed
+    if not _indexed:
+        await db.revoked_tokens.create_index("expires_at", expireAfterSeconds=0)
+        await db.revoked_tokens.create_index("revoked_at")
+        _indexed = True
+
+
+class RevocationList:
+    def __init__(self):
+        self.filter = self._new_filter()
+        self.ready = False
+        self._watermark: datetime | None = None
+        self._rebuilt_at = 0.0
+        self._task: asyncio.Task | None = None
+        self.checks = 0
+        self.lookups = 0
+        self.false_positives = 0
+
+    @staticmethod
+    def _new_filter() -> BloomFilter:
+        return BloomFilter(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE)
+
+    def add(self, token_id: str):
+        self.filter.add(token_id)
+
+    async def rebuild(self):
+        """Load every unexpired revocation into a fresh filter and swap it in."""
+        db = get_db()
+        await ensure_indexes(db)
+        started = datetime.now(timezone.utc)
+        fresh = self._new_filter()
+        async for doc in db.revoked_tokens.find({"kind": SESSION}, {"_id": 1}):
+            fresh.add(doc["_id"])
+        # Ids revoked locally or via the bus while loading are in the old filter
+        # and the collection; the next delta pull re-adds them.
+        self.filter = fresh
+        self._watermark = started
+        self._rebuilt_at = time.monotonic()
+        self.ready = True
+
+    async def sync(self):
+        """Delta pull of revocations since the last pull (full rebuild when due)."""
+        if (
+            not self.ready
+            or time.monotonic() - self._rebuilt_at > REBUILD_SECONDS
+            or self.filter.count > settings.REVOCATION_BLOOM_CAPACITY
+        ):
+            await self.rebuild()
+            return
+        db = get_db()
+        since = self._watermark - timedelta(seconds=CLOCK_SKEW_SECONDS)
+        cursor = db.revoked_tokens.find(
+            {"revoked_at": {"$gt": since}, "kind": SESSION}, {"_id": 1, "revoked_at": 1}
+        )
+        async for doc in cursor:
+            self.filter.add(doc["_id"])
+            revoked_at = doc["revoked_at"]
+            if revoked_at.tzinfo is None:
+                revoked_at = revoked_at.replace(tzinfo=timezone.utc)
+            self._watermark = max(self._watermark, revoked_at)
+
+    async def is_revoked(self, token_id: str) -> bool:
+        self.checks += 1
+        if self.ready and token_id not in self.filter:
+            return False
+        self.lookups += 1
+        db = get_db()
+        doc = await db.revoked_tokens.find_one({"_id": token_id}, projection={"_id": 1})
+        if doc is None and self.ready:
+            self.false_positives += 1
+        return doc is not None
+
+    async def run(self):
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("revocation sync failed")
+            await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def metrics(self) -> dict:
+        return {
+            "worker": invalidation.WORKER_ID,
+            "ready": self.ready,
+            "filter_bits": self.filter.size,
+            "filter_hashes": self.filter.hashes,
+            "filter_items": self.filter.count,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+            "checks": self.checks,
+            "lookups": self.lookups,
+            "false_positives": self.false_positives,
+        }
+
+
+_list: RevocationList | None = None
+
+
+def get_list() -> RevocationList:
+    global _list
+    if _list is None:
+        _list = RevocationList()
+    return _list
+
+
+async def is_revoked(token_id: str) -> bool:
+    return await get_list().is_revoked(token_id)
+
+
+async def revoke(token_id: str, kind: str, expires_at: datetime) -> bool:
+    """Revoke ``token_id`` until ``expires_at``; ``False`` if already revoked.
+
+    Only ``SESSION`` revocations are broadcast; see the module docstring.
+    """
+    db = get_db()
+    await ensure_indexes(db)
+    try:
+        await db.revoked_tokens.insert_one({
+            "_id": token_id,
+            "kind": kind,
+            "revoked_at": datetime.now(timezone.utc),
+            "expires_at": expires_at,
+        })
+    except DuplicateKeyError:
+        return False
+    if kind == SESSION:
+        await invalidation.publish(REVOCATION_TOPIC, token_id)
+    return True
+
+
+def _on_revoked(token_id: str | None):
+    if _list is not None and token_id:
+        _list.add(token_id)
+
+
+invalidation.subscribe(REVOCATION_TOPIC, _on_revoked)
+
+
+def reset():
+    global _list, _indexed
+    if _list is not None and _list._task is not None:
+        _list._task.cancel()
+    _list = None
+    _indexed = False
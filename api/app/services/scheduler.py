@@ -0,0 +1,316 @@
+"""Single-leader background job scheduler.
+
+Every API worker runs a ``Scheduler``, but only the holder of the lease
+document in ``db.scheduler_leases`` runs jobs, so each job runs once
+cluster-wide however many workers and tasks are up::
+
+    {"_id": "scheduler", "owner": "<host>:<pid>:<nonce>", "expires_at": ...}
+
+The leader renews the lease every ``lease_seconds / RENEW_FRACTION``.
+Other workers read the lease and only try to take it once the
+``expires_at`` they saw has passed, so followers cost one read per lease
+period rather than a failed upsert per tick. If the leader dies, another
+worker takes over once ``expires_at`` passes. Per-job state and metrics live in
+``db.scheduler_jobs``, so a new leader continues the schedule rather than
+restarting it::
+
+    {
+        "_id": "auto_complete_bookings",
+        "next_run": ..., "last_run": ...,
+        "runs": 12, "failures": 0,
+        "last_duration_ms": 8.1, "last_lag_ms": 3.0, "max_lag_ms": 950.2,
+        "last_error": None,
+    }
+
+Jobs run either ``every`` N seconds or on a 5-field ``cron`` expression
+(minute hour day-of-month month day-of-week, in UTC). A job is never run
+again while its previous run is still in progress.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.database import get_db
+
+logger = logging.getLogger(__name__)
+
+LEASE_ID = "scheduler"
+LEASE_SECONDS = 30
+TICK_SECONDS = 1.0
+RENEW_FRACTION = 3
+
+
+# ── Cron ──
+
+
+def _parse_field(field: str, low: int, high: int) -> set[int]:
+    values: set[int] = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/")
+            step = int(step_str)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-"))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Invalid cron field: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Minimal 5-field cron (``*``, ``a-b``, ``*/n``, ``a,b``); Sunday is 0."""
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in _parse_field(fields[4], 0, 7)}
+
+    def _day_matches(self, day: datetime) -> bool:
+        # Python weekday(): Monday=0; cron: Sunday=0
+        return (
+            day.month in self.months
+            and day.day in self.days
+            and (day.weekday() + 1) % 7 in self.weekdays
+        )
+
+    def next_after(self, t: datetime) -> datetime:
+        """First matching minute strictly after ``t``."""
+        t = t.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(366 * 5):
+            if self._day_matches(t):
+                for hour in sorted(h for h in self.hours if h >= t.hour):
+                    first = t.minute if hour == t.hour else 0
+                    for minute in sorted(self.minutes):
+                        if minute >= first:
+                            return t.replace(hour=hour, minute=minute)
+            t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ValueError(f"Cron expression never fires: {self.expr!r}")
+
+
+# ── Jobs ──
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable],
+        every: float | None = None,
+        cron: str | None = None,
+    ):
+        if (every is None) == (cron is None):
+            raise ValueError("Job needs exactly one of every= or cron=")
+        self.name = name
+        self.func = func
+        self.every = every
+        self.cron = CronSchedule(cron) if cron else None
+        self.next_run: datetime | None = None
+        self.running = False
+
+    def first_run(self, now: datetime) -> datetime:
+        return now if self.every is not None else self.cron.next_after(now)
+
+    def next_after(self, scheduled: datetime, now: datetime) -> datetime:
+        if self.cron:
+            return self.cron.next_after(now)
+        nxt = scheduled + timedelta(seconds=self.every)
+        # After a long stall, resume from now rather than replaying missed runs
+        return nxt if nxt > now else now + timedelta(seconds=self.every)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class Scheduler:
+    def __init__(
+        self,
+        lease_seconds: float = LEASE_SECONDS,
+        tick_seconds: float = TICK_SECONDS,
+        owner: str | None = None,
+    ):
+        self.lease_seconds = lease_seconds
+        self.tick_seconds = tick_seconds
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs: dict[str, Job] = {}
+        self.is_leader = False
+        self._renew_at: datetime | None = None
+        self._held_until: datetime | None = None
+        self._task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def add(self, name: str, func, every: float | None = None, cron: str | None = None) -> Job:
+        job = Job(name, func, every=every, cron=cron)
+        self.jobs[name] = job
+        return job
+
+    # ── Leadership ──
+
+    async def acquire(self, now: datetime | None = None) -> bool:
+        """Take or renew the lease; returns whether this worker is leader."""
+        db = get_db()
+        now = now or datetime.now(timezone.utc)
+        if self.is_leader and self._renew_at and now < self._renew_at:
+            return True
+        if not self.is_leader:
+            if self._held_until and now <= self._held_until:
+                return False
+            lease = await db.scheduler_leases.find_one({"_id": LEASE_ID})
+            if lease and lease.get("owner") != self.owner:
+                expires_at = _as_utc(lease["expires_at"])
+                if expires_at >= now:
+                    # Held elsewhere: look again once it would have expired
+                    self._held_until = expires_at
+                    return False
+        try:
+            doc = await db.scheduler_leases.find_one_and_update(
+                {
+                    "_id": LEASE_ID,
+                    "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}],
+                },
+                {"$set": {
+                    "owner": self.owner,
+                    "expires_at": now + timedelta(seconds=self.lease_seconds),
+                }},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            leader = bool(doc) and doc.get("owner") == self.owner
+        except DuplicateKeyError:
+            # Another worker holds an unexpired lease
+            leader = False
+
+        if leader and not self.is_leader:
+            await self._load_job_state(now)
+        self.is_leader = leader
+        if leader:
+            self._renew_at = now + timedelta(seconds=self.lease_seconds / RENEW_FRACTION)
+        return leader
+
+    async def release(self):
+        if not self.is_leader:
+            return
+        db = get_db()
+        await db.scheduler_leases.delete_one({"_id": LEASE_ID, "owner": self.owner})
+        self.is_leader = False
+
+    async def _load_job_state(self, now: datetime):
+        db = get_db()
+        stored = {
+            doc["_id"]: doc
+            async for doc in db.scheduler_jobs.find({"_id": {"$in": list(self.jobs)}})
+        }
+        for name, job in self.jobs.items():
+            next_run = stored.get(name, {}).get("next_run")
+            job.next_run = _as_utc(next_run) if next_run else job.first_run(now)
+
+    # ── Running ──
+
+    async def tick(self, now: datetime | None = None) -> list[str]:
+        """Start every due job that is not already running (leader only)."""
+        if not self.is_leader:
+            return []
+        now = now or datetime.now(timezone.utc)
+        started = []
+        for job in self.jobs.values():
+            if job.running or job.next_run is None or job.next_run > now:
+                continue
+            scheduled = job.next_run
+            job.next_run = job.next_after(scheduled, now)
+            job.running = True
+            task = asyncio.create_task(self._run_job(job, scheduled, now))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            started.append(job.name)
+        return started
+
+    async def _run_job(self, job: Job, scheduled: datetime, started_at: datetime):
+        lag_ms = (started_at - scheduled).total_seconds() * 1000
+        t0 = time.perf_counter()
+        error = None
+        try:
+            await job.func()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.exception("scheduled job failed", extra={"job": job.name})
+        finally:
+            job.running = False
+        duration_ms = (time.perf_counter() - t0) * 1000
+
+        db = get_db()
+        await db.scheduler_jobs.update_one(
+            {"_id": job.name},
+            {
+                "$set": {
+                    "next_run": job.next_run,
+                    "last_run": started_at,
+                    "last_duration_ms": round(duration_ms, 3),
+                    "last_lag_ms": round(lag_ms, 3),
+                    "last_error": error,
+                },
+                "$max": {"max_lag_ms": round(lag_ms, 3)},
+                "$inc": {"runs": 1, "failures": 1 if error else 0},
+            },
+            upsert=True,
+        )
+
+    async def run_forever(self):
+        while True:
+            try:
+                if await self.acquire():
+                    await self.tick()
+            except Exception:
+                logger.exception("scheduler tick failed")
+                self.is_leader = False
+            await asyncio.sleep(self.tick_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._running):
+            task.cancel()
+        try:
+            await self.release()
+        except Exception:
+            pass
+
+
+async def job_metrics() -> dict:
+    """Cluster-wide view: current lease holder plus per-job metrics."""
+    db = get_db()
+    lease = await db.scheduler_leases.find_one({"_id": LEASE_ID})
+    jobs = []
+    async for doc in db.scheduler_jobs.find({}):
+        doc["name"] = doc.pop("_id")
+        jobs.append(doc)
+    return {
+        "leader": lease.get("owner") if lease else None,
+        "lease_expires_at": lease.get("expires_at") if lease else None,
+        "jobs": jobs,
+    }
@@ -1,18 +1,51 @@
 """Shared business hours settings accessor."""
 
+import time
+
 from app.database import get_db
 from app.models.availability import BusinessHoursSettings, DayHours
+from app.services import invalidation
 
 DEFAULT_SETTINGS = BusinessHoursSettings()
 
+# Business hours change rarely but are read on every slot/booking request
+BUSINESS_HOURS_CACHE_SECONDS = 30
+BUSINESS_HOURS_TOPIC = "business_hours"
+
+_cache: tuple[float, BusinessHoursSettings] | None = None
+
 
 async def get_business_hours() -> BusinessHoursSettings:
-    """Load business hours from DB, or return defaults if none exist."""
+    """Load business hours from DB, or return defaults if none exist.
+
+    Results are cached in-process for ``BUSINESS_HOURS_CACHE_SECONDS``.
+    """
+    global _cache
+    now = time.monotonic()
+    if _cache and now - _cache[0] < BUSINESS_HOURS_CACHE_SECONDS:
+        return _cache[1]
+
     db = get_db()
     doc = await db.settings.find_one({"_id": "business_hours"})
     if not doc:
-        return DEFAULT_SETTINGS
-    return BusinessHoursSettings(
-        timezone=doc.get("timezone", "Asia/Kolkata"),
-        weekly_hours=[DayHours(**d) for d in doc.get("weekly_hours", [])],
-    )
+        result = DEFAULT_SETTINGS
+    else:
+        result = BusinessHoursSettings(
+            timezone=doc.get("timezone", "Asia/Kolkata"),
+            weekly_hours=[DayHours(**d) for d in doc.get("weekly_hours", [])],
+        )
+    _cache = (now, result)
+    return result
+
+
+def invalidate_business_hours(_key: str | None = None):
+    """Drop the cached business hours.
+
+    Writers publish ``BUSINESS_HOURS_TOPIC`` on the invalidation bus, which
+    calls this on every worker.
+    """
+    global _cache
+    _cache = None
+
+
+invalidation.subscribe(BUSINESS_HOURS_TOPIC, invalidate_business_hours)
@@ -0,0 +1,149 @@
+"""Per-worker fan-out of live slot availability.
+
+Open booking pages subscribe to one or more dates over SSE. Each worker
+keeps one ``SlotHub`` holding the last known slot list for every date that
+has subscribers. When a write publishes ``SLOTS_TOPIC`` on the invalidation
+bus (key = date, or ``None`` for every date), the hub recomputes each
+affected date once and pushes only the added/removed slots to every
+subscriber queue. A thousand open pages therefore cost one slot query per
+change per worker, not one query per page per poll.
+
+Pending bookings expire and today's slots pass without any write, so
+subscribed dates are also refreshed every ``REFRESH_SECONDS``.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from app.services import invalidation
+
+logger = logging.getLogger(__name__)
+
+SLOTS_TOPIC = "slots"
+REFRESH_SECONDS = 60
+QUEUE_SIZE = 100
+
+# Queued instead of a delta when a subscriber fell too far behind
+RESYNC = None
+
+
+async def publish_change(date_str: str | None = None):
+    """Tell every worker that ``date_str`` (or all dates) may have changed."""
+    await invalidation.publish(SLOTS_TOPIC, date_str)
+
+
+class SlotHub:
+    def __init__(self, compute: Callable[[str], Awaitable[list]]):
+        self.compute = compute
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._snapshots: dict[str, dict[str, dict]] = {}
+        self._dirty: set[str] = set()
+        self._refresher: asyncio.Task | None = None
+        self._periodic: asyncio.Task | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({id(q) for qs in self._subscribers.values() for q in qs})
+
+    async def _load(self, date_str: str) -> dict[str, dict]:
+        slots = await self.compute(date_str)
+        return {s.start: s.model_dump() for s in slots}
+
+    async def subscribe(self, dates: list[str]) -> tuple[asyncio.Queue, dict[str, list[dict]]]:
+        """Register a subscriber; returns its queue and the current snapshot."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        for date_str in dates:
+            if date_str not in self._snapshots:
+                self._snapshots[date_str] = await self._load(date_str)
+            self._subscribers.setdefault(date_str, set()).add(queue)
+        if self._periodic is None:
+            self._periodic = asyncio.create_task(self._refresh_periodically())
+        return queue, self.snapshot(dates)
+
+    def unsubscribe(self, queue: asyncio.Queue, dates: list[str]):
+        for date_str in dates:
+            queues = self._subscribers.get(date_str)
+            if queues is None:
+                continue
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[date_str]
+                self._snapshots.pop(date_str, None)
+        if not self._subscribers and self._periodic is not None:
+            self._periodic.cancel()
+            self._periodic = None
+
+    def notify(self, date_str: str | None = None):
+        """Invalidation bus handler: schedule a coalesced refresh."""
+        dates = set(self._subscribers) if date_str is None else {date_str} & set(self._subscribers)
+        if not dates:
+            return
+        self._dirty |= dates
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self):
+        # Changes that arrive while a refresh runs are picked up by the next pass
+        while self._dirty:
+            date_str = self._dirty.pop()
+            await self.refresh(date_str)
+
+    async def refresh(self, date_str: str):
+        """Recompute one date and push the delta to its subscribers."""
+        if date_str not in self._subscribers:
+            return
+        try:
+            current = await self._load(date_str)
+        except Exception:
+            logger.exception("slot refresh failed", extra={"date": date_str})
+            return
+        previous = self._snapshots.get(date_str, {})
+        added = [current[k] for k in sorted(current.keys() - previous.keys())]
+        removed = [previous[k] for k in sorted(previous.keys() - current.keys())]
+        self._snapshots[date_str] = current
+        if not added and not removed:
+            return
+
+        delta = {"date": date_str, "added": added, "removed": removed}
+        for queue in list(self._subscribers.get(date_str, ())):
+            try:
+                queue.put_nowait(delta)
+            except asyncio.QueueFull:
+                # Client is not keeping up: drop its backlog and ask it to resync
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+    def snapshot(self, dates: list[str]) -> dict[str, list[dict]]:
+        return {d: list(self._snapshots.get(d, {}).values()) for d in dates}
+
+    async def _refresh_periodically(self):
+        while True:
+            await asyncio.sleep(REFRESH_SECONDS)
+            self.notify(None)
+
+
+_hub: SlotHub | None = None
+
+
+def get_hub(compute: Callable[[str], Awaitable[list]]) -> SlotHub:
+    global _hub
+    if _hub is None:
+        _hub = SlotHub(compute)
+    return _hub
+
+
+def _on_slots_changed(date_str: str | None):
+    if _hub is not None:
+        _hub.notify(date_str)
+
+
+invalidation.subscribe(SLOTS_TOPIC, _on_slots_changed)
+
+
+def reset():
+    global _hub
+    if _hub is not None and _hub._periodic is not None:
+        _hub._periodic.cancel()
+    _hub = None
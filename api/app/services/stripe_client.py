@@ -0,0 +1,24 @@
+"""Lazily imported Stripe SDK.
+
+``stripe`` is slow to import and only needed by the payment endpoints, so
+it is loaded (and given its API key) on first use rather than at startup.
+Calls go through ``resilience.get("stripe")``; the HTTP timeout matches its
+deadline so an abandoned call's thread does not linger.
+"""
+
+from app.config import settings
+
+_stripe = None
+
+
+def get_stripe():
+    global _stripe
+    if _stripe is None:
+        import stripe
+
+        stripe.api_key = settings.STRIPE_SECRET_KEY
+        stripe.default_http_client = stripe.new_default_http_client(
+            timeout=settings.STRIPE_TIMEOUT_SECONDS
+        )
+        _stripe = stripe
+    return _stripe
@@ -0,0 +1,321 @@
+"""Request tracing with W3C ``traceparent`` propagation.
+
+``TracingMiddleware`` opens a server span per request, continuing the
+caller's trace when a valid ``traceparent`` header arrives. Code wraps
+outbound work in ``span()``; Mongo commands get child spans from a pymongo
+command listener (Motor copies the context into its executor threads).
+
+Sampling is decided once per trace: an incoming ``traceparent`` keeps its
+sampled flag, new traces are sampled at ``TRACING_SAMPLE_RATIO``. Finished
+sampled spans are queued and handed to the exporter in batches by a
+background thread, so exporting never blocks the event loop; when the
+queue is full spans are dropped and counted.
+
+Exporters implement ``export(spans: list[dict])`` and ``shutdown()``.
+``TRACING_EXPORTER`` is ``off``, ``console`` (JSON lines on stdout),
+``file`` (JSON lines appended to ``TRACING_FILE``) or ``module:factory``
+for anything else.
+"""
+
+import contextlib
+import contextvars
+import importlib
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from pymongo import monitoring
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVER = "server"
+CLIENT = "client"
+INTERNAL = "internal"
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_QUEUE_SIZE = 2048
+_BATCH_SIZE = 256
+
+_current: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+_stats = {"exported": 0, "dropped": 0, "export_errors": 0}
+_processor: "_BatchProcessor | None" = None
+
+
+class Span:
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind", "sampled",
+        "attributes", "status", "start_ns", "end_ns",
+    )
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: str | None, sampled: bool):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes: dict = {}
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+
+    def set_attribute(self, key: str, value):
+        if self.sampled:
+            self.attributes[key] = value
+
+    def record_error(self, exc: BaseException):
+        self.status = "error"
+        self.set_attribute("error.type", type(exc).__name__)
+        self.set_attribute("error.message", str(exc)[:500])
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def end(self, end_ns: int | None = None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        if self.sampled and _processor is not None:
+            _processor.submit(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": datetime.fromtimestamp(self.start_ns / 1e9, timezone.utc).isoformat(timespec="microseconds"),
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+def enabled() -> bool:
+    return _processor is not None
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    """``(trace_id, parent_span_id, sampled)`` from a W3C header, or None."""
+    if not header:
+        return None
+    match = _TRACEPARENT.match(header.strip().lower())
+    if not match:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def start_span(name: str, kind: str = INTERNAL, traceparent: str | None = None) -> Span:
+    """A new span under the current one (or the remote parent in ``traceparent``).
+
+    The caller must ``end()`` it; prefer ``span()`` unless the start and end
+    happen in different places.
+    """
+    parent = _current.get()
+    remote = parse_traceparent(traceparent) if parent is None else None
+    if parent is not None:
+        return Span(name, kind, parent.trace_id, parent.span_id, parent.sampled)
+    if remote is not None:
+        trace_id, parent_id, sampled = remote
+        return Span(name, kind, trace_id, parent_id, sampled)
+    sampled = random.random() < settings.TRACING_SAMPLE_RATIO
+    return Span(name, kind, os.urandom(16).hex(), None, sampled)
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str = INTERNAL, attributes: dict | None = None, traceparent: str | None = None):
+    """Run the block inside a child span; exceptions mark it as an error.
+
+    A no-op (yielding None) when tracing is off.
+    """
+    if _processor is None:
+        yield None
+        return
+    current = start_span(name, kind, traceparent)
+    for key, value in (attributes or {}).items():
+        current.set_attribute(key, value)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.record_error(exc)
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+
+
+# ── Mongo ──
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Child spans for Mongo commands issued inside a traced span."""
+
+    def __init__(self):
+        self._open: dict[tuple, Span] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        parent = _current.get()
+        if parent is None or not parent.sampled or _processor is None:
+            return
+        command = Span(f"mongo.{event.command_name}", CLIENT, parent.trace_id, parent.span_id, True)
+        command.set_attribute("db.system", "mongodb")
+        command.set_attribute("db.name", event.database_name)
+        command.set_attribute("db.operation", event.command_name)
+        collection = event.command.get(event.command_name)
+        if isinstance(collection, str):
+            command.set_attribute("db.collection", collection)
+        self._open[(event.connection_id, event.request_id)] = command
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        command = self._open.get((event.connection_id, event.request_id))
+        if command is not None:
+            command.status = "error"
+            command.set_attribute("error.message", str(event.failure.get("errmsg", ""))[:500])
+        self._finish(event)
+
+    def _finish(self, event):
+        command = self._open.pop((event.connection_id, event.request_id), None)
+        if command is not None:
+            command.end(command.start_ns + event.duration_micros * 1000)
+
+
+# ── Export ──
+
+
+class ConsoleExporter:
+    def export(self, spans: list[dict]):
+        sys.stdout.write("".join(json.dumps({"span": s}, default=str) + "\n" for s in spans))
+        sys.stdout.flush()
+
+    def shutdown(self):
+        pass
+
+
+class FileExporter:
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans: list[dict]):
+        self._file.write("".join(json.dumps(s, default=str) + "\n" for s in spans))
+        self._file.flush()
+
+    def shutdown(self):
+        self._file.close()
+
+
+def load_exporter(name: str):
+    """The exporter for a ``TRACING_EXPORTER`` value, or None when off."""
+    if name in ("", "off"):
+        return None
+    if name == "console":
+        return ConsoleExporter()
+    if name == "file":
+        return FileExporter(settings.TRACING_FILE)
+    module_name, sep, attr = name.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown TRACING_EXPORTER: {name}")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+class _BatchProcessor:
+    _STOP = object()
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+        self.queue: queue.Queue = queue.Queue(maxsize=_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, finished: Span):
+        try:
+            self.queue.put_nowait(finished)
+        except queue.Full:
+            _stats["dropped"] += 1
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            batch = []
+            while item is not self._STOP:
+                batch.append(item)
+                if len(batch) >= _BATCH_SIZE:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._export(batch)
+            if item is self._STOP:
+                return
+
+    def _export(self, batch: list[Span]):
+        try:
+            self.exporter.export([s.to_dict() for s in batch])
+            _stats["exported"] += len(batch)
+        except Exception:
+            _stats["export_errors"] += 1
+            logger.exception("span export failed", extra={"spans": len(batch)})
+
+    def shutdown(self):
+        # Blocks until queued spans are exported
+        self.queue.put(self._STOP)
+        self._thread.join()
+        self.exporter.shutdown()
+
+
+def setup():
+    """Start exporting spans if ``TRACING_EXPORTER`` is set (idempotent)."""
+    global _processor
+    if _processor is not None:
+        return
+    exporter = load_exporter(settings.TRACING_EXPORTER)
+    if exporter is not None:
+        _processor = _BatchProcessor(exporter)
+
+
+def shutdown():
+    """Flush queued spans and stop the exporter thread."""
+    global _processor
+    if _processor is not None:
+        processor, _processor = _processor, None
+        processor.shutdown()
+
+
+def metrics() -> dict:
+    return {
+        "exporter": settings.TRACING_EXPORTER if _processor else "off",
+        "sample_ratio": settings.TRACING_SAMPLE_RATIO,
+        "queued": _processor.queue.qsize() if _processor else 0,
+        **_stats,
+    }
+
+
+def reset():
+    shutdown()
+    _stats.update(exported=0, dropped=0, export_errors=0)
@@ -0,0 +1,12 @@
+import json
+
+
+def format_event(event: str, data, event_id: str | None = None) -> str:
+    """Encode one Server-Sent Events message."""
+    lines = f"id: {event_id}\n" if event_id else ""
+    return f"{lines}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+KEEP_ALIVE = ": keep-alive\n\n"
+
+HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
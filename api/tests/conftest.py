@@ -16,7 +16,26 @@ os.environ["RESEND_API_KEY"] = ""
 os.environ["ADMIN_EMAIL"] = "admin@test.com"
 os.environ["MONGODB_URI"] = "mongodb://localhost:27017/test"
 
+from app import log, tracing
 from app.main import app
+from app.memorydb import MemoryClient
+from app.services import (
+    activity,
+    booking_lifecycle,
+    booking_search,
+    catalog,
+    health,
+    http_cache,
+    idempotency,
+    intervals,
+    kundli,
+    rate_limit,
+    recurring,
+    resilience,
+    revocation,
+    slot_stream,
+)
+from app.services.settings import invalidate_business_hours
 from app.utils.security import create_access_token, hash_password
 
 
@@ -116,6 +135,49 @@ def sample_booking_doc():
     }
 
 
+# ── Process-local state ──
+
+
+@pytest.fixture(autouse=True)
+def reset_process_state():
+    """Give every test fresh rate-limit buckets, caches and health state."""
+    rate_limit.reset_store()
+    invalidate_business_hours()
+    recurring.invalidate_rules()
+    health.reset()
+    booking_lifecycle.reset()
+    slot_stream.reset()
+    activity.reset()
+    booking_search.reset()
+    intervals.reset()
+    catalog.reset()
+    idempotency.reset()
+    http_cache.reset()
+    revocation.reset()
+    log.reset()
+    tracing.reset()
+    resilience.reset()
+    kundli.reset()
+    yield
+    rate_limit.reset_store()
+    invalidate_business_hours()
+    recurring.invalidate_rules()
+    health.reset()
+    booking_lifecycle.reset()
+    slot_stream.reset()
+    activity.reset()
+    booking_search.reset()
+    intervals.reset()
+    catalog.reset()
+    idempotency.reset()
+    http_cache.reset()
+    revocation.reset()
+    log.reset()
+    tracing.reset()
+    resilience.reset()
+    kundli.reset()
+
+
 # ── Mock database ──
 
 
@@ -125,9 +187,15 @@ def _make_mock_collection():
     col.find_one = AsyncMock(return_value=None)
     col.insert_one = AsyncMock(return_value=MagicMock(inserted_id=ObjectId()))
     col.update_one = AsyncMock(return_value=MagicMock(modified_count=1))
+    col.update_many = AsyncMock(return_value=MagicMock(matched_count=0, modified_count=0))
     col.delete_one = AsyncMock(return_value=MagicMock(deleted_count=1))
     col.replace_one = AsyncMock(return_value=MagicMock(modified_count=1))
+    col.find_one_and_delete = AsyncMock(return_value=None)
+    col.find_one_and_update = AsyncMock(return_value=None)
+    col.bulk_write = AsyncMock(return_value=MagicMock())
     col.count_documents = AsyncMock(return_value=0)
+    col.distinct = AsyncMock(return_value=[])
+    col.create_index = AsyncMock()
     col.find = MagicMock(return_value=MockCursor([]))
     col.aggregate = MagicMock(return_value=MockAggregationCursor([]))
     return col
@@ -143,11 +211,52 @@ def mock_db():
     db.unavailability = _make_mock_collection()
     db.availability = _make_mock_collection()
     db.settings = _make_mock_collection()
+    db.day_schedule = _make_mock_collection()
+    db.unavailability_rules = _make_mock_collection()
+    db.services = _make_mock_collection()
+    db.scheduler_leases = _make_mock_collection()
+    db.scheduler_jobs = _make_mock_collection()
+    db.cache_events = _make_mock_collection()
+    db.activity_events = _make_mock_collection()
+    db.idempotency_keys = _make_mock_collection()
+    db.data_versions = _make_mock_collection()
+    db.revoked_tokens = _make_mock_collection()
+    db.create_collection = AsyncMock()
+    db.with_options = MagicMock(return_value=db)
+
+    with (
+        patch("app.database.db", db),
+        patch("app.database.get_db", return_value=db),
+        patch("app.database._profile_dbs", {}),
+    ):
+        yield db
+
 
-    with patch("app.database.db", db), patch("app.database.get_db", return_value=db):
+@pytest.fixture
+def memory_db():
+    """Patch the database module with an empty in-memory database.
+
+    Unlike ``mock_db``, filters, sorts, limits, updates and aggregations
+    are really evaluated, so tests seed documents and assert on results.
+    """
+    db = MemoryClient("memory:///test").get_default_database()
+    with (
+        patch("app.database.db", db),
+        patch("app.database.get_db", return_value=db),
+        patch("app.database._profile_dbs", {}),
+    ):
         yield db
 
 
+@pytest.fixture
+async def memory_client(memory_db, sample_user_doc, sample_admin_doc):
+    """Async HTTP client over ``memory_db``, seeded with the sample user and admin."""
+    await memory_db.users.insert_many([dict(sample_user_doc), dict(sample_admin_doc)])
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
 # ── Auth tokens ──
 
 
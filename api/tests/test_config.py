@@ -37,3 +37,24 @@ def test_settings_overridden_by_constructor():
     s = Settings(JWT_SECRET="custom", APP_ENV="production", ACCESS_TOKEN_EXPIRE_MINUTES=60)
     assert s.APP_ENV == "production"
     assert s.ACCESS_TOKEN_EXPIRE_MINUTES == 60
+
+
+def test_get_settings_is_cached_and_configurable(monkeypatch):
+    from app import config
+
+    monkeypatch.setattr(config, "_settings", None)
+    first = config.get_settings()
+    assert config.get_settings() is first
+
+    custom = Settings(JWT_SECRET="explicit", FRONTEND_URL="https://example.test")
+    config.configure(custom)
+    assert config.get_settings() is custom
+    assert config.settings.FRONTEND_URL == "https://example.test"
+
+
+def test_settings_proxy_forwards_assignment(monkeypatch):
+    from app import config
+
+    monkeypatch.setattr(config, "_settings", Settings(JWT_SECRET="test"))
+    config.settings.APP_ENV = "staging"
+    assert config.get_settings().APP_ENV == "staging"
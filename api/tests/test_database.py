@@ -5,6 +5,7 @@ from unittest.mock import patch, MagicMock, AsyncMock
 import pytest
 
 from app import database
+from app.memorydb import MemoryClient
 
 
 @pytest.fixture(autouse=True)
@@ -32,6 +33,21 @@ async def test_connect_db_creates_client_and_db():
     mock_client_instance.get_default_database.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_connect_db_uses_memory_backend_for_memory_uri():
+    with (
+        patch("app.database.settings.MONGODB_URI", "memory:///bench?simulate_indexes=true"),
+        patch("app.database.AsyncIOMotorClient") as motor,
+    ):
+        await database.connect_db()
+
+    motor.assert_not_called()
+    assert isinstance(database.client, MemoryClient)
+    assert database.db.name == "bench"
+    assert database.client.simulate_indexes is True
+    assert await database.db.command("ping") == {"ok": 1.0}
+
+
 @pytest.mark.asyncio
 async def test_close_db_closes_client():
     mock_client = MagicMock()
@@ -62,3 +78,51 @@ def test_get_db_returns_none_before_connect():
     database.db = None
     result = database.get_db()
     assert result is None
+
+
+# ── Read profiles ──
+
+
+def test_read_options_secondary_with_staleness_and_tags():
+    from pymongo.read_preferences import SecondaryPreferred
+
+    options = database.read_options({
+        "read_preference": "secondaryPreferred",
+        "read_concern": "local",
+        "max_staleness_seconds": 120,
+        "tags": [{"nodeType": "ANALYTICS"}, {}],
+    })
+
+    pref = options["read_preference"]
+    assert isinstance(pref, SecondaryPreferred)
+    assert pref.max_staleness == 120
+    assert pref.tag_sets == [{"nodeType": "ANALYTICS"}, {}]
+    assert options["read_concern"].level == "local"
+
+
+def test_read_options_primary():
+    from pymongo.read_preferences import Primary
+
+    options = database.read_options({"read_preference": "primary"})
+    assert isinstance(options["read_preference"], Primary)
+    assert "read_concern" not in options
+
+
+def test_read_options_unknown_preference():
+    with pytest.raises(ValueError):
+        database.read_options({"read_preference": "fastest"})
+
+
+def test_get_db_routes_query_class():
+    mock_db = MagicMock()
+    database.db = mock_db
+
+    with patch("app.database._profile_dbs", {}):
+        analytics = database.get_db(database.ANALYTICS)
+        assert analytics is mock_db.with_options.return_value
+        assert database.get_db(database.ANALYTICS) is analytics
+        mock_db.with_options.assert_called_once()
+
+    # Unconfigured classes and the default stay on the primary handle
+    assert database.get_db("checkout") is mock_db
+    assert database.get_db() is mock_db
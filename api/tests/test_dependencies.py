@@ -5,7 +5,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 from bson import ObjectId
 
-from app.dependencies import get_current_user, require_admin
+from app.dependencies import client_ip, get_current_user, require_admin
 from app.utils.exceptions import ForbiddenError, UnauthorizedError
 from app.utils.security import create_access_token, create_refresh_token
 
@@ -102,3 +102,30 @@ async def test_require_admin_regular_user_rejected():
     user = {"id": str(USER_ID), "email": "user@test.com", "name": "User", "role": "user"}
     with pytest.raises(ForbiddenError):
         await require_admin(user)
+
+
+# ── client_ip ──
+
+
+def _request(forwarded=None, host="10.9.9.9"):
+    request = MagicMock()
+    request.headers = {"x-forwarded-for": forwarded} if forwarded else {}
+    request.client.host = host
+    return request
+
+
+def test_client_ip_uses_hop_appended_by_proxy():
+    assert client_ip(_request("6.6.6.6, 1.2.3.4")) == "1.2.3.4"
+    assert client_ip(_request("1.2.3.4")) == "1.2.3.4"
+
+
+def test_client_ip_honours_trusted_hop_count():
+    with patch("app.dependencies.settings.TRUSTED_PROXY_HOPS", 2):
+        assert client_ip(_request("6.6.6.6, 1.2.3.4, 10.0.0.5")) == "1.2.3.4"
+        assert client_ip(_request("1.2.3.4")) == "10.9.9.9"
+
+
+def test_client_ip_without_trusted_proxies_uses_peer():
+    assert client_ip(_request()) == "10.9.9.9"
+    with patch("app.dependencies.settings.TRUSTED_PROXY_HOPS", 0):
+        assert client_ip(_request("1.2.3.4")) == "10.9.9.9"
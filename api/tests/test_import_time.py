@@ -0,0 +1,59 @@
+"""Import-time budget for app startup, measured with ``python -X importtime``.
+
+Fails if importing ``app.main`` or building the app starts pulling in heavy
+SDKs eagerly, or if the import itself regresses past the budget.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+# Generous ceiling for `import app.main` (cumulative, microseconds); override
+# with IMPORT_BUDGET_US on slow CI runners.
+IMPORT_BUDGET_US = int(os.environ.get("IMPORT_BUDGET_US", 1_500_000))
+
+LAZY_MODULES = ("stripe", "resend", "numpy")
+
+
+def _importtime(code: str) -> dict[str, int]:
+    env = {**os.environ, "JWT_SECRET": "import-time-test"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=API_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:  self |  cumulative | <indent>module"
+        _, cum, name = line.split("|")
+        cumulative[name.strip()] = int(cum)
+    return cumulative
+
+
+def test_import_main_within_budget():
+    modules = _importtime("import app.main")
+    assert modules["app.main"] <= IMPORT_BUDGET_US, (
+        f"import app.main took {modules['app.main'] / 1000:.0f} ms "
+        f"(budget {IMPORT_BUDGET_US / 1000:.0f} ms)"
+    )
+
+
+def test_import_main_does_not_load_routers_or_settings():
+    modules = _importtime("import app.main")
+    assert not any(name.startswith("app.routers") for name in modules)
+    assert "motor" not in modules
+
+
+def test_create_app_keeps_heavy_sdks_lazy():
+    modules = _importtime("import app.main; app.main.create_app()")
+    assert "app.routers.payments" in modules
+    for name in LAZY_MODULES:
+        assert name not in modules, f"{name} is imported at startup"
@@ -0,0 +1,112 @@
+"""Tests for app.log — queued JSON logging with request ids."""
+
+import json
+import logging
+import queue
+from unittest.mock import patch
+
+from app import log
+
+
+def _record(msg="hello", level=logging.INFO, **extra):
+    return logging.makeLogRecord({
+        "name": "app.test", "levelno": level, "levelname": logging.getLevelName(level),
+        "msg": msg, **extra,
+    })
+
+
+def test_json_formatter_includes_request_id_and_extras():
+    record = _record("booking %s", args=("b1",), request_id="req-1", booking_id="b1")
+    entry = json.loads(log.JsonFormatter().format(record))
+    assert entry["message"] == "booking b1"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.test"
+    assert entry["request_id"] == "req-1"
+    assert entry["booking_id"] == "b1"
+
+
+def test_json_formatter_renders_exception():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        import sys
+        record = _record(exc_info=sys.exc_info())
+    entry = json.loads(log.JsonFormatter().format(record))
+    assert "ValueError: boom" in entry["exc"]
+
+
+def test_context_filter_stamps_bound_request_id():
+    token = log.bind_request("req-2")
+    try:
+        record = _record()
+        assert log.ContextFilter().filter(record)
+        assert record.request_id == "req-2"
+        assert log.current_request_id() == "req-2"
+    finally:
+        log.unbind_request(token)
+    assert log.current_request_id() is None
+
+
+def test_debug_records_follow_request_sampling_decision():
+    with patch("app.log._sample", return_value=False):
+        token = log.bind_request("req-3")
+    try:
+        assert not log.ContextFilter().filter(_record(level=logging.DEBUG))
+        assert log.ContextFilter().filter(_record(level=logging.WARNING))
+    finally:
+        log.unbind_request(token)
+    assert log.metrics()["debug_sampled_out"] == 1
+
+    with patch("app.log._sample", return_value=True):
+        token = log.bind_request("req-4")
+    try:
+        assert log.ContextFilter().filter(_record(level=logging.DEBUG))
+    finally:
+        log.unbind_request(token)
+
+
+def test_full_queue_drops_without_blocking_and_reports_later():
+    log_queue = queue.Queue(maxsize=2)
+    handler = log.QueueHandler(log_queue)
+    for i in range(5):
+        handler.handle(_record(f"msg {i}"))
+    assert log_queue.qsize() == 2
+    assert log.metrics()["dropped"] == 3
+
+    log_queue.get_nowait()
+    log_queue.get_nowait()
+    handler.handle(_record("after"))
+    warning = log_queue.get_nowait()
+    assert warning.getMessage() == "log records dropped: queue full"
+    assert warning.dropped == 3
+    assert log_queue.get_nowait().getMessage() == "after"
+
+
+def test_prepare_merges_args_but_keeps_exc_info():
+    handler = log.QueueHandler(queue.Queue())
+    try:
+        raise RuntimeError("x")
+    except RuntimeError:
+        import sys
+        record = _record("id=%s", args=("42",), exc_info=sys.exc_info())
+    prepared = handler.prepare(record)
+    assert prepared.msg == "id=42" and prepared.args is None
+    assert prepared.exc_info is not None
+    assert record.args == ("42",)
+
+
+def test_setup_writes_json_lines_to_stdout_and_shutdown_flushes(capsys):
+    with patch.object(log.settings, "LOG_LEVEL", "INFO"):
+        log.setup()
+        log.setup()  # idempotent
+        logging.getLogger("app.test").info("ready", extra={"port": 8000})
+        metrics = log.metrics()
+        log.shutdown()
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    ready = [line for line in lines if line["message"] == "ready"]
+    assert len(ready) == 1
+    assert ready[0]["port"] == 8000
+    assert metrics["level"] == "INFO"
+    assert metrics["capacity"] == log.settings.LOG_QUEUE_SIZE
+    assert log.metrics()["capacity"] == 0
@@ -62,3 +62,19 @@ def test_cors_middleware_allows_localhost():
     )
     # Alternatively check that the app middleware stack contains it
     assert True  # CORS is configured in the app; verified by preflight in integration tests
+
+
+def test_create_app_with_explicit_settings(monkeypatch):
+    from app import config
+    from app.config import Settings
+    from app.main import create_app
+
+    monkeypatch.setattr(config, "_settings", config.get_settings())
+    custom = Settings(JWT_SECRET="explicit", FRONTEND_URL="https://frontend.example")
+    built = create_app(custom)
+
+    assert config.get_settings() is custom
+    routes = [r.path for r in built.routes]
+    assert "/api/health" in routes
+    cors = next(m for m in built.user_middleware if "CORSMiddleware" in str(m.cls))
+    assert "https://frontend.example" in cors.kwargs["allow_origins"]
@@ -0,0 +1,422 @@
+"""Tests for app.memorydb — the in-memory Motor-compatible backend."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from pymongo import DESCENDING, TEXT, InsertOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import (
+    BulkWriteError,
+    CollectionInvalid,
+    DuplicateKeyError,
+    OperationFailure,
+    WriteError,
+)
+
+from app.memorydb import MemoryClient, is_memory_uri
+
+T0 = datetime(2026, 3, 1, 20, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    return MemoryClient("memory:///test").get_default_database()
+
+
+@pytest.fixture
+async def bookings(db):
+    docs = [
+        {"n": 0, "status": "pending", "price_inr": 1999, "service_title": "Call", "created_at": T0, "tags": ["a", "b"]},
+        {"n": 1, "status": "confirmed", "price_inr": 4999, "service_title": "Kundli", "created_at": T0 + timedelta(hours=5)},
+        {"n": 2, "status": "confirmed", "price_inr": 1999, "service_title": "Call", "created_at": T0 + timedelta(days=1), "tags": ["c"]},
+        {"n": 3, "status": "cancelled", "price_inr": 999, "service_title": "Chat", "created_at": T0 + timedelta(days=2)},
+        {"n": 4, "status": "pending", "service_title": "Chat", "created_at": T0 + timedelta(days=2, hours=1)},
+    ]
+    await db.bookings.insert_many(docs)
+    return db.bookings
+
+
+async def _ns(cursor) -> list[int]:
+    return [doc["n"] async for doc in cursor]
+
+
+# ── URI ──
+
+
+def test_is_memory_uri():
+    assert is_memory_uri("memory://")
+    assert not is_memory_uri("mongodb://localhost/test")
+
+
+def test_uri_options():
+    client = MemoryClient("memory:///bench?notablescan=true")
+    assert client.get_default_database().name == "bench"
+    assert client.notablescan and client.simulate_indexes
+    assert MemoryClient("memory://").get_default_database().name == "test"
+
+
+# ── Inserts and reads ──
+
+
+async def test_insert_one_sets_id_and_returns_copies(db):
+    doc = {"name": "x", "created_at": T0}
+    result = await db.users.insert_one(doc)
+    assert isinstance(result.inserted_id, ObjectId)
+    assert doc["_id"] == result.inserted_id
+
+    found = await db.users.find_one({"_id": result.inserted_id})
+    # BSON round trip: naive UTC datetimes
+    assert found["created_at"] == T0.replace(tzinfo=None)
+    found["name"] = "changed"
+    assert (await db.users.find_one(result.inserted_id))["name"] == "x"
+
+
+async def test_duplicate_id_raises(db):
+    await db.users.insert_one({"_id": "a"})
+    with pytest.raises(DuplicateKeyError) as exc:
+        await db.users.insert_one({"_id": "a"})
+    assert exc.value.code == 11000
+
+
+async def test_date_objects_are_rejected_like_bson(db):
+    from bson.errors import InvalidDocument
+
+    with pytest.raises(InvalidDocument):
+        await db.users.insert_one({"dob": T0.date()})
+
+
+async def test_find_filters(bookings):
+    assert await _ns(bookings.find({"status": "pending"})) == [0, 4]
+    assert await _ns(bookings.find({"price_inr": {"$gte": 1999}})) == [0, 1, 2]
+    assert await _ns(bookings.find({"status": {"$in": ["cancelled", "confirmed"]}})) == [1, 2, 3]
+    assert await _ns(bookings.find({"$or": [{"n": 0}, {"price_inr": {"$lt": 1000}}]})) == [0, 3]
+    assert await _ns(bookings.find({"price_inr": {"$exists": False}})) == [4]
+    assert await _ns(bookings.find({"price_inr": None})) == [4]
+    assert await _ns(bookings.find({"price_inr": {"$ne": 1999}})) == [1, 3, 4]
+    assert await _ns(bookings.find({"tags": "b"})) == [0]
+    assert await _ns(bookings.find({"service_title": {"$regex": "^ch", "$options": "i"}})) == [3, 4]
+    assert await _ns(bookings.find({"created_at": {"$gte": T0 + timedelta(days=1)}})) == [2, 3, 4]
+
+
+async def test_range_queries_do_not_cross_types(bookings):
+    await bookings.insert_one({"n": 5, "price_inr": "1999"})
+    assert 5 not in await _ns(bookings.find({"price_inr": {"$gte": 0}}))
+
+
+async def test_sort_skip_limit(bookings):
+    cursor = bookings.find({}).sort([("price_inr", DESCENDING), ("n", 1)]).skip(1).limit(2)
+    assert await _ns(cursor) == [0, 2]
+    # Missing sorts as null: first ascending
+    assert (await _ns(bookings.find().sort("price_inr", 1)))[0] == 4
+    assert await _ns(bookings.find({}, sort=[("created_at", -1)], limit=1)) == [4]
+
+
+async def test_to_list_and_projection(bookings):
+    docs = await bookings.find({"n": {"$lt": 2}}, {"status": 1, "_id": 0}).to_list(None)
+    assert docs == [{"status": "pending"}, {"status": "confirmed"}]
+    doc = await bookings.find_one({"n": 0}, {"tags": 0, "created_at": 0, "_id": 0})
+    assert doc == {"n": 0, "status": "pending", "price_inr": 1999, "service_title": "Call"}
+
+
+async def test_projection_excluding_only_id(bookings):
+    doc = await bookings.find_one({"n": 1}, {"_id": 0})
+    assert doc.pop("created_at")
+    assert doc == {"n": 1, "status": "confirmed", "price_inr": 4999, "service_title": "Kundli"}
+    doc = (await bookings.aggregate([{"$match": {"n": 0}}, {"$project": {"_id": 0}}]).to_list(None))[0]
+    assert "_id" not in doc and doc["n"] == 0
+
+
+async def test_count_and_distinct(bookings):
+    assert await bookings.count_documents({"status": "confirmed"}) == 2
+    assert await bookings.count_documents({}) == 5
+    assert sorted(await bookings.distinct("status")) == ["cancelled", "confirmed", "pending"]
+    assert sorted(await bookings.distinct("tags", {"n": {"$lte": 2}})) == ["a", "b", "c"]
+
+
+# ── Updates ──
+
+
+async def test_update_operators(bookings):
+    result = await bookings.update_one(
+        {"n": 0}, {"$set": {"status": "confirmed"}, "$inc": {"price_inr": 1}, "$push": {"tags": "z"}}
+    )
+    assert (result.matched_count, result.modified_count) == (1, 1)
+    doc = await bookings.find_one({"n": 0})
+    assert doc["status"] == "confirmed" and doc["price_inr"] == 2000 and doc["tags"] == ["a", "b", "z"]
+
+    result = await bookings.update_one({"n": 0}, {"$set": {"status": "confirmed"}})
+    assert (result.matched_count, result.modified_count) == (1, 0)
+
+    result = await bookings.update_many({"status": "confirmed"}, {"$unset": {"tags": ""}})
+    assert (result.matched_count, result.modified_count) == (3, 2)
+
+
+async def test_positional_update(db):
+    await db.availability.insert_one({
+        "_id": "2026-03-16",
+        "slots": [{"time": "10:00", "booked": False}, {"time": "11:00", "booked": False}],
+    })
+    result = await db.availability.update_one(
+        {"_id": "2026-03-16", "slots.time": "11:00"}, {"$set": {"slots.$.booked": True}}
+    )
+    assert result.modified_count == 1
+    doc = await db.availability.find_one({"_id": "2026-03-16"})
+    assert [s["booked"] for s in doc["slots"]] == [False, True]
+
+
+async def test_all_positional_and_array_filters(db):
+    await db.availability.insert_one({"_id": 1, "slots": [{"h": 9}, {"h": 10}, {"h": 11}]})
+    await db.availability.update_one({"_id": 1}, {"$set": {"slots.$[].free": True}})
+    await db.availability.update_one(
+        {"_id": 1}, {"$set": {"slots.$[late].free": False}}, array_filters=[{"late.h": {"$gte": 10}}]
+    )
+    doc = await db.availability.find_one({"_id": 1})
+    assert [s["free"] for s in doc["slots"]] == [True, False, False]
+
+
+async def test_positional_without_match_fails(db):
+    await db.availability.insert_one({"_id": 1, "slots": [{"h": 9}]})
+    with pytest.raises(WriteError):
+        await db.availability.update_one({"_id": 1}, {"$set": {"slots.$.free": True}})
+
+
+async def test_upsert_seeds_from_filter(db):
+    result = await db.services.update_one(
+        {"_id": "call", "active": True}, {"$setOnInsert": {"title": "Call"}}, upsert=True
+    )
+    assert result.upserted_id == "call" and result.matched_count == 0
+    assert await db.services.find_one("call") == {"_id": "call", "active": True, "title": "Call"}
+
+    result = await db.services.update_one({"_id": "call"}, {"$setOnInsert": {"title": "Other"}}, upsert=True)
+    assert result.upserted_id is None and result.modified_count == 0
+
+
+async def test_find_one_and_update_return_document(db):
+    doc = await db.data_versions.find_one_and_update(
+        {"_id": "hours"}, {"$inc": {"version": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    assert doc == {"_id": "hours", "version": 1}
+    before = await db.data_versions.find_one_and_update({"_id": "hours"}, {"$inc": {"version": 1}})
+    assert before["version"] == 1
+
+
+async def test_pipeline_update(db):
+    now = datetime.now(timezone.utc)
+    pipeline = [
+        {"$set": {"tokens": {"$min": [2, {"$ifNull": ["$tokens", 2]}]}, "updated_at": now}},
+        {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+        {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}}},
+    ]
+    results = [
+        await db.rate_limits.find_one_and_update(
+            {"_id": "k"}, pipeline, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        for _ in range(3)
+    ]
+    assert [r["allowed"] for r in results] == [True, True, False]
+    assert results[-1]["tokens"] == 0
+
+
+async def test_cannot_modify_id(db):
+    await db.users.insert_one({"_id": 1})
+    with pytest.raises(WriteError):
+        await db.users.update_one({"_id": 1}, {"$set": {"_id": 2}})
+
+
+async def test_replace_and_delete(bookings):
+    await bookings.replace_one({"n": 3}, {"n": 3, "status": "archived"})
+    doc = await bookings.find_one({"n": 3})
+    assert set(doc) == {"_id", "n", "status"}
+
+    assert (await bookings.delete_many({"status": "pending"})).deleted_count == 2
+    removed = await bookings.find_one_and_delete({"n": 1})
+    assert removed["n"] == 1
+    assert await bookings.count_documents({}) == 2
+
+
+async def test_bulk_write(db):
+    result = await db.services.bulk_write([
+        UpdateOne({"_id": "a"}, {"$setOnInsert": {"x": 1}}, upsert=True),
+        UpdateOne({"_id": "a"}, {"$set": {"x": 2}}, upsert=True),
+        InsertOne({"_id": "b"}),
+        UpdateMany({}, {"$set": {"seen": True}}),
+    ])
+    assert result.upserted_count == 1
+    assert result.inserted_count == 1
+    assert result.matched_count == 3
+    assert await db.services.find_one("a") == {"_id": "a", "x": 2, "seen": True}
+
+
+async def test_ordered_bulk_write_stops_at_first_error(db):
+    with pytest.raises(BulkWriteError) as exc:
+        await db.unavailability.bulk_write([InsertOne({"_id": 1}), InsertOne({"_id": 1}), InsertOne({"_id": 2})])
+    assert exc.value.details["nInserted"] == 1
+    assert exc.value.details["writeErrors"][0]["index"] == 1
+    assert await db.unavailability.count_documents({}) == 1
+
+
+# ── Aggregation ──
+
+
+async def test_group_sum_and_sort(bookings):
+    pipeline = [
+        {"$match": {"status": {"$ne": "cancelled"}}},
+        {"$group": {"_id": "$service_title", "count": {"$sum": 1}, "revenue": {"$sum": "$price_inr"}}},
+        {"$sort": {"revenue": -1}},
+    ]
+    docs = await bookings.aggregate(pipeline).to_list(None)
+    assert docs == [
+        {"_id": "Kundli", "count": 1, "revenue": 4999},
+        {"_id": "Call", "count": 2, "revenue": 3998},
+        {"_id": "Chat", "count": 1, "revenue": 0},
+    ]
+
+
+async def test_group_by_date_to_string_with_timezone(bookings):
+    pipeline = [
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at", "timezone": "Asia/Kolkata"}},
+            "count": {"$sum": 1},
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+    docs = [doc async for doc in bookings.aggregate(pipeline)]
+    # 20:00 UTC is already the next day in India
+    assert docs == [
+        {"_id": "2026-03-02", "count": 2},
+        {"_id": "2026-03-03", "count": 1},
+        {"_id": "2026-03-04", "count": 2},
+    ]
+
+
+async def test_facet_unwind_and_project(bookings):
+    pipeline = [
+        {"$facet": {
+            "total": [{"$count": "n"}],
+            "tags": [{"$unwind": "$tags"}, {"$sortByCount": "$tags"}, {"$project": {"_id": 0, "tag": "$_id"}}],
+            "priciest": [{"$sort": {"price_inr": -1}}, {"$limit": 1}, {"$project": {"_id": 0, "n": 1}}],
+        }},
+    ]
+    [doc] = await bookings.aggregate(pipeline).to_list(1)
+    assert doc["total"] == [{"n": 5}]
+    assert sorted(t["tag"] for t in doc["tags"]) == ["a", "b", "c"]
+    assert doc["priciest"] == [{"n": 1}]
+
+
+async def test_lookup(db):
+    await db.users.insert_one({"_id": 1, "name": "Asha"})
+    await db.bookings.insert_many([{"user_id": 1}, {"user_id": 2}])
+    docs = await db.bookings.aggregate([
+        {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "_id", "as": "user"}},
+        {"$project": {"_id": 0, "names": "$user.name"}},
+    ]).to_list(None)
+    assert docs == [{"names": ["Asha"]}, {"names": []}]
+
+
+async def test_expr_and_unknown_operator(bookings):
+    docs = await bookings.find({"$expr": {"$gt": ["$price_inr", 2000]}}).to_list(None)
+    assert [d["n"] for d in docs] == [1]
+    with pytest.raises(OperationFailure):
+        await bookings.find({"n": {"$near": 1}}).to_list(None)
+
+
+# ── Indexes ──
+
+
+async def test_unique_index(db):
+    assert await db.users.create_index("email", unique=True) == "email_1"
+    await db.users.insert_one({"email": "a@x.com"})
+    with pytest.raises(DuplicateKeyError):
+        await db.users.insert_one({"email": "a@x.com"})
+    await db.users.insert_one({"email": "b@x.com"})
+    with pytest.raises(WriteError):
+        await db.users.update_one({"email": "b@x.com"}, {"$set": {"email": "a@x.com"}})
+
+
+async def test_ttl_index_expires_documents(db):
+    await db.revoked_tokens.create_index("expires_at", expireAfterSeconds=0)
+    now = datetime.now(timezone.utc)
+    await db.revoked_tokens.insert_many([
+        {"_id": "old", "expires_at": now - timedelta(seconds=1)},
+        {"_id": "new", "expires_at": now + timedelta(hours=1)},
+    ])
+    assert await db.revoked_tokens.distinct("_id") == ["new"]
+
+
+async def test_text_search_scores(db):
+    await db.bookings.create_index(
+        [("user_name", TEXT), ("service_title", TEXT)], weights={"user_name": 5, "service_title": 1}
+    )
+    await db.bookings.insert_many([
+        {"n": 0, "user_name": "Asha", "service_title": "Kundli Reading"},
+        {"n": 1, "user_name": "Kundli Fan", "service_title": "Call"},
+        {"n": 2, "user_name": "Ravi", "service_title": "Call"},
+    ])
+    docs = await db.bookings.aggregate([
+        {"$match": {"$text": {"$search": "kundli"}}},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+        {"$sort": {"score": -1}},
+    ]).to_list(None)
+    assert [d["n"] for d in docs] == [1, 0]
+    assert docs[0]["score"] > docs[1]["score"]
+
+
+async def test_text_search_requires_index(db):
+    with pytest.raises(OperationFailure) as exc:
+        await db.bookings.find({"$text": {"$search": "x"}}).to_list(None)
+    assert exc.value.code == 27
+
+
+async def test_explain_with_index_simulation():
+    db = MemoryClient("memory:///test?simulate_indexes=true").get_default_database()
+    await db.bookings.insert_many([{"status": s} for s in ["pending", "confirmed"] * 50])
+    await db.bookings.create_index([("status", 1), ("date", 1)])
+
+    plan = await db.bookings.find({"status": "pending"}).explain()
+    assert plan["queryPlanner"]["winningPlan"]["inputStage"]["indexName"] == "status_1_date_1"
+    assert plan["executionStats"] == {"nReturned": 50, "totalDocsExamined": 50}
+
+    plan = await db.bookings.find({"date": "2026-03-01"}).explain()
+    assert plan["queryPlanner"]["winningPlan"]["stage"] == "COLLSCAN"
+    assert plan["executionStats"]["totalDocsExamined"] == 100
+
+
+async def test_notablescan_rejects_unindexed_queries():
+    db = MemoryClient("memory:///test?notablescan=true").get_default_database()
+    await db.bookings.create_index("status")
+    await db.bookings.insert_one({"status": "pending", "date": "2026-03-01"})
+    assert len(await db.bookings.find({"status": "pending"}).to_list(None)) == 1
+    with pytest.raises(OperationFailure) as exc:
+        await db.bookings.find({"date": "2026-03-01"}).to_list(None)
+    assert exc.value.code == 291
+
+
+# ── Database ──
+
+
+async def test_capped_collection_keeps_newest(db):
+    await db.create_collection("events", capped=True, size=10_000, max=3)
+    with pytest.raises(CollectionInvalid):
+        await db.create_collection("events", capped=True, size=10_000)
+    for i in range(5):
+        await db.events.insert_one({"i": i})
+    assert await db.events.distinct("i") == [2, 3, 4]
+
+
+async def test_natural_order_is_insertion_order(db):
+    later, earlier = ObjectId("65f000000000000000000002"), ObjectId("65f000000000000000000001")
+    await db.events.insert_many([{"_id": later}, {"_id": earlier}])
+    assert [d["_id"] async for d in db.events.find({}).sort("$natural", 1)] == [later, earlier]
+    assert (await db.events.find_one({}, sort=[("$natural", -1)]))["_id"] == earlier
+
+    cursor = db.events.find({})
+    assert cursor.alive
+    await cursor.to_list()
+    assert not cursor.alive
+
+
+async def test_watch_is_unsupported(db):
+    with pytest.raises(OperationFailure) as exc:
+        db.cache_events.watch([])
+    # The invalidation bus falls back to polling on this code
+    assert exc.value.code == 40573
@@ -0,0 +1,82 @@
+"""Tests for app.middleware.profiling — admin-only per-request profiler."""
+
+from unittest.mock import patch
+
+from app.middleware.profiling import _profile_requested
+
+
+def _scope(headers=None, query=b""):
+    return {"type": "http", "headers": headers or [], "query_string": query}
+
+
+def test_profile_requested_by_header():
+    assert _profile_requested(_scope(headers=[(b"x-profile", b"1")]))
+
+
+def test_profile_requested_by_query_param():
+    assert _profile_requested(_scope(query=b"date=2026-03-16&profile=true"))
+
+
+def test_profile_not_requested_without_flag():
+    assert not _profile_requested(_scope(query=b"date=2026-03-16"))
+
+
+def test_profile_header_false_wins_over_query():
+    assert not _profile_requested(_scope(headers=[(b"x-profile", b"0")], query=b"profile=1"))
+
+
+async def test_admin_request_returns_profile_report(client, mock_db, admin_token):
+    resp = await client.get(
+        "/api/admin/dashboard",
+        headers={"Authorization": f"Bearer {admin_token}", "X-Profile": "1"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert resp.headers["x-profile-status"] == "200"
+    assert "GET /api/admin/dashboard" in resp.text
+    assert "function calls" in resp.text
+
+
+async def test_profile_reports_original_error_status(client, mock_db, admin_token):
+    resp = await client.get(
+        "/api/availability/slots?profile=1",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["x-profile-status"] == "422"
+
+
+async def test_non_admin_flag_is_ignored(client, mock_db, user_token):
+    resp = await client.get(
+        "/api/bookings",
+        headers={"Authorization": f"Bearer {user_token}", "X-Profile": "1"},
+    )
+    assert resp.status_code == 200
+    assert "x-profile-status" not in resp.headers
+    assert resp.json() == []
+
+
+async def test_anonymous_flag_is_ignored(client, mock_db):
+    resp = await client.get("/api/health?profile=1")
+    assert resp.json()["status"] == "ok"
+    assert "x-profile-status" not in resp.headers
+
+
+async def test_profiling_disabled_by_setting(client, mock_db, admin_token):
+    with patch("app.middleware.profiling.settings.PROFILING_ENABLED", False):
+        resp = await client.get(
+            "/api/health",
+            headers={"Authorization": f"Bearer {admin_token}", "X-Profile": "1"},
+        )
+    assert resp.json()["status"] == "ok"
+
+
+async def test_profile_dumped_to_output_dir(client, mock_db, admin_token, tmp_path):
+    with patch("app.middleware.profiling.settings.PROFILING_OUTPUT_DIR", str(tmp_path)):
+        resp = await client.get(
+            "/api/health",
+            headers={"Authorization": f"Bearer {admin_token}", "X-Profile": "1"},
+        )
+    filename = resp.headers["x-profile-file"]
+    assert filename.endswith("-get-api_health.prof")
+    assert (tmp_path / filename).exists()
@@ -0,0 +1,63 @@
+"""Tests for app.middleware.request_id — per-request correlation ids."""
+
+import logging
+from unittest.mock import patch
+
+from app import log
+from app.middleware.request_id import _request_id
+
+
+def _scope(value=None):
+    headers = [(b"x-request-id", value)] if value is not None else []
+    return {"type": "http", "headers": headers}
+
+
+def test_incoming_id_is_kept():
+    assert _request_id(_scope(b"cdn-abc.123:4")) == "cdn-abc.123:4"
+
+
+def test_invalid_incoming_id_is_replaced():
+    generated = _request_id(_scope(b"bad id\n"))
+    assert generated != "bad id\n"
+    assert len(generated) == 32
+
+
+def test_overlong_incoming_id_is_replaced():
+    assert len(_request_id(_scope(b"a" * 129))) == 32
+
+
+async def test_response_carries_generated_id(client, mock_db):
+    resp = await client.get("/api/health")
+    assert len(resp.headers["x-request-id"]) == 32
+
+
+async def test_response_echoes_incoming_id(client, mock_db):
+    resp = await client.get("/api/health", headers={"X-Request-ID": "edge-42"})
+    assert resp.headers["x-request-id"] == "edge-42"
+
+
+async def test_records_logged_during_request_carry_id(client, mock_db, caplog):
+    seen = []
+
+    class Capture(logging.Handler):
+        def emit(self, record):
+            seen.append(record)
+
+    handler = Capture()
+    handler.addFilter(log.ContextFilter())
+    logger = logging.getLogger("app.middleware.request_id")
+    logger.addHandler(handler)
+    try:
+        with (
+            caplog.at_level(logging.DEBUG, logger="app.middleware.request_id"),
+            patch.object(log.settings, "LOG_DEBUG_SAMPLE_RATE", 1.0),
+        ):
+            await client.get("/api/health", headers={"X-Request-ID": "trace-me"})
+    finally:
+        logger.removeHandler(handler)
+
+    request = [r for r in seen if r.getMessage() == "request"]
+    assert request and request[0].request_id == "trace-me"
+    assert request[0].path == "/api/health"
+    assert request[0].status == 200
+    assert log.current_request_id() is None
@@ -1,9 +1,13 @@
 """Tests for app.routers.admin — dashboard and stats endpoints."""
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from tests.conftest import MockAggregationCursor, MockCursor
+from bson import ObjectId
+
+from app.utils.security import create_stream_token, decode_token
+from tests.conftest import ADMIN_ID, USER_ID, MockAggregationCursor, MockCursor
 
 
 async def test_dashboard_returns_today_bookings(client, mock_db, admin_token):
@@ -198,3 +202,369 @@ async def test_stats_requires_admin(client, mock_db, user_token):
         headers={"Authorization": f"Bearer {user_token}"},
     )
     assert resp.status_code == 403
+
+
+async def test_day_schedule_check_reports_mismatches(client, mock_db, admin_token):
+    mock_db.bookings.find = MagicMock(side_effect=lambda *a, **k: MockCursor([
+        {"_id": "b1", "time_slot": "10:00", "duration_minutes": 30, "status": "confirmed"},
+    ]))
+
+    resp = await client.post(
+        "/api/admin/day-schedule/check?start=2026-03-16&end=2026-03-17&repair=true",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["checked"] == 2
+    assert data["mismatched"] == ["2026-03-16", "2026-03-17"]
+    assert mock_db.day_schedule.replace_one.await_count == 2
+
+
+async def test_day_schedule_check_rejects_long_range(client, mock_db, admin_token):
+    resp = await client.post(
+        "/api/admin/day-schedule/check?start=2026-01-01&end=2027-06-01",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 400
+
+
+async def test_scheduler_status(client, mock_db, admin_token):
+    mock_db.scheduler_jobs.find = MagicMock(
+        return_value=MockCursor([{"_id": "auto_complete_bookings", "runs": 2, "failures": 0}])
+    )
+
+    resp = await client.get(
+        "/api/admin/scheduler",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["leader"] is None
+    assert data["jobs"][0]["name"] == "auto_complete_bookings"
+
+
+async def test_scheduler_status_requires_admin(client, mock_db, user_token):
+    resp = await client.get(
+        "/api/admin/scheduler",
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert resp.status_code == 403
+
+
+async def test_logging_status(client, mock_db, admin_token):
+    resp = await client.get(
+        "/api/admin/logging",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["dropped"] == 0
+    assert data["debug_sample_rate"] == 0.01
+
+
+async def test_invalidation_status_without_bus(client, mock_db, admin_token):
+    resp = await client.get(
+        "/api/admin/invalidation?probe=true",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["mode"] is None
+    assert data["probe_ms"] is None
+
+
+async def test_revocation_status(client, mock_db, admin_token):
+    resp = await client.get(
+        "/api/admin/revocation",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["ready"] is False
+    assert data["filter_hashes"] == 10
+
+
+async def test_activity_stream_rejects_access_token_in_query(client, mock_db, admin_token):
+    resp = await client.get("/api/admin/activity/stream", params={"token": admin_token})
+    assert resp.status_code == 401
+    resp = await client.get(
+        "/api/admin/activity/stream",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 401
+
+
+async def test_activity_stream_requires_admin(client, mock_db):
+    token = create_stream_token({"sub": str(USER_ID)})
+    resp = await client.get("/api/admin/activity/stream", params={"token": token})
+    assert resp.status_code == 403
+
+
+async def test_stream_token_is_admin_only_and_short_lived(client, mock_db, user_token, admin_token):
+    resp = await client.post("/api/admin/stream-token", headers={"Authorization": f"Bearer {user_token}"})
+    assert resp.status_code == 403
+
+    resp = await client.post("/api/admin/stream-token", headers={"Authorization": f"Bearer {admin_token}"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["expires_in"] == 60
+    payload = decode_token(data["token"])
+    assert (payload["type"], payload["sub"]) == ("stream", str(ADMIN_ID))
+
+
+async def test_stream_token_rejected_by_header_auth(client, mock_db):
+    token = create_stream_token({"sub": str(ADMIN_ID)})
+    resp = await client.get("/api/admin/dashboard", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 401
+
+
+async def test_activity_stream_catch_up_then_live(memory_db):
+    import json
+    from datetime import datetime, timedelta, timezone
+
+    from bson import ObjectId
+
+    from app.routers.admin import activity_stream
+    from app.services import activity
+
+    now = datetime.now(timezone.utc)
+    last_seen = ObjectId.from_datetime(now - timedelta(minutes=2))
+    missed = {
+        "_id": ObjectId.from_datetime(now - timedelta(minutes=1)),
+        "type": "booking_created",
+        "data": {"booking_id": "b1"},
+        "created_at": now,
+    }
+    await memory_db.activity_events.insert_many([{**missed, "_id": last_seen}, missed])
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(return_value=False)
+
+    resp = await activity_stream(request, last_event_id=None, last_event_id_header=str(last_seen))
+    body = resp.body_iterator
+
+    first = await body.__anext__()
+    assert first.startswith(f"id: {missed['_id']}\nevent: booking_created\n")
+
+    await activity.record(activity.PAYMENT_CAPTURED, {})
+
+    second = await body.__anext__()
+    assert json.loads(second.split("data: ", 1)[1])["type"] == "payment_captured"
+
+    await body.aclose()
+    assert activity.get_hub().subscriber_count == 0
+
+
+async def test_activity_stream_unsubscribes_when_catch_up_fails(mock_db):
+    from app.routers.admin import activity_stream
+    from app.services import activity
+
+    with patch.object(activity, "catch_up", AsyncMock(side_effect=RuntimeError("down"))):
+        with pytest.raises(RuntimeError):
+            await activity_stream(MagicMock(), last_event_id="x", last_event_id_header=None)
+    assert activity.get_hub().subscriber_count == 0
+
+
+async def test_activity_stream_reset_when_gap_too_large(mock_db):
+    from bson import ObjectId
+
+    from app.routers.admin import activity_stream
+
+    request = MagicMock()
+    old = ObjectId("5f0000000000000000000000")
+
+    resp = await activity_stream(request, last_event_id=str(old), last_event_id_header=None)
+    first = await resp.body_iterator.__anext__()
+    assert first.startswith("event: reset\n")
+    await resp.body_iterator.aclose()
+
+
+async def test_backfill_booking_search(client, mock_db, admin_token):
+    mock_db.bookings.update_many = AsyncMock(return_value=MagicMock(modified_count=3))
+    resp = await client.post(
+        "/api/admin/bookings/search-backfill",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"updated": 3}
+
+
+async def test_dashboard_reads_use_analytics_profile(client, mock_db, admin_token):
+    await client.get(
+        "/api/admin/dashboard",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    mock_db.with_options.assert_called_once()
+    pref = mock_db.with_options.call_args[1]["read_preference"]
+    assert pref.mongos_mode == "secondaryPreferred"
+
+
+async def test_backfill_interval_fields(client, mock_db, admin_token):
+    mock_db.bookings.update_many = AsyncMock(return_value=MagicMock(modified_count=4))
+    mock_db.unavailability.update_many = AsyncMock(return_value=MagicMock(modified_count=1))
+    resp = await client.post(
+        "/api/admin/migrations/interval-fields",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"bookings": 4, "blocks": 1}
+
+
+# ── Against the in-memory database (real aggregation) ──
+
+
+async def test_stats_aggregates_seeded_data(memory_client, memory_db, admin_token, sample_booking_doc):
+    today = datetime.now(timezone.utc)
+    yesterday = (today - timedelta(days=1)).strftime("%Y-%m-%d")
+    old = (today - timedelta(days=40)).strftime("%Y-%m-%d")
+    bookings = [
+        {**sample_booking_doc, "_id": ObjectId(), "status": "confirmed", "date": yesterday, "price_inr": 1999},
+        {**sample_booking_doc, "_id": ObjectId(), "status": "completed", "date": yesterday, "price_inr": 1999},
+        {**sample_booking_doc, "_id": ObjectId(), "status": "confirmed", "date": old,
+         "service_title": "Kundli Report", "price_inr": 4999},
+        {**sample_booking_doc, "_id": ObjectId(), "status": "cancelled", "date": yesterday},
+    ]
+    await memory_db.bookings.insert_many(bookings)
+    await memory_db.payments.insert_many([
+        {"status": "captured", "amount_inr": 1999, "created_at": today},
+        {"status": "captured", "amount_inr": 4999, "created_at": today - timedelta(days=45)},
+        {"status": "failed", "amount_inr": 1999, "created_at": today},
+    ])
+
+    resp = await memory_client.get("/api/admin/stats", headers={"Authorization": f"Bearer {admin_token}"})
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["total_users"], data["total_bookings"], data["total_payments"]) == (2, 4, 2)
+    assert data["revenue_by_service"] == [
+        {"service": "Kundli Report", "bookings": 1, "revenue": 4999},
+        {"service": "Call Consultation", "bookings": 2, "revenue": 3998},
+    ]
+    daily = {d["date"]: d["bookings"] for d in data["daily_bookings"]}
+    assert daily[yesterday] == 3
+    assert sum(daily.values()) == 3
+    assert data["daily_revenue"][-1] == {"date": today.strftime("%Y-%m-%d"), "revenue": 1999}
+    assert sum(d["revenue"] for d in data["daily_revenue"]) == 1999
+
+
+async def test_dashboard_recent_bookings_sorted_and_limited(memory_client, memory_db, admin_token, sample_booking_doc):
+    now = datetime.now(timezone.utc)
+    await memory_db.bookings.insert_many([
+        {**sample_booking_doc, "_id": ObjectId(), "user_name": f"User {i}", "created_at": now - timedelta(minutes=i)}
+        for i in range(12)
+    ])
+
+    resp = await memory_client.get("/api/admin/dashboard", headers={"Authorization": f"Bearer {admin_token}"})
+
+    data = resp.json()
+    assert [b["user_name"] for b in data["recent_bookings"]] == [f"User {i}" for i in range(10)]
+    assert data["bookings_by_status"] == {"pending": 12}
+
+
+async def test_booking_kundli_chart(memory_client, memory_db, admin_token, sample_booking_doc):
+    await memory_db.bookings.insert_one({**sample_booking_doc, "service_slug": "premium-kundli"})
+
+    resp = await memory_client.get(
+        f"/api/admin/bookings/{sample_booking_doc['_id']}/kundli",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["birth"]["date_of_birth"] == "1990-05-15"
+    assert data["birth"]["minutes"] == 510
+    assert data["ascendant"]["sign"] in [h["sign"] for h in data["houses"]]
+    assert data["planets"]["moon"]["nakshatra"]
+
+
+async def test_booking_kundli_invalid_birth_details(memory_client, memory_db, admin_token, sample_booking_doc):
+    await memory_db.bookings.insert_one({**sample_booking_doc, "date_of_birth": ""})
+
+    resp = await memory_client.get(
+        f"/api/admin/bookings/{sample_booking_doc['_id']}/kundli",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 422
+
+
+async def test_booking_kundli_not_found(memory_client, memory_db, admin_token):
+    for booking_id in ("not-an-id", str(ObjectId())):
+        resp = await memory_client.get(
+            f"/api/admin/bookings/{booking_id}/kundli",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert resp.status_code == 404
+
+
+async def test_precompute_kundli_charts(memory_client, memory_db, admin_token, sample_booking_doc):
+    await memory_db.bookings.insert_many([
+        {**sample_booking_doc, "_id": ObjectId(), "service_slug": "premium-kundli"},
+        {**sample_booking_doc, "_id": ObjectId(), "service_slug": "premium-kundli", "date_of_birth": "1988-02-29"},
+    ])
+
+    resp = await memory_client.post(
+        "/api/admin/kundli/precompute", headers={"Authorization": f"Bearer {admin_token}"}
+    )
+
+    assert resp.status_code == 200
+    assert resp.json() == {"bookings": 2, "charts": 2, "computed": 2, "invalid": []}
+
+
+async def test_precompute_kundli_requires_admin(client, mock_db, user_token):
+    resp = await client.post(
+        "/api/admin/kundli/precompute", headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert resp.status_code == 403
+
+
+async def test_matchmaking_score(memory_client, memory_db, admin_token, sample_booking_doc):
+    candidates = [
+        {**sample_booking_doc, "_id": ObjectId(), "user_name": f"Candidate {i}", "date_of_birth": f"1993-0{i}-20"}
+        for i in range(1, 5)
+    ]
+    await memory_db.bookings.insert_many([sample_booking_doc, *candidates])
+
+    resp = await memory_client.post(
+        "/api/admin/matchmaking/score",
+        json={
+            "booking_id": str(sample_booking_doc["_id"]),
+            "role": "bride",
+            "candidate_booking_ids": [str(c["_id"]) for c in candidates],
+        },
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["profile"]["role"] == "bride"
+    assert len(data["matches"]) == 4
+    assert set(data["matches"][0]["kootas"]) == {
+        "varna", "vashya", "tara", "yoni", "graha_maitri", "gana", "bhakoot", "nadi",
+    }
+    assert data["matches"][0]["score"] == sum(data["matches"][0]["kootas"].values())
+
+
+async def test_matchmaking_score_unknown_booking(memory_client, memory_db, admin_token):
+    resp = await memory_client.post(
+        "/api/admin/matchmaking/score",
+        json={"booking_id": str(ObjectId()), "role": "groom", "candidate_booking_ids": [str(ObjectId())]},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 404
+
+
+async def test_matchmaking_score_rejects_self_match(client, mock_db, admin_token):
+    resp = await client.post(
+        "/api/admin/matchmaking/score",
+        json={"booking_id": "a" * 24, "role": "groom", "candidate_booking_ids": ["a" * 24]},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 422
+
+
+async def test_matchmaking_score_requires_admin(client, mock_db, user_token):
+    resp = await client.post(
+        "/api/admin/matchmaking/score",
+        json={"booking_id": "a" * 24, "role": "groom", "candidate_booking_ids": ["b" * 24]},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert resp.status_code == 403
@@ -4,8 +4,14 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock
 
 from bson import ObjectId
-
-from app.utils.security import create_access_token, create_refresh_token, hash_password
+from pymongo.errors import DuplicateKeyError
+
+from app.utils.security import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    hash_password,
+)
 from tests.conftest import ADMIN_ID, USER_ID
 
 
@@ -114,6 +120,74 @@ async def test_refresh_success(client, mock_db, sample_user_doc):
     assert "access_token" in resp.json()
 
 
+async def test_refresh_rotates_token(client, mock_db, sample_user_doc):
+    token = create_refresh_token({"sub": str(USER_ID), "sid": "sid-1"})
+    mock_db.users.find_one = AsyncMock(return_value=sample_user_doc)
+
+    resp = await client.post("/api/auth/refresh", json={"refresh_token": token})
+
+    assert resp.status_code == 200
+    old = decode_token(token)
+    new = decode_token(resp.json()["refresh_token"])
+    assert new["sid"] == "sid-1"
+    assert new["jti"] != old["jti"]
+    assert decode_token(resp.json()["access_token"])["sid"] == "sid-1"
+    revoked = mock_db.revoked_tokens.insert_one.call_args[0][0]
+    assert revoked["_id"] == old["jti"]
+    assert revoked["kind"] == "rotated"
+
+
+async def test_refresh_reuse_revokes_session(client, mock_db, sample_user_doc):
+    token = create_refresh_token({"sub": str(USER_ID), "sid": "sid-1"})
+    mock_db.users.find_one = AsyncMock(return_value=sample_user_doc)
+    inserted = []
+
+    async def insert(doc):
+        if doc["_id"] in inserted:
+            raise DuplicateKeyError("dup")
+        inserted.append(doc["_id"])
+
+    mock_db.revoked_tokens.insert_one = AsyncMock(side_effect=insert)
+
+    first = await client.post("/api/auth/refresh", json={"refresh_token": token})
+    replay = await client.post("/api/auth/refresh", json={"refresh_token": token})
+
+    assert first.status_code == 200
+    assert replay.status_code == 401
+    assert inserted == [decode_token(token)["jti"], "sid-1"]
+
+
+async def test_refresh_revoked_session(client, mock_db, sample_user_doc):
+    token = create_refresh_token({"sub": str(USER_ID), "sid": "sid-1"})
+    mock_db.users.find_one = AsyncMock(return_value=sample_user_doc)
+    mock_db.revoked_tokens.find_one = AsyncMock(return_value={"_id": "sid-1"})
+
+    resp = await client.post("/api/auth/refresh", json={"refresh_token": token})
+
+    assert resp.status_code == 401
+    assert "revoked" in resp.json()["detail"]
+
+
+async def test_logout_revokes_session(client, mock_db):
+    token = create_refresh_token({"sub": str(USER_ID), "sid": "sid-1"})
+
+    resp = await client.post("/api/auth/logout", json={"refresh_token": token})
+
+    assert resp.status_code == 200
+    revoked = mock_db.revoked_tokens.insert_one.call_args[0][0]
+    assert revoked["_id"] == "sid-1"
+    assert revoked["kind"] == "session"
+
+
+async def test_access_token_rejected_after_logout(client, mock_db):
+    access = create_access_token({"sub": str(USER_ID), "sid": "sid-1"})
+    mock_db.revoked_tokens.find_one = AsyncMock(return_value={"_id": "sid-1"})
+
+    resp = await client.get("/api/auth/me", headers={"Authorization": f"Bearer {access}"})
+
+    assert resp.status_code == 401
+
+
 async def test_refresh_with_access_token_fails(client, mock_db):
     token = create_access_token({"sub": str(USER_ID)})
 
@@ -158,3 +232,45 @@ async def test_get_me_authenticated(client, mock_db, user_token, sample_user_doc
 async def test_get_me_no_token(client, mock_db):
     resp = await client.get("/api/auth/me")
     assert resp.status_code == 422
+
+
+# ── Rate limiting ──
+
+
+async def test_login_throttled_per_email(client, mock_db):
+    from unittest.mock import patch
+
+    with patch.dict("app.services.rate_limit.settings.RATE_LIMITS", {"login:email": "2/minute"}):
+        for _ in range(2):
+            resp = await client.post(
+                "/api/auth/login",
+                json={"email": "Test@Example.com", "password": "WrongPass1"},
+            )
+            assert resp.status_code == 401
+
+        resp = await client.post(
+            "/api/auth/login",
+            json={"email": "test@example.com", "password": "WrongPass1"},
+        )
+    assert resp.status_code == 429
+    assert int(resp.headers["retry-after"]) >= 1
+
+
+async def test_register_throttled_per_ip(client, mock_db):
+    from unittest.mock import patch
+
+    payload = {"name": "New User", "email": "new@test.com", "password": "Password123"}
+    with patch.dict("app.services.rate_limit.settings.RATE_LIMITS", {"register:ip": "1/minute"}):
+        first = await client.post(
+            "/api/auth/register", json=payload, headers={"X-Forwarded-For": "10.0.0.1"}
+        )
+        # A spoofed leftmost hop does not escape the bucket
+        second = await client.post(
+            "/api/auth/register", json=payload, headers={"X-Forwarded-For": "10.1.1.1, 10.0.0.1"}
+        )
+        other_ip = await client.post(
+            "/api/auth/register", json=payload, headers={"X-Forwarded-For": "10.0.0.2"}
+        )
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert other_ip.status_code == 200
@@ -1,15 +1,15 @@
 """Tests for app.routers.availability — slot generation, unavailability CRUD."""
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from bson import ObjectId
 
 from app.routers.availability import (
     _generate_all_slots,
     _overlaps,
-    _time_to_minutes,
 )
+from app.services import http_cache
 from tests.conftest import MockAggregationCursor, MockCursor
 
 
@@ -46,22 +46,6 @@ def test_generate_all_slots_short_window():
     assert slots[1] == {"start": "14:30", "end": "15:00"}
 
 
-def test_time_to_minutes_midnight():
-    assert _time_to_minutes("00:00") == 0
-
-
-def test_time_to_minutes_noon():
-    assert _time_to_minutes("12:00") == 720
-
-
-def test_time_to_minutes_end_of_day():
-    assert _time_to_minutes("23:59") == 1439
-
-
-def test_time_to_minutes_with_half_hour():
-    assert _time_to_minutes("09:30") == 570
-
-
 def test_overlaps_true():
     assert _overlaps("09:00", "10:00", "09:30", "10:30") is True
 
@@ -180,6 +164,17 @@ async def test_get_holidays(client, mock_db):
     resp = await client.get("/api/availability/holidays?start=2026-03-01&end=2026-03-31")
     assert resp.status_code == 200
     assert resp.json() == ["2026-03-01", "2026-03-15"]
+    assert resp.headers["etag"].startswith('"unavailability-v0-')
+
+
+async def test_holidays_etag_varies_by_range(client, mock_db):
+    march = await client.get("/api/availability/holidays?start=2026-03-01&end=2026-03-31")
+    april = await client.get(
+        "/api/availability/holidays?start=2026-04-01&end=2026-04-30",
+        headers={"If-None-Match": march.headers["etag"]},
+    )
+    assert april.status_code == 200
+    assert april.headers["etag"] != march.headers["etag"]
 
 
 async def test_get_unavailability(client, mock_db):
@@ -229,6 +224,22 @@ async def test_add_unavailability_holiday(client, mock_db, admin_token):
     assert resp.json()["reason"] == "Holi"
 
 
+async def test_add_time_block_keeps_holidays_cached(client, mock_db, admin_token):
+    purged = []
+
+    async def hook(paths):
+        purged.append(paths)
+
+    http_cache.add_purge_hook(hook)
+    resp = await client.post(
+        "/api/availability/unavailable",
+        json={"date": "2026-03-20", "start_time": "10:00", "end_time": "11:00"},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    assert purged == [["/api/availability/unavailable*"]]
+
+
 async def test_add_unavailability_duplicate_holiday(client, mock_db, admin_token):
     mock_db.unavailability.find_one = AsyncMock(
         return_value={"_id": ObjectId(), "date": "2026-03-20", "is_holiday": True}
@@ -285,8 +296,8 @@ async def test_add_unavailability_requires_admin(client, mock_db, user_token):
 
 async def test_remove_unavailability_success(client, mock_db, admin_token):
     block_id = str(ObjectId())
-    mock_db.unavailability.delete_one = AsyncMock(
-        return_value=MagicMock(deleted_count=1)
+    mock_db.unavailability.find_one_and_delete = AsyncMock(
+        return_value={"_id": ObjectId(block_id), "date": "2026-03-16", "is_holiday": True}
     )
 
     resp = await client.delete(
@@ -299,9 +310,7 @@ async def test_remove_unavailability_success(client, mock_db, admin_token):
 
 async def test_remove_unavailability_not_found(client, mock_db, admin_token):
     block_id = str(ObjectId())
-    mock_db.unavailability.delete_one = AsyncMock(
-        return_value=MagicMock(deleted_count=0)
-    )
+    mock_db.unavailability.find_one_and_delete = AsyncMock(return_value=None)
 
     resp = await client.delete(
         f"/api/availability/unavailable/{block_id}",
@@ -368,6 +377,50 @@ async def test_update_settings_success(client, mock_db, admin_token):
     assert resp.status_code == 200
     assert resp.json()["timezone"] == "Asia/Kolkata"
     mock_db.settings.replace_one.assert_called_once()
+    topics = [c[0][0]["topic"] for c in mock_db.cache_events.insert_one.call_args_list]
+    assert topics == ["business_hours", "slots", "data_versions"]
+    mock_db.data_versions.find_one_and_update.assert_awaited_once()
+
+
+async def test_get_settings_not_modified(client, mock_db):
+    mock_db.data_versions.find_one = AsyncMock(return_value={"_id": "business_hours", "version": 3})
+    first = await client.get("/api/availability/settings")
+    etag = first.headers["etag"]
+    assert "v3" in etag
+    assert "stale-while-revalidate" in first.headers["cache-control"]
+    mock_db.settings.find_one.reset_mock()
+
+    resp = await client.get("/api/availability/settings", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+    mock_db.settings.find_one.assert_not_called()
+
+
+async def test_update_settings_purges_cdn(client, mock_db, admin_token):
+    purged = []
+
+    async def hook(paths):
+        purged.append(paths)
+
+    http_cache.add_purge_hook(hook)
+    mock_db.data_versions.find_one_and_update = AsyncMock(return_value={"version": 4})
+    payload = {
+        "timezone": "Asia/Kolkata",
+        "weekly_hours": [
+            {"day": i, "is_open": i < 6, "open_time": "10:00", "close_time": "18:00"}
+            for i in range(7)
+        ],
+    }
+    await client.put(
+        "/api/availability/settings",
+        json=payload,
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+
+    assert purged == [["/api/availability/settings"]]
+    resp = await client.get("/api/availability/settings")
+    assert "v4" in resp.headers["etag"]
 
 
 async def test_update_settings_requires_admin(client, mock_db, user_token):
@@ -400,3 +453,289 @@ async def test_update_settings_invalid_timezone(client, mock_db, admin_token):
         headers={"Authorization": f"Bearer {admin_token}"},
     )
     assert resp.status_code == 422
+
+
+# ═══════════════════════════════════════
+# Month summary
+# ═══════════════════════════════════════
+
+
+async def test_month_summary_default_hours(client, mock_db):
+    resp = await client.get("/api/availability/month?month=2026-03")
+    assert resp.status_code == 200
+    days = resp.json()
+    assert len(days) == 31
+    # 2026-03-16 is a Monday, 2026-03-15 a Sunday (closed by default)
+    assert days[15] == {"date": "2026-03-16", "status": "open", "total_slots": 16, "free_slots": 16}
+    assert days[14]["status"] == "closed"
+    assert days[14]["free_slots"] == 0
+
+
+async def test_month_summary_holidays_blocks_and_bookings(client, mock_db):
+    mock_db.unavailability.find = MagicMock(
+        return_value=MockCursor([
+            {"date": "2026-03-17", "is_holiday": True},
+            {"date": "2026-03-16", "start_time": "10:00", "end_time": "12:00", "is_holiday": False},
+        ])
+    )
+    mock_db.bookings.find = MagicMock(
+        return_value=MockCursor([
+            {"date": "2026-03-16", "time_slot": "14:00", "duration_minutes": 60, "status": "confirmed"},
+            {"date": "2026-03-18", "time_slot": "10:00", "duration_minutes": 480, "status": "confirmed"},
+        ])
+    )
+
+    resp = await client.get("/api/availability/month?month=2026-03")
+    days = {d["date"]: d for d in resp.json()}
+    assert days["2026-03-16"]["free_slots"] == 10
+    assert days["2026-03-17"]["status"] == "holiday"
+    assert days["2026-03-17"]["free_slots"] == 0
+    assert days["2026-03-18"]["status"] == "full"
+    assert days["2026-03-18"]["total_slots"] == 16
+
+    query = mock_db.bookings.find.call_args[0][0]
+    assert query["date"] == {"$gte": "2026-03-01", "$lte": "2026-03-31"}
+
+
+async def test_month_summary_matches_slots_endpoint(client, mock_db):
+    blocks = [{"date": "2026-03-16", "start_time": "11:15", "end_time": "12:45", "is_holiday": False}]
+    bookings = [{"date": "2026-03-16", "time_slot": "15:00", "duration_minutes": 45, "status": "pending"}]
+    mock_db.unavailability.find = MagicMock(side_effect=lambda *a, **k: MockCursor(blocks))
+    mock_db.bookings.find = MagicMock(side_effect=lambda *a, **k: MockCursor(bookings))
+
+    slots = (await client.get("/api/availability/slots?date=2026-03-16")).json()
+    month = (await client.get("/api/availability/month?month=2026-03")).json()
+    assert month[15]["free_slots"] == len(slots)
+
+
+async def test_month_summary_invalid_month(client, mock_db):
+    resp = await client.get("/api/availability/month?month=2026-13")
+    assert resp.status_code == 400
+
+    resp = await client.get("/api/availability/month?month=March")
+    assert resp.status_code == 422
+
+
+async def test_get_available_slots_from_day_schedule(client, mock_db):
+    from app.services.day_schedule import _split_words, interval_mask
+
+    mock_db.day_schedule.find_one = AsyncMock(return_value={
+        "_id": "2026-03-16",
+        "blocked": _split_words(interval_mask(600, 720)),
+        "booked": _split_words(interval_mask(840, 900)),
+    })
+
+    with patch("app.routers.availability.settings.DAY_SCHEDULE_READS", True):
+        resp = await client.get("/api/availability/slots?date=2026-03-16")
+    start_times = [s["start"] for s in resp.json()]
+    assert len(start_times) == 10
+    assert "11:30" not in start_times
+    assert "14:30" not in start_times
+    assert "12:00" in start_times
+    mock_db.bookings.find.assert_not_called()
+    mock_db.unavailability.find.assert_not_called()
+
+
+async def test_get_available_slots_day_schedule_holiday(client, mock_db):
+    mock_db.day_schedule.find_one = AsyncMock(return_value={"_id": "2026-03-16", "holiday": True})
+
+    with patch("app.routers.availability.settings.DAY_SCHEDULE_READS", True):
+        resp = await client.get("/api/availability/slots?date=2026-03-16")
+    assert resp.json() == []
+
+
+async def test_add_unavailability_updates_day_schedule(client, mock_db, admin_token):
+    resp = await client.post(
+        "/api/availability/unavailable",
+        json={"date": "2026-03-20", "start_time": "10:00", "end_time": "11:00"},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    query, update = mock_db.day_schedule.update_one.call_args[0]
+    assert query == {"_id": "2026-03-20"}
+    assert "$bit" in update
+
+
+async def test_remove_unavailability_rebuilds_day_schedule(client, mock_db, admin_token):
+    block_id = ObjectId()
+    mock_db.unavailability.find_one_and_delete = AsyncMock(
+        return_value={"_id": block_id, "date": "2026-03-16", "start_time": "10:00", "end_time": "11:00"}
+    )
+
+    await client.delete(
+        f"/api/availability/unavailable/{block_id}",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    replaced = mock_db.day_schedule.replace_one.call_args[0][1]
+    assert replaced["_id"] == "2026-03-16"
+
+
+# ═══════════════════════════════════════
+# Bulk and recurring unavailability
+# ═══════════════════════════════════════
+
+
+async def test_bulk_add_unavailability(client, mock_db, admin_token):
+    mock_db.unavailability.find = MagicMock(
+        return_value=MockCursor([{"date": "2026-10-20", "is_holiday": True}])
+    )
+
+    resp = await client.post(
+        "/api/availability/unavailable/bulk",
+        json={"items": [
+            {"date": "2026-10-20", "is_holiday": True, "reason": "Diwali"},
+            {"date": "2026-10-21", "is_holiday": True},
+            {"date": "2026-10-21", "is_holiday": True},
+            {"date": "2026-10-22", "start_time": "10:00", "end_time": "11:00"},
+        ]},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"inserted": 2, "skipped_holidays": ["2026-10-20", "2026-10-21"]}
+
+    ops = mock_db.unavailability.bulk_write.call_args[0][0]
+    assert len(ops) == 2
+    assert mock_db.unavailability.bulk_write.call_args[1]["ordered"] is True
+    assert len(mock_db.day_schedule.bulk_write.call_args[0][0]) == 2
+
+
+async def test_bulk_add_rejects_invalid_item(client, mock_db, admin_token):
+    resp = await client.post(
+        "/api/availability/unavailable/bulk",
+        json={"items": [
+            {"date": "2026-10-22", "start_time": "10:00", "end_time": "11:00"},
+            {"date": "2026-10-22", "start_time": "12:00", "end_time": "11:00"},
+        ]},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 400
+    assert resp.json()["detail"].startswith("items[1]")
+    mock_db.unavailability.bulk_write.assert_not_called()
+
+
+async def test_bulk_add_requires_admin(client, mock_db, user_token):
+    resp = await client.post(
+        "/api/availability/unavailable/bulk",
+        json={"items": [{"date": "2026-10-20", "is_holiday": True}]},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert resp.status_code == 403
+
+
+async def test_add_unavailability_rule(client, mock_db, admin_token):
+    resp = await client.post(
+        "/api/availability/unavailable/rules",
+        json={
+            "weekday": 1,
+            "start_date": "2026-03-01",
+            "until": "2026-09-01",
+            "start_time": "13:00",
+            "end_time": "14:00",
+        },
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["interval_weeks"] == 1
+    mock_db.unavailability_rules.insert_one.assert_awaited_once()
+
+
+async def test_add_unavailability_rule_until_before_start(client, mock_db, admin_token):
+    resp = await client.post(
+        "/api/availability/unavailable/rules",
+        json={"weekday": 1, "start_date": "2026-03-01", "until": "2026-02-01", "is_holiday": True},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 400
+
+
+async def test_remove_unavailability_rule_not_found(client, mock_db, admin_token):
+    mock_db.unavailability_rules.delete_one = AsyncMock(return_value=MagicMock(deleted_count=0))
+    resp = await client.delete(
+        f"/api/availability/unavailable/rules/{ObjectId()}",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 404
+
+
+_TUESDAY_LUNCH_RULE = {
+    "_id": ObjectId(),
+    "weekday": 1,
+    "interval_weeks": 1,
+    "start_date": "2026-03-01",
+    "until": None,
+    "start_time": "13:00",
+    "end_time": "14:00",
+    "is_holiday": False,
+}
+
+
+async def test_slots_exclude_recurring_blocks(client, mock_db):
+    mock_db.unavailability_rules.find = MagicMock(return_value=MockCursor([_TUESDAY_LUNCH_RULE]))
+
+    # 2026-03-17 is a Tuesday
+    resp = await client.get("/api/availability/slots?date=2026-03-17")
+    start_times = [s["start"] for s in resp.json()]
+    assert "13:00" not in start_times
+    assert "13:30" not in start_times
+    assert "12:30" in start_times
+    assert "14:00" in start_times
+
+
+async def test_month_and_holidays_include_recurring_holidays(client, mock_db):
+    mock_db.unavailability_rules.find = MagicMock(return_value=MockCursor([
+        {**_TUESDAY_LUNCH_RULE, "is_holiday": True, "start_time": None, "end_time": None},
+    ]))
+
+    month = (await client.get("/api/availability/month?month=2026-03")).json()
+    assert month[16]["status"] == "holiday"
+
+    holidays = (await client.get("/api/availability/holidays?start=2026-03-01&end=2026-03-31")).json()
+    assert holidays == ["2026-03-03", "2026-03-10", "2026-03-17", "2026-03-24", "2026-03-31"]
+
+
+# ═══════════════════════════════════════
+# Slot stream (SSE)
+# ═══════════════════════════════════════
+
+
+async def test_stream_slots_requires_date_or_range(client, mock_db):
+    resp = await client.get("/api/availability/slots/stream")
+    assert resp.status_code == 400
+
+
+async def test_stream_slots_range_limit(client, mock_db):
+    resp = await client.get("/api/availability/slots/stream?start=2026-03-01&end=2026-04-30")
+    assert resp.status_code == 400
+
+
+async def test_stream_slots_snapshot_then_delta(mock_db):
+    import json
+
+    from app.routers.availability import stream_slots
+    from app.services import slot_stream
+
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(return_value=False)
+
+    resp = await stream_slots(request, date_str="2026-03-16", start=None, end=None)
+    assert resp.media_type == "text/event-stream"
+    body = resp.body_iterator
+
+    first = await body.__anext__()
+    assert first.startswith("event: snapshot\n")
+    snapshot = json.loads(first.split("data: ", 1)[1])
+    assert "10:00" in [s["start"] for s in snapshot["2026-03-16"]]
+
+    # A confirmed booking now takes 10:00
+    mock_db.bookings.find = MagicMock(return_value=MockCursor([
+        {"time_slot": "10:00", "duration_minutes": 30, "status": "confirmed"},
+    ]))
+    await slot_stream.publish_change("2026-03-16")
+
+    second = await body.__anext__()
+    assert second.startswith("event: delta\n")
+    delta = json.loads(second.split("data: ", 1)[1])
+    assert [s["start"] for s in delta["removed"]] == ["10:00"]
+
+    await body.aclose()
+    assert slot_stream.get_hub(None).subscriber_count == 0
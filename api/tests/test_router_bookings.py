@@ -2,12 +2,14 @@
 
 import pytest
 from datetime import datetime, timedelta, timezone
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
-from app.routers.bookings import SERVICE_PRICES, _overlaps, _time_to_minutes, get_price
-from app.utils.exceptions import BadRequestError
+from app.models.booking import BookingCreate
+from app.routers.bookings import _overlaps
+from app.services import idempotency
 from tests.conftest import BOOKING_ID, MockCursor
 
 
@@ -16,38 +18,6 @@ from tests.conftest import BOOKING_ID, MockCursor
 # ═══════════════════════════════════════
 
 
-def test_get_price_valid_service_and_duration():
-    assert get_price("call-consultation", 30) == 1999
-
-
-def test_get_price_45_min():
-    assert get_price("call-consultation", 45) == 2499
-
-
-def test_get_price_unknown_service():
-    with pytest.raises(BadRequestError, match="Unknown service"):
-        get_price("nonexistent", 30)
-
-
-def test_get_price_invalid_duration():
-    with pytest.raises(BadRequestError, match="not available"):
-        get_price("call-consultation", 90)
-
-
-def test_get_price_report_service_any_duration():
-    # Report services have "0" key — falls back to it for any duration
-    assert get_price("premium-kundli", 15) == 4999
-
-
-def test_get_price_all_services_have_entries():
-    for slug, prices in SERVICE_PRICES.items():
-        assert len(prices) > 0, f"{slug} has no price entries"
-
-
-def test_time_to_minutes():
-    assert _time_to_minutes("09:30") == 570
-
-
 def test_overlaps_true():
     assert _overlaps(540, 600, 570, 630) is True
 
@@ -116,6 +86,56 @@ async def test_create_booking_success(client, mock_db):
     assert data["date_of_birth"] == "1990-05-15"
     assert data["place_of_birth"] == "Mumbai, India"
 
+    event = mock_db.activity_events.insert_one.call_args[0][0]
+    assert event["type"] == "booking_created"
+    assert event["data"]["booking_id"] == str(BOOKING_ID)
+
+
+async def test_create_booking_idempotency_key_replays_stored_booking(client, mock_db):
+    stored = {"_id": BOOKING_ID, **_VALID_BOOKING_DATA, "price_inr": 1999, "status": "pending"}
+    mock_db.idempotency_keys.insert_one = AsyncMock(side_effect=DuplicateKeyError("dup"))
+    mock_db.idempotency_keys.find_one = AsyncMock(return_value={
+        "_id": "bookings:retry-1",
+        "fingerprint": idempotency.fingerprint(BookingCreate(**_VALID_BOOKING_DATA).model_dump()),
+        "status": "completed",
+        "status_code": 200,
+        "body": {**stored, "id": str(BOOKING_ID), "created_at": "2026-03-01T00:00:00"},
+    })
+
+    resp = await client.post(
+        "/api/bookings", json=_VALID_BOOKING_DATA, headers={"Idempotency-Key": "retry-1"}
+    )
+
+    assert resp.status_code == 200
+    assert resp.json()["id"] == str(BOOKING_ID)
+    assert resp.headers["idempotent-replayed"] == "true"
+    mock_db.bookings.insert_one.assert_not_called()
+
+
+async def test_create_booking_idempotency_key_stores_response(client, mock_db):
+    booking_doc = {
+        "_id": BOOKING_ID,
+        **_VALID_BOOKING_DATA,
+        "price_inr": 1999,
+        "status": "pending",
+        "payment_id": None,
+        "created_at": "2026-03-01T00:00:00",
+    }
+    mock_db.bookings.find_one = AsyncMock(
+        side_effect=lambda query, projection=None: None if "start_min" in query else booking_doc
+    )
+
+    resp = await client.post(
+        "/api/bookings", json=_VALID_BOOKING_DATA, headers={"Idempotency-Key": "retry-1"}
+    )
+
+    assert resp.status_code == 200
+    claim = mock_db.idempotency_keys.insert_one.call_args[0][0]
+    assert claim["_id"] == "bookings:retry-1"
+    query, update = mock_db.idempotency_keys.update_one.call_args[0]
+    assert update["$set"]["status"] == "completed"
+    assert update["$set"]["body"]["id"] == str(BOOKING_ID)
+
 
 async def test_create_booking_holiday(client, mock_db):
     mock_db.unavailability.find_one = AsyncMock(
@@ -380,3 +400,270 @@ async def test_resume_booking_already_confirmed(client, mock_db, sample_booking_
     resp = await client.get(f"/api/bookings/{BOOKING_ID}/resume")
     assert resp.status_code == 400
     assert "no longer pending" in resp.json()["detail"].lower()
+
+
+# ═══════════════════════════════════════
+# day_schedule read model
+# ═══════════════════════════════════════
+
+
+async def test_create_booking_records_pending_in_day_schedule(client, mock_db):
+    booking_doc = {
+        "_id": BOOKING_ID,
+        **_VALID_BOOKING_DATA,
+        "price_inr": 1999,
+        "status": "pending",
+        "created_at": datetime.now(timezone.utc),
+    }
+    mock_db.bookings.find_one = AsyncMock(return_value=booking_doc)
+
+    resp = await client.post("/api/bookings", json=_VALID_BOOKING_DATA)
+    assert resp.status_code == 200
+    _prune, push = mock_db.day_schedule.bulk_write.call_args[0][0]
+    assert push._filter == {"_id": "2026-03-16"}
+    assert push._doc["$push"]["pending"]["booking_id"] == str(BOOKING_ID)
+
+
+async def test_create_booking_conflict_from_day_schedule(client, mock_db):
+    from app.services.day_schedule import _split_words, interval_mask
+
+    mock_db.day_schedule.find_one = AsyncMock(return_value={
+        "_id": "2026-03-16",
+        "booked": _split_words(interval_mask(600, 630)),
+    })
+
+    with patch("app.routers.bookings.settings.DAY_SCHEDULE_READS", True):
+        resp = await client.post("/api/bookings", json=_VALID_BOOKING_DATA)
+    assert resp.status_code == 400
+    assert "already booked" in resp.json()["detail"].lower()
+    mock_db.bookings.find.assert_not_called()
+    mock_db.unavailability.find_one.assert_not_called()
+
+
+async def test_cancel_confirmed_booking_clears_day_schedule(client, mock_db, user_token, sample_booking_doc):
+    sample_booking_doc["status"] = "confirmed"
+    mock_db.bookings.find_one = AsyncMock(return_value=sample_booking_doc)
+
+    resp = await client.patch(
+        f"/api/bookings/{BOOKING_ID}/cancel",
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert resp.status_code == 200
+    update = mock_db.day_schedule.update_one.call_args[0][1]
+    assert all("and" in op for op in update["$bit"].values())
+
+
+async def test_create_booking_conflicts_with_recurring_block(client, mock_db):
+    mock_db.unavailability_rules.find = MagicMock(return_value=MockCursor([{
+        "weekday": 0,
+        "start_date": "2026-03-01",
+        "start_time": "09:30",
+        "end_time": "10:15",
+        "is_holiday": False,
+    }]))
+
+    resp = await client.post("/api/bookings", json=_VALID_BOOKING_DATA)
+    assert resp.status_code == 400
+    assert "unavailable" in resp.json()["detail"].lower()
+
+
+# ═══════════════════════════════════════
+# Bulk status
+# ═══════════════════════════════════════
+
+
+async def test_bulk_status_single_update(client, mock_db, admin_token):
+    mock_db.bookings.distinct = AsyncMock(return_value=["2020-01-01", "2099-01-01"])
+    mock_db.bookings.update_many = AsyncMock(
+        return_value=MagicMock(matched_count=3, modified_count=2)
+    )
+
+    with patch("app.routers.bookings.day_schedule.rebuild_day", new_callable=AsyncMock) as rebuild:
+        resp = await client.patch(
+            "/api/bookings/status",
+            json={
+                "status": "cancelled",
+                "current_status": "pending",
+                "date_from": "2020-01-01",
+                "date_to": "2099-12-31",
+            },
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+
+    assert resp.status_code == 200
+    assert resp.json() == {"matched": 3, "modified": 2}
+    query, update = mock_db.bookings.update_many.call_args[0]
+    assert query == {
+        "status": "pending",
+        "date": {"$gte": "2020-01-01", "$lte": "2099-12-31"},
+    }
+    assert update == {"$set": {"status": "cancelled"}}
+    rebuild.assert_awaited_once_with("2099-01-01")
+
+
+async def test_bulk_status_by_ids(client, mock_db, admin_token):
+    resp = await client.patch(
+        "/api/bookings/status",
+        json={"status": "completed", "booking_ids": [str(BOOKING_ID)]},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    query = mock_db.bookings.update_many.call_args[0][0]
+    assert query == {"_id": {"$in": [BOOKING_ID]}}
+
+
+async def test_bulk_status_requires_filter(client, mock_db, admin_token):
+    resp = await client.patch(
+        "/api/bookings/status",
+        json={"status": "completed"},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 422
+    mock_db.bookings.update_many.assert_not_called()
+
+
+async def test_bulk_status_invalid_id(client, mock_db, admin_token):
+    resp = await client.patch(
+        "/api/bookings/status",
+        json={"status": "completed", "booking_ids": ["not-an-id"]},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 400
+
+
+async def test_bulk_status_requires_admin(client, mock_db, user_token):
+    resp = await client.patch(
+        "/api/bookings/status",
+        json={"status": "completed", "current_status": "confirmed"},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert resp.status_code == 403
+
+
+# ═══════════════════════════════════════
+# Search
+# ═══════════════════════════════════════
+
+
+async def test_search_bookings(client, mock_db, admin_token, sample_booking_doc):
+    mock_db.bookings.find = MagicMock(return_value=MockCursor([sample_booking_doc]))
+
+    resp = await client.get(
+        "/api/bookings/search?q=test@exa",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["mode"] == "email"
+    assert data["items"][0]["id"] == str(BOOKING_ID)
+    assert data["next_cursor"] is None
+
+
+async def test_search_bookings_invalid_cursor(client, mock_db, admin_token):
+    resp = await client.get(
+        "/api/bookings/search?q=test@exa&cursor=bogus",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 400
+
+
+async def test_search_bookings_requires_admin(client, mock_db, user_token):
+    resp = await client.get(
+        "/api/bookings/search?q=test",
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert resp.status_code == 403
+
+
+async def test_create_booking_stores_search_keys(client, mock_db):
+    mock_db.bookings.find_one = AsyncMock(return_value={
+        "_id": BOOKING_ID,
+        **_VALID_BOOKING_DATA,
+        "price_inr": 1999,
+        "status": "pending",
+        "created_at": datetime.now(timezone.utc),
+    })
+    resp = await client.post("/api/bookings", json=_VALID_BOOKING_DATA)
+    assert resp.status_code == 200
+
+    doc = mock_db.bookings.insert_one.call_args[0][0]
+    assert doc["email_lc"] == _VALID_BOOKING_DATA["user_email"].lower()
+    assert doc["phone_digits"].isdigit()
+
+
+async def test_create_booking_interval_conflict_single_find_one(client, mock_db):
+    async def _find_one(query, projection=None):
+        if "start_min" in query:
+            return {"_id": ObjectId()}
+        return None
+
+    mock_db.bookings.find_one = AsyncMock(side_effect=_find_one)
+
+    with patch("app.routers.bookings.settings.INTERVAL_CONFLICT_CHECKS", True):
+        resp = await client.post("/api/bookings", json=_VALID_BOOKING_DATA)
+
+    assert resp.status_code == 400
+    assert "already booked" in resp.json()["detail"].lower()
+    mock_db.bookings.find.assert_not_called()
+    query = mock_db.bookings.find_one.call_args[0][0]
+    assert query["start_min"] == {"$lt": 630}
+    assert query["end_min"] == {"$gt": 600}
+
+
+async def test_create_booking_stores_interval_fields(client, mock_db):
+    stored = {
+        "_id": BOOKING_ID,
+        **_VALID_BOOKING_DATA,
+        "price_inr": 1999,
+        "status": "pending",
+        "created_at": datetime.now(timezone.utc),
+    }
+    mock_db.bookings.find_one = AsyncMock(
+        side_effect=lambda query, projection=None: None if "start_min" in query else stored
+    )
+
+    with patch("app.routers.bookings.settings.INTERVAL_CONFLICT_CHECKS", True):
+        resp = await client.post("/api/bookings", json=_VALID_BOOKING_DATA)
+
+    assert resp.status_code == 200
+    doc = mock_db.bookings.insert_one.call_args[0][0]
+    assert (doc["start_min"], doc["end_min"]) == (600, 630)
+
+
+async def test_search_bookings_pages_in_order(memory_client, memory_db, admin_token, sample_booking_doc):
+    now = datetime.now(timezone.utc)
+    emails = ["asha@x.com", "other@x.com", "asha@y.com", "asha@z.com"]
+    await memory_db.bookings.insert_many([
+        {**sample_booking_doc, "_id": ObjectId(), "user_email": email, "email_lc": email,
+         "created_at": now - timedelta(minutes=i)}
+        for i, email in enumerate(emails)
+    ])
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    page = (await memory_client.get("/api/bookings/search?q=Asha@&limit=2", headers=headers)).json()
+    assert page["mode"] == "email"
+    assert [b["user_email"] for b in page["items"]] == ["asha@x.com", "asha@y.com"]
+
+    resp = await memory_client.get(
+        f"/api/bookings/search?q=Asha@&limit=2&cursor={page['next_cursor']}", headers=headers
+    )
+    page = resp.json()
+    assert [b["user_email"] for b in page["items"]] == ["asha@z.com"]
+    assert page["next_cursor"] is None
+
+
+async def test_search_bookings_text_ranks_by_score(memory_client, memory_db, admin_token, sample_booking_doc):
+    await memory_db.bookings.insert_many([
+        {**sample_booking_doc, "_id": ObjectId(), "user_name": "Ravi", "service_title": "Kundli Report"},
+        {**sample_booking_doc, "_id": ObjectId(), "user_name": "Kundli Shah", "service_title": "Call"},
+        {**sample_booking_doc, "_id": ObjectId(), "user_name": "Meera", "service_title": "Call"},
+    ])
+
+    resp = await memory_client.get(
+        "/api/bookings/search?q=kundli", headers={"Authorization": f"Bearer {admin_token}"}
+    )
+
+    data = resp.json()
+    assert data["mode"] == "text"
+    # user_name is weighted above service_title
+    assert [b["user_name"] for b in data["items"]] == ["Kundli Shah", "Ravi"]
@@ -0,0 +1,45 @@
+"""Tests for app.routers.health — liveness and readiness probes."""
+
+from unittest.mock import AsyncMock, patch
+
+
+async def test_live_always_ok(client, mock_db):
+    resp = await client.get("/api/health/live")
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "ok"}
+
+
+async def test_started_is_503_until_warm(client, mock_db):
+    resp = await client.get("/api/health/started")
+    assert resp.status_code == 503
+    assert resp.json()["status"] == "warming"
+
+
+async def test_started_ignores_mongo_once_warm(client, mock_db):
+    mock_db.command = AsyncMock(side_effect=Exception("timeout"))
+    with patch("app.services.health._ready", True):
+        resp = await client.get("/api/health/started")
+    assert resp.status_code == 200
+    mock_db.command.assert_not_called()
+
+
+async def test_ready_is_503_until_warm(client, mock_db):
+    resp = await client.get("/api/health/ready")
+    assert resp.status_code == 503
+    assert resp.json()["status"] == "warming"
+
+
+async def test_ready_after_warm_up(client, mock_db):
+    mock_db.command = AsyncMock(return_value={"ok": 1})
+    with patch("app.services.health._ready", True):
+        resp = await client.get("/api/health/ready")
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "ready"}
+
+
+async def test_ready_503_when_mongo_unreachable(client, mock_db):
+    mock_db.command = AsyncMock(side_effect=Exception("timeout"))
+    with patch("app.services.health._ready", True):
+        resp = await client.get("/api/health/ready")
+    assert resp.status_code == 503
+    assert resp.json()["status"] == "unavailable"
@@ -55,6 +55,25 @@ async def test_create_checkout_session_success(client, mock_db):
     mock_db.payments.insert_one.assert_called_once()
 
 
+async def test_create_checkout_session_passes_idempotency_key_to_stripe(client, mock_db):
+    mock_db.bookings.find_one = AsyncMock(return_value=SAMPLE_BOOKING)
+
+    mock_session = MagicMock()
+    mock_session.id = "cs_test_abc123"
+    mock_session.url = "https://checkout.stripe.com/pay/cs_test_abc123"
+
+    with patch("stripe.checkout.Session.create", return_value=mock_session) as create:
+        resp = await client.post(
+            "/api/payments/create-checkout-session",
+            json={"booking_id": str(BOOKING_ID)},
+            headers={"Idempotency-Key": "retry-1"},
+        )
+
+    assert resp.status_code == 200
+    assert create.call_args[1]["idempotency_key"] == "checkout:retry-1"
+    assert mock_db.idempotency_keys.insert_one.call_args[0][0]["_id"] == "checkout:retry-1"
+
+
 async def test_create_checkout_session_booking_not_found(client, mock_db):
     mock_db.bookings.find_one = AsyncMock(return_value=None)
 
@@ -195,6 +214,9 @@ async def test_webhook_charge_refunded(client, mock_db):
 
     assert resp.status_code == 200
     mock_db.payments.update_one.assert_called_once()
+    activity_event = mock_db.activity_events.insert_one.call_args[0][0]
+    assert activity_event["type"] == "payment_refunded"
+    assert activity_event["data"]["payment_intent_id"] == "pi_test_refund"
 
 
 # ── Webhook: invalid signature ──
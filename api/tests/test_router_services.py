@@ -0,0 +1,65 @@
+"""Tests for app.routers.services — public catalog and admin edits."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+
+async def test_list_services_with_cache_headers(client, mock_db):
+    resp = await client.get("/api/services")
+
+    assert resp.status_code == 200
+    assert "stale-while-revalidate" in resp.headers["cache-control"]
+    assert resp.headers["etag"]
+    services = {s["slug"]: s for s in resp.json()}
+    assert services["call-consultation"]["prices"] == {"30": 1999, "45": 2499, "60": 2999}
+    assert services["call-consultation"]["durations"] == [30, 45, 60]
+    assert services["premium-kundli"]["is_report"] is True
+
+
+async def test_list_services_not_modified(client, mock_db):
+    etag = (await client.get("/api/services")).headers["etag"]
+
+    resp = await client.get("/api/services", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+
+async def test_upsert_service_publishes_reload(client, mock_db, admin_token):
+    resp = await client.put(
+        "/api/services/tarot-reading",
+        json={"title": "Tarot Reading", "prices": {"30": 1599}},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+
+    assert resp.status_code == 200
+    query, update = mock_db.services.update_one.call_args[0]
+    assert query == {"_id": "tarot-reading"}
+    assert update["$set"]["prices"] == {"30": 1599}
+    assert mock_db.cache_events.insert_one.call_args[0][0]["topic"] == "services"
+
+
+async def test_upsert_service_validates_prices(client, mock_db, admin_token):
+    resp = await client.put(
+        "/api/services/tarot-reading",
+        json={"title": "Tarot Reading", "prices": {"half-hour": 1599}},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 422
+
+
+async def test_upsert_service_requires_admin(client, mock_db, user_token):
+    resp = await client.put(
+        "/api/services/tarot-reading",
+        json={"title": "Tarot Reading", "prices": {"30": 1599}},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert resp.status_code == 403
+
+
+async def test_deactivate_unknown_service(client, mock_db, admin_token):
+    mock_db.services.update_one = AsyncMock(return_value=MagicMock(matched_count=0))
+    resp = await client.delete(
+        "/api/services/nope",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == 404
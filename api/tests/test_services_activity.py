@@ -0,0 +1,136 @@
+"""Tests for app.services.activity — admin activity feed and catch-up."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from bson import ObjectId
+
+from app.services import activity
+from tests.conftest import MockCursor
+
+NOW = datetime(2026, 3, 16, 10, 0, tzinfo=timezone.utc)
+
+
+def _event(minutes_ago=0, event_type=activity.BOOKING_CREATED):
+    created = NOW - timedelta(minutes=minutes_ago)
+    return {
+        "_id": ObjectId.from_datetime(created),
+        "type": event_type,
+        "data": {"booking_id": "b1"},
+        "created_at": created,
+    }
+
+
+async def test_record_inserts_and_publishes(mock_db):
+    await activity.record(activity.BOOKING_CREATED, {"booking_id": "b1"})
+
+    mock_db.create_collection.assert_awaited_once()
+    doc = mock_db.activity_events.insert_one.call_args[0][0]
+    assert doc["type"] == "booking_created"
+    assert doc["data"] == {"booking_id": "b1"}
+    assert mock_db.cache_events.insert_one.call_args[0][0]["topic"] == activity.ACTIVITY_TOPIC
+
+
+async def test_record_never_raises(mock_db):
+    mock_db.activity_events.insert_one = AsyncMock(side_effect=Exception("down"))
+    await activity.record(activity.BOOKING_CREATED, {})
+
+
+async def test_catch_up_replays_missed_events(memory_db):
+    last = _event(minutes_ago=5)
+    missed = [_event(minutes_ago=3), _event(minutes_ago=1)]
+    await memory_db.activity_events.insert_many([_event(minutes_ago=6), last, *missed])
+
+    events = await activity.catch_up(str(last["_id"]), now=NOW)
+
+    assert [e["id"] for e in events] == [str(d["_id"]) for d in missed]
+
+
+async def test_catch_up_follows_insertion_order_not_ids(memory_db):
+    # Another worker's event inserted later can carry a smaller ObjectId
+    last, later_small_id = _event(minutes_ago=1), _event(minutes_ago=2)
+    await memory_db.activity_events.insert_many([last, later_small_id])
+
+    events = await activity.catch_up(str(last["_id"]), now=NOW)
+
+    assert [e["id"] for e in events] == [str(later_small_id["_id"])]
+
+
+async def test_catch_up_outside_window(mock_db):
+    old = _event(minutes_ago=120)
+    assert await activity.catch_up(str(old["_id"]), now=NOW) is None
+    mock_db.activity_events.find.assert_not_called()
+
+
+async def test_catch_up_too_many_events(memory_db, monkeypatch):
+    monkeypatch.setattr(activity, "CATCHUP_LIMIT", 1)
+    last = _event(minutes_ago=5)
+    await memory_db.activity_events.insert_many([last, _event(minutes_ago=2), _event(minutes_ago=1)])
+    assert await activity.catch_up(str(last["_id"]), now=NOW) is None
+
+
+async def test_catch_up_unknown_event(memory_db):
+    await memory_db.activity_events.insert_one(_event(minutes_ago=1))
+    assert await activity.catch_up(str(_event(minutes_ago=5)["_id"]), now=NOW) is None
+
+
+async def test_catch_up_invalid_id(mock_db):
+    assert await activity.catch_up("garbage") is None
+
+
+async def test_hub_fans_out_new_events(memory_db):
+    await memory_db.activity_events.insert_one(_event(minutes_ago=5))
+    hub = activity.get_hub()
+    q1, q2 = await hub.subscribe(), await hub.subscribe()
+    first, second = _event(minutes_ago=1), _event(minutes_ago=2)
+    await memory_db.activity_events.insert_many([first, second])
+
+    hub.notify()
+    await asyncio.wait_for(hub._fetcher, 1)
+
+    for q in (q1, q2):
+        assert [q.get_nowait()["id"] for _ in range(2)] == [str(first["_id"]), str(second["_id"])]
+        assert q.empty()
+    assert hub._last_id == second["_id"]
+
+
+async def test_hub_first_event_into_empty_collection(memory_db):
+    hub = activity.get_hub()
+    q = await hub.subscribe()
+    event = _event()
+    await memory_db.activity_events.insert_one(event)
+
+    await hub.fetch()
+    assert q.get_nowait()["id"] == str(event["_id"])
+
+
+async def test_hub_without_subscribers_does_not_query(mock_db):
+    activity.get_hub().notify()
+    await asyncio.sleep(0)
+    mock_db.activity_events.find.assert_not_called()
+
+
+async def test_slow_subscriber_gets_reset(memory_db, monkeypatch):
+    monkeypatch.setattr(activity, "QUEUE_SIZE", 1)
+    hub = activity.get_hub()
+    q = await hub.subscribe()
+    await memory_db.activity_events.insert_many([_event(minutes_ago=2), _event(minutes_ago=1)])
+
+    await hub.fetch()
+
+    assert q.qsize() == 1
+    assert q.get_nowait() is activity.RESET
+
+
+async def test_hub_resets_when_position_is_lost(memory_db, monkeypatch):
+    monkeypatch.setattr(activity, "CATCHUP_LIMIT", 1)
+    hub = activity.get_hub()
+    q = await hub.subscribe()
+    events = [_event(minutes_ago=3), _event(minutes_ago=2), _event(minutes_ago=1)]
+    await memory_db.activity_events.insert_many(events)
+
+    await hub.fetch()
+
+    assert q.get_nowait() is activity.RESET
+    assert hub._last_id == events[-1]["_id"]
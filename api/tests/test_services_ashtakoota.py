@@ -0,0 +1,159 @@
+"""Tests for app.services.ashtakoota — table-driven guna milan."""
+
+import numpy as np
+import pytest
+from bson import ObjectId
+
+from app.models.matchmaking import MatchRole
+from app.services import ashtakoota, kundli
+from app.services.ashtakoota import KOOTA_TABLE, KOOTAS, TOTAL_TABLE
+
+
+def _pada(nakshatra: int, pada: int = 1) -> int:
+    return nakshatra * 4 + pada - 1
+
+
+def _kootas(groom: int, bride: int) -> dict:
+    return dict(zip(KOOTAS, KOOTA_TABLE[:, groom, bride].tolist()))
+
+
+# ── Tables ──
+
+
+def test_table_bounds():
+    assert KOOTA_TABLE.shape == (8, 108, 108)
+    assert (KOOTA_TABLE >= 0).all()
+    assert (KOOTA_TABLE <= ashtakoota.MAX_POINTS[:, None, None]).all()
+    assert TOTAL_TABLE.max() == 36
+
+
+def test_lookup_tables_are_consistent():
+    assert np.array_equal(ashtakoota.YONI_POINTS, ashtakoota.YONI_POINTS.T)
+    assert np.array_equal(ashtakoota.VASHYA_POINTS, ashtakoota.VASHYA_POINTS.T)
+    assert np.diag(ashtakoota.YONI_POINTS).tolist() == [4] * 14
+    # Each yoni appears for a male and a female nakshatra (13 pairs + one extra)
+    assert np.bincount(ashtakoota.YONI).min() == 1
+
+
+def test_same_nakshatra_scores_28_with_nadi_dosha():
+    kootas = _kootas(_pada(0), _pada(0))
+    assert sum(kootas.values()) == 28
+    assert kootas["nadi"] == 0
+
+
+def test_ashwini_groom_bharani_bride():
+    assert _kootas(_pada(0), _pada(1)) == {
+        "varna": 1, "vashya": 2, "tara": 3, "yoni": 2,
+        "graha_maitri": 5, "gana": 6, "bhakoot": 7, "nadi": 8,
+    }
+
+
+def test_sworn_enemy_yonis_score_zero():
+    # Horse (Ashwini) and Buffalo (Hasta); Cat (Punarvasu) and Rat (Magha)
+    assert _kootas(_pada(0), _pada(12))["yoni"] == 0
+    assert _kootas(_pada(6), _pada(9))["yoni"] == 0
+
+
+def test_bhakoot_dosha_on_six_eight_axis():
+    # Moon in Mesha (Ashwini) and Kanya (Hasta, pada 1): 6/8
+    assert _kootas(_pada(0), _pada(12))["bhakoot"] == 0
+    assert _kootas(_pada(0), _pada(6, 4))["bhakoot"] == 7  # Karka: 4/10
+
+
+def test_varna_depends_on_direction():
+    # Karka (Brahmin, Pushya) groom, Mithuna (Shudra, Ardra) bride and back
+    assert _kootas(_pada(7), _pada(5))["varna"] == 1
+    assert _kootas(_pada(5), _pada(7))["varna"] == 0
+
+
+def test_gana_deva_groom_rakshasa_bride():
+    # Ashwini (Deva) and Krittika pada 1 (Rakshasa)
+    assert _kootas(_pada(0), _pada(2))["gana"] == 1
+    assert _kootas(_pada(2), _pada(0))["gana"] == 1
+    assert _kootas(_pada(1), _pada(2))["gana"] == 0
+
+
+# ── Vectorized scoring ──
+
+
+def test_score_matches_table_for_both_roles():
+    rng = np.random.default_rng(7)
+    candidates = rng.integers(0, 108, size=5000)
+    as_groom = ashtakoota.score(10, candidates, MatchRole.GROOM)
+    as_bride = ashtakoota.score(10, candidates, MatchRole.BRIDE)
+
+    assert as_groom.shape == (5000, 8)
+    assert np.array_equal(as_groom.sum(axis=1), TOTAL_TABLE[10, candidates])
+    assert np.array_equal(as_bride.sum(axis=1), TOTAL_TABLE[candidates, 10])
+
+
+def test_moon_pada():
+    assert ashtakoota.moon_pada([0.0, 3.34, 359.99]).tolist() == [0, 1, 107]
+
+
+# ── Bookings ──
+
+
+def _booking(name: str, dob: str, tob: str = "10:00 AM") -> dict:
+    return {
+        "_id": ObjectId(),
+        "user_name": name,
+        "service_slug": "matchmaking",
+        "date_of_birth": dob,
+        "time_of_birth": tob,
+        "birth_time_unknown": False,
+        "birth_latitude": 19.076,
+        "birth_longitude": 72.8777,
+    }
+
+
+async def test_score_bookings_ranks_candidates(memory_db):
+    profile = _booking("Profile", "1992-03-04")
+    candidates = [_booking(f"Candidate {i}", f"1994-0{i}-1{i}") for i in range(1, 8)]
+    broken = {**_booking("Broken", "1994-01-01"), "date_of_birth": ""}
+    await memory_db.bookings.insert_many([profile, *candidates, broken])
+    ghost = str(ObjectId())
+
+    result = await ashtakoota.score_bookings(
+        str(profile["_id"]),
+        MatchRole.GROOM,
+        [str(c["_id"]) for c in candidates] + [str(broken["_id"]), ghost, "bad-id"],
+    )
+
+    scores = [m["score"] for m in result["matches"]]
+    assert len(scores) == 7
+    assert scores == sorted(scores, reverse=True)
+    assert result["invalid"] == [str(broken["_id"])]
+    assert result["missing"] == [ghost, "bad-id"]
+    assert result["max_score"] == 36
+
+    charts = await kundli.charts_for([kundli.birth_input(profile), kundli.birth_input(candidates[0])])
+    profile_pada, candidate_pada = ashtakoota.moon_pada([c["planets"]["moon"]["longitude"] for c in charts])
+    first = next(m for m in result["matches"] if m["booking_id"] == str(candidates[0]["_id"]))
+    assert first["score"] == TOTAL_TABLE[profile_pada, candidate_pada]
+    assert first["nadi_dosha"] == (first["kootas"]["nadi"] == 0)
+    assert result["profile"]["moon_nakshatra"] == charts[0]["planets"]["moon"]["nakshatra"]
+
+
+async def test_score_bookings_min_score(memory_db):
+    profile = _booking("Profile", "1992-03-04")
+    candidates = [_booking(f"Candidate {i}", f"1990-01-{i:02d}") for i in range(1, 28)]
+    await memory_db.bookings.insert_many([profile, *candidates])
+    ids = [str(c["_id"]) for c in candidates]
+
+    everyone = await ashtakoota.score_bookings(str(profile["_id"]), MatchRole.BRIDE, ids)
+    strong = await ashtakoota.score_bookings(str(profile["_id"]), MatchRole.BRIDE, ids, min_score=18)
+
+    assert len(everyone["matches"]) == 27
+    assert [m for m in everyone["matches"] if m["score"] >= 18] == strong["matches"]
+
+
+async def test_score_bookings_unknown_profile(memory_db):
+    assert await ashtakoota.score_bookings(str(ObjectId()), MatchRole.GROOM, [str(ObjectId())]) is None
+
+
+async def test_score_bookings_profile_without_birth_details(memory_db):
+    profile = {**_booking("Profile", "1992-03-04"), "date_of_birth": ""}
+    await memory_db.bookings.insert_one(profile)
+    with pytest.raises(ValueError):
+        await ashtakoota.score_bookings(str(profile["_id"]), MatchRole.GROOM, [str(ObjectId())])
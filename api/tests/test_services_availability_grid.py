@@ -0,0 +1,63 @@
+"""Tests for app.services.availability_grid — vectorized free-slot counting."""
+
+import numpy as np
+
+from app.services.availability_grid import MINUTES_PER_DAY, busy_matrix, free_slot_counts
+
+
+def test_busy_matrix_marks_half_open_intervals():
+    busy = busy_matrix(2, [(0, 600, 630), (1, 0, 1)])
+    assert busy.shape == (2, MINUTES_PER_DAY)
+    assert busy[0, 600] and busy[0, 629]
+    assert not busy[0, 630] and not busy[0, 599]
+    assert busy[1].sum() == 1
+
+
+def test_busy_matrix_ignores_empty_and_clips():
+    busy = busy_matrix(1, [(0, 600, 600), (0, 1430, 1500)])
+    assert busy[0].sum() == 10
+
+
+def test_busy_matrix_overlapping_intervals():
+    busy = busy_matrix(1, [(0, 600, 660), (0, 630, 690)])
+    assert busy[0].sum() == 90
+
+
+def test_free_slot_counts_open_day():
+    busy = busy_matrix(1, [])
+    total, free = free_slot_counts(busy, np.array([600]), np.array([1080]), 30)
+    assert total.tolist() == [16]
+    assert free.tolist() == [16]
+
+
+def test_free_slot_counts_with_busy_minutes():
+    # A 15-minute block at 11:15 takes out the 11:00 slot only
+    busy = busy_matrix(1, [(0, 675, 690)])
+    total, free = free_slot_counts(busy, np.array([600]), np.array([1080]), 30)
+    assert free.tolist() == [15]
+
+
+def test_free_slot_counts_closed_day_has_no_slots():
+    busy = busy_matrix(2, [])
+    total, free = free_slot_counts(busy, np.array([600, 0]), np.array([1080, 0]), 30)
+    assert total.tolist() == [16, 0]
+    assert free.tolist() == [16, 0]
+
+
+def test_free_slot_counts_unaligned_open_time():
+    busy = busy_matrix(1, [])
+    total, _ = free_slot_counts(busy, np.array([615]), np.array([720]), 30)
+    # 10:15, 10:45, 11:15 — 11:45 would end past 12:00
+    assert total.tolist() == [3]
+
+
+def test_free_slot_counts_not_before():
+    busy = busy_matrix(1, [])
+    _, free = free_slot_counts(busy, np.array([600]), np.array([1080]), 30, np.array([600]))
+    assert free.tolist() == [15]
+
+
+def test_free_slot_counts_full_day_until_midnight():
+    busy = busy_matrix(1, [])
+    total, _ = free_slot_counts(busy, np.array([0]), np.array([MINUTES_PER_DAY]), 30)
+    assert total.tolist() == [48]
@@ -0,0 +1,77 @@
+"""Tests for app.services.booking_lifecycle — auto-completion of past sessions."""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from zoneinfo import ZoneInfo
+
+from app.services import day_schedule
+from app.services.booking_lifecycle import (
+    STATUS_DATE_INDEX,
+    complete_past_bookings,
+    past_sessions_query,
+)
+
+
+def test_past_sessions_query_shape():
+    query = past_sessions_query(datetime(2026, 3, 16, 11, 5))
+    assert query["status"] == "confirmed"
+    assert query["duration_minutes"] == {"$gt": 0}
+    earlier, today = query["$or"]
+    assert earlier == {"date": {"$lt": "2026-03-16"}}
+    assert today["date"] == "2026-03-16"
+    assert today["$expr"]["$lte"][1] == 11 * 60 + 5
+
+
+async def test_complete_past_bookings_single_update(mock_db):
+    mock_db.bookings.create_index = AsyncMock()
+    mock_db.bookings.update_many = AsyncMock(return_value=MagicMock(modified_count=4))
+    now = datetime(2026, 3, 16, 5, 0, tzinfo=timezone.utc)
+
+    assert await complete_past_bookings(now) == 4
+
+    mock_db.bookings.update_many.assert_awaited_once()
+    query, update = mock_db.bookings.update_many.call_args[0]
+    # 05:00 UTC is 10:30 in Asia/Kolkata (default business timezone)
+    local = now.astimezone(ZoneInfo("Asia/Kolkata"))
+    assert query == past_sessions_query(local)
+    assert update == {"$set": {"status": "completed", "completed_at": now}}
+
+
+async def test_complete_past_bookings_creates_index_once(mock_db):
+    mock_db.bookings.create_index = AsyncMock()
+
+    await complete_past_bookings()
+    await complete_past_bookings()
+
+    mock_db.bookings.create_index.assert_awaited_once_with(STATUS_DATE_INDEX)
+
+
+async def test_complete_past_bookings_rebuilds_only_today(memory_db):
+    # 12:00 UTC is 17:30 in Asia/Kolkata
+    now = datetime(2026, 3, 16, 12, 0, tzinfo=timezone.utc)
+    await memory_db.bookings.insert_many([
+        {"date": "2026-03-15", "time_slot": "10:00", "duration_minutes": 60, "status": "confirmed"},
+        {"date": "2026-03-16", "time_slot": "10:00", "duration_minutes": 60, "status": "confirmed"},
+        {"date": "2026-03-20", "time_slot": "10:00", "duration_minutes": 60, "status": "confirmed"},
+    ])
+    for date_str in ("2026-03-16", "2026-03-20"):
+        await day_schedule.rebuild_day(date_str)
+
+    with patch.object(day_schedule, "rebuild_day", wraps=day_schedule.rebuild_day) as rebuild:
+        assert await complete_past_bookings(now) == 2
+
+    rebuild.assert_awaited_once_with("2026-03-16")
+    assert (await day_schedule.load_day_schedule("2026-03-16")).booked == 0
+    assert await day_schedule.check_consistency(["2026-03-16", "2026-03-20"]) == []
+
+
+async def test_complete_past_bookings_skips_rebuild_for_past_days(memory_db):
+    now = datetime(2026, 3, 16, 12, 0, tzinfo=timezone.utc)
+    await memory_db.bookings.insert_one(
+        {"date": "2026-03-15", "time_slot": "10:00", "duration_minutes": 60, "status": "confirmed"}
+    )
+
+    with patch.object(day_schedule, "rebuild_day", AsyncMock()) as rebuild:
+        assert await complete_past_bookings(now) == 1
+
+    rebuild.assert_not_awaited()
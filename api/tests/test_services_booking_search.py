@@ -0,0 +1,157 @@
+"""Tests for app.services.booking_search — query routing and keyset paging."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+
+from app.services import booking_search
+from app.services.booking_search import classify, decode_cursor, encode_cursor
+from tests.conftest import MockAggregationCursor, MockCursor
+
+NOW = datetime(2026, 3, 16, 10, 0, tzinfo=timezone.utc)
+
+
+def _doc(minutes_ago=0, **extra):
+    return {"_id": ObjectId(), "created_at": NOW - timedelta(minutes=minutes_ago), **extra}
+
+
+@pytest.mark.parametrize("q, mode", [
+    ("507f1f77bcf86cd799439013", "id"),
+    ("Test@Example", "email"),
+    ("+91 98765", "phone"),
+    ("98-76", "phone"),
+    ("123", "text"),
+    ("Ravi Kumar", "text"),
+    ("vastu", "text"),
+])
+def test_classify(q, mode):
+    assert classify(q) == mode
+
+
+def test_normalizers():
+    assert booking_search.normalize_email("  Ravi@Example.COM ") == "ravi@example.com"
+    assert booking_search.normalize_phone("+91 (987) 654-3210") == "9876543210"
+
+
+PHONES = [
+    ("+91 98765 43210", "9876543210"),
+    ("0091 9876543210", "9876543210"),
+    ("91 98765 43210", "9876543210"),
+    ("09876543210", "9876543210"),
+    ("98765-43210", "9876543210"),
+    ("022 2345 6789", "2223456789"),
+    ("+1 415 555 1234", "14155551234"),
+    ("", ""),
+]
+
+
+@pytest.mark.parametrize("phone, national", PHONES)
+def test_normalize_phone_to_national_number(phone, national):
+    assert booking_search.normalize_phone(phone) == national
+
+
+@pytest.mark.parametrize("query, prefix", [("+91 98765", "98765"), ("98765", "98765"), ("022 23", "2223")])
+def test_phone_queries_normalize_like_stored_numbers(query, prefix):
+    assert booking_search.normalize_phone(query) == prefix
+
+
+def test_cursor_round_trip():
+    oid = ObjectId()
+    values = decode_cursor(encode_cursor({"s": 1.5, "id": str(oid)}))
+    assert values == {"s": 1.5, "id": oid}
+
+
+def test_invalid_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+async def test_email_prefix_is_anchored_and_paged(mock_db):
+    docs = [_doc(1), _doc(2), _doc(3)]
+    mock_db.bookings.find = MagicMock(return_value=MockCursor(docs))
+
+    mode, page, next_cursor = await booking_search.search("Ravi.K@", limit=2)
+
+    assert mode == "email"
+    assert page == docs[:2]
+    assert mock_db.bookings.find.call_args[0][0] == {"email_lc": {"$regex": r"^ravi\.k@"}}
+
+    mock_db.bookings.find = MagicMock(return_value=MockCursor([]))
+    await booking_search.search("Ravi.K@", limit=2, cursor=next_cursor)
+    query = mock_db.bookings.find.call_args[0][0]
+    keyset = query["$and"][1]["$or"]
+    assert keyset[0] == {"created_at": {"$lt": docs[1]["created_at"]}}
+    assert keyset[1]["_id"] == {"$lt": docs[1]["_id"]}
+
+
+async def test_phone_prefix(mock_db):
+    mode, page, next_cursor = await booking_search.search("+91 98", limit=20)
+    assert mode == "phone"
+    assert next_cursor is None
+    assert mock_db.bookings.find.call_args[0][0] == {"phone_digits": {"$regex": "^98"}}
+
+
+@pytest.mark.parametrize("q", ["0000", "+0091", "00 91"])
+async def test_phone_query_without_national_digits_matches_nothing(mock_db, q):
+    mode, page, next_cursor = await booking_search.search(q, limit=20)
+    assert (mode, page, next_cursor) == ("phone", [], None)
+    mock_db.bookings.find.assert_not_called()
+
+
+async def test_text_search_orders_by_relevance(mock_db):
+    docs = [_doc(_score=3.0), _doc(_score=2.0), _doc(_score=1.0)]
+    mock_db.bookings.aggregate = MagicMock(return_value=MockAggregationCursor(docs))
+
+    mode, page, next_cursor = await booking_search.search("Ravi", limit=2)
+
+    assert mode == "text"
+    pipeline = mock_db.bookings.aggregate.call_args[0][0]
+    assert pipeline[0] == {"$match": {"$text": {"$search": "Ravi"}}}
+    assert {"$sort": {"_score": -1, "_id": -1}} in pipeline
+    assert decode_cursor(next_cursor) == {"s": 2.0, "id": docs[1]["_id"]}
+
+    await booking_search.search("Ravi", limit=2, cursor=next_cursor)
+    pipeline = mock_db.bookings.aggregate.call_args[0][0]
+    assert pipeline[2]["$match"]["$or"][0] == {"_score": {"$lt": 2.0}}
+
+
+async def test_id_lookup(mock_db):
+    doc = _doc()
+    mock_db.bookings.find_one = AsyncMock(return_value=doc)
+    mode, page, _ = await booking_search.search(str(doc["_id"]), limit=20)
+    assert (mode, page) == ("id", [doc])
+
+
+async def test_indexes_created_once(mock_db):
+    await booking_search.search("Ravi", limit=5)
+    await booking_search.search("Ravi", limit=5)
+    assert mock_db.bookings.create_index.await_count == len(booking_search.INDEXES)
+
+
+async def test_backfill_uses_single_pipeline_update(mock_db):
+    mock_db.bookings.update_many = AsyncMock(return_value=MagicMock(modified_count=7))
+    assert await booking_search.backfill_normalized_fields() == 7
+    query, pipeline = mock_db.bookings.update_many.call_args[0]
+    assert "$or" in query
+    assert set(pipeline[0]["$set"]) == {"email_lc", "phone_digits"}
+
+
+async def test_backfill_pipeline_matches_normalize_phone(memory_db):
+    await memory_db.bookings.insert_many([
+        {"user_email": " A@B.com", "user_phone": phone, "created_at": NOW} for phone, _ in PHONES
+    ])
+    # Stored before country codes were stripped
+    await memory_db.bookings.insert_one(
+        {"user_email": "c@d.com", "email_lc": "c@d.com", "user_phone": "+91 98765 43210",
+         "phone_digits": "919876543210", "created_at": NOW}
+    )
+
+    assert await booking_search.backfill_normalized_fields() == len(PHONES) + 1
+    docs = [doc async for doc in memory_db.bookings.find({})]
+    assert [d["phone_digits"] for d in docs] == [national for _, national in PHONES] + ["9876543210"]
+    assert docs[0]["email_lc"] == "a@b.com"
+
+    _, found, _ = await booking_search.search("+91 98765", limit=20)
+    assert len(found) == 6
@@ -0,0 +1,88 @@
+"""Tests for app.services.catalog — immutable service catalog and reloads."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services import catalog
+from app.services.catalog import DEFAULT_SERVICES, get_catalog
+from app.utils.exceptions import BadRequestError
+from tests.conftest import MockCursor
+
+
+def test_price_valid_service_and_duration():
+    assert get_catalog().price("call-consultation", 30) == 1999
+    assert get_catalog().price("call-consultation", 45) == 2499
+
+
+def test_price_unknown_service():
+    with pytest.raises(BadRequestError, match="Unknown service"):
+        get_catalog().price("nonexistent", 30)
+
+
+def test_price_invalid_duration():
+    with pytest.raises(BadRequestError, match="not available.*30 min, 45 min, 60 min"):
+        get_catalog().price("call-consultation", 90)
+
+
+def test_report_service_any_duration():
+    # Report services have a "0" price used for any duration
+    assert get_catalog().price("premium-kundli", 15) == 4999
+    assert get_catalog().get("premium-kundli").is_report
+
+
+def test_durations():
+    assert get_catalog().durations("therapeutic-healing") == (45, 60, 75)
+    assert get_catalog().durations("premium-kundli") == ()
+    assert get_catalog().durations("nonexistent") == ()
+
+
+def test_defaults_cover_every_service():
+    assert len(get_catalog()) == len(DEFAULT_SERVICES)
+
+
+def test_catalog_is_read_only():
+    service = get_catalog().get("call-consultation")
+    with pytest.raises(TypeError):
+        service.prices[30] = 1
+
+
+async def test_reload_swaps_snapshot(mock_db):
+    mock_db.services.count_documents = AsyncMock(return_value=1)
+    mock_db.services.find = MagicMock(return_value=MockCursor([
+        {"_id": "call-consultation", "title": "Call", "prices": {"30": 2199}},
+    ]))
+    before = get_catalog()
+
+    after = await catalog.reload()
+
+    assert get_catalog() is after
+    assert after.price("call-consultation", 30) == 2199
+    assert after.get("video-consultation") is None
+    assert after.etag != before.etag
+    # The old snapshot is untouched
+    assert before.price("call-consultation", 30) == 1999
+
+
+async def test_reload_seeds_empty_collection(mock_db):
+    mock_db.services.count_documents = AsyncMock(return_value=0)
+
+    await catalog.reload()
+
+    ops = mock_db.services.bulk_write.call_args[0][0]
+    assert len(ops) == len(DEFAULT_SERVICES)
+    assert mock_db.services.bulk_write.call_args[1]["ordered"] is False
+
+
+async def test_bus_event_reloads(mock_db):
+    mock_db.services.count_documents = AsyncMock(return_value=1)
+    mock_db.services.find = MagicMock(return_value=MockCursor([
+        {"_id": "matchmaking", "title": "Kundli Matching", "prices": {"0": 2799}},
+    ]))
+
+    await catalog.invalidation.publish(catalog.CATALOG_TOPIC)
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    assert get_catalog().price("matchmaking", 0) == 2799
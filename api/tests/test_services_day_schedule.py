@@ -0,0 +1,238 @@
+"""Tests for app.services.day_schedule — materialized per-date busy bitmaps."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+from app.services import day_schedule
+from app.services.day_schedule import (
+    WORD_MASK,
+    _bit_update,
+    _join_words,
+    _split_words,
+    interval_mask,
+)
+from tests.conftest import MockCursor
+
+
+@pytest.fixture
+def db():
+    db = MagicMock()
+    db.day_schedule.find_one = AsyncMock(return_value=None)
+    db.day_schedule.update_one = AsyncMock()
+    db.day_schedule.replace_one = AsyncMock()
+    db.day_schedule.bulk_write = AsyncMock()
+    db.unavailability.find = MagicMock(return_value=MockCursor([]))
+    db.bookings.find = MagicMock(return_value=MockCursor([]))
+    with patch("app.services.day_schedule.get_db", return_value=db):
+        yield db
+
+
+def _booking(status="pending", time_slot="10:00", duration=60, created_at=None):
+    return {
+        "_id": ObjectId(),
+        "date": "2026-03-16",
+        "time_slot": time_slot,
+        "duration_minutes": duration,
+        "status": status,
+        "created_at": created_at or datetime.now(timezone.utc),
+    }
+
+
+# ── Bitmap helpers ──
+
+
+def test_interval_mask_bits():
+    assert interval_mask(0, 3) == 0b111
+    assert interval_mask(600, 600) == 0
+    assert interval_mask(1430, 1500) == interval_mask(1430, 1440)
+
+
+def test_words_round_trip():
+    mask = interval_mask(47, 49) | interval_mask(1400, 1440)
+    words = _split_words(mask)
+    assert len(words) == 30
+    assert all(0 <= w <= WORD_MASK for w in words.values())
+    assert _join_words(words) == mask
+
+
+def test_bit_update_only_touches_nonzero_words():
+    update = _bit_update("booked", interval_mask(600, 660), "or")
+    assert set(update) == {"booked.w12", "booked.w13"}
+    assert update["booked.w12"] == {"or": WORD_MASK & ~((1 << 24) - 1)}
+
+
+def test_bit_update_and_clears_bits():
+    update = _bit_update("booked", interval_mask(0, 48), "and")
+    assert update == {"booked.w00": {"and": 0}}
+
+
+# ── Reads ──
+
+
+async def test_load_missing_doc_is_empty(db):
+    schedule = await day_schedule.load_day_schedule("2026-03-16")
+    assert schedule == (False, 0, 0)
+
+
+async def test_load_folds_live_pendings_and_drops_expired(db):
+    now = datetime.now(timezone.utc)
+    db.day_schedule.find_one = AsyncMock(return_value={
+        "_id": "2026-03-16",
+        "holiday": False,
+        "blocked": _split_words(interval_mask(600, 630)),
+        "booked": _split_words(interval_mask(700, 730)),
+        "pending": [
+            {"start_min": 800, "end_min": 830, "created_at": now},
+            {"start_min": 900, "end_min": 930, "created_at": (now - timedelta(hours=1)).replace(tzinfo=None)},
+        ],
+    })
+
+    schedule = await day_schedule.load_day_schedule("2026-03-16")
+    assert schedule.blocked == interval_mask(600, 630)
+    assert schedule.booked == interval_mask(700, 730) | interval_mask(800, 830)
+    assert not schedule.busy & interval_mask(900, 930)
+
+
+# ── Write hooks ──
+
+
+async def test_booking_created_pushes_pending(db):
+    doc = _booking()
+    await day_schedule.booking_created(doc)
+
+    prune, push = db.day_schedule.bulk_write.call_args[0][0]
+    assert prune._filter == push._filter == {"_id": "2026-03-16"}
+    assert "$lt" in prune._doc["$pull"]["pending"]["created_at"]
+    assert push._doc["$push"]["pending"]["start_min"] == 600
+    assert push._doc["$push"]["pending"]["end_min"] == 660
+    assert push._upsert is True
+
+
+async def test_report_booking_is_not_scheduled(db):
+    await day_schedule.booking_created(_booking(duration=0))
+    db.day_schedule.update_one.assert_not_called()
+
+
+async def test_confirm_moves_pending_into_bitmap(db):
+    doc = _booking()
+    await day_schedule.booking_status_changed(doc, "pending", "confirmed")
+
+    update = db.day_schedule.update_one.call_args[0][1]
+    own, expired = update["$pull"]["pending"]["$or"]
+    assert own == {"booking_id": str(doc["_id"])}
+    assert "$lt" in expired["created_at"]
+    assert "or" in update["$bit"]["booked.w12"]
+
+
+async def test_cancel_confirmed_clears_bitmap(db):
+    await day_schedule.booking_status_changed(_booking(), "confirmed", "cancelled")
+
+    update = db.day_schedule.update_one.call_args[0][1]
+    assert "booking_id" not in str(update["$pull"])
+    assert "and" in update["$bit"]["booked.w12"]
+
+
+async def test_cancel_keeps_bits_of_overlapping_confirmed_booking(db):
+    db.bookings.find = MagicMock(return_value=MockCursor([
+        _booking(status="confirmed", time_slot="10:30", duration=60),
+    ]))
+    await day_schedule.booking_status_changed(_booking(), "confirmed", "cancelled")
+
+    query = db.bookings.find.call_args[0][0]
+    assert query["status"] == "confirmed" and "$ne" in query["_id"]
+    update = db.day_schedule.update_one.call_args[0][1]
+    # Only 10:00-10:30 is released; 10:30-11:00 stays booked
+    assert _join_words({k[len("booked."):]: ~v["and"] & WORD_MASK for k, v in update["$bit"].items()}) == (
+        interval_mask(600, 630)
+    )
+
+
+async def test_unchanged_status_is_noop(db):
+    await day_schedule.booking_status_changed(_booking(), "confirmed", "confirmed")
+    db.day_schedule.update_one.assert_not_called()
+
+
+async def test_block_added_sets_holiday_or_bits(db):
+    await day_schedule.block_added({"date": "2026-03-16", "is_holiday": True})
+    assert db.day_schedule.update_one.call_args[0][1]["$set"] == {"holiday": True}
+
+    await day_schedule.block_added(
+        {"date": "2026-03-16", "is_holiday": False, "start_time": "10:00", "end_time": "10:30"}
+    )
+    assert "blocked.w12" in db.day_schedule.update_one.call_args[0][1]["$bit"]
+    assert "$pull" in db.day_schedule.update_one.call_args[0][1]
+
+
+async def test_writes_prune_expired_pendings(memory_db):
+    stale = _booking(created_at=datetime.now(timezone.utc) - timedelta(hours=1), time_slot="09:00")
+    live = _booking(time_slot="12:00")
+    await memory_db.day_schedule.insert_one({
+        "_id": "2026-03-16",
+        "pending": [
+            {"booking_id": str(stale["_id"]), "start_min": 540, "end_min": 600, "created_at": stale["created_at"]},
+        ],
+    })
+
+    await day_schedule.booking_created(live)
+    doc = await memory_db.day_schedule.find_one({"_id": "2026-03-16"})
+    assert [p["booking_id"] for p in doc["pending"]] == [str(live["_id"])]
+
+
+async def test_overlapping_confirmed_bookings_keep_shared_minutes(memory_db):
+    first = _booking(status="confirmed", time_slot="10:00")
+    second = _booking(status="confirmed", time_slot="10:30")
+    await memory_db.bookings.insert_many([first, second])
+    await day_schedule.rebuild_day("2026-03-16")
+
+    await memory_db.bookings.update_one({"_id": first["_id"]}, {"$set": {"status": "cancelled"}})
+    await day_schedule.booking_status_changed(first, "confirmed", "cancelled")
+
+    schedule = await day_schedule.load_day_schedule("2026-03-16")
+    assert schedule.booked == interval_mask(630, 690)
+    assert await day_schedule.check_consistency(["2026-03-16"]) == []
+
+
+# ── Rebuild / consistency ──
+
+
+async def test_rebuild_day_from_sources(db):
+    db.unavailability.find = MagicMock(return_value=MockCursor([
+        {"date": "2026-03-16", "is_holiday": False, "start_time": "10:00", "end_time": "11:00"},
+        {"date": "2026-03-16", "is_holiday": False, "start_time": "10:30", "end_time": "11:30"},
+    ]))
+    db.bookings.find = MagicMock(return_value=MockCursor([
+        _booking(status="confirmed", time_slot="14:00"),
+        _booking(status="pending", time_slot="16:00", duration=30),
+    ]))
+
+    doc = await day_schedule.rebuild_day("2026-03-16")
+    assert _join_words(doc["blocked"]) == interval_mask(600, 690)
+    assert _join_words(doc["booked"]) == interval_mask(840, 900)
+    assert len(doc["pending"]) == 1
+    db.day_schedule.replace_one.assert_awaited_once()
+
+
+async def test_check_consistency_reports_and_repairs(db):
+    db.bookings.find = MagicMock(
+        side_effect=lambda *a, **k: MockCursor([_booking(status="confirmed")])
+    )
+
+    mismatched = await day_schedule.check_consistency(["2026-03-16"], repair=True)
+    assert mismatched == ["2026-03-16"]
+    db.day_schedule.replace_one.assert_awaited_once()
+
+
+async def test_check_consistency_clean(db):
+    db.day_schedule.find_one = AsyncMock(return_value={
+        "_id": "2026-03-16",
+        "booked": _split_words(interval_mask(600, 660)),
+    })
+    db.bookings.find = MagicMock(
+        side_effect=lambda *a, **k: MockCursor([_booking(status="confirmed")])
+    )
+
+    assert await day_schedule.check_consistency(["2026-03-16"]) == []
+    db.day_schedule.replace_one.assert_not_called()
@@ -0,0 +1,69 @@
+"""Tests for app.services.ephemeris — vectorized offline positions."""
+
+import numpy as np
+import pytest
+
+from app.services import ephemeris
+
+J2000 = 2451545.0
+
+# Geocentric longitudes of date at 2000-01-01 12:00 (published almanac values)
+J2000_LONGITUDES = {
+    "sun": 280.37,
+    "moon": 223.32,
+    "mercury": 271.89,
+    "venus": 241.57,
+    "mars": 327.96,
+    "jupiter": 25.25,
+    "saturn": 40.40,
+    "rahu": 125.04,
+}
+
+
+def _angle_diff(a, b):
+    return np.abs((np.asarray(a) - b + 180) % 360 - 180)
+
+
+@pytest.mark.parametrize("body,expected", J2000_LONGITUDES.items())
+def test_longitudes_at_j2000(body, expected):
+    longitudes = ephemeris.tropical_longitudes(np.array([J2000]))
+    assert _angle_diff(longitudes[0, ephemeris.BODIES.index(body)], expected) < 0.1
+
+
+def test_ketu_opposes_rahu():
+    longitudes = ephemeris.tropical_longitudes(np.array([J2000, J2000 + 4000]))
+    rahu, ketu = ephemeris.BODIES.index("rahu"), ephemeris.BODIES.index("ketu")
+    assert np.allclose(_angle_diff(longitudes[:, rahu], longitudes[:, ketu]), 180)
+
+
+def test_batch_matches_single_evaluations():
+    jd = J2000 + np.linspace(-30000, 30000, 25)
+    batch = ephemeris.tropical_longitudes(jd)
+    single = np.vstack([ephemeris.tropical_longitudes(np.array([day])) for day in jd])
+    assert batch.shape == (25, len(ephemeris.BODIES))
+    assert np.allclose(batch, single)
+    assert ((batch >= 0) & (batch < 360)).all()
+
+
+def test_sun_advances_about_one_degree_a_day():
+    longitudes = ephemeris.tropical_longitudes(np.array([J2000, J2000 + 1]))
+    assert 0.95 < longitudes[1, 0] - longitudes[0, 0] < 1.05
+
+
+def test_lahiri_ayanamsa():
+    assert ephemeris.ayanamsa(np.array([J2000]))[0] == pytest.approx(23.853, abs=0.01)
+    # 1950: about 23°09'
+    assert ephemeris.ayanamsa(np.array([2433282.5]))[0] == pytest.approx(23.15, abs=0.02)
+
+
+def test_ascendant_at_greenwich_j2000():
+    # Sidereal time ~18h42m puts about 24° Aries on the Greenwich horizon
+    asc = ephemeris.ascendant(np.array([J2000]), np.array([51.48]), np.array([0.0]))
+    assert _angle_diff(asc[0], 24.3) < 0.5
+
+
+def test_ascendant_on_equator_is_ninety_degrees_from_mc():
+    # With 0° Aries culminating on the equator, 0° Cancer rises
+    jd = J2000 + (360 - 280.46061837) / 360.98564736629
+    asc = ephemeris.ascendant(np.array([jd]), np.array([0.0]), np.array([0.0]))
+    assert _angle_diff(asc[0], 90) < 0.01
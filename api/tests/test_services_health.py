@@ -0,0 +1,62 @@
+"""Tests for app.services.health — warm-up and cached readiness ping."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import health
+from tests.conftest import MockCursor
+
+
+@pytest.fixture
+def db():
+    db = MagicMock()
+    db.command = AsyncMock(return_value={"ok": 1})
+    db.settings.find_one = AsyncMock(return_value=None)
+    db.services.count_documents = AsyncMock(return_value=1)
+    db.services.find = MagicMock(return_value=MockCursor([]))
+    with patch("app.services.health.get_db", return_value=db), \
+         patch("app.services.settings.get_db", return_value=db), \
+         patch("app.services.catalog.get_db", return_value=db):
+        yield db
+
+
+async def test_warm_up_opens_pool_and_prefetches(db):
+    with patch("app.services.health.settings.MONGODB_MIN_POOL_SIZE", 3):
+        await health.warm_up()
+
+    assert health.is_ready()
+    assert db.command.await_count == 4
+    db.settings.find_one.assert_awaited_once_with({"_id": "business_hours"})
+    db.services.find.assert_called_once()
+
+
+async def test_warm_up_retries_until_mongo_answers(db):
+    db.command = AsyncMock(side_effect=[Exception("no server"), {"ok": 1}, {"ok": 1}, {"ok": 1}])
+
+    with patch("app.services.health.asyncio.sleep", AsyncMock()) as sleep:
+        await health.warm_up()
+
+    assert health.is_ready()
+    assert health.warmup_error() is None
+    sleep.assert_awaited_once_with(health.WARMUP_RETRY_SECONDS[0])
+
+
+async def test_ping_is_cached(db):
+    assert await health.ping_mongo()
+    assert await health.ping_mongo()
+    db.command.assert_awaited_once_with("ping")
+
+
+async def test_ping_failure_is_reported(db):
+    db.command = AsyncMock(side_effect=Exception("down"))
+    assert not await health.ping_mongo()
+
+
+async def test_ping_refreshes_after_cache_window(db):
+    await health.ping_mongo()
+    stamp, ok = health._last_ping
+    health._last_ping = (stamp - health.PING_CACHE_SECONDS, ok)
+
+    await health.ping_mongo()
+    assert db.command.await_count == 2
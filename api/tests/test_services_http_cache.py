@@ -0,0 +1,105 @@
+"""Tests for app.services.http_cache — ETags, versions and CDN purges."""
+
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import Response
+from starlette.requests import Request
+
+from app.services import http_cache
+
+
+def _request(query: str = "", headers: dict | None = None) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "query_string": query.encode(), "headers": raw})
+
+
+def test_etag_matches_list_and_weak_tags():
+    etag = '"unavailability-v1-abc"'
+    assert http_cache.etag_matches(etag, etag)
+    assert http_cache.etag_matches(f'"other", W/{etag}', etag)
+    assert http_cache.etag_matches("*", etag)
+    assert not http_cache.etag_matches('"unavailability-v0-abc"', etag)
+    assert not http_cache.etag_matches(None, etag)
+
+
+def test_etag_depends_on_version_and_query():
+    a = http_cache.make_etag("unavailability", 1, _request("date=2026-03-01"))
+    assert a == http_cache.make_etag("unavailability", 1, _request("date=2026-03-01"))
+    assert a != http_cache.make_etag("unavailability", 2, _request("date=2026-03-01"))
+    assert a != http_cache.make_etag("unavailability", 1, _request("date=2026-03-02"))
+
+
+async def test_version_is_cached_per_worker(mock_db):
+    mock_db.data_versions.find_one = AsyncMock(return_value={"_id": "unavailability", "version": 7})
+
+    assert await http_cache.get_version("unavailability") == 7
+    assert await http_cache.get_version("unavailability") == 7
+    assert mock_db.data_versions.find_one.await_count == 1
+
+
+async def test_conditional_sets_headers_or_returns_304(mock_db):
+    response = Response()
+    assert await http_cache.conditional("business_hours", _request(), response) is None
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == (
+        "public, max-age=60, s-maxage=86400, stale-while-revalidate=86400"
+    )
+
+    not_modified = await http_cache.conditional(
+        "business_hours", _request(headers={"If-None-Match": etag}), Response()
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+
+
+async def test_bump_updates_version_everywhere(mock_db):
+    mock_db.data_versions.find_one_and_update = AsyncMock(return_value={"version": 5})
+    hook = AsyncMock()
+    http_cache.add_purge_hook(hook)
+
+    await http_cache.bump("unavailability", ["/api/availability/unavailable*"])
+
+    assert await http_cache.get_version("unavailability") == 5
+    mock_db.data_versions.find_one.assert_not_called()
+    event = mock_db.cache_events.insert_one.call_args[0][0]
+    assert (event["topic"], event["key"]) == ("data_versions", "unavailability")
+    hook.assert_awaited_once_with(["/api/availability/unavailable*"])
+
+
+async def test_remote_bump_drops_cached_version(mock_db):
+    mock_db.data_versions.find_one = AsyncMock(return_value={"version": 1})
+    await http_cache.get_version("unavailability")
+
+    http_cache._on_version_changed("unavailability")
+    mock_db.data_versions.find_one = AsyncMock(return_value={"version": 2})
+
+    assert await http_cache.get_version("unavailability") == 2
+
+
+async def test_purge_failure_is_logged(mock_db, caplog):
+    http_cache.add_purge_hook(AsyncMock(side_effect=RuntimeError("throttled")))
+
+    await http_cache.bump("business_hours", ["/api/availability/settings"])
+
+    [record] = [r for r in caplog.records if r.message == "cdn purge failed"]
+    assert record.paths == ["/api/availability/settings"]
+    assert "throttled" in str(record.exc_info[1])
+
+
+def test_unavailability_paths():
+    assert http_cache.unavailability_paths(holidays=False) == ["/api/availability/unavailable*"]
+    assert "/api/availability/holidays*" in http_cache.unavailability_paths()
+
+
+async def test_cloudfront_purge(monkeypatch):
+    client = MagicMock()
+    monkeypatch.setitem(sys.modules, "boto3", SimpleNamespace(client=MagicMock(return_value=client)))
+    monkeypatch.setattr(http_cache.settings, "CDN_DISTRIBUTION_ID", "E123")
+
+    await http_cache.cloudfront_purge(["/api/availability/settings"])
+
+    kwargs = client.create_invalidation.call_args[1]
+    assert kwargs["DistributionId"] == "E123"
+    assert kwargs["InvalidationBatch"]["Paths"] == {"Quantity": 1, "Items": ["/api/availability/settings"]}
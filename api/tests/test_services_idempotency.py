@@ -0,0 +1,182 @@
+"""Tests for app.services.idempotency — Idempotency-Key claims and replays."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import Response
+from pymongo.errors import DuplicateKeyError
+
+from app.services import idempotency
+from app.utils.exceptions import (
+    BadRequestError,
+    ConflictError,
+    NotFoundError,
+    UnprocessableEntityError,
+)
+
+
+class FakeKeys:
+    """Just enough of db.idempotency_keys for claims, completion and release."""
+
+    def __init__(self, col):
+        self.docs: dict[str, dict] = {}
+        col.insert_one = AsyncMock(side_effect=self.insert_one)
+        col.find_one = AsyncMock(side_effect=self.find_one)
+        col.update_one = AsyncMock(side_effect=self.update_one)
+        col.delete_one = AsyncMock(side_effect=self.delete_one)
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("dup")
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def find_one(self, query):
+        doc = self.docs.get(query["_id"])
+        return dict(doc) if doc else None
+
+    def _matches(self, doc, query):
+        return doc is not None and all(doc.get(k) == v for k, v in query.items())
+
+    async def update_one(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if not self._matches(doc, query):
+            return MagicMock(modified_count=0)
+        doc.update(update["$set"])
+        return MagicMock(modified_count=1)
+
+    async def delete_one(self, query):
+        if self._matches(self.docs.get(query["_id"]), query):
+            del self.docs[query["_id"]]
+
+
+@pytest.fixture
+def keys(mock_db):
+    return FakeKeys(mock_db.idempotency_keys)
+
+
+def _counting_work(result=None, delay=0.0, error=None):
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+
+    return work, calls
+
+
+def test_fingerprint_ignores_key_order():
+    assert idempotency.fingerprint({"a": 1, "b": 2}) == idempotency.fingerprint({"b": 2, "a": 1})
+    assert idempotency.fingerprint({"a": 1}) != idempotency.fingerprint({"a": 2})
+
+
+async def test_without_key_always_runs(keys):
+    work, calls = _counting_work({"ok": True})
+    await idempotency.run("bookings", None, {}, work)
+    await idempotency.run("bookings", None, {}, work)
+    assert len(calls) == 2
+    assert keys.docs == {}
+
+
+async def test_rejects_oversized_key(keys):
+    work, calls = _counting_work()
+    with pytest.raises(BadRequestError):
+        await idempotency.run("bookings", "k" * 300, {}, work)
+    assert calls == []
+
+
+async def test_stores_result_and_replays(keys, mock_db):
+    work, calls = _counting_work({"id": "b1"})
+
+    first = await idempotency.run("bookings", "key-1", {"x": 1}, work)
+    response = Response()
+    second = await idempotency.run("bookings", "key-1", {"x": 1}, work, response)
+
+    assert first == second == {"id": "b1"}
+    assert len(calls) == 1
+    assert response.headers[idempotency.REPLAYED_HEADER] == "true"
+    stored = keys.docs["bookings:key-1"]
+    assert stored["status"] == idempotency.COMPLETED
+    assert stored["expires_at"] > datetime.now(timezone.utc) + timedelta(hours=23)
+    mock_db.idempotency_keys.create_index.assert_awaited_once_with("expires_at", expireAfterSeconds=0)
+
+
+async def test_keys_are_scoped(keys):
+    work, calls = _counting_work({"ok": True})
+    await idempotency.run("bookings", "key-1", {}, work)
+    await idempotency.run("checkout", "key-1", {}, work)
+    assert len(calls) == 2
+
+
+async def test_different_body_is_rejected(keys):
+    work, _ = _counting_work({"ok": True})
+    await idempotency.run("bookings", "key-1", {"x": 1}, work)
+    with pytest.raises(UnprocessableEntityError):
+        await idempotency.run("bookings", "key-1", {"x": 2}, work)
+
+
+async def test_concurrent_duplicates_run_work_once(keys):
+    work, calls = _counting_work({"id": "b1"}, delay=0.05)
+
+    results = await asyncio.gather(*[
+        idempotency.run("bookings", "key-1", {"x": 1}, work) for _ in range(5)
+    ])
+
+    assert results == [{"id": "b1"}] * 5
+    assert len(calls) == 1
+
+
+async def test_client_errors_are_replayed(keys):
+    work, calls = _counting_work(error=NotFoundError("Booking not found"))
+
+    for _ in range(2):
+        with pytest.raises(Exception) as exc:
+            await idempotency.run("checkout", "key-1", {}, work)
+        assert exc.value.status_code == 404
+        assert exc.value.detail == "Booking not found"
+    assert len(calls) == 1
+    assert exc.value.headers[idempotency.REPLAYED_HEADER] == "true"
+
+
+async def test_server_errors_release_the_key(keys):
+    failing, _ = _counting_work(error=RuntimeError("stripe down"))
+    with pytest.raises(RuntimeError):
+        await idempotency.run("checkout", "key-1", {}, failing)
+    assert keys.docs == {}
+
+    work, calls = _counting_work({"ok": True})
+    assert await idempotency.run("checkout", "key-1", {}, work) == {"ok": True}
+    assert len(calls) == 1
+
+
+async def test_takes_over_expired_lock(keys):
+    now = datetime.now(timezone.utc)
+    keys.docs["bookings:key-1"] = {
+        "_id": "bookings:key-1",
+        "fingerprint": idempotency.fingerprint({}),
+        "status": idempotency.IN_PROGRESS,
+        "locked_until": now - timedelta(seconds=1),
+    }
+    work, calls = _counting_work({"ok": True})
+
+    assert await idempotency.run("bookings", "key-1", {}, work) == {"ok": True}
+    assert len(calls) == 1
+
+
+async def test_gives_up_waiting_on_live_lock(keys, monkeypatch):
+    monkeypatch.setattr(idempotency.settings, "IDEMPOTENCY_WAIT_SECONDS", 0.1)
+    keys.docs["bookings:key-1"] = {
+        "_id": "bookings:key-1",
+        "fingerprint": idempotency.fingerprint({}),
+        "status": idempotency.IN_PROGRESS,
+        "locked_until": datetime.now(timezone.utc) + timedelta(seconds=30),
+    }
+    work, calls = _counting_work({"ok": True})
+
+    with pytest.raises(ConflictError):
+        await idempotency.run("bookings", "key-1", {}, work)
+    assert calls == []
@@ -0,0 +1,70 @@
+"""Tests for app.services.intervals — numeric interval fields and conflicts."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services import intervals
+from app.services.intervals import INTERVAL_INDEX, block_fields, booking_fields, to_minutes
+
+
+def test_to_minutes_midnight():
+    assert to_minutes("00:00") == 0
+
+
+def test_to_minutes_noon():
+    assert to_minutes("12:00") == 720
+
+
+def test_to_minutes_end_of_day():
+    assert to_minutes("23:59") == 1439
+
+
+def test_to_minutes_with_half_hour():
+    assert to_minutes("09:30") == 570
+
+
+def test_booking_fields():
+    assert booking_fields("10:30", 45) == {"start_min": 630, "end_min": 675}
+    assert booking_fields("10:30", 0) == {"start_min": 630, "end_min": 630}
+
+
+def test_block_fields():
+    assert block_fields("13:00", "24:00") == {"start_min": 780, "end_min": 1440}
+
+
+async def test_no_conflict(mock_db):
+    assert await intervals.find_conflict("2026-03-16", 600, 630) is None
+
+    block_query = mock_db.unavailability.find_one.call_args[0][0]
+    assert block_query == {
+        "date": "2026-03-16",
+        "start_min": {"$lt": 630},
+        "end_min": {"$gt": 600},
+        "is_holiday": False,
+    }
+    booking_query = mock_db.bookings.find_one.call_args[0][0]
+    assert booking_query["date"] == "2026-03-16"
+    assert booking_query["$or"][0] == {"status": "confirmed"}
+
+
+async def test_block_conflict_short_circuits(mock_db):
+    mock_db.unavailability.find_one = AsyncMock(return_value={"_id": 1})
+    assert await intervals.find_conflict("2026-03-16", 600, 630) == "unavailable"
+    mock_db.bookings.find_one.assert_not_called()
+
+
+async def test_booking_conflict(mock_db):
+    mock_db.bookings.find_one = AsyncMock(return_value={"_id": 1})
+    assert await intervals.find_conflict("2026-03-16", 600, 630) == "booked"
+
+
+async def test_backfill(mock_db):
+    mock_db.bookings.update_many = AsyncMock(return_value=MagicMock(modified_count=5))
+    mock_db.unavailability.update_many = AsyncMock(return_value=MagicMock(modified_count=2))
+
+    assert await intervals.backfill() == {"bookings": 5, "blocks": 2}
+
+    mock_db.bookings.create_index.assert_awaited_once_with(INTERVAL_INDEX)
+    mock_db.unavailability.create_index.assert_awaited_once_with(INTERVAL_INDEX)
+    query, pipeline = mock_db.bookings.update_many.call_args[0]
+    assert query["start_min"] == {"$exists": False}
+    assert [list(stage["$set"]) for stage in pipeline] == [["start_min"], ["end_min"]]
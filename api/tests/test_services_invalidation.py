@@ -0,0 +1,170 @@
+"""Tests for app.services.invalidation — publish, listen and lag tracking."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from app.services import invalidation
+from app.services.invalidation import WORKER_ID, InvalidationBus
+from tests.conftest import MockCursor
+
+NOW = datetime(2026, 3, 16, 10, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    handler = MagicMock()
+    monkeypatch.setattr(invalidation, "_handlers", {"test_topic": [handler]})
+    return handler
+
+
+async def test_publish_applies_locally_and_broadcasts(mock_db, handler):
+    await invalidation.publish("test_topic", "k1")
+
+    handler.assert_called_once_with("k1")
+    event = mock_db.cache_events.insert_one.call_args[0][0]
+    assert event["topic"] == "test_topic"
+    assert event["key"] == "k1"
+    assert event["origin"] == WORKER_ID
+
+
+async def test_publish_failure_is_not_raised(mock_db, handler):
+    mock_db.cache_events.insert_one = AsyncMock(side_effect=Exception("down"))
+    await invalidation.publish("test_topic")
+    handler.assert_called_once_with(None)
+
+
+def test_handle_applies_remote_event_and_records_lag(handler):
+    bus = InvalidationBus()
+    bus.handle(
+        {"topic": "test_topic", "key": None, "origin": "other", "published_at": NOW},
+        now=NOW + timedelta(milliseconds=40),
+    )
+
+    handler.assert_called_once_with(None)
+    metrics = bus.metrics()
+    assert metrics["received"] == 1
+    assert metrics["applied"] == 1
+    assert metrics["last_lag_ms"] == 40
+
+
+def test_handle_skips_own_events(handler):
+    bus = InvalidationBus()
+    bus.handle(
+        {"topic": "test_topic", "origin": WORKER_ID, "published_at": NOW.replace(tzinfo=None)},
+        now=NOW + timedelta(milliseconds=5),
+    )
+
+    handler.assert_not_called()
+    assert bus.metrics()["received"] == 1
+    assert bus.metrics()["applied"] == 0
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        InvalidationBus("carrier-pigeon")
+
+
+class TailCursor(MockCursor):
+    """One pass over the documents, after which the server closes the cursor."""
+
+    def __init__(self, documents):
+        super().__init__(documents)
+        self.alive = True
+
+    def __aiter__(self):
+        self.alive = False
+        return super().__aiter__()
+
+
+def _events(*ids):
+    return [{"_id": i, "topic": "test_topic", "key": i, "origin": "other", "published_at": NOW} for i in ids]
+
+
+async def _tail_briefly(bus):
+    with patch("app.services.invalidation.POLL_SECONDS", 0.01):
+        task = asyncio.create_task(bus._tail())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+
+async def test_falls_back_to_polling_without_replica_set(mock_db, handler):
+    mock_db.create_collection = AsyncMock()
+    mock_db.cache_events.watch = MagicMock(
+        side_effect=OperationFailure("only supported on replica sets", code=40573)
+    )
+    mock_db.cache_events.find = MagicMock(side_effect=lambda *a, **k: TailCursor(_events("e1")))
+    bus = InvalidationBus("auto")
+
+    with patch("app.services.invalidation.POLL_SECONDS", 0.01):
+        task = asyncio.create_task(bus.run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    assert bus.mode == "poll"
+    handler.assert_called_once_with("e1")
+    # Natural order, never paged by _id
+    assert mock_db.cache_events.find.call_args[0][0] == {}
+
+
+async def test_poll_starts_after_existing_events(mock_db, handler):
+    mock_db.cache_events.find_one = AsyncMock(return_value=_events("e2")[0])
+    # Ids from other processes need not sort in insertion order
+    mock_db.cache_events.find = MagicMock(side_effect=lambda *a, **k: TailCursor(_events("e9", "e2", "e1")))
+
+    await _tail_briefly(InvalidationBus("poll"))
+
+    assert mock_db.cache_events.find_one.call_args[1]["sort"] == [("$natural", -1)]
+    handler.assert_called_once_with("e1")
+
+
+async def test_poll_reopened_cursor_skips_to_last_event(mock_db, handler):
+    passes = iter([_events("e1"), _events("e1", "e3", "e2")])
+    mock_db.cache_events.find = MagicMock(side_effect=lambda *a, **k: TailCursor(next(passes, [])))
+
+    await _tail_briefly(InvalidationBus("poll"))
+
+    assert [c.args[0] for c in handler.call_args_list] == ["e1", "e3", "e2"]
+
+
+async def test_poll_applies_everything_when_position_rolled_out(mock_db, handler):
+    mock_db.cache_events.find_one = AsyncMock(return_value=_events("gone")[0])
+    passes = iter([_events("e1", "e2")])
+    mock_db.cache_events.find = MagicMock(side_effect=lambda *a, **k: TailCursor(next(passes, [])))
+
+    await _tail_briefly(InvalidationBus("poll"))
+
+    assert [c.args[0] for c in handler.call_args_list] == ["e1", "e2"]
+
+
+async def test_change_stream_mode(mock_db, handler):
+    class FakeStream:
+        resume_token = {"_data": "tok"}
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def __aiter__(self):
+            return MockCursor([{"fullDocument": {
+                "_id": "e1", "topic": "test_topic", "origin": "other", "published_at": NOW,
+            }}]).__aiter__()
+
+    mock_db.create_collection = AsyncMock()
+    mock_db.cache_events.watch = MagicMock(return_value=FakeStream())
+    bus = InvalidationBus("change_stream")
+
+    await bus._watch()
+
+    assert bus.mode == "change_stream"
+    assert bus._resume_token == {"_data": "tok"}
+    handler.assert_called_once_with(None)
+
+
+async def test_measure_lag_without_listener():
+    assert await invalidation.measure_lag() is None
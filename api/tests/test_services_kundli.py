@@ -0,0 +1,180 @@
+"""Tests for app.services.kundli — batch birth charts and memoization."""
+
+from unittest.mock import patch
+
+import pytest
+from bson import ObjectId
+
+from app.services import kundli
+
+MUMBAI = {"birth_latitude": 19.076, "birth_longitude": 72.8777}
+
+
+def _booking(dob="1990-05-17", tob="02:30 PM", **extra):
+    return {
+        "_id": ObjectId(),
+        "service_slug": "premium-kundli",
+        "status": "confirmed",
+        "date_of_birth": dob,
+        "time_of_birth": tob,
+        "birth_time_unknown": tob is None,
+        **MUMBAI,
+        **extra,
+    }
+
+
+# ── Inputs ──
+
+
+@pytest.mark.parametrize("value,minutes", [
+    ("12:00 AM", 0),
+    ("12:30 PM", 750),
+    ("01:05 AM", 65),
+    ("11:59 PM", 1439),
+])
+def test_clock_minutes(value, minutes):
+    assert kundli._clock_minutes(value) == minutes
+
+
+def test_birth_input_normalizes_key():
+    birth = kundli.birth_input(_booking(birth_latitude=19.07601234))
+    assert birth.key == "v1|1990-05-17|14:30|19.0760|72.8777|Asia/Kolkata"
+    assert birth.utc().isoformat() == "1990-05-17T09:00:00+00:00"
+
+
+def test_unknown_birth_time_uses_noon():
+    birth = kundli.birth_input(_booking(tob=None))
+    assert birth.minutes is None
+    assert "|unknown|" in birth.key
+    assert birth.utc().hour == 6 and birth.utc().minute == 30
+
+
+@pytest.mark.parametrize("changes", [
+    {"date_of_birth": ""},
+    {"date_of_birth": "1990-13-01"},
+    {"time_of_birth": "25:00"},
+    {"birth_latitude": 95},
+])
+def test_invalid_birth_details_are_rejected(changes):
+    with pytest.raises(ValueError):
+        kundli.birth_input({**_booking(), **changes})
+
+
+# ── Charts ──
+
+
+def test_chart_contents():
+    (chart,) = kundli.compute_charts([kundli.birth_input(_booking())])
+    planets = chart["planets"]
+    assert set(planets) == {"sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn", "rahu", "ketu"}
+    # Mid-May 1990: sidereal Sun early Taurus, Saturn retrograde in Capricorn
+    assert planets["sun"]["sign"] == "Vrishabha"
+    assert planets["saturn"]["sign"] == "Makara" and planets["saturn"]["retrograde"]
+    assert planets["rahu"]["retrograde"] and planets["ketu"]["retrograde"]
+    assert not planets["sun"]["retrograde"]
+    assert chart["ayanamsa"] == pytest.approx(23.72, abs=0.01)
+    for planet in planets.values():
+        assert planet["nakshatra_index"] == int(planet["longitude"] // (360 / 27))
+        assert 1 <= planet["pada"] <= 4
+        assert planet["house"] == (planet["sign_index"] - chart["ascendant"]["sign_index"]) % 12 + 1
+    assert chart["houses"][0]["sign"] == chart["ascendant"]["sign"]
+    assert len(chart["houses"]) == 12
+
+
+def test_unknown_time_chart_has_no_lagna_or_houses():
+    (chart,) = kundli.compute_charts([kundli.birth_input(_booking(tob=None))])
+    assert chart["ascendant"] is None
+    assert chart["houses"] is None
+    assert chart["planets"]["moon"]["house"] is None
+    assert chart["birth"]["birth_time_unknown"]
+
+
+def test_ascendant_changes_through_the_day():
+    inputs = [kundli.birth_input(_booking(tob=f"{h:02d}:00 AM")) for h in (1, 5, 9)]
+    signs = [chart["ascendant"]["sign_index"] for chart in kundli.compute_charts(inputs)]
+    assert len(set(signs)) == 3
+
+
+def test_batch_matches_individual_charts():
+    inputs = [
+        kundli.birth_input(_booking(dob=f"{1950 + i}-0{1 + i % 9}-1{i % 10}", tob="07:15 PM"))
+        for i in range(40)
+    ]
+    batch = kundli.compute_charts(inputs)
+    for birth, chart in zip(inputs, batch):
+        (single,) = kundli.compute_charts([birth])
+        assert chart["planets"] == single["planets"]
+        assert chart["ascendant"] == single["ascendant"]
+
+
+def test_compute_empty_batch():
+    assert kundli.compute_charts([]) == []
+
+
+# ── Memoization ──
+
+
+async def test_charts_are_memoized_and_persisted(memory_db):
+    birth = kundli.birth_input(_booking())
+    (first,) = await kundli.charts_for([birth])
+    (second,) = await kundli.charts_for([birth])
+
+    assert second is first
+    assert kundli.metrics()["computed"] == 1
+    assert kundli.metrics()["hits"] == 1
+    assert await memory_db.kundli_charts.count_documents({"_id": birth.key}) == 1
+
+
+async def test_persisted_chart_is_reused_by_fresh_worker(memory_db):
+    birth = kundli.birth_input(_booking())
+    await kundli.charts_for([birth])
+    kundli.reset()
+
+    with patch.object(kundli, "compute_charts") as compute:
+        (chart,) = await kundli.charts_for([birth])
+    compute.assert_not_called()
+    assert chart["planets"]["sun"]["sign"] == "Vrishabha"
+    assert kundli.metrics()["db_hits"] == 1
+
+
+async def test_duplicate_inputs_are_computed_once(memory_db):
+    birth = kundli.birth_input(_booking())
+    charts = await kundli.charts_for([birth, birth])
+    assert charts[0] is charts[1]
+    assert kundli.metrics()["computed"] == 1
+
+
+async def test_memo_is_bounded(memory_db):
+    inputs = [kundli.birth_input(_booking(dob=f"1990-01-{day:02d}")) for day in range(1, 6)]
+    with patch.object(kundli.settings, "KUNDLI_CACHE_SIZE", 3):
+        await kundli.charts_for(inputs)
+    assert kundli.metrics()["memoized"] == 3
+
+
+# ── Precompute ──
+
+
+async def test_precompute_upcoming_in_one_batch(memory_db):
+    await memory_db.bookings.insert_many([
+        _booking(),
+        _booking(),  # same birth details: one chart
+        _booking(dob="1985-11-02", tob="06:45 AM", status="pending"),
+        _booking(dob="1970-01-01", status="completed"),
+        _booking(dob="1971-01-01", service_slug="call-consultation"),
+        _booking(dob="", _id=ObjectId("65f000000000000000000001")),
+    ])
+
+    with patch.object(kundli, "compute_charts", wraps=kundli.compute_charts) as compute:
+        result = await kundli.precompute_upcoming()
+
+    assert result == {
+        "bookings": 4,
+        "charts": 2,
+        "computed": 2,
+        "invalid": ["65f000000000000000000001"],
+    }
+    compute.assert_called_once()
+    assert await memory_db.kundli_charts.count_documents({}) == 2
+
+    again = await kundli.precompute_upcoming()
+    assert again["computed"] == 0
@@ -0,0 +1,143 @@
+"""Tests for app.services.rate_limit — token buckets and stores."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.services import rate_limit
+from app.services.rate_limit import Limit, MemoryStore, MongoStore, parse_limit
+
+
+# ── parse_limit ──
+
+
+def test_parse_limit_named_period():
+    assert parse_limit("5/minute") == Limit(capacity=5, period=60)
+    assert parse_limit("100/hours") == Limit(capacity=100, period=3600)
+
+
+def test_parse_limit_seconds():
+    assert parse_limit("3/10") == Limit(capacity=3, period=10)
+
+
+def test_parse_limit_invalid():
+    with pytest.raises(ValueError):
+        parse_limit("0/minute")
+
+
+# ── MemoryStore ──
+
+
+async def test_memory_store_allows_burst_then_throttles():
+    store = MemoryStore()
+    limit = Limit(capacity=3, period=60)
+    results = [(await store.hit("k", limit)).allowed for _ in range(4)]
+    assert results == [True, True, True, False]
+
+
+async def test_memory_store_retry_after_reflects_refill_rate():
+    store = MemoryStore()
+    limit = Limit(capacity=2, period=60)
+    await store.hit("k", limit)
+    await store.hit("k", limit)
+    decision = await store.hit("k", limit)
+    assert not decision.allowed
+    assert 1 <= decision.retry_after <= 30
+
+
+async def test_memory_store_refills_over_time():
+    store = MemoryStore()
+    limit = Limit(capacity=1, period=10)
+    with patch("app.services.rate_limit.time.monotonic", side_effect=[100.0, 101.0, 111.0]):
+        assert (await store.hit("k", limit)).allowed
+        assert not (await store.hit("k", limit)).allowed
+        assert (await store.hit("k", limit)).allowed
+
+
+async def test_memory_store_keys_are_independent():
+    store = MemoryStore()
+    limit = Limit(capacity=1, period=60)
+    assert (await store.hit("a", limit)).allowed
+    assert (await store.hit("b", limit)).allowed
+
+
+async def test_memory_store_sweeps_refilled_buckets_at_most_once_per_interval():
+    store = MemoryStore()
+    limit = Limit(capacity=1, period=10)
+    with (
+        patch("app.services.rate_limit.MEMORY_SWEEP_THRESHOLD", 2),
+        patch("app.services.rate_limit.time.monotonic") as clock,
+    ):
+        clock.return_value = 100.0
+        for key in ("a", "b", "c"):
+            await store.hit(key, limit)
+        assert len(store._buckets) == 3  # swept, but nothing has refilled yet
+
+        clock.return_value = 130.0
+        await store.hit("d", limit)
+        assert len(store._buckets) == 4  # a-c refilled, but the last sweep was 30s ago
+
+        clock.return_value = 160.0
+        await store.hit("e", limit)
+        assert set(store._buckets) == {"e"}
+
+
+# ── MongoStore ──
+
+
+async def test_mongo_store_uses_atomic_pipeline_update():
+    db = MagicMock()
+    db.rate_limits.create_index = AsyncMock()
+    db.rate_limits.find_one_and_update = AsyncMock(
+        return_value={"_id": "login:ip:1.2.3.4", "tokens": 0.5, "allowed": False}
+    )
+
+    with patch("app.services.rate_limit.get_db", return_value=db):
+        decision = await MongoStore().hit("login:ip:1.2.3.4", Limit(capacity=6, period=60))
+
+    assert not decision.allowed
+    assert decision.retry_after == 5
+    query, pipeline = db.rate_limits.find_one_and_update.call_args[0]
+    assert query == {"_id": "login:ip:1.2.3.4"}
+    assert isinstance(pipeline, list)
+    assert db.rate_limits.find_one_and_update.call_args[1]["upsert"] is True
+    db.rate_limits.create_index.assert_awaited_once_with("expires_at", expireAfterSeconds=0)
+
+
+async def test_mongo_store_retries_racing_upsert_once():
+    db = MagicMock()
+    db.rate_limits.create_index = AsyncMock()
+    db.rate_limits.find_one_and_update = AsyncMock(side_effect=[
+        DuplicateKeyError("E11000"),
+        {"_id": "login:ip:1.2.3.4", "tokens": 4.0, "allowed": True},
+    ])
+
+    with patch("app.services.rate_limit.get_db", return_value=db):
+        decision = await MongoStore().hit("login:ip:1.2.3.4", Limit(capacity=6, period=60))
+
+    assert decision.allowed
+    assert db.rate_limits.find_one_and_update.await_count == 2
+
+
+# ── check ──
+
+
+async def test_check_unconfigured_name_is_allowed():
+    decision = await rate_limit.check("unknown:ip", "1.2.3.4")
+    assert decision.allowed
+
+
+async def test_check_disabled():
+    with patch("app.services.rate_limit.settings.RATE_LIMIT_ENABLED", False), \
+         patch.dict("app.services.rate_limit.settings.RATE_LIMITS", {"x:ip": "1/minute"}):
+        for _ in range(3):
+            assert (await rate_limit.check("x:ip", "1.2.3.4")).allowed
+
+
+async def test_get_store_selects_backend():
+    with patch("app.services.rate_limit.settings.RATE_LIMIT_BACKEND", "mongo"):
+        rate_limit.reset_store()
+        assert isinstance(rate_limit.get_store(), MongoStore)
+    rate_limit.reset_store()
+    assert isinstance(rate_limit.get_store(), MemoryStore)
@@ -0,0 +1,62 @@
+"""Tests for app.services.recurring — weekly rule expansion."""
+
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from app.services import recurring
+from app.services.recurring import expand, rule_applies
+from tests.conftest import MockCursor
+
+TUESDAY_LUNCH = {
+    "weekday": 1,
+    "interval_weeks": 1,
+    "start_date": "2026-03-01",
+    "until": "2026-08-31",
+    "start_time": "13:00",
+    "end_time": "14:00",
+    "is_holiday": False,
+}
+
+
+def test_rule_applies_on_matching_weekday():
+    assert rule_applies(TUESDAY_LUNCH, date(2026, 3, 17))
+    assert not rule_applies(TUESDAY_LUNCH, date(2026, 3, 16))
+
+
+def test_rule_respects_start_and_until():
+    assert not rule_applies(TUESDAY_LUNCH, date(2026, 2, 24))
+    assert rule_applies(TUESDAY_LUNCH, date(2026, 8, 25))
+    assert not rule_applies(TUESDAY_LUNCH, date(2026, 9, 1))
+
+
+def test_open_ended_rule():
+    rule = {**TUESDAY_LUNCH, "until": None}
+    assert rule_applies(rule, date(2030, 1, 1))
+
+
+def test_rule_interval_weeks():
+    rule = {**TUESDAY_LUNCH, "interval_weeks": 2, "start_date": "2026-03-03"}
+    assert rule_applies(rule, date(2026, 3, 3))
+    assert not rule_applies(rule, date(2026, 3, 10))
+    assert rule_applies(rule, date(2026, 3, 17))
+
+
+def test_expand_collects_blocks_and_holidays():
+    holiday_rule = {"weekday": 1, "start_date": "2026-03-01", "is_holiday": True}
+    assert expand([TUESDAY_LUNCH], date(2026, 3, 17)) == (False, [(780, 840)])
+    assert expand([TUESDAY_LUNCH, holiday_rule], date(2026, 3, 17))[0] is True
+    assert expand([TUESDAY_LUNCH], date(2026, 3, 18)) == (False, [])
+
+
+async def test_load_rules_is_cached():
+    db = MagicMock()
+    db.unavailability_rules.find = MagicMock(return_value=MockCursor([TUESDAY_LUNCH]))
+
+    with patch("app.services.recurring.get_db", return_value=db):
+        assert await recurring.load_rules() == [TUESDAY_LUNCH]
+        await recurring.load_rules()
+        assert db.unavailability_rules.find.call_count == 1
+
+        recurring.invalidate_rules()
+        await recurring.load_rules()
+        assert db.unavailability_rules.find.call_count == 2
@@ -0,0 +1,264 @@
+"""Tests for app.services.resilience — deadlines, bulkheads and circuit breakers."""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import stripe
+
+from app.services import resilience
+from app.services.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, Dependency
+from app.utils.exceptions import GatewayTimeoutError, ServiceUnavailableError
+from tests.conftest import BOOKING_ID
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(clock=None, **kwargs):
+    options = {"window": 10, "min_calls": 4, "error_rate": 0.5, "open_seconds": 30}
+    return CircuitBreaker(**{**options, **kwargs}, clock=clock or Clock())
+
+
+def _fail():
+    raise ConnectionError("upstream down")
+
+
+# ── Circuit breaker ──
+
+
+def _call(breaker, success):
+    breaker.record(breaker.allow(), success)
+
+
+def _trip(breaker):
+    for _ in range(breaker.min_calls):
+        _call(breaker, False)
+
+
+def test_breaker_stays_closed_below_min_calls():
+    breaker = _breaker()
+    for _ in range(3):
+        _call(breaker, False)
+    assert breaker.state == CLOSED
+
+
+def test_breaker_opens_at_error_rate():
+    breaker = _breaker()
+    for success in (True, False, True, False):
+        _call(breaker, success)
+    assert breaker.state == OPEN
+    assert breaker.allow() is None
+    assert breaker.times_opened == 1
+
+
+def test_breaker_half_opens_after_cooldown_and_allows_one_probe():
+    clock = Clock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+    clock.now += 29
+    assert breaker.allow() is None
+
+    clock.now += 1
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow().probe
+    assert breaker.allow() is None  # probe in flight
+
+
+def test_successful_probe_closes_breaker():
+    clock = Clock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+    clock.now += 30
+    _call(breaker, True)
+    assert breaker.state == CLOSED
+    assert breaker.metrics()["window_calls"] == 0
+
+
+def test_failed_probe_reopens_breaker():
+    clock = Clock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+    clock.now += 30
+    _call(breaker, False)
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == 30
+    assert breaker.times_opened == 2
+
+
+def test_abandoned_probe_frees_the_slot():
+    clock = Clock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+    clock.now += 30
+    breaker.abandon(breaker.allow())
+    assert breaker.allow().probe
+
+
+def test_late_outcomes_are_ignored_while_open():
+    breaker = _breaker()
+    late = breaker.allow()
+    _trip(breaker)
+    breaker.record(late, False)
+    assert breaker.times_opened == 1
+    assert breaker.metrics()["window_calls"] == 0
+
+
+def test_call_from_before_opening_does_not_settle_half_open():
+    clock = Clock()
+    breaker = _breaker(clock)
+    late = breaker.allow()
+    _trip(breaker)
+    clock.now += 30
+    probe = breaker.allow()
+
+    breaker.record(late, True)
+    breaker.abandon(late)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is None  # the probe is still in flight
+
+    breaker.record(probe, True)
+    assert breaker.state == CLOSED
+
+
+def test_call_from_before_reopening_is_ignored_after_close():
+    clock = Clock()
+    breaker = _breaker(clock)
+    late = breaker.allow()
+    _trip(breaker)
+    clock.now += 30
+    _call(breaker, True)
+
+    breaker.record(late, False)
+    assert breaker.metrics()["window_calls"] == 0
+
+
+# ── Dependency ──
+
+
+def _dependency(**kwargs):
+    options = {"label": "Upstream", "timeout": 1.0, "max_concurrency": 2, "breaker": _breaker()}
+    return Dependency(**{**options, **kwargs})
+
+
+async def test_call_runs_in_thread_and_returns_result():
+    dependency = _dependency()
+    main = threading.get_ident()
+    assert await dependency.call(threading.get_ident) != main
+    assert dependency.metrics()["calls"] == 1
+    assert dependency.in_flight == 0
+
+
+async def test_deadline_raises_504_and_keeps_slot_until_thread_returns():
+    dependency = _dependency(timeout=0.05)
+    release = threading.Event()
+
+    with pytest.raises(GatewayTimeoutError):
+        await dependency.call(release.wait, 5)
+    assert dependency.in_flight == 1
+    assert dependency.metrics()["timeouts"] == 1
+
+    release.set()
+    for _ in range(100):
+        if dependency.in_flight == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert dependency.in_flight == 0
+
+
+async def test_bulkhead_rejects_when_full():
+    dependency = _dependency(max_concurrency=1)
+    release = threading.Event()
+    first = asyncio.create_task(dependency.call(release.wait, 5))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(ServiceUnavailableError) as exc:
+        await dependency.call(lambda: None)
+    assert exc.value.headers["Retry-After"] == "1"
+    assert dependency.metrics()["rejected_full"] == 1
+
+    release.set()
+    assert await first is True
+
+
+async def test_open_breaker_fails_fast_with_retry_after():
+    dependency = _dependency()
+    for _ in range(4):
+        with pytest.raises(ConnectionError):
+            await dependency.call(_fail)
+
+    called = []
+    with pytest.raises(ServiceUnavailableError) as exc:
+        await dependency.call(called.append, 1)
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "30"
+    assert called == []
+    metrics = dependency.metrics()
+    assert (metrics["state"], metrics["failures"], metrics["rejected_open"]) == (OPEN, 4, 1)
+
+
+async def test_client_errors_do_not_trip_breaker():
+    dependency = _dependency(is_failure=resilience._stripe_outage)
+
+    def bad_request():
+        raise stripe.InvalidRequestError("No such booking", param="x", http_status=400)
+
+    for _ in range(6):
+        with pytest.raises(stripe.InvalidRequestError):
+            await dependency.call(bad_request)
+    assert dependency.breaker.state == CLOSED
+    assert dependency.metrics()["failures"] == 0
+
+
+def test_stripe_and_resend_outage_classification():
+    from resend.exceptions import ResendError, ValidationError
+
+    assert resilience._stripe_outage(stripe.APIConnectionError("reset"))
+    assert resilience._stripe_outage(stripe.RateLimitError("slow down", http_status=429))
+    assert resilience._stripe_outage(stripe.APIError("boom", http_status=502))
+    assert not resilience._stripe_outage(stripe.CardError("declined", param=None, code="card_declined", http_status=402))
+    assert not resilience._resend_outage(ValidationError("bad to", "validation_error", 422))
+    assert resilience._resend_outage(ResendError(500, "application_error", "boom", ""))
+    assert resilience._resend_outage(RuntimeError("Request failed: timeout"))
+
+
+def test_registry_reads_settings():
+    with patch.object(resilience.settings, "STRIPE_MAX_CONCURRENCY", 3):
+        assert resilience.get("stripe").max_concurrency == 3
+    assert resilience.get("stripe") is resilience.get("stripe")
+    assert set(resilience.metrics()) == {"stripe", "resend"}
+
+
+# ── Routes ──
+
+
+async def test_checkout_returns_503_while_stripe_breaker_open(client, mock_db):
+    mock_db.bookings.find_one = AsyncMock(return_value={
+        "_id": BOOKING_ID, "status": "pending", "service_title": "Call Consultation",
+        "user_email": "test@example.com", "date": "2026-03-15", "time_slot": "10:00",
+        "duration_minutes": 30, "price_inr": 1999,
+    })
+    _trip(resilience.get("stripe").breaker)
+
+    with patch("stripe.checkout.Session.create") as create:
+        resp = await client.post(
+            "/api/payments/create-checkout-session", json={"booking_id": str(BOOKING_ID)}
+        )
+
+    assert resp.status_code == 503
+    assert int(resp.headers["Retry-After"]) > 0
+    create.assert_not_called()
+
+
+async def test_dependency_status_endpoint(client, mock_db, admin_token):
+    resp = await client.get("/api/admin/dependencies", headers={"Authorization": f"Bearer {admin_token}"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["stripe"]["state"] == "closed"
+    assert data["resend"]["max_concurrency"] == resilience.settings.RESEND_MAX_CONCURRENCY
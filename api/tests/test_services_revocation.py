@@ -0,0 +1,153 @@
+"""Tests for app.services.revocation — Bloom filter and revocation sync."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from pymongo.errors import DuplicateKeyError
+
+from app.services import invalidation, revocation
+from app.services.revocation import BloomFilter, RevocationList
+from tests.conftest import MockCursor
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    ids = [f"jti-{i}" for i in range(1000)]
+    for i in ids:
+        bloom.add(i)
+    assert all(i in bloom for i in ids)
+
+
+def test_bloom_filter_false_positive_rate_near_target():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+    hits = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert hits < 300  # 1% target, generous margin
+
+
+def test_bloom_filter_counts_distinct_items():
+    bloom = BloomFilter(1000, 0.01)
+    assert bloom.add("sid-1") is True
+    assert bloom.add("sid-1") is False
+    bloom.add("sid-2")
+    assert bloom.count == 2
+
+
+def test_bloom_filter_sizing():
+    bloom = BloomFilter(100_000, 0.001)
+    # ~14.4 bits and ~10 hashes per item for 0.1%
+    assert 1_400_000 < bloom.size < 1_500_000
+    assert bloom.hashes == 10
+
+
+async def test_not_revoked_costs_no_io_once_ready(mock_db):
+    revocations = RevocationList()
+    await revocations.rebuild()
+    mock_db.revoked_tokens.find_one.reset_mock()
+
+    assert await revocations.is_revoked("sid-1") is False
+    mock_db.revoked_tokens.find_one.assert_not_called()
+
+
+async def test_checks_database_until_first_sync(mock_db):
+    revocations = RevocationList()
+    mock_db.revoked_tokens.find_one = AsyncMock(return_value={"_id": "sid-1"})
+
+    assert await revocations.is_revoked("sid-1") is True
+    mock_db.revoked_tokens.find_one.assert_awaited_once()
+
+
+async def test_probable_hit_is_confirmed_by_lookup(mock_db):
+    mock_db.revoked_tokens.find = MagicMock(return_value=MockCursor([{"_id": "sid-1"}]))
+    revocations = RevocationList()
+    await revocations.rebuild()
+
+    mock_db.revoked_tokens.find_one = AsyncMock(return_value={"_id": "sid-1"})
+    assert await revocations.is_revoked("sid-1") is True
+
+    mock_db.revoked_tokens.find_one = AsyncMock(return_value=None)
+    assert await revocations.is_revoked("sid-1") is False
+    assert revocations.metrics()["false_positives"] == 1
+
+
+async def test_sync_pulls_only_new_revocations(mock_db):
+    revocations = RevocationList()
+    await revocations.rebuild()
+    revoked_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+    mock_db.revoked_tokens.find = MagicMock(
+        return_value=MockCursor([{"_id": "sid-2", "revoked_at": revoked_at}])
+    )
+
+    await revocations.sync()
+
+    query = mock_db.revoked_tokens.find.call_args[0][0]
+    assert "$gt" in query["revoked_at"]
+    assert query["kind"] == revocation.SESSION
+    assert "sid-2" in revocations.filter
+    assert revocations.metrics()["watermark"] == revoked_at.isoformat()
+
+
+async def test_overlapping_pulls_do_not_inflate_count(mock_db):
+    revocations = RevocationList()
+    await revocations.rebuild()
+    revoked_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+    mock_db.revoked_tokens.find = MagicMock(
+        return_value=MockCursor([{"_id": "sid-2", "revoked_at": revoked_at}])
+    )
+    revocations.add("sid-2")  # arrived on the bus first
+
+    await revocations.sync()
+    await revocations.sync()
+
+    assert revocations.metrics()["filter_items"] == 1
+
+
+async def test_rebuild_loads_only_sessions(mock_db):
+    await RevocationList().rebuild()
+    assert mock_db.revoked_tokens.find.call_args[0][0] == {"kind": revocation.SESSION}
+
+
+async def test_revoke_session_inserts_and_broadcasts(mock_db):
+    revocations = revocation.get_list()
+    await revocations.rebuild()
+    expires = datetime.now(timezone.utc) + timedelta(days=7)
+
+    assert await revocation.revoke("sid-1", revocation.SESSION, expires) is True
+
+    doc = mock_db.revoked_tokens.insert_one.call_args[0][0]
+    assert doc["_id"] == "sid-1"
+    assert doc["expires_at"] == expires
+    event = mock_db.cache_events.insert_one.call_args[0][0]
+    assert (event["topic"], event["key"]) == ("revocations", "sid-1")
+    # The local handler added it to this worker's filter
+    assert "sid-1" in revocations.filter
+    mock_db.revoked_tokens.create_index.assert_any_await("expires_at", expireAfterSeconds=0)
+
+
+async def test_revoke_rotated_is_recorded_without_broadcast(mock_db):
+    revocations = revocation.get_list()
+    await revocations.rebuild()
+    expires = datetime.now(timezone.utc) + timedelta(days=7)
+
+    assert await revocation.revoke("jti-1", revocation.ROTATED, expires) is True
+
+    assert mock_db.revoked_tokens.insert_one.call_args[0][0]["kind"] == revocation.ROTATED
+    mock_db.cache_events.insert_one.assert_not_called()
+    assert revocations.filter.count == 0
+
+
+async def test_revoke_twice_returns_false(mock_db):
+    mock_db.revoked_tokens.insert_one = AsyncMock(side_effect=DuplicateKeyError("dup"))
+    expires = datetime.now(timezone.utc)
+    assert await revocation.revoke("jti-1", revocation.ROTATED, expires) is False
+
+
+async def test_remote_revocation_reaches_filter(mock_db):
+    revocations = revocation.get_list()
+    await revocations.rebuild()
+
+    bus = invalidation.InvalidationBus("poll")
+    bus.handle({"topic": "revocations", "key": "sid-9", "origin": "other-worker"})
+
+    assert "sid-9" in revocations.filter
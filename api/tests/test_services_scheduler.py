@@ -0,0 +1,212 @@
+"""Tests for app.services.scheduler — cron parsing, leases and job runs."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.services.scheduler import CronSchedule, Job, Scheduler, job_metrics
+from tests.conftest import MockCursor
+
+NOW = datetime(2026, 3, 16, 10, 0, tzinfo=timezone.utc)  # a Monday
+
+
+# ── Cron ──
+
+
+def test_cron_every_15_minutes():
+    cron = CronSchedule("*/15 * * * *")
+    assert cron.next_after(NOW) == NOW.replace(minute=15)
+    assert cron.next_after(NOW.replace(minute=50)) == NOW.replace(hour=11, minute=0)
+
+
+def test_cron_daily_rolls_to_next_day():
+    cron = CronSchedule("30 2 * * *")
+    assert cron.next_after(NOW) == datetime(2026, 3, 17, 2, 30, tzinfo=timezone.utc)
+
+
+def test_cron_weekday_sunday_is_zero():
+    cron = CronSchedule("0 9 * * 0")
+    assert cron.next_after(NOW) == datetime(2026, 3, 22, 9, 0, tzinfo=timezone.utc)
+    assert CronSchedule("0 9 * * 7").next_after(NOW) == cron.next_after(NOW)
+
+
+def test_cron_lists_and_ranges():
+    cron = CronSchedule("0,30 9-17 * * 1-5")
+    assert cron.minutes == {0, 30}
+    assert cron.hours == set(range(9, 18))
+    assert cron.next_after(NOW) == NOW.replace(minute=30)
+
+
+@pytest.mark.parametrize("expr", ["* * * *", "61 * * * *", "* 5-2 * * *", "0 0 31 2 *"])
+def test_cron_invalid(expr):
+    with pytest.raises(ValueError):
+        CronSchedule(expr).next_after(NOW)
+
+
+def test_job_requires_one_schedule():
+    with pytest.raises(ValueError):
+        Job("x", AsyncMock())
+    with pytest.raises(ValueError):
+        Job("x", AsyncMock(), every=5, cron="* * * * *")
+
+
+def test_interval_job_skips_missed_runs():
+    job = Job("x", AsyncMock(), every=60)
+    assert job.next_after(NOW, NOW + timedelta(seconds=5)) == NOW + timedelta(seconds=60)
+    stalled = NOW + timedelta(minutes=10)
+    assert job.next_after(NOW, stalled) == stalled + timedelta(seconds=60)
+
+
+# ── Leadership ──
+
+
+async def test_acquire_lease(mock_db):
+    sched = Scheduler(owner="worker-a")
+    sched.add("job", AsyncMock(), every=60)
+    mock_db.scheduler_leases.find_one_and_update = AsyncMock(
+        return_value={"_id": "scheduler", "owner": "worker-a"}
+    )
+
+    assert await sched.acquire(NOW) is True
+    query, update = mock_db.scheduler_leases.find_one_and_update.call_args[0]
+    assert query["$or"] == [{"owner": "worker-a"}, {"expires_at": {"$lt": NOW}}]
+    assert update["$set"]["expires_at"] == NOW + timedelta(seconds=30)
+    # Interval jobs without stored state are due immediately
+    assert sched.jobs["job"].next_run == NOW
+
+
+async def test_acquire_lease_held_elsewhere(mock_db):
+    sched = Scheduler(owner="worker-b")
+    mock_db.scheduler_leases.find_one_and_update = AsyncMock(
+        side_effect=DuplicateKeyError("E11000")
+    )
+    assert await sched.acquire(NOW) is False
+    assert await sched.tick(NOW) == []
+
+
+async def test_follower_waits_for_lease_expiry_before_writing(mock_db):
+    sched = Scheduler(owner="worker-b")
+    expires = NOW + timedelta(seconds=20)
+    mock_db.scheduler_leases.find_one = AsyncMock(
+        return_value={"_id": "scheduler", "owner": "worker-a", "expires_at": expires}
+    )
+    mock_db.scheduler_leases.find_one_and_update = AsyncMock(return_value={"owner": "worker-b"})
+
+    assert await sched.acquire(NOW) is False
+    assert await sched.acquire(NOW + timedelta(seconds=10)) is False
+    mock_db.scheduler_leases.find_one.assert_awaited_once()
+    mock_db.scheduler_leases.find_one_and_update.assert_not_called()
+
+    mock_db.scheduler_leases.find_one = AsyncMock(
+        return_value={"_id": "scheduler", "owner": "worker-a", "expires_at": expires.replace(tzinfo=None)}
+    )
+    assert await sched.acquire(NOW + timedelta(seconds=21)) is True
+    mock_db.scheduler_leases.find_one_and_update.assert_awaited_once()
+
+
+async def test_leader_renews_at_a_fraction_of_the_lease(mock_db):
+    sched = Scheduler(owner="worker-a")
+    mock_db.scheduler_leases.find_one_and_update = AsyncMock(return_value={"owner": "worker-a"})
+
+    for seconds in (0, 1, 9):
+        assert await sched.acquire(NOW + timedelta(seconds=seconds)) is True
+    assert mock_db.scheduler_leases.find_one_and_update.await_count == 1
+
+    assert await sched.acquire(NOW + timedelta(seconds=10)) is True
+    assert mock_db.scheduler_leases.find_one_and_update.await_count == 2
+
+
+async def test_new_leader_resumes_stored_schedule(mock_db):
+    sched = Scheduler(owner="worker-a")
+    sched.add("job", AsyncMock(), every=60)
+    stored = NOW + timedelta(seconds=40)
+    mock_db.scheduler_leases.find_one_and_update = AsyncMock(return_value={"owner": "worker-a"})
+    mock_db.scheduler_jobs.find = MagicMock(
+        return_value=MockCursor([{"_id": "job", "next_run": stored.replace(tzinfo=None)}])
+    )
+
+    await sched.acquire(NOW)
+    assert sched.jobs["job"].next_run == stored
+    assert await sched.tick(NOW) == []
+
+
+async def test_release_only_own_lease(mock_db):
+    sched = Scheduler(owner="worker-a")
+    sched.is_leader = True
+    await sched.release()
+    mock_db.scheduler_leases.delete_one.assert_awaited_once_with(
+        {"_id": "scheduler", "owner": "worker-a"}
+    )
+    assert sched.is_leader is False
+
+
+# ── Running ──
+
+
+async def _leader(mock_db, **jobs):
+    sched = Scheduler(owner="worker-a")
+    for name, func in jobs.items():
+        sched.add(name, func, every=60)
+    mock_db.scheduler_leases.find_one_and_update = AsyncMock(return_value={"owner": "worker-a"})
+    await sched.acquire(NOW)
+    return sched
+
+
+async def test_tick_runs_due_job_and_records_metrics(mock_db):
+    func = AsyncMock()
+    sched = await _leader(mock_db, job=func)
+
+    started = NOW + timedelta(seconds=2)
+    assert await sched.tick(started) == ["job"]
+    await asyncio.gather(*sched._running)
+
+    func.assert_awaited_once()
+    assert sched.jobs["job"].next_run == NOW + timedelta(seconds=60)
+    query, update = mock_db.scheduler_jobs.update_one.call_args[0]
+    assert query == {"_id": "job"}
+    assert update["$set"]["last_lag_ms"] == 2000
+    assert update["$set"]["last_error"] is None
+    assert update["$inc"] == {"runs": 1, "failures": 0}
+    assert update["$max"] == {"max_lag_ms": 2000}
+
+
+async def test_failed_job_counts_failure(mock_db):
+    sched = await _leader(mock_db, job=AsyncMock(side_effect=RuntimeError("boom")))
+
+    await sched.tick(NOW)
+    await asyncio.gather(*sched._running)
+
+    update = mock_db.scheduler_jobs.update_one.call_args[0][1]
+    assert update["$inc"] == {"runs": 1, "failures": 1}
+    assert update["$set"]["last_error"] == "RuntimeError: boom"
+    assert sched.jobs["job"].running is False
+
+
+async def test_running_job_is_not_started_again(mock_db):
+    gate = asyncio.Event()
+
+    async def slow():
+        await gate.wait()
+
+    sched = await _leader(mock_db, job=slow)
+    assert await sched.tick(NOW) == ["job"]
+    assert await sched.tick(NOW + timedelta(minutes=5)) == []
+
+    gate.set()
+    await asyncio.gather(*sched._running)
+
+
+async def test_job_metrics(mock_db):
+    mock_db.scheduler_leases.find_one = AsyncMock(
+        return_value={"_id": "scheduler", "owner": "worker-a", "expires_at": NOW}
+    )
+    mock_db.scheduler_jobs.find = MagicMock(
+        return_value=MockCursor([{"_id": "job", "runs": 3, "failures": 1}])
+    )
+
+    metrics = await job_metrics()
+    assert metrics["leader"] == "worker-a"
+    assert metrics["jobs"] == [{"name": "job", "runs": 3, "failures": 1}]
@@ -108,3 +108,19 @@ def test_default_settings_is_valid_model():
     assert isinstance(DEFAULT_SETTINGS, BusinessHoursSettings)
     assert DEFAULT_SETTINGS.timezone == "Asia/Kolkata"
     assert len(DEFAULT_SETTINGS.weekly_hours) == 7
+
+
+@pytest.mark.asyncio
+async def test_business_hours_are_cached_until_invalidated(mock_db):
+    from app.services.settings import invalidate_business_hours
+
+    mock_db.settings.find_one.return_value = None
+
+    with patch("app.services.settings.get_db", return_value=mock_db):
+        await get_business_hours()
+        await get_business_hours()
+        assert mock_db.settings.find_one.await_count == 1
+
+        invalidate_business_hours()
+        await get_business_hours()
+        assert mock_db.settings.find_one.await_count == 2
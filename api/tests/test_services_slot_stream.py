@@ -0,0 +1,98 @@
+"""Tests for app.services.slot_stream — per-worker slot delta fan-out."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from app.models.availability import AvailableSlot
+from app.services import slot_stream
+from app.services.slot_stream import RESYNC, SlotHub
+
+
+def _slots(*starts):
+    return [AvailableSlot(start=s, end=s[:3] + "30") for s in starts]
+
+
+def _hub(*results):
+    compute = AsyncMock(side_effect=list(results))
+    return SlotHub(compute), compute
+
+
+async def test_subscribe_returns_snapshot_and_shares_query():
+    hub, compute = _hub(_slots("10:00", "11:00"))
+
+    q1, snap1 = await hub.subscribe(["2026-03-16"])
+    q2, snap2 = await hub.subscribe(["2026-03-16"])
+
+    assert compute.await_count == 1
+    assert [s["start"] for s in snap1["2026-03-16"]] == ["10:00", "11:00"]
+    assert snap1 == snap2
+    assert hub.subscriber_count == 2
+    hub.unsubscribe(q1, ["2026-03-16"])
+    hub.unsubscribe(q2, ["2026-03-16"])
+
+
+async def test_refresh_pushes_delta_to_every_subscriber():
+    hub, compute = _hub(_slots("10:00", "11:00"), _slots("11:00", "12:00"))
+    q1, _ = await hub.subscribe(["2026-03-16"])
+    q2, _ = await hub.subscribe(["2026-03-16"])
+
+    await hub.refresh("2026-03-16")
+
+    assert compute.await_count == 2
+    for q in (q1, q2):
+        delta = q.get_nowait()
+        assert delta["date"] == "2026-03-16"
+        assert [s["start"] for s in delta["added"]] == ["12:00"]
+        assert [s["start"] for s in delta["removed"]] == ["10:00"]
+    hub.unsubscribe(q1, ["2026-03-16"])
+    hub.unsubscribe(q2, ["2026-03-16"])
+
+
+async def test_unchanged_refresh_sends_nothing():
+    hub, _ = _hub(_slots("10:00"), _slots("10:00"))
+    q, _ = await hub.subscribe(["2026-03-16"])
+    await hub.refresh("2026-03-16")
+    assert q.empty()
+    hub.unsubscribe(q, ["2026-03-16"])
+
+
+async def test_notify_ignores_dates_without_subscribers():
+    hub, compute = _hub(_slots("10:00"))
+    q, _ = await hub.subscribe(["2026-03-16"])
+
+    hub.notify("2026-03-17")
+    await asyncio.sleep(0)
+    assert compute.await_count == 1
+    hub.unsubscribe(q, ["2026-03-16"])
+
+
+async def test_bus_event_triggers_refresh(mock_db):
+    hub = slot_stream.get_hub(AsyncMock(side_effect=[_slots("10:00"), _slots()]))
+    q, _ = await hub.subscribe(["2026-03-16"])
+
+    await slot_stream.publish_change("2026-03-16")
+    delta = await asyncio.wait_for(q.get(), 1)
+
+    assert [s["start"] for s in delta["removed"]] == ["10:00"]
+    hub.unsubscribe(q, ["2026-03-16"])
+
+
+async def test_slow_subscriber_gets_resync(monkeypatch):
+    monkeypatch.setattr(slot_stream, "QUEUE_SIZE", 1)
+    hub, _ = _hub(_slots("10:00"), _slots(), _slots("10:00"))
+    q, _ = await hub.subscribe(["2026-03-16"])
+
+    await hub.refresh("2026-03-16")
+    await hub.refresh("2026-03-16")
+
+    assert q.qsize() == 1
+    assert q.get_nowait() is RESYNC
+    hub.unsubscribe(q, ["2026-03-16"])
+
+
+async def test_last_unsubscribe_drops_snapshot():
+    hub, _ = _hub(_slots("10:00"))
+    q, _ = await hub.subscribe(["2026-03-16"])
+    hub.unsubscribe(q, ["2026-03-16"])
+    assert hub.snapshot(["2026-03-16"]) == {"2026-03-16": []}
+    assert hub._periodic is None
@@ -0,0 +1,291 @@
+"""Tests for app.tracing and app.middleware.tracing — spans and traceparent."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app import tracing
+from tests.conftest import BOOKING_ID
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+EXPORTED: list[dict] = []
+
+
+class ListExporter:
+    def export(self, spans):
+        EXPORTED.extend(spans)
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def exported():
+    """Trace everything into ``EXPORTED``; call ``tracing.shutdown()`` to flush."""
+    EXPORTED.clear()
+    with (
+        patch.object(tracing.settings, "TRACING_EXPORTER", "tests.test_tracing:ListExporter"),
+        patch.object(tracing.settings, "TRACING_SAMPLE_RATIO", 1.0),
+    ):
+        tracing.setup()
+        yield EXPORTED
+    EXPORTED.clear()
+
+
+def _by_name(spans):
+    return {s["name"]: s for s in spans}
+
+
+# ── traceparent ──
+
+
+def test_parse_traceparent():
+    assert tracing.parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert tracing.parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+
+
+@pytest.mark.parametrize("header", [
+    None,
+    "",
+    "garbage",
+    f"01-{TRACE_ID}-{PARENT_ID}-01",
+    f"00-{'0' * 32}-{PARENT_ID}-01",
+    f"00-{TRACE_ID}-{'0' * 16}-01",
+    f"00-{TRACE_ID[:-1]}-{PARENT_ID}-01",
+])
+def test_parse_traceparent_rejects_invalid(header):
+    assert tracing.parse_traceparent(header) is None
+
+
+# ── Spans ──
+
+
+def test_span_is_noop_when_disabled():
+    with tracing.span("work") as span:
+        assert span is None
+    assert not tracing.enabled()
+
+
+def test_child_spans_share_trace_and_parent(exported):
+    with tracing.span("outer") as outer:
+        with tracing.span("inner", tracing.CLIENT, {"peer.service": "x"}):
+            pass
+    tracing.shutdown()
+
+    spans = _by_name(exported)
+    assert spans["inner"]["trace_id"] == spans["outer"]["trace_id"] == outer.trace_id
+    assert spans["inner"]["parent_span_id"] == spans["outer"]["span_id"]
+    assert spans["outer"]["parent_span_id"] is None
+    assert spans["inner"]["kind"] == "client"
+    assert spans["inner"]["attributes"] == {"peer.service": "x"}
+    assert tracing.current_span() is None
+
+
+def test_exception_marks_span_as_error(exported):
+    with pytest.raises(ValueError):
+        with tracing.span("failing"):
+            raise ValueError("nope")
+    tracing.shutdown()
+
+    span = exported[0]
+    assert span["status"] == "error"
+    assert span["attributes"]["error.type"] == "ValueError"
+
+
+def test_remote_parent_is_continued(exported):
+    with tracing.span("request", traceparent=f"00-{TRACE_ID}-{PARENT_ID}-01") as span:
+        assert span.traceparent == f"00-{TRACE_ID}-{span.span_id}-01"
+    tracing.shutdown()
+
+    assert exported[0]["trace_id"] == TRACE_ID
+    assert exported[0]["parent_span_id"] == PARENT_ID
+
+
+def test_unsampled_remote_parent_is_not_exported(exported):
+    with tracing.span("request", traceparent=f"00-{TRACE_ID}-{PARENT_ID}-00") as span:
+        with tracing.span("child"):
+            pass
+        assert span.traceparent.endswith("-00")
+    tracing.shutdown()
+
+    assert exported == []
+
+
+def test_sample_ratio_applies_to_new_traces(exported):
+    with patch.object(tracing.settings, "TRACING_SAMPLE_RATIO", 0.0):
+        with tracing.span("dropped"):
+            pass
+    tracing.shutdown()
+
+    assert exported == []
+
+
+def test_full_queue_drops_spans(exported):
+    processor = tracing._processor
+    with patch.object(processor.queue, "put_nowait", side_effect=tracing.queue.Full):
+        with tracing.span("lost"):
+            pass
+    assert tracing.metrics()["dropped"] == 1
+
+
+def test_export_errors_are_counted():
+    class Broken:
+        def export(self, spans):
+            raise OSError("disk full")
+
+        def shutdown(self):
+            pass
+
+    with patch.object(tracing, "load_exporter", return_value=Broken()):
+        tracing.setup()
+    with patch.object(tracing.settings, "TRACING_SAMPLE_RATIO", 1.0):
+        with tracing.span("unlucky"):
+            pass
+    tracing.shutdown()
+
+    assert tracing.metrics()["export_errors"] == 1
+
+
+# ── Exporters ──
+
+
+def test_file_exporter_appends_json_lines(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    with (
+        patch.object(tracing.settings, "TRACING_EXPORTER", "file"),
+        patch.object(tracing.settings, "TRACING_FILE", str(path)),
+        patch.object(tracing.settings, "TRACING_SAMPLE_RATIO", 1.0),
+    ):
+        tracing.setup()
+        with tracing.span("a"):
+            pass
+        with tracing.span("b"):
+            pass
+        tracing.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["a", "b"]
+    assert tracing.metrics()["exported"] == 2
+
+
+def test_console_exporter_writes_stdout(capsys):
+    tracing.ConsoleExporter().export([{"name": "a"}])
+    assert json.loads(capsys.readouterr().out) == {"span": {"name": "a"}}
+
+
+def test_unknown_exporter_is_rejected():
+    with pytest.raises(ValueError):
+        tracing.load_exporter("zipkin")
+    assert tracing.load_exporter("off") is None
+
+
+# ── Mongo ──
+
+
+def _event(name="find", request_id=1, **extra):
+    return SimpleNamespace(
+        command_name=name,
+        database_name="vedicjivan",
+        command={name: "bookings", "filter": {}},
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        **extra,
+    )
+
+
+def test_mongo_listener_records_commands_under_current_span(exported):
+    listener = tracing.MongoCommandListener()
+    with tracing.span("request") as request:
+        listener.started(_event())
+        listener.succeeded(_event(duration_micros=1500))
+        listener.started(_event("insert", request_id=2))
+        listener.failed(_event("insert", request_id=2, duration_micros=10, failure={"errmsg": "E11000"}))
+    tracing.shutdown()
+
+    spans = _by_name(exported)
+    find = spans["mongo.find"]
+    assert find["parent_span_id"] == request.span_id
+    assert find["attributes"]["db.collection"] == "bookings"
+    assert find["duration_ms"] == 1.5
+    assert spans["mongo.insert"]["status"] == "error"
+    assert listener._open == {}
+
+
+def test_mongo_listener_ignores_commands_outside_spans(exported):
+    listener = tracing.MongoCommandListener()
+    listener.started(_event())
+    listener.succeeded(_event(duration_micros=5))
+    tracing.shutdown()
+
+    assert exported == []
+
+
+# ── Middleware ──
+
+
+async def test_request_span_named_after_route_and_echoes_traceparent(client, mock_db, exported):
+    resp = await client.get(
+        "/api/health",
+        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01", "X-Request-ID": "req-9"},
+    )
+    tracing.shutdown()
+
+    assert resp.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+    span = exported[-1]
+    assert span["name"] == "GET /api/health"
+    assert span["kind"] == "server"
+    assert span["parent_span_id"] == PARENT_ID
+    assert span["attributes"]["http.status_code"] == 200
+    assert span["attributes"]["request_id"] == "req-9"
+
+
+async def test_no_traceparent_header_when_disabled(client, mock_db):
+    resp = await client.get("/api/health")
+    assert "traceparent" not in resp.headers
+
+
+async def test_checkout_has_stripe_child_span(client, mock_db, exported):
+    mock_db.bookings.find_one = AsyncMock(return_value={
+        "_id": BOOKING_ID, "status": "pending", "service_title": "Call Consultation",
+        "user_email": "test@example.com", "date": "2026-03-15", "time_slot": "10:00",
+        "duration_minutes": 30, "price_inr": 1999,
+    })
+    session = MagicMock(id="cs_test", url="https://checkout.stripe.com/pay/cs_test")
+
+    with patch("stripe.checkout.Session.create", return_value=session):
+        resp = await client.post(
+            "/api/payments/create-checkout-session", json={"booking_id": str(BOOKING_ID)}
+        )
+    tracing.shutdown()
+
+    assert resp.status_code == 200
+    spans = _by_name(exported)
+    stripe_span = spans["stripe.checkout.sessions.create"]
+    request_span = spans["POST /api/payments/create-checkout-session"]
+    assert stripe_span["parent_span_id"] == request_span["span_id"]
+    assert stripe_span["attributes"]["peer.service"] == "stripe"
+
+
+def test_resend_call_gets_span(exported):
+    from app.services import email_service
+
+    with (
+        patch.object(email_service.settings, "RESEND_API_KEY", "re_test"),
+        patch("resend.Emails.send") as send,
+    ):
+        email_service._send_email("a@example.com", "Hello", "<p>hi</p>")
+    tracing.shutdown()
+
+    send.assert_called_once()
+    assert exported[0]["name"] == "resend.emails.send"
+    assert exported[0]["attributes"]["email.subject"] == "Hello"
+
+
+async def test_tracing_status_endpoint(client, mock_db, admin_token):
+    resp = await client.get("/api/admin/tracing", headers={"Authorization": f"Bearer {admin_token}"})
+    assert resp.status_code == 200
+    assert resp.json()["exporter"] == "off"
@@ -4,9 +4,12 @@ from fastapi import HTTPException
 
 from app.utils.exceptions import (
     BadRequestError,
+    ConflictError,
     ForbiddenError,
     NotFoundError,
+    TooManyRequestsError,
     UnauthorizedError,
+    UnprocessableEntityError,
 )
 
 
@@ -73,3 +76,36 @@ def test_not_found_error_default_detail():
 def test_all_are_http_exceptions():
     for cls in [BadRequestError, UnauthorizedError, ForbiddenError, NotFoundError]:
         assert issubclass(cls, HTTPException)
+
+
+# ── ConflictError ──
+
+
+def test_conflict_error_status_code():
+    assert ConflictError().status_code == 409
+
+
+def test_conflict_error_custom_detail():
+    assert ConflictError("busy").detail == "busy"
+
+
+# ── UnprocessableEntityError ──
+
+
+def test_unprocessable_entity_error_status_code():
+    assert UnprocessableEntityError().status_code == 422
+
+
+def test_unprocessable_entity_error_custom_detail():
+    assert UnprocessableEntityError("mismatch").detail == "mismatch"
+
+
+# ── TooManyRequestsError ──
+
+
+def test_too_many_requests_error_status_code():
+    assert TooManyRequestsError(5).status_code == 429
+
+
+def test_too_many_requests_error_retry_after_header():
+    assert TooManyRequestsError(5).headers == {"Retry-After": "5"}
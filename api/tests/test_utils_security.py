@@ -83,6 +83,12 @@ def test_create_refresh_token_contains_type_refresh():
     assert payload["type"] == "refresh"
 
 
+def test_create_refresh_token_has_unique_jti():
+    a = decode_token(create_refresh_token({"sub": "user123"}))
+    b = decode_token(create_refresh_token({"sub": "user123"}))
+    assert a["jti"] and a["jti"] != b["jti"]
+
+
 def test_create_refresh_token_has_longer_expiry():
     access = create_access_token({"sub": "123"})
     refresh = create_refresh_token({"sub": "123"})
@@ -22,7 +22,7 @@ vi.mock("next/navigation", () => ({
 
 vi.mock("@/lib/api", () => ({
   availabilityApi: {
-    getUnavailableRange: mockGetUnavailableRange,
+    getUnavailableRangeForAdmin: mockGetUnavailableRange,
     addUnavailable: mockAddUnavailable,
     removeUnavailable: mockRemoveUnavailable,
   },
@@ -21,7 +21,7 @@ vi.mock("next/navigation", () => ({
 
 vi.mock("@/lib/api", () => ({
   availabilityApi: {
-    getSettings: mockGetSettings,
+    getSettingsForAdmin: mockGetSettings,
     updateSettings: mockUpdateSettings,
   },
 }));
@@ -3,8 +3,10 @@ import { render, screen, fireEvent, waitFor, cleanup } from "@testing-library/re
 import userEvent from "@testing-library/user-event";
 import { BookingWizard } from "@/components/booking/BookingWizard";
 import type { Service } from "@/data/services";
+import { resetCatalog } from "@/lib/catalog";
 
-const { mockCreate, mockResume, mockGetHolidays, mockGetSlots, mockGetSettings } = vi.hoisted(() => ({
+const { mockCreate, mockResume, mockGetHolidays, mockGetSlots, mockGetSettings, mockListServices } = vi.hoisted(() => ({
+  mockListServices: vi.fn(),
   mockCreate: vi.fn(),
   mockResume: vi.fn(),
   mockGetHolidays: vi.fn(),
@@ -22,6 +24,9 @@ vi.mock("@/lib/api", () => ({
     create: mockCreate,
     resume: mockResume,
   },
+  servicesApi: {
+    list: mockListServices,
+  },
   paymentsApi: {
     createCheckoutSession: vi.fn().mockResolvedValue({
       checkout_url: "https://checkout.stripe.com/pay/cs_test_123",
@@ -127,6 +132,8 @@ describe("BookingWizard", () => {
     vi.clearAllMocks();
     cleanup();
     localStorage.clear();
+    resetCatalog();
+    mockListServices.mockResolvedValue([]);
     mockResume.mockRejectedValue(new Error("not found"));
     mockGetHolidays.mockResolvedValue([]);
     mockGetSettings.mockResolvedValue({
@@ -484,6 +491,25 @@ describe("BookingWizard", () => {
     });
   });
 
+  it("review shows the catalog price instead of the static one", async () => {
+    mockListServices.mockResolvedValue([
+      { slug: "premium-kundli", title: "Premium Kundli Report", prices: { "0": 5499 }, durations: [], is_report: true },
+    ]);
+    const user = userEvent.setup();
+    render(<BookingWizard service={reportService} />);
+
+    await fillDetailsForm(user);
+
+    const allButtons = screen.getAllByRole("button");
+    const nextBtn = allButtons.find(b => b.textContent?.includes("Next") && !b.hasAttribute("disabled"));
+    fireEvent.click(nextBtn!);
+
+    await waitFor(() => {
+      expect(screen.getByText("\u20B95,499")).toBeInTheDocument();
+    });
+    expect(screen.queryByText("\u20B94,999")).not.toBeInTheDocument();
+  });
+
   it("report service uses today's date for booking", async () => {
     const user = userEvent.setup();
     render(<BookingWizard service={reportService} />);
@@ -6,6 +6,7 @@ import {
   bookingsApi,
   paymentsApi,
   adminApi,
+  servicesApi,
 } from "@/lib/api";
 
 describe("apiRequest", () => {
@@ -203,6 +204,14 @@ describe("availabilityApi", () => {
     );
   });
 
+  it("getUnavailableRangeForAdmin bypasses the HTTP cache", async () => {
+    await availabilityApi.getUnavailableRangeForAdmin("2026-03-01", "2026-03-31");
+    expect(fetch).toHaveBeenCalledWith(
+      expect.stringContaining("/api/availability/unavailable/range?start=2026-03-01&end=2026-03-31"),
+      expect.objectContaining({ cache: "no-store" })
+    );
+  });
+
   it("addUnavailable calls POST with token", async () => {
     await availabilityApi.addUnavailable(
       { date: "2026-03-15", is_holiday: true },
@@ -236,6 +245,14 @@ describe("availabilityApi", () => {
     );
   });
 
+  it("getSettingsForAdmin bypasses the HTTP cache", async () => {
+    await availabilityApi.getSettingsForAdmin();
+    expect(fetch).toHaveBeenCalledWith(
+      expect.stringContaining("/api/availability/settings"),
+      expect.objectContaining({ method: "GET", cache: "no-store" })
+    );
+  });
+
   it("updateSettings calls PUT with token", async () => {
     const settings = {
       timezone: "Asia/Kolkata",
@@ -369,6 +386,26 @@ describe("paymentsApi", () => {
   });
 });
 
+describe("servicesApi", () => {
+  beforeEach(() => {
+    vi.stubGlobal(
+      "fetch",
+      vi.fn().mockResolvedValue({
+        ok: true,
+        json: () => Promise.resolve([]),
+      })
+    );
+  });
+
+  it("list calls GET /api/services", async () => {
+    await servicesApi.list();
+    expect(fetch).toHaveBeenCalledWith(
+      expect.stringContaining("/api/services"),
+      expect.objectContaining({ method: "GET" })
+    );
+  });
+});
+
 describe("adminApi", () => {
   beforeEach(() => {
     vi.stubGlobal(
@@ -399,4 +436,22 @@ describe("adminApi", () => {
       })
     );
   });
+
+  it("streamToken calls POST /api/admin/stream-token with token", async () => {
+    await adminApi.streamToken("admin-token");
+    expect(fetch).toHaveBeenCalledWith(
+      expect.stringContaining("/api/admin/stream-token"),
+      expect.objectContaining({
+        method: "POST",
+        headers: expect.objectContaining({ Authorization: "Bearer admin-token" }),
+      })
+    );
+  });
+
+  it("activityStreamUrl carries the stream token and resume point", () => {
+    const url = adminApi.activityStreamUrl("stream-token", "abc123");
+    expect(url).toContain("/api/admin/activity/stream?");
+    expect(url).toContain("token=stream-token");
+    expect(url).toContain("last_event_id=abc123");
+  });
 });
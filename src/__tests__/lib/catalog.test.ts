@@ -0,0 +1,56 @@
+import { describe, it, expect, vi, beforeEach } from "vitest";
+import { catalogPrice, formatDurations, formatINR, loadCatalog, resetCatalog, startingPrice } from "@/lib/catalog";
+import type { CatalogService } from "@/lib/api";
+
+const { mockList } = vi.hoisted(() => ({ mockList: vi.fn() }));
+
+vi.mock("@/lib/api", () => ({
+  servicesApi: { list: mockList },
+}));
+
+const call: CatalogService = {
+  slug: "call-consultation",
+  title: "Call Consultation",
+  prices: { "30": 1999, "60": 3499 },
+  durations: [30, 60],
+  is_report: false,
+};
+
+describe("catalog helpers", () => {
+  it("formats rupees with Indian grouping", () => {
+    expect(formatINR(1999)).toBe("₹1,999");
+    expect(formatINR(125000)).toBe("₹1,25,000");
+  });
+
+  it("looks up prices by duration", () => {
+    expect(catalogPrice(call, 60)).toBe(3499);
+    expect(catalogPrice(call, 45)).toBeNull();
+    expect(startingPrice(call)).toBe(1999);
+  });
+
+  it("formats durations", () => {
+    expect(formatDurations(call)).toBe("30 / 60 min");
+    expect(formatDurations({ ...call, durations: [] })).toBeNull();
+  });
+});
+
+describe("loadCatalog", () => {
+  beforeEach(() => {
+    resetCatalog();
+    mockList.mockReset();
+  });
+
+  it("fetches the catalog once", async () => {
+    mockList.mockResolvedValue([call]);
+    await loadCatalog();
+    const catalog = await loadCatalog();
+    expect(catalog.get("call-consultation")).toEqual(call);
+    expect(mockList).toHaveBeenCalledTimes(1);
+  });
+
+  it("falls back to an empty catalog and retries after a failure", async () => {
+    mockList.mockRejectedValueOnce(new Error("down")).mockResolvedValue([call]);
+    expect((await loadCatalog()).size).toBe(0);
+    expect((await loadCatalog()).size).toBe(1);
+  });
+});
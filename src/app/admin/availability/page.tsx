@@ -47,7 +47,7 @@ export default function AvailabilityPage() {
     if (!viewStart || !viewEnd) return;
     setViewLoading(true);
     try {
-      const data = await availabilityApi.getUnavailableRange(viewStart, viewEnd);
+      const data = await availabilityApi.getUnavailableRangeForAdmin(viewStart, viewEnd);
       setBlocks(data);
     } catch {
       setBlocks([]);
@@ -53,7 +53,7 @@ export default function SettingsPage() {
 
   useEffect(() => {
     availabilityApi
-      .getSettings()
+      .getSettingsForAdmin()
       .then((data) => {
         setTimezone(data.timezone);
         setWeeklyHours(data.weekly_hours);
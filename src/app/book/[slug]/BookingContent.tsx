@@ -5,6 +5,7 @@ import { ArrowLeft } from "lucide-react";
 import { Container } from "@/components/ui/Container";
 import { FloatingElements } from "@/components/ui/FloatingElements";
 import { GradientText } from "@/components/ui/GradientText";
+import { ServicePrice, ServiceDuration } from "@/components/ui/ServicePrice";
 import { BookingWizard } from "@/components/booking/BookingWizard";
 import { getServiceBySlug } from "@/data/services";
 
@@ -43,7 +44,7 @@ export function BookingContent({ slug }: { slug: string }) {
               {service.shortDescription}
             </p>
             <p className="mt-2 text-lg font-semibold text-gold-400">
-              Starting from {service.priceINR}
+              Starting from <ServicePrice slug={service.slug} fallback={service.priceINR} />
             </p>
           </div>
         </Container>
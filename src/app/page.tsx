@@ -23,6 +23,7 @@ import { AnimatedCounter } from "@/components/ui/AnimatedCounter";
 import { AnimatedText } from "@/components/ui/AnimatedText";
 import { TestimonialsCarousel } from "@/components/ui/TestimonialsCarousel";
 import { TiltCard } from "@/components/ui/TiltCard";
+import { ServicePrice, ServiceDuration } from "@/components/ui/ServicePrice";
 import { FloatingElements } from "@/components/ui/FloatingElements";
 import { SectionDivider } from "@/components/ui/SectionDivider";
 import { MagneticWrapper } from "@/components/ui/MagneticWrapper";
@@ -146,11 +147,11 @@ export default function HomePage() {
                       </p>
                       <div className="mt-4 flex items-center gap-2">
                         <span className="text-lg font-bold text-primary-600 dark:text-primary-400">
-                          {service.price}
+                          <ServicePrice slug={service.slug} fallback={service.price} />
                         </span>
                         {service.duration && (
                           <span className="text-sm text-gray-400">
-                            / {service.duration}
+                            / <ServiceDuration slug={service.slug} fallback={service.duration} />
                           </span>
                         )}
                       </div>
@@ -22,6 +22,7 @@ import { AnimateOnScroll } from "@/components/ui/AnimateOnScroll";
 import { FAQAccordion } from "@/components/ui/FAQAccordion";
 import { FloatingElements } from "@/components/ui/FloatingElements";
 import { TiltCard } from "@/components/ui/TiltCard";
+import { ServicePrice, ServiceDuration } from "@/components/ui/ServicePrice";
 import { services, getServiceBySlug, getRelatedServices } from "@/data/services";
 import { ServiceJsonLd, FAQJsonLd, BreadcrumbJsonLd } from "@/components/seo/JsonLd";
 
@@ -148,7 +149,7 @@ export default function ServiceDetailPage({
                   {service.duration && (
                     <div className="mt-4 flex items-center gap-2 text-gray-400">
                       <Clock className="h-4 w-4" />
-                      <span>{service.duration} session</span>
+                      <span><ServiceDuration slug={service.slug} fallback={service.duration} /> session</span>
                     </div>
                   )}
                 </div>
@@ -156,7 +157,7 @@ export default function ServiceDetailPage({
                 <div className="shrink-0 rounded-2xl border border-white/10 bg-white/5 p-8 text-center backdrop-blur-sm">
                   <p className="text-sm text-gray-400">Starting at</p>
                   <p className="mt-1 font-heading text-4xl font-bold text-white">
-                    {service.priceINR}
+                    <ServicePrice slug={service.slug} fallback={service.priceINR} />
                   </p>
                   <p className="text-sm text-gray-400">{service.priceEUR}</p>
                   <Link href={`/book/${service.slug}`}>
@@ -282,11 +283,11 @@ export default function ServiceDetailPage({
                     </p>
                     <div className="mt-4 flex items-center gap-2">
                       <span className="text-lg font-bold text-primary-600 dark:text-primary-400">
-                        {s.priceINR}
+                        <ServicePrice slug={s.slug} fallback={s.priceINR} />
                       </span>
                       {s.duration && (
                         <span className="text-sm text-gray-400">
-                          / {s.duration}
+                          / <ServiceDuration slug={s.slug} fallback={s.duration} />
                         </span>
                       )}
                     </div>
@@ -313,7 +314,7 @@ export default function ServiceDetailPage({
               <div className="mt-8 flex flex-col items-center justify-center gap-4 sm:flex-row">
                 <Link href={`/book/${service.slug}`}>
                   <Button variant="gold" size="lg">
-                    Book Now — {service.priceINR}
+                    Book Now — <ServicePrice slug={service.slug} fallback={service.priceINR} />
                     <ArrowRight className="h-5 w-5" />
                   </Button>
                 </Link>
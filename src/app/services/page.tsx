@@ -23,6 +23,7 @@ import { AnimateOnScroll } from "@/components/ui/AnimateOnScroll";
 import { FAQAccordion } from "@/components/ui/FAQAccordion";
 import { FloatingElements } from "@/components/ui/FloatingElements";
 import { GradientText } from "@/components/ui/GradientText";
+import { ServicePrice, ServiceDuration } from "@/components/ui/ServicePrice";
 import { services } from "@/data/services";
 
 const astrologyServices = services.filter((s) => s.category !== "wellness");
@@ -113,7 +114,7 @@ export default function ServicesPage() {
                       </h3>
                       <div className="text-right">
                         <p className="text-2xl font-bold text-primary-600 dark:text-primary-400">
-                          {service.priceINR}
+                          <ServicePrice slug={service.slug} fallback={service.priceINR} />
                         </p>
                         <p className="text-sm text-gray-400">
                           {service.priceEUR}
@@ -128,7 +129,7 @@ export default function ServicesPage() {
                     {service.duration && (
                       <div className="mt-3 flex items-center gap-1.5 text-sm text-gray-500">
                         <Clock className="h-4 w-4" />
-                        {service.duration}
+                        <ServiceDuration slug={service.slug} fallback={service.duration} />
                       </div>
                     )}
 
@@ -204,14 +205,14 @@ export default function ServicesPage() {
                     <div className="mt-4 flex items-center justify-between">
                       <div>
                         <p className="text-xl font-bold text-primary-600 dark:text-primary-400">
-                          {service.priceINR}
+                          <ServicePrice slug={service.slug} fallback={service.priceINR} />
                         </p>
                         <p className="text-xs text-gray-400">{service.priceEUR}</p>
                       </div>
                       {service.duration && (
                         <div className="flex items-center gap-1.5 text-sm text-gray-500">
                           <Clock className="h-4 w-4" />
-                          {service.duration}
+                          <ServiceDuration slug={service.slug} fallback={service.duration} />
                         </div>
                       )}
                     </div>
@@ -17,6 +17,7 @@ import { DateOfBirthPicker } from "./DateOfBirthPicker";
 import { TimeOfBirthPicker } from "./TimeOfBirthPicker";
 import { PlaceOfBirthAutocomplete } from "./PlaceOfBirthAutocomplete";
 import { bookingsApi, paymentsApi, type Booking } from "@/lib/api";
+import { catalogPrice, formatINR, useCatalogService } from "@/lib/catalog";
 import type { Service } from "@/data/services";
 
 interface BookingWizardProps {
@@ -146,8 +147,13 @@ export function BookingWizard({ service }: BookingWizardProps) {
   // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
-  // Fixed duration from the service definition (e.g. "30 min" → 30)
-  const fixedDuration = parseDurationMinutes(service.duration);
+  // Duration and price come from the API catalog; the static service
+  // strings are only a fallback until it loads
+  const catalogEntry = useCatalogService(service.slug);
+  const fixedDuration = catalogEntry?.durations[0] ?? parseDurationMinutes(service.duration);
+  const quotedPrice = catalogEntry
+    ? catalogPrice(catalogEntry, isReport ? 0 : selectedDuration)
+    : null;
 
   const steps: { key: Step; label: string; icon: React.ReactNode }[] = isReport
     ? [
@@ -579,7 +585,9 @@ export function BookingWizard({ service }: BookingWizardProps) {
               <hr className="border-gray-200 dark:border-gray-600" />
               <div className="flex justify-between text-base font-bold dark:text-gray-100">
                 <span>Price</span>
-                <span className="text-primary-600 dark:text-primary-400">{service.priceINR}</span>
+                <span className="text-primary-600 dark:text-primary-400">
+                  {quotedPrice !== null ? formatINR(quotedPrice) : service.priceINR}
+                </span>
               </div>
             </div>
           </div>
@@ -0,0 +1,21 @@
+"use client";
+
+import { formatDurations, formatINR, startingPrice, useCatalogService } from "@/lib/catalog";
+
+interface CatalogTextProps {
+  slug: string;
+  fallback: string | null;
+}
+
+/** A service's starting price from the API catalog, or ``fallback`` until it loads. */
+export function ServicePrice({ slug, fallback }: CatalogTextProps) {
+  const entry = useCatalogService(slug);
+  const price = entry ? startingPrice(entry) : null;
+  return <>{price !== null ? formatINR(price) : fallback}</>;
+}
+
+/** A service's session length(s) from the API catalog, or ``fallback``. */
+export function ServiceDuration({ slug, fallback }: CatalogTextProps) {
+  const entry = useCatalogService(slug);
+  return <>{(entry && formatDurations(entry)) ?? fallback}</>;
+}
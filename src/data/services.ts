@@ -3,6 +3,8 @@ export interface Service {
   title: string;
   shortDescription: string;
   description: string;
+  // Shown until the API catalog (/api/services) loads; prices and durations
+  // are edited there, not here
   priceINR: string;
   priceEUR: string;
   duration: string | null;
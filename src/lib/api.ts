@@ -1,16 +1,20 @@
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+// Public availability reads go through the CloudFront distribution when set
+const CDN_API_URL = process.env.NEXT_PUBLIC_CDN_API_URL || API_URL;
 
 interface RequestOptions {
   method?: string;
   body?: unknown;
   token?: string;
+  baseUrl?: string;
+  cache?: RequestCache;
 }
 
 export async function apiRequest<T>(
   endpoint: string,
   options: RequestOptions = {}
 ): Promise<T> {
-  const { method = "GET", body, token } = options;
+  const { method = "GET", body, token, baseUrl = API_URL, cache } = options;
 
   const headers: Record<string, string> = {
     "Content-Type": "application/json",
@@ -20,10 +24,11 @@ export async function apiRequest<T>(
     headers["Authorization"] = `Bearer ${token}`;
   }
 
-  const response = await fetch(`${API_URL}${endpoint}`, {
+  const response = await fetch(`${baseUrl}${endpoint}`, {
     method,
     headers,
     body: body ? JSON.stringify(body) : undefined,
+    cache,
   });
 
   if (!response.ok) {
@@ -67,6 +72,19 @@ export const authApi = {
     }>("/api/auth/me", { token }),
 };
 
+// ── Services ──
+export interface CatalogService {
+  slug: string;
+  title: string;
+  prices: Record<string, number>; // INR by duration in minutes ("0" for reports)
+  durations: number[];
+  is_report: boolean;
+}
+
+export const servicesApi = {
+  list: () => apiRequest<CatalogService[]>("/api/services", { baseUrl: CDN_API_URL }),
+};
+
 // ── Availability ──
 export interface AvailableSlot {
   start: string;
@@ -99,14 +117,27 @@ export const availabilityApi = {
     apiRequest<AvailableSlot[]>(`/api/availability/slots?date=${date}`),
 
   getHolidays: (start: string, end: string) =>
-    apiRequest<string[]>(`/api/availability/holidays?start=${start}&end=${end}`),
+    apiRequest<string[]>(`/api/availability/holidays?start=${start}&end=${end}`, {
+      baseUrl: CDN_API_URL,
+    }),
 
   getUnavailable: (date: string) =>
-    apiRequest<Unavailability[]>(`/api/availability/unavailable?date=${date}`),
+    apiRequest<Unavailability[]>(`/api/availability/unavailable?date=${date}`, {
+      baseUrl: CDN_API_URL,
+    }),
 
   getUnavailableRange: (start: string, end: string) =>
     apiRequest<Unavailability[]>(
-      `/api/availability/unavailable/range?start=${start}&end=${end}`
+      `/api/availability/unavailable/range?start=${start}&end=${end}`,
+      { baseUrl: CDN_API_URL }
+    ),
+
+  // Admin pages re-read right after their own writes, so skip the CDN and
+  // the browser cache rather than wait out max-age and the invalidation
+  getUnavailableRangeForAdmin: (start: string, end: string) =>
+    apiRequest<Unavailability[]>(
+      `/api/availability/unavailable/range?start=${start}&end=${end}`,
+      { cache: "no-store" }
     ),
 
   addUnavailable: (
@@ -132,7 +163,10 @@ export const availabilityApi = {
     }),
 
   getSettings: () =>
-    apiRequest<BusinessHoursSettings>("/api/availability/settings"),
+    apiRequest<BusinessHoursSettings>("/api/availability/settings", { baseUrl: CDN_API_URL }),
+
+  getSettingsForAdmin: () =>
+    apiRequest<BusinessHoursSettings>("/api/availability/settings", { cache: "no-store" }),
 
   updateSettings: (data: BusinessHoursSettings, token: string) =>
     apiRequest<BusinessHoursSettings>("/api/availability/settings", {
@@ -281,4 +315,18 @@ export const adminApi = {
       daily_bookings: { date: string; bookings: number }[];
       daily_revenue: { date: string; revenue: number }[];
     }>("/api/admin/stats", { token }),
+
+  // EventSource cannot send an Authorization header, so the activity stream
+  // is opened with a short-lived stream token in the URL
+  streamToken: (token: string) =>
+    apiRequest<{ token: string; expires_in: number }>("/api/admin/stream-token", {
+      method: "POST",
+      token,
+    }),
+
+  activityStreamUrl: (streamToken: string, lastEventId?: string) => {
+    const params = new URLSearchParams({ token: streamToken });
+    if (lastEventId) params.set("last_event_id", lastEventId);
+    return `${API_URL}/api/admin/activity/stream?${params}`;
+  },
 };
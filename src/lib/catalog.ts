@@ -0,0 +1,59 @@
+
+import { useEffect, useState } from "react";
+import { servicesApi, type CatalogService } from "@/lib/api";
+
+// Prices and durations come from the API catalog, which admins edit; the
+// strings in data/services.ts are only shown until it loads (or if it fails)
+let catalogPromise: Promise<Map<string, CatalogService>> | null = null;
+
+export function loadCatalog(): Promise<Map<string, CatalogService>> {
+  if (!catalogPromise) {
+    catalogPromise = (async () => {
+      const list = await servicesApi.list();
+      return new Map(list.map((s) => [s.slug, s]));
+    })().catch(() => {
+      catalogPromise = null; // retry on the next mount
+      return new Map<string, CatalogService>();
+    });
+  }
+  return catalogPromise;
+}
+
+export function resetCatalog() {
+  catalogPromise = null;
+}
+
+export function useCatalogService(slug: string): CatalogService | null {
+  const [entry, setEntry] = useState<CatalogService | null>(null);
+
+  useEffect(() => {
+    let active = true;
+    loadCatalog().then((catalog) => {
+      if (active) setEntry(catalog.get(slug) ?? null);
+    });
+    return () => {
+      active = false;
+    };
+  }, [slug]);
+
+  return entry;
+}
+
+export function formatINR(amount: number): string {
+  return `\u20B9${amount.toLocaleString("en-IN")}`;
+}
+
+/** Price for a duration (0 for reports), or null if the catalog has none. */
+export function catalogPrice(entry: CatalogService, durationMinutes: number): number | null {
+  return entry.prices[String(durationMinutes)] ?? null;
+}
+
+/** Lowest price across the service's options. */
+export function startingPrice(entry: CatalogService): number | null {
+  const prices = Object.values(entry.prices);
+  return prices.length ? Math.min(...prices) : null;
+}
+
+export function formatDurations(entry: CatalogService): string | null {
+  return entry.durations.length ? `${entry.durations.join(" / ")} min` : null;
+}
@@ -128,6 +128,36 @@ resource "aws_cloudfront_response_headers_policy" "noindex" {
 }
 
 
+# ══════════════════════════════════════════════
+#  Cache Policy — public API reads
+# ══════════════════════════════════════════════
+
+# TTLs come from the API's Cache-Control (s-maxage); the API purges these
+# paths on every write, so a long edge TTL is safe.
+resource "aws_cloudfront_cache_policy" "api_public_reads" {
+  name        = "${local.name_prefix}-api-public-reads"
+  comment     = "Public availability reads for ${local.env}"
+  min_ttl     = 0
+  default_ttl = 0
+  max_ttl     = 604800
+
+  parameters_in_cache_key_and_forwarded_to_origin {
+    enable_accept_encoding_gzip   = true
+    enable_accept_encoding_brotli = true
+
+    query_strings_config {
+      query_string_behavior = "all"
+    }
+    headers_config {
+      header_behavior = "none"
+    }
+    cookies_config {
+      cookie_behavior = "none"
+    }
+  }
+}
+
+
 # ══════════════════════════════════════════════
 #  CloudFront Distribution
 # ══════════════════════════════════════════════
@@ -151,6 +181,32 @@ resource "aws_cloudfront_distribution" "website" {
     }
   }
 
+  # API origin — only the public, cacheable reads below are routed here
+  origin {
+    domain_name = local.api_domain
+    origin_id   = "API-${local.api_domain}"
+
+    custom_origin_config {
+      http_port              = 80
+      https_port             = 443
+      origin_protocol_policy = "https-only"
+      origin_ssl_protocols   = ["TLSv1.2"]
+    }
+  }
+
+  dynamic "ordered_cache_behavior" {
+    for_each = local.cdn_api_paths
+    content {
+      path_pattern           = ordered_cache_behavior.value
+      allowed_methods        = ["GET", "HEAD", "OPTIONS"]
+      cached_methods         = ["GET", "HEAD"]
+      target_origin_id       = "API-${local.api_domain}"
+      viewer_protocol_policy = "redirect-to-https"
+      compress               = true
+      cache_policy_id        = aws_cloudfront_cache_policy.api_public_reads.id
+    }
+  }
+
   default_cache_behavior {
     allowed_methods        = ["GET", "HEAD"]
     cached_methods         = ["GET", "HEAD"]
@@ -45,6 +45,7 @@ resource "aws_ecs_task_definition" "api" {
         { name = "JWT_ALGORITHM", value = "HS256" },
         { name = "ACCESS_TOKEN_EXPIRE_MINUTES", value = "15" },
         { name = "REFRESH_TOKEN_EXPIRE_DAYS", value = "7" },
+        { name = "CDN_DISTRIBUTION_ID", value = aws_cloudfront_distribution.website.id },
       ]
 
       # Sensitive values from SSM Parameter Store (free tier)
@@ -64,13 +65,18 @@ resource "aws_ecs_task_definition" "api" {
         }
       }
 
-      # Health check at container level
+      # Health check at container level. Cloud Map (and so API Gateway)
+      # only routes to healthy tasks, and /api/health/started is 503 until
+      # the first warm-up finishes, so a cold task gets no traffic. It does
+      # not ping Mongo afterwards: ECS replaces unhealthy tasks, and a Mongo
+      # blip must not restart every task at once. startPeriod covers the
+      # warm-up retries (1+2+5+10s backoff, then every 10s).
       healthCheck = {
-        command     = ["CMD-SHELL", "python -c \"import urllib.request; urllib.request.urlopen('http://localhost:${var.api_container_port}/api/health')\" || exit 1"]
-        interval    = 30
+        command     = ["CMD-SHELL", "python -c \"import urllib.request; urllib.request.urlopen('http://localhost:${var.api_container_port}/api/health/started')\" || exit 1"]
+        interval    = 10
         timeout     = 5
         retries     = 3
-        startPeriod = 60
+        startPeriod = 120
       }
     }
   ])
@@ -176,3 +176,21 @@ resource "aws_iam_role" "ecs_task" {
 
   tags = local.common_tags
 }
+
+# Purge cached public API reads after admin writes
+resource "aws_iam_role_policy" "ecs_task_cloudfront" {
+  name = "${local.name_prefix}-ecs-cloudfront-invalidate"
+  role = aws_iam_role.ecs_task.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Sid      = "CloudFrontInvalidation"
+        Effect   = "Allow"
+        Action   = ["cloudfront:CreateInvalidation"]
+        Resource = aws_cloudfront_distribution.website.arn
+      }
+    ]
+  })
+}
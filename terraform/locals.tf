@@ -12,6 +12,15 @@ locals {
   frontend_domain = terraform.workspace == "default" ? "vedicjivan.${var.hosted_zone_name}" : "${lower(var.project_name)}-${local.env}.${var.hosted_zone_name}"
   api_domain      = terraform.workspace == "default" ? "api.vedicjivan.${var.hosted_zone_name}" : "api.${lower(var.project_name)}-${local.env}.${var.hosted_zone_name}"
 
+  # Public API reads served (and cached) through the website distribution.
+  # The API purges them on writes; keep in sync with app/services/http_cache.py.
+  cdn_api_paths = [
+    "/api/availability/settings",
+    "/api/availability/holidays",
+    "/api/availability/unavailable",
+    "/api/availability/unavailable/range",
+  ]
+
   # SSM parameter prefix: "/vedicjivan" for prod, "/vedicjivan-test" for test
   ssm_prefix = "/${local.name_prefix}"
 